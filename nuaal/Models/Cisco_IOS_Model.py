@@ -18,6 +18,8 @@ class CiscoIOSModel(DeviceBaseModel):
         super(CiscoIOSModel, self).__init__(name="CiscoIOSCliModel", DEBUG=DEBUG)
         self.cli_connection = cli_connection
         self.physical_interfaces = ["FastEthernet", "GigabitEthernet", "TenGigabitEthernet"]
+        # Keys of `show interfaces` used by _map_interface(), other keys (such as counters) are not parsed at all
+        self.interface_fields = ["name", "status", "lineProtocol", "description", "hardware", "mac", "duplex", "bandwidth", "ipv4Address", "ipv4Mask"]
 
     def _map_interface(self, interface):
         """
@@ -53,11 +55,11 @@ class CiscoIOSModel(DeviceBaseModel):
             with self.cli_connection as device:
                 access_vlans = device.get_vlans()
                 trunks = device.get_trunks()
-                interfaces = device.get_interfaces()
+                interfaces = device.get_interfaces(fields=self.interface_fields)
         else:
             access_vlans = self.cli_connection.get_vlans()
             trunks = self.cli_connection.get_trunks()
-            interfaces = self.cli_connection.get_interfaces()
+            interfaces = self.cli_connection.get_interfaces(fields=self.interface_fields)
 
         #
         for interface in interfaces:
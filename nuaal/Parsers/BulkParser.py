@@ -0,0 +1,273 @@
+from nuaal.definitions import OUTPUT_PATH
+from nuaal.utils import get_logger
+from nuaal.Parsers.GetParser import GetParser
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import timeit
+
+# Parsers of the worker process, created on first use and reused for all files parsed by that process
+_WORKER_PARSERS = {}
+_WORKER_VERBOSITY = 2
+# Queue of the pool, worker puts index of each shard to it before parsing, so shards in progress are known when the worker dies
+_WORKER_STARTED = None
+
+
+def _init_worker(verbosity, started=None):
+    global _WORKER_VERBOSITY, _WORKER_STARTED
+    _WORKER_VERBOSITY = verbosity
+    _WORKER_STARTED = started
+
+
+def _get_parser(device_type):
+    if device_type not in _WORKER_PARSERS:
+        _WORKER_PARSERS[device_type] = GetParser(device_type=device_type, verbosity=_WORKER_VERBOSITY)
+    return _WORKER_PARSERS[device_type]
+
+
+def parse_file(path, device, device_type, command):
+    """
+    Parses single archived output. Any exception is caught and reported in the result, so one broken file never stops the whole run.
+
+    :param str path: Path of the text file
+    :param str device: Name of the device folder, such as `10.0.0.1_SW1`
+    :param str device_type: String representation of device type, such as `cisco_ios`
+    :param str command: Command used to generate the output
+    :return: (dict) Result with `path`, `device`, `device_type`, `command`, `status` (`ok`, `unsupported` or `error`) and `entries` or `error` keys
+    """
+    start_time = timeit.default_timer()
+    result = {"path": path, "device": device, "device_type": device_type, "command": command}
+    try:
+        parser = _get_parser(device_type=device_type)
+        if parser is None:
+            raise ValueError("Unknown device type '{}'.".format(device_type))
+        if not parser.supports(command=command):
+            result["status"] = "unsupported"
+        else:
+            with open(path, mode="r", errors="replace") as f:
+                text = f.read()
+            result["entries"] = parser.autoparse(text=text, command=command)
+            result["status"] = "ok"
+    except Exception as e:
+        result["status"] = "error"
+        result["error"] = repr(e)
+    result["time"] = round((timeit.default_timer() - start_time) * 1000, 3)
+    return result
+
+
+def parse_files(files, index=None):
+    """
+    Parses shard of archived outputs and serializes the results to JSON in the worker process.
+
+    :param list files: List of ``(path, device, device_type, command)`` tuples
+    :param int index: Index of the shard, reported to ``BulkParser`` before parsing
+    :return: List of ``(status, json_line)`` tuples
+    """
+    if _WORKER_STARTED is not None and index is not None:
+        _WORKER_STARTED.put(index)
+    lines = []
+    for path, device, device_type, command in files:
+        result = parse_file(path=path, device=device, device_type=device_type, command=command)
+        try:
+            lines.append((result["status"], json.dumps(result)))
+        except (TypeError, ValueError) as e:
+            result.pop("entries", None)
+            result["status"] = "error"
+            result["error"] = repr(e)
+            lines.append((result["status"], json.dumps(result)))
+    return lines
+
+
+class BulkParser(object):
+    """
+    This class re-parses archived raw outputs, such as those stored by connection objects with ``store_outputs=True`` in
+    `~/.nuaal/outputs/<ip>_<hostname>/<command>.txt`. Files are split to shards and parsed by pool of worker processes, each of them
+    keeping one parser per device type for the whole run. Results are written to NDJSON file as they arrive, one line per parsed file.
+
+    When a worker process dies, for example killed by the OS for running out of memory, the pool is broken and all its pending shards fail.
+    Shards which were not started yet are then parsed by new pool, and each shard which was in progress is parsed again by a pool of its own,
+    so only the shard which crashed the worker is reported as errors.
+
+    The package exports this class under the name of its module, so run it from command line as ``python -m nuaal.Parsers.BulkParser`` and
+    import functions of the module as ``from nuaal.Parsers.BulkParser import parse_file``.
+    """
+    def __init__(self, path=OUTPUT_PATH, device_type="cisco_ios", device_types=None, workers=None, chunk_size=16, verbosity=3, DEBUG=False):
+        """
+
+        :param str path: Root of the outputs tree, every subfolder represents single device
+        :param str device_type: Device type of devices not listed in ``device_types``
+        :param dict device_types: Dictionary with device folder names as keys and device types as values
+        :param int workers: Number of worker processes, defaults to number of CPUs. With ``workers=1`` files are parsed in current process.
+        :param int chunk_size: Number of files sent to worker process at once
+        :param bool DEBUG: Enables/disables debugging output
+        """
+        self.path = path
+        self.device_type = device_type
+        self.device_types = device_types if isinstance(device_types, dict) else {}
+        self.workers = workers if workers else os.cpu_count() or 1
+        self.chunk_size = max(int(chunk_size), 1)
+        self.verbosity = verbosity
+        self.logger = get_logger(name="BulkParser", verbosity=verbosity, DEBUG=DEBUG)
+        self.stats = {}
+        self._logged_decile = 0
+
+    def find_files(self):
+        """
+        Walks the outputs tree and maps each text file to its device, device type and command. Command is derived from the file name,
+        the same way as connection objects create it, e.g. `show_vlan_brief.txt` -> `show vlan brief`.
+
+        :return: List of ``(path, device, device_type, command)`` tuples
+        """
+        files = []
+        for root, dirs, filenames in os.walk(self.path):
+            dirs.sort()
+            device = os.path.relpath(root, self.path)
+            if device == ".":
+                continue
+            device = device.split(os.sep)[0]
+            device_type = self.device_types.get(device, self.device_type)
+            for filename in sorted(filenames):
+                if filename[-4:] != ".txt":
+                    continue
+                files.append((os.path.join(root, filename), device, device_type, filename[:-4].replace("_", " ")))
+        self.logger.info(msg="Found {} outputs of {} devices in '{}'.".format(len(files), len(set(x[1] for x in files)), self.path))
+        return files
+
+    def _shards(self, files):
+        return [files[i:i + self.chunk_size] for i in range(0, len(files), self.chunk_size)]
+
+    def _report(self, done, total, start_time, progress):
+        if progress is not None:
+            progress(done, total)
+            return
+        # Log every 10 percent
+        decile = done * 10 // total
+        if decile > self._logged_decile:
+            self._logged_decile = decile
+            self.logger.info(msg="Parsed {}/{} files in {} seconds.".format(done, total, round(timeit.default_timer() - start_time, 1)))
+
+    def run(self, output, progress=None):
+        """
+        Parses all outputs found in ``self.path`` and writes results to ``output``.
+
+        :param output: Path of NDJSON file, or file-like object opened for writing text
+        :param progress: Optional callable, called with number of parsed files and total number of files after each shard. Progress is logged otherwise.
+        :return: (dict) Number of files by status (`ok`, `unsupported`, `error`), total number of `files` and run `time` in seconds
+        """
+        start_time = timeit.default_timer()
+        files = self.find_files()
+        self.stats = {"files": len(files), "ok": 0, "unsupported": 0, "error": 0}
+        self._logged_decile = 0
+        stream = open(output, mode="w") if isinstance(output, str) else output
+        try:
+            if self.workers == 1:
+                _init_worker(verbosity=self.verbosity)
+                done = 0
+                for shard in self._shards(files):
+                    self._write(stream=stream, lines=parse_files(shard))
+                    done += len(shard)
+                    self._report(done=done, total=len(files), start_time=start_time, progress=progress)
+            else:
+                self._run_pool(files=files, stream=stream, start_time=start_time, progress=progress)
+        finally:
+            if stream is not output:
+                stream.close()
+        self.stats["time"] = round(timeit.default_timer() - start_time, 3)
+        self.logger.info(msg="Bulk parsing finished: {}".format(self.stats))
+        return self.stats
+
+    def _run_pool(self, files, stream, start_time, progress):
+        progress_state = {"done": 0, "total": len(files), "start_time": start_time, "progress": progress}
+        pending = dict(enumerate(self._shards(files)))
+        while pending:
+            pending, started = self._run_shards(shards=pending, workers=self.workers, stream=stream, progress_state=progress_state)
+            if started:
+                self.logger.warning(msg="Worker process died, parsing {} shards in progress one by one.".format(len(started)))
+            for index, shard in started.items():
+                unfinished, crashed = self._run_shards(shards={index: shard}, workers=1, stream=stream, progress_state=progress_state)
+                for failed in list(unfinished.values()) + list(crashed.values()):
+                    self._fail_shard(
+                        shard=failed, error=BrokenProcessPool("Worker process died while parsing the shard."), stream=stream,
+                        progress_state=progress_state
+                    )
+
+    def _run_shards(self, shards, workers, stream, progress_state):
+        """
+        Parses ``shards`` by new pool of ``workers`` processes and writes the results.
+
+        :param dict shards: Dictionary with indexes of the shards as keys and lists of files as values
+        :param int workers: Number of worker processes
+        :return: Tuple of dictionaries with shards which were not parsed because the pool broke, first of those not started,
+            second of those in progress
+        """
+        unfinished = dict(shards)
+        started = multiprocessing.SimpleQueue()
+        with ProcessPoolExecutor(max_workers=min(workers, len(shards)), initializer=_init_worker, initargs=(self.verbosity, started)) as executor:
+            futures = {}
+            try:
+                for index, shard in shards.items():
+                    futures[executor.submit(parse_files, shard, index)] = index
+            except BrokenProcessPool:
+                pass
+            for future in as_completed(futures):
+                index = futures[future]
+                try:
+                    lines = future.result()
+                except BrokenProcessPool:
+                    continue
+                except Exception as e:
+                    self._fail_shard(shard=shards[index], error=e, stream=stream, progress_state=progress_state)
+                else:
+                    self._write(stream=stream, lines=lines)
+                    progress_state["done"] += len(shards[index])
+                    self._report(**progress_state)
+                del unfinished[index]
+        started_indexes = set()
+        while not started.empty():
+            started_indexes.add(started.get())
+        started.close()
+        in_progress = {index: shard for index, shard in unfinished.items() if index in started_indexes}
+        not_started = {index: shard for index, shard in unfinished.items() if index not in started_indexes}
+        if unfinished and not in_progress and len(unfinished) == len(shards):
+            # Pool broke before any shard was started, such as when worker could not be initialized
+            for shard in unfinished.values():
+                self._fail_shard(
+                    shard=shard, error=BrokenProcessPool("Worker process died before parsing the shard."), stream=stream, progress_state=progress_state
+                )
+            return {}, {}
+        return not_started, in_progress
+
+    def _fail_shard(self, shard, error, stream, progress_state):
+        self.logger.error(msg="Failed to parse shard of {} files. Exception: {}".format(len(shard), repr(error)))
+        self._write(stream=stream, lines=[("error", json.dumps({
+            "path": path, "device": device, "device_type": device_type, "command": command, "status": "error", "error": repr(error)
+        })) for path, device, device_type, command in shard])
+        progress_state["done"] += len(shard)
+        self._report(**progress_state)
+
+    def _write(self, stream, lines):
+        for status, line in lines:
+            self.stats[status] += 1
+            stream.write(line)
+            stream.write("\n")
+        stream.flush()
+
+
+def main(argv=None):
+    argument_parser = argparse.ArgumentParser(description="Re-parse archived raw outputs to NDJSON.")
+    argument_parser.add_argument("output", help="Path of the NDJSON file")
+    argument_parser.add_argument("--path", default=OUTPUT_PATH, help="Root of the outputs tree")
+    argument_parser.add_argument("--device-type", default="cisco_ios", help="Device type of all devices")
+    argument_parser.add_argument("--workers", type=int, default=None, help="Number of worker processes")
+    args = argument_parser.parse_args(argv)
+    bulk_parser = BulkParser(path=args.path, device_type=args.device_type, workers=args.workers)
+    stats = bulk_parser.run(output=args.output)
+    return 0 if stats["error"] == 0 else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
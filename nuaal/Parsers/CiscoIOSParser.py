@@ -1,13 +1,21 @@
 from nuaal.Parsers import ParserModule
+from nuaal.Parsers.Extractors import PatternExtractor
 import timeit
 import re
 
+# Patterns of `show interfaces trunk` sections, matched against single lines
+TRUNK_MODE_PATTERN = PatternExtractor(regex=re.compile(
+    pattern=r"^(?P<interface>[A-Za-z]+\d+(\/\d+){0,2})\s+(?P<mode>\S+)\s+(?P<encapsulation>\S+)\s+(?P<status>\S+)\s+(?P<nativeVlan>\d+)"
+))
+TRUNK_VLANS_PATTERN = PatternExtractor(regex=re.compile(pattern=r"^(?P<interface>[A-Za-z]+\d+(\/\d+){0,2})\s+(?P<vlanGroup>(?:\d{1,4}(?:-\d{1,4})?,?)+)"))
+
+
 class CiscoIOSParser(ParserModule):
     """
     Child class of `ParserModule` designed for `cisco_ios` device type.
     """
-    def __init__(self, verbosity=4, DEBUG=False):
-        super(CiscoIOSParser, self).__init__(device_type="cisco_ios", verbosity=verbosity, DEBUG=DEBUG)
+    def __init__(self, lazy=True, use_bundle=False, compact=False, verbosity=4, DEBUG=False):
+        super(CiscoIOSParser, self).__init__(device_type="cisco_ios", lazy=lazy, use_bundle=use_bundle, compact=compact, verbosity=verbosity, DEBUG=DEBUG)
 
     def vlanGroup_check(self, vlanGroup):
         if isinstance(vlanGroup, list):
@@ -33,41 +41,69 @@ class CiscoIOSParser(ParserModule):
         :return: List of dictionaries representing trunk interfaces.
         """
         start_time = timeit.default_timer()
-        section_pattern = re.compile(pattern=r"(?:^Port.*$(?:\s^\S.*$)+)", flags=re.MULTILINE)
-        sections = self.match_single_pattern(pattern=section_pattern, text=text)
+        sections = self.trunk_sections(text=text)
         if len(sections) != 4:
             return []
-        mode_pattern = re.compile(
-            pattern=r"^(?P<interface>[A-Za-z]+\d+(\/\d+){0,2})\s+(?P<mode>\S+)\s+(?P<encapsulation>\S+)\s+(?P<status>\S+)\s+(?P<nativeVlan>\d+)",
-            flags=re.MULTILINE
-        )
-        interface_pattern = re.compile(pattern=r"^(?P<interface>[A-Za-z]+\d+(\/\d+){0,2})\s+(?P<vlanGroup>(?:\d{1,4}(?:-\d{1,4})?,?)+)", flags=re.MULTILINE)
-        mode = self.match_single_pattern(text=sections[0], pattern=mode_pattern)
-        allowed = self.match_single_pattern(text=sections[1], pattern=interface_pattern)
-        active = self.match_single_pattern(text=sections[2], pattern=interface_pattern)
-        forwarding = self.match_single_pattern(text=sections[3], pattern=interface_pattern)
-        trunks = []
-        for trunk in mode:
-            entry = dict(trunk)
-            entry["allowed"] = self.vlanGroup_check([x["vlanGroup"] for x in allowed if x["interface"] == entry["interface"]])
-            entry["active"] = self.vlanGroup_check([x["vlanGroup"] for x in active if x["interface"] == entry["interface"]])
-            entry["forwarding"] = self.vlanGroup_check([x["vlanGroup"] for x in forwarding if x["interface"] == entry["interface"]])
-            trunks.append(entry)
+        trunks = [entry for entry in map(TRUNK_MODE_PATTERN.search, sections[0]) if entry is not None]
+        vlans = []
+        for section in sections[1:]:
+            # Only the first line of each interface is used, wrapped VLAN lists repeat the interface name
+            section_vlans = {}
+            for entry in map(TRUNK_VLANS_PATTERN.search, section):
+                if entry is not None and entry["interface"] not in section_vlans:
+                    section_vlans[entry["interface"]] = entry["vlanGroup"]
+            vlans.append(section_vlans)
+        allowed, active, forwarding = vlans
+        for entry in trunks:
+            entry["allowed"] = self.vlanGroup_check(allowed.get(entry["interface"], []))
+            entry["active"] = self.vlanGroup_check(active.get(entry["interface"], []))
+            entry["forwarding"] = self.vlanGroup_check(forwarding.get(entry["interface"], []))
         self.logger.info(msg="Parsing of 'show interfaces trunk' took {} seconds.".format((timeit.default_timer()-start_time)))
         return trunks
 
-    def parse_interfaces_switchport(self, text):
-        entries = super(CiscoIOSParser, self).autoparse(text=text, command="show interfaces switchport")
+    def trunk_sections(self, text):
+        """
+        Splits output of `show interfaces trunk` to sections in single pass. Each section starts with header line beginning with `Port`
+        and continues until a blank or indented line.
 
-        to_list_keys = ["trunk_enabled_vlans", "pruning_enabled_vlans"]
-        for entry in entries:
+        :param str text: Plaintext output of `show interfaces trunk` command.
+        :return: List of sections, each being list of lines without the header.
+        """
+        sections = []
+        section = None
+        for line in text.split("\n"):
+            if section is not None:
+                if line[:1].strip():
+                    section.append(line)
+                    continue
+                section = None
+            if line.startswith("Port"):
+                section = []
+                sections.append(section)
+        return [x for x in sections if x]
+
+    def iter_interfaces_switchport(self, text, fields=None):
+        """
+        Generator version of ``parse_interfaces_switchport()``.
 
+        :param str text: Plaintext output of `show interfaces switchport` command.
+        :param list fields: Optional list of keys the caller needs.
+        :return: Generator of dictionaries representing interfaces.
+        """
+        to_list_keys = ["trunk_enabled_vlans", "pruning_enabled_vlans"]
+        for entry in super(CiscoIOSParser, self).iterparse(text=text, command="show interfaces switchport", fields=fields):
             for key in to_list_keys:
-                if isinstance(entry[key], str):
+                if isinstance(entry.get(key), str):
                     entry[key] = self.split_to_list(text=entry[key], delimiter=",")
-        return entries
+            yield entry
 
-    def autoparse(self, text, command):
+    def parse_interfaces_switchport(self, text, fields=None):
+        return list(self.iter_interfaces_switchport(text=text, fields=fields))
+
+    def supports(self, command):
+        return command == "show interfaces trunk" or super(CiscoIOSParser, self).supports(command=command)
+
+    def autoparse(self, text, command, fields=None, layout="rows"):
         """
         .. _autoparse:
 
@@ -75,12 +111,38 @@ class CiscoIOSParser(ParserModule):
 
         :param str text: Text output to be processed
         :param str command: Command used to generate ``text`` output. Based on this parameter, correct regex patterns are selected.
-        :return: List of found entities, usually list of dictionaries
+        :param list fields: Optional list of keys the caller needs.
+        :param str layout: `rows` (default) or `columns`, see ``ParserModule.autoparse()``
+        :return: List of found entities, usually list of dictionaries, or ``Columns`` object
         """
         # Process Special Commands
+        if layout != "rows":
+            return super(CiscoIOSParser, self).autoparse(text=text, command=command, fields=fields, layout=layout)
+        elif command == "show interfaces trunk":
+            trunks = self.trunk_parser(text=text)
+            if fields is not None:
+                trunks = self._project(entries=trunks, fields=fields)
+            return list(self.compact_entries(entries=trunks, command=command))
+        elif command == "show interfaces switchport":
+            return self.parse_interfaces_switchport(text=text, fields=fields)
+        else:
+            return super(CiscoIOSParser, self).autoparse(text=text, command=command, fields=fields)
+
+    def iterparse(self, text, command, fields=None):
+        """
+        Generator version of :ref:`autoparse <autoparse>`, handles the same special commands.
+
+        :param str text: Text output to be processed
+        :param str command: Command used to generate ``text`` output. Based on this parameter, correct regex patterns are selected.
+        :param list fields: Optional list of keys the caller needs.
+        :return: Generator of found entities, usually dictionaries
+        """
         if command == "show interfaces trunk":
-            return self.trunk_parser(text=text)
+            trunks = self.trunk_parser(text=text)
+            if fields is not None:
+                trunks = self._project(entries=trunks, fields=fields)
+            yield from self.compact_entries(entries=trunks, command=command)
         elif command == "show interfaces switchport":
-            return self.parse_interfaces_switchport(text=text)
+            yield from self.iter_interfaces_switchport(text=text, fields=fields)
         else:
-            return super(CiscoIOSParser, self).autoparse(text=text, command=command)
+            yield from super(CiscoIOSParser, self).iterparse(text=text, command=command, fields=fields)
@@ -1,10 +1,112 @@
 from nuaal.Parsers import ParserModule
+from nuaal.Parsers.Structured import StructuredMapping, short_interface, port_list, split_part, constant
+from nuaal.Parsers.Extractors import to_str
 import timeit
 import re
 
+
+def _capabilities(value):
+    if isinstance(value, list):
+        return " ".join(value)
+    return value
+
+
+def _software(value):
+    for marker, software in [("NX-OS", "NX-OS"), ("IOS-XE", "IOS XE"), ("IOS XE", "IOS XE"), ("IOS", "IOS")]:
+        if marker in value:
+            return software
+    return None
+
+
+def _version(value):
+    version = value.partition("Version ")[2]
+    return version.split(",")[0].split()[0] if version.strip() else None
+
+
+def _uptime(row):
+    if row.get("kern_uptm_days") is None:
+        return None
+    return "{} days, {} hours, {} minutes".format(row.get("kern_uptm_days"), row.get("kern_uptm_hrs"), row.get("kern_uptm_mins"))
+
+
+def _memory(row):
+    if row.get("memory") is None:
+        return None
+    return "{}{}".format(row["memory"], "K" if row.get("mem_type") == "kB" else row.get("mem_type", ""))
+
+
+STRUCTURED = {
+    "show version": StructuredMapping(rows=(), fields={
+        "vendor": constant("Cisco"),
+        "software": constant("NX-OS"),
+        "version": lambda row: row.get("nxos_ver_str") or row.get("sys_ver_str") or row.get("kickstart_ver_str"),
+        "platform": ("chassis_id", lambda value: value.replace("Chassis", "").replace("chassis", "").split("(")[0].strip()),
+        "systemMemory": _memory,
+        "hostname": ("host_name", to_str),
+        "uptime": _uptime,
+        "imageFile": lambda row: row.get("nxos_file_name") or row.get("kick_file_name"),
+        "experimental_version": constant(None)
+    }),
+    "show vlan brief": StructuredMapping(rows=("TABLE_vlanbriefxbrief", "ROW_vlanbriefxbrief"), fields={
+        "id": "vlanshowbr-vlanid",
+        "name": ("vlanshowbr-vlanname", to_str),
+        "status": "vlanshowbr-vlanstate",
+        "access_ports": lambda row: port_list(row.get("vlanshowplist-ifidx"))
+    }),
+    "show interface status": StructuredMapping(rows=("TABLE_interface", "ROW_interface"), fields={
+        "interface": ("interface", short_interface),
+        "name": ("name", to_str),
+        "status": "state",
+        "vlan": "vlan",
+        "duplex": "duplex",
+        "speed": "speed",
+        "type": ("type", to_str)
+    }),
+    "show mac address-table": StructuredMapping(rows=("TABLE_mac_address", "ROW_mac_address"), fields={
+        "vlan": "disp_vlan",
+        "mac": "disp_mac_addr",
+        "type": ("disp_is_static", lambda value: "STATIC" if value == "enabled" else "DYNAMIC"),
+        "ports": ("disp_port", short_interface)
+    }),
+    "show ip arp": StructuredMapping(rows=("TABLE_vrf", "ROW_vrf", "TABLE_adj", "ROW_adj"), fields={
+        "protocol": constant("Internet"),
+        "ipAddress": "ip-addr-out",
+        "age": "time-stamp",
+        "mac": "mac",
+        "type": constant("ARPA"),
+        "interface": ("intf-out", short_interface)
+    }),
+    "show cdp neighbors detail": StructuredMapping(rows=("TABLE_cdp_neighbor_detail_info", "ROW_cdp_neighbor_detail_info"), fields={
+        "hostname": lambda row: row.get("sysname") or row.get("device_id", "").split("(")[0].split(".")[0] or None,
+        "ipAddress": lambda row: row.get("v4addr") or row.get("v4mgmtaddr"),
+        "platform": "platform_id",
+        "capabilities": ("capability", _capabilities),
+        "localInterface": ("intf_id", to_str),
+        "remoteInterface": ("port_id", to_str),
+        "vendor": constant("Cisco"),
+        "software": ("version", _software),
+        "version": ("version", _version)
+    }),
+    "show lldp neighbors detail": StructuredMapping(rows=("TABLE_nbor_detail", "ROW_nbor_detail"), fields={
+        "hostname": ("sys_name", split_part(".", 0)),
+        "domain": ("sys_name", split_part(".", 1)),
+        "localInterface": ("l_port_id", to_str),
+        "remoteInterface": ("port_id", to_str),
+        "remotePortDescription": ("port_desc", to_str),
+        "chassisId": "chassis_id",
+        "capabilities": ("system_capability", to_str),
+        "enCapabilities": ("enabled_capability", to_str)
+    })
+}
+
+
 class CiscoNXOSParser(ParserModule):
     """
-    Child class of `ParserModule` designed for `cisco_ios` device type.
+    Child class of `ParserModule` designed for `cisco_nxos` device type. Outputs of commands in ``STRUCTURED`` requested with `| json`
+    are mapped onto the same keys without regex, other commands and plaintext outputs are parsed by patterns from ``PatternsLib``.
     """
-    def __init__(self, DEBUG=False):
-        super(CiscoNXOSParser, self).__init__(device_type="cisco_nxos", DEBUG=DEBUG)
+    structured = STRUCTURED
+    structured_suffix = "| json"
+
+    def __init__(self, lazy=True, use_bundle=False, compact=False, verbosity=4, DEBUG=False):
+        super(CiscoNXOSParser, self).__init__(device_type="cisco_nxos", lazy=lazy, use_bundle=use_bundle, compact=compact, verbosity=verbosity, DEBUG=DEBUG)
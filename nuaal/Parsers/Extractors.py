@@ -0,0 +1,482 @@
+from nuaal.utils import int_name_convert, mac_addr_convert
+from operator import itemgetter
+import re
+
+_INT_PATTERN = re.compile(r"\s*[+-]?\d+(?:_\d+)*\s*")
+_VLAN_LIST_PATTERN = re.compile(r"\d{1,4}(?:-\d{1,4})?(?:[,\s]+\d{1,4}(?:-\d{1,4})?)*")
+_BOOL_MAP = {
+    "yes": True, "true": True, "enabled": True, "on": True, "up": True,
+    "no": False, "false": False, "disabled": False, "off": False, "down": False
+}
+
+
+def auto_int(value):
+    """
+    Converts captured string to integer if it represents one, otherwise returns it unchanged. Equivalent of trying ``int(value)``
+    and falling back to the original value on failure, but without raising exceptions for non-numeric strings.
+
+    :param str value: Captured string or ``None``
+    :return: Integer or original value
+    """
+    if value is None:
+        return None
+    if value.isdecimal():
+        return int(value)
+    if _INT_PATTERN.fullmatch(value) is None:
+        return value
+    return int(value)
+
+
+def to_str(value):
+    """
+    Returns captured string unchanged.
+    """
+    return value
+
+
+def to_mac(value):
+    """
+    Converts captured MAC address to `XX:XX:XX:XX:XX:XX` format.
+    """
+    if value is None:
+        return None
+    return mac_addr_convert(value)
+
+
+def to_vlan_list(value):
+    """
+    Converts captured VLAN range, such as `"1-3,10"`, to list of integers. Value `"none"` is converted to empty list, values which are not
+    VLAN ranges (such as `"ALL"`) are returned unchanged.
+    """
+    if value is None:
+        return None
+    value = value.strip()
+    if value == "" or value.lower() == "none":
+        return []
+    if _VLAN_LIST_PATTERN.fullmatch(value) is None:
+        return value
+    vlans = []
+    for vlan_range in re.split(r"[,\s]+", value):
+        if "-" in vlan_range:
+            first, last = vlan_range.split("-")
+            vlans.extend(range(int(first), int(last) + 1))
+        else:
+            vlans.append(int(vlan_range))
+    return vlans
+
+
+def to_interface_name(value):
+    """
+    Converts captured interface name to its long form, such as `"Gi1/0/1"` -> `"GigabitEthernet1/0/1"`.
+    """
+    if value is None:
+        return None
+    return int_name_convert(value, out_type="long")
+
+
+def to_bool(value):
+    """
+    Converts captured words such as `"yes"`, `"enabled"` or `"down"` to boolean. Other values are returned unchanged.
+    """
+    if value is None:
+        return None
+    return _BOOL_MAP.get(value.strip().lower(), value)
+
+
+def iter_lines(text, chunk_size=1 << 16):
+    """
+    Generator of lines of ``text``, same as ``text.split("\\n")``, but only chunk of roughly ``chunk_size`` characters is split at a time,
+    so list of all lines of large outputs is never built.
+
+    :param str text: Text to be split
+    :param int chunk_size: Number of characters split at once
+    :return: Generator of strings
+    """
+    start = 0
+    length = len(text)
+    while length - start > chunk_size:
+        end = text.rfind("\n", start, start + chunk_size)
+        if end == -1:
+            end = text.find("\n", start + chunk_size)
+            if end == -1:
+                break
+        yield from text[start:end].split("\n")
+        start = end + 1
+    yield from text[start:].split("\n")
+
+
+CONVERTERS = {
+    "auto": auto_int,
+    "int": auto_int,
+    "str": to_str,
+    "mac": to_mac,
+    "vlan-list": to_vlan_list,
+    "interface-name": to_interface_name,
+    "bool": to_bool
+}
+
+
+class PatternExtractor(object):
+    """
+    Compiled regex pattern together with precomputed names of its named groups and converters for each of them.
+    Used by ``ParserModule`` for matching patterns against text outputs in a single pass.
+    """
+    __slots__ = ("regex", "pattern", "flags", "groupindex", "group_names", "converters", "_conversions")
+
+    def __init__(self, regex, converters=None, default_converter=auto_int):
+        """
+
+        :param regex: ``re`` compiled regex pattern
+        :param converters: Dictionary with group names as keys and functions converting the captured strings as values.
+        :param default_converter: Function used for groups not specified in ``converters``, ``auto_int`` by default.
+        """
+        self.regex = regex
+        self.pattern = regex.pattern
+        self.flags = regex.flags
+        self.groupindex = regex.groupindex
+        self.group_names = tuple(self.groupindex.keys())
+        converters = converters if isinstance(converters, dict) else {}
+        self.converters = tuple(converters.get(name, default_converter) for name in self.group_names)
+        self._conversions = tuple((name, convert) for name, convert in zip(self.group_names, self.converters) if convert is not to_str)
+
+    def __repr__(self):
+        return "<PatternExtractor: {}>".format(self.pattern)
+
+    def _entry(self, match):
+        entry = match.groupdict()
+        for name, convert in self._conversions:
+            entry[name] = convert(entry[name])
+        return entry
+
+    def extract(self, text):
+        """
+        Finds all matches of the pattern in ``text``. If the pattern contains named groups, list of dictionaries with these groups as keys
+        is returned, otherwise list of matching strings.
+
+        :param str text: Text to be searched
+        :return: List of matches
+        """
+        if not self.group_names:
+            return self.regex.findall(text)
+        entry = self._entry
+        return [entry(match) for match in self.regex.finditer(text)]
+
+    def iter_extract(self, text):
+        """
+        Generator version of ``extract()``, yields matches one by one as they are found in ``text``.
+
+        :param str text: Text to be searched
+        :return: Generator of matches
+        """
+        if not self.group_names:
+            # Same results as ``findall()``: whole match, single group or tuple of groups, with empty strings for groups which did not participate
+            groups = self.regex.groups
+            for match in self.regex.finditer(text):
+                if groups == 0:
+                    yield match.group()
+                elif groups == 1:
+                    yield match.groups("")[0]
+                else:
+                    yield match.groups("")
+            return
+        entry = self._entry
+        for match in self.regex.finditer(text):
+            yield entry(match)
+
+    def search(self, text):
+        """
+        Finds first match of the pattern in ``text``.
+
+        :param str text: Text to be searched
+        :return: Dictionary with named groups as keys, ``None`` if the pattern does not match.
+        """
+        match = self.regex.search(text)
+        if match is None:
+            return None
+        return self._entry(match)
+
+
+class BlockSplitter(object):
+    """
+    Splits sectioned text outputs, such as `show interfaces` or `show cdp neighbors detail`, to blocks. Lines which start or end a block
+    are found by regex starting with line break, which ``re`` scans for as a literal, so the text is scanned only once and contents
+    of the blocks are never matched. Can be used in `level0` of pattern modules in place of regex pattern, for example
+    ``{"splitter": "unindented"}`` or ``{"splitter": "prefix", "prefix": "Device ID:", "end": ["-----"]}``. ``spans()`` returns offsets
+    of the blocks, ``extract()`` and ``iter_extract()`` return copies of the blocks.
+
+    Supported splitters:
+
+    - `unindented` - Every line which does not start with whitespace begins new block, following indented lines belong to it.
+    - `prefix` - Every line starting with any of ``prefix`` (leading whitespace is ignored) begins new block. Block ends at the start of next block,
+      at line starting with any of ``end`` or at the end of the text.
+    """
+    __slots__ = ("splitter", "prefix", "end", "group_names", "_head", "_regex")
+    SPLITTERS = ("unindented", "prefix")
+
+    def __init__(self, splitter="unindented", prefix=None, end=None):
+        """
+
+        :param str splitter: Name of the splitter, `unindented` or `prefix`
+        :param prefix: String or list of strings, lines starting with any of them begin new block. Required for `prefix` splitter.
+        :param end: String or list of strings, lines starting with any of them end current block.
+        """
+        if splitter not in self.SPLITTERS:
+            raise ValueError("Unknown splitter '{}', expected one of {}.".format(splitter, self.SPLITTERS))
+        if splitter == "prefix" and not prefix:
+            raise ValueError("Splitter 'prefix' requires parameter 'prefix'.")
+        self.splitter = splitter
+        self.prefix = tuple([prefix] if isinstance(prefix, str) else prefix or [])
+        self.end = tuple([end] if isinstance(end, str) else end or [])
+        self.group_names = ()
+        if splitter == "unindented":
+            pattern = r"(?=\S)"
+        else:
+            pattern = r"[ \t]*(?:(?P<start>{})".format("|".join(re.escape(x) for x in self.prefix))
+            if self.end:
+                pattern += r"|{}".format("|".join(re.escape(x) for x in self.end))
+            pattern += ")"
+        # First line is matched by `_head`, following lines by `_regex`, which begins with the line break
+        self._head = re.compile(pattern)
+        self._regex = re.compile("\n" + pattern)
+
+    def __repr__(self):
+        return "<BlockSplitter: {}>".format(self.splitter if not self.prefix else "{} {}".format(self.splitter, self.prefix))
+
+    def _marks(self, text):
+        """
+        Returns list of ``(offset, starts_block)`` tuples for lines of ``text`` which start or end a block.
+        """
+        head = self._head.match(text)
+        if self.splitter == "unindented":
+            marks = [(0, True)] if head is not None else []
+            marks.extend((match.start() + 1, True) for match in self._regex.finditer(text))
+            return marks
+        # Prefix is tried before end, so line starting with both begins new block
+        marks = [(0, head.start("start") != -1)] if head is not None else []
+        marks.extend((match.start() + 1, match.start("start") != -1) for match in self._regex.finditer(text))
+        return marks
+
+    def spans(self, text):
+        """
+        Generator of ``(start, end)`` offsets of blocks in ``text``. Blocks are not copied, the caller decides whether to slice the text.
+
+        :param str text: Text to be split
+        :return: Generator of tuples
+        """
+        block_start = None
+        for offset, starts_block in self._marks(text):
+            if block_start is not None:
+                yield block_start, offset
+            block_start = offset if starts_block else None
+        if block_start is not None:
+            yield block_start, len(text)
+
+    def extract(self, text):
+        """
+        Splits ``text`` to blocks.
+
+        :param str text: Text to be split
+        :return: List of strings
+        """
+        return [text[start:end] for start, end in self.spans(text)]
+
+    def iter_extract(self, text):
+        """
+        Generator version of ``extract()``, yields blocks one by one.
+
+        :param str text: Text to be split
+        :return: Generator of strings
+        """
+        for start, end in self.spans(text):
+            yield text[start:end]
+
+
+class TableExtractor(object):
+    """
+    Parses column-aligned tabular outputs, such as `show interfaces status` or `show vlan brief`, by slicing rows at fixed offsets instead of
+    matching regex pattern against the whole text. Column boundaries are detected once, from the header line, and detected again only when
+    the header repeats. Can be used in `level0` of pattern modules in place of regex pattern, for example::
+
+        {"table": {"columns": [{"header": "VLAN", "group": "id", "pattern": "\\d+"}, ...], "continuation": "access_ports"}}
+
+    Each column is a dictionary with following keys:
+
+    - `header` - Text of the column header
+    - `group` - Name of the resulting field
+    - `pattern` - Optional regex the (stripped) cell must fully match, otherwise the row is skipped. Only columns which are needed
+      to tell data rows from other lines should be validated. Named groups of the pattern are added to the resulting fields,
+      which allows splitting single cell, such as `Po1(SU)`, to multiple fields.
+    - `default` - Value of empty cells, either ``None`` (default) or empty string.
+    - `align` - `left` (default) or `right`. Values of right-aligned columns may start before the header. If the previous column is
+      right-aligned as well, the boundary is placed right after its header, otherwise boundary cutting through a value is moved
+      to the start of that value.
+
+    Rows with empty first column are treated as continuation lines, content of the ``continuation`` column is appended to previous row.
+    If ``tokens`` is set, values of all columns are single words, so rows with as many words as there are columns are split on whitespace
+    instead of slicing.
+    """
+    __slots__ = ("columns", "continuation", "join", "tokens", "group_names", "_headers", "_right", "_names", "_validators", "_nullable",
+                 "_conversions", "_continuation_index", "_snap_columns")
+
+    def __init__(self, columns, continuation=None, join=" ", tokens=False, converters=None, default_converter=auto_int):
+        """
+
+        :param list columns: List of column dictionaries
+        :param str continuation: Field of column which can wrap to following lines, such as list of ports
+        :param str join: String used for joining continuation lines
+        :param bool tokens: Values of all columns are single words without whitespace
+        :param converters: Dictionary with field names as keys and functions converting the captured strings as values.
+        :param default_converter: Function used for fields not specified in ``converters``, ``auto_int`` by default.
+        """
+        if not columns:
+            raise ValueError("Table requires at least one column.")
+        converters = converters if isinstance(converters, dict) else {}
+        self.columns = columns
+        self.continuation = continuation
+        self.join = join
+        self.tokens = tokens
+        self._headers = tuple(column["header"] for column in columns)
+        self._right = tuple(column.get("align", "left") == "right" for column in columns)
+        self._snap_columns = tuple(index for index in range(1, len(columns)) if self._right[index] and not self._right[index - 1])
+        self._names = tuple(column["group"] for column in columns)
+        validators = []
+        group_names = list(self._names)
+        for index, column in enumerate(columns):
+            if "pattern" in column:
+                regex = re.compile(column["pattern"])
+                validators.append((index, regex.fullmatch, bool(regex.groupindex)))
+                group_names.extend(name for name in regex.groupindex if name not in group_names)
+        self.group_names = tuple(group_names)
+        self._validators = tuple(validators)
+        self._nullable = tuple(column["group"] for column in columns if column.get("default") is None)
+        self._conversions = tuple(
+            (name, convert) for name, convert in [(name, converters.get(name, default_converter)) for name in self.group_names] if convert is not to_str
+        )
+        self._continuation_index = None
+        if continuation is not None:
+            self._continuation_index = self._names.index(continuation)
+
+    def __repr__(self):
+        return "<TableExtractor: {}>".format(" | ".join(self._headers))
+
+    def _layout(self, line):
+        """
+        Detects column boundaries from header ``line``.
+
+        :param str line: Line of text
+        :return: List of start offsets of the columns, ``None`` if ``line`` is not the header.
+        """
+        starts = []
+        position = 0
+        previous_end = 0
+        for index, header in enumerate(self._headers):
+            position = line.find(header, position)
+            while position > 0 and not line[position - 1].isspace():
+                position = line.find(header, position + 1)
+            if position == -1:
+                return None
+            end = position + len(header)
+            if end < len(line) and not line[end].isspace():
+                return None
+            if index and self._right[index] and self._right[index - 1]:
+                starts.append(previous_end)
+            else:
+                starts.append(position)
+            position = previous_end = end
+        return starts
+
+    def _snap(self, line, starts):
+        """
+        Returns column boundaries for ``line``, with boundaries of right-aligned columns which cut through a value moved to the start of that value.
+        """
+        snapped = list(starts)
+        for index in self._snap_columns:
+            start = snapped[index]
+            if line[start - 1:start].strip() and line[start:start + 1].strip():
+                snapped[index] = max(line.rfind(" ", snapped[index - 1], start) + 1, snapped[index - 1] + 1)
+        return snapped
+
+    def extract(self, text):
+        """
+        Parses all rows of all tables found in ``text``.
+
+        :param str text: Text to be parsed
+        :return: List of dictionaries
+        """
+        return list(self.iter_extract(text))
+
+    def iter_extract(self, text):
+        """
+        Generator version of ``extract()``, yields rows one by one. Each row is yielded only after the following row was found,
+        because it might still be extended by continuation lines.
+
+        :param str text: Text to be parsed
+        :return: Generator of dictionaries
+        """
+        previous = None
+        first_header = self._headers[0]
+        column_count = len(self._headers)
+        starts = None
+        get_cells = None
+        boundaries = ()
+        strip = str.strip
+        names = self._names
+        validators = self._validators
+        nullable = self._nullable
+        conversions = self._conversions
+        continuation_index = self._continuation_index
+        for line in iter_lines(text):
+            if first_header in line:
+                layout = self._layout(line)
+                if layout is not None:
+                    starts = layout
+                    get_cells = self._cells_getter(starts)
+                    boundaries = tuple(starts[index] for index in self._snap_columns)
+                    continue
+            if get_cells is None:
+                continue
+            cells = line.split() if self.tokens else None
+            if cells is None or len(cells) != column_count:
+                if not line or line.isspace():
+                    continue
+                cells = list(map(strip, get_cells(line)))
+                for boundary in boundaries:
+                    if line[boundary - 1:boundary].strip() and line[boundary:boundary + 1].strip():
+                        cells = list(map(strip, self._cells_getter(self._snap(line, starts))(line)))
+                        break
+                if not cells[0]:
+                    # Continuation line, such as wrapped list of ports
+                    if continuation_index is not None and previous is not None and cells[continuation_index] and not any(cells[:continuation_index]):
+                        field = self.continuation
+                        value = cells[continuation_index]
+                        previous[field] = value if previous[field] is None else previous[field] + self.join + value
+                    continue
+            entry = dict(zip(names, cells))
+            for index, validate, expand in validators:
+                match = validate(cells[index])
+                if match is None:
+                    break
+                if expand:
+                    entry.update(match.groupdict())
+            else:
+                if "" in cells:
+                    for name in nullable:
+                        if entry[name] == "":
+                            entry[name] = None
+                for name, convert in conversions:
+                    entry[name] = convert(entry[name])
+                if previous is not None:
+                    yield previous
+                previous = entry
+        if previous is not None:
+            yield previous
+
+    @staticmethod
+    def _cells_getter(starts):
+        """
+        Returns function which slices line to cells based on ``starts`` of the columns.
+        """
+        slices = [slice(start, end) for start, end in zip(starts, starts[1:] + [None])]
+        if len(slices) == 1:
+            return lambda line: (line[slices[0]], )
+        return itemgetter(*slices)
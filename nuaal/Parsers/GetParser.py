@@ -0,0 +1,31 @@
+from nuaal.definitions import DATA_PATH
+from nuaal.Parsers.Parser import ParserModule
+from nuaal.Parsers.CiscoIOSParser import CiscoIOSParser
+from nuaal.Parsers.CiscoNXOSParser import CiscoNXOSParser
+from nuaal.Parsers.JuniperJUNOSParser import JuniperJUNOSParser
+import os
+
+PARSERS = {
+    "cisco_ios": CiscoIOSParser,
+    "cisco_nxos": CiscoNXOSParser,
+    "juniper_junos": JuniperJUNOSParser
+}
+
+
+def GetParser(device_type=None, lazy=True, use_bundle=False, compact=False, verbosity=4, DEBUG=False):
+    """
+    This function can be used for getting the correct parser object for specific device type.
+
+    :param str device_type: String representation of device type, such as `cisco_ios`
+    :param bool lazy: If set to `True` (default), pattern modules are compiled on demand.
+    :param bool use_bundle: If set to `True`, patterns are loaded from precompiled ``PatternsBundle`` (experimental).
+    :param bool compact: If set to `True`, parsed entries are returned as compact ``Record`` objects instead of dictionaries.
+    :param bool DEBUG: Enables/disables debugging output
+    :return: Instance of parser object, generic ``ParserModule`` for device types with patterns but without specific parser class,
+        ``None`` for unknown device types.
+    """
+    if device_type in PARSERS:
+        return PARSERS[device_type](lazy=lazy, use_bundle=use_bundle, compact=compact, verbosity=verbosity, DEBUG=DEBUG)
+    if device_type and os.path.isdir(os.path.join(DATA_PATH, "patterns", device_type)):
+        return ParserModule(device_type=device_type, lazy=lazy, use_bundle=use_bundle, compact=compact, verbosity=verbosity, DEBUG=DEBUG)
+    return None
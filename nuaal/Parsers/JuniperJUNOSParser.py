@@ -1,11 +1,77 @@
 from nuaal.Parsers import ParserModule
+from nuaal.Parsers.Structured import StructuredMapping, split_part, constant
+from nuaal.Parsers.Extractors import to_str
 import timeit
 import re
 
+
+def _vlan_tag(index):
+    # Link address of VLAN subinterface, such as "[ 0x8100.100 ] "
+    convert = split_part(".", index)
+    return lambda value: convert(value.strip("[] "))
+
+
+def _address(path, convert):
+    # Address of the first family with any, such as `inet`
+    def getter(row):
+        for family in row.get("address-family", []):
+            for address in family.get("interface-address", []):
+                value = address.get(path, [{}])[0].get("data")
+                if value is not None and not value.startswith("127."):
+                    return convert(value)
+        return None
+    return getter
+
+
+LOGICAL_INTERFACES = StructuredMapping(rows=("logical-interface", ), fields={
+    "interface_name": ("name", to_str),
+    "admin_status": constant(None),
+    "link_status": constant(None),
+    "description": ("description", to_str),
+    "vlan_tag_protocol": ("link-address", _vlan_tag(0)),
+    "vlan_tag": ("link-address", _vlan_tag(1)),
+    "encapsulation": lambda row: row["encapsulation"][0]["data"] if "link-address" in row and "encapsulation" in row else None,
+    "subnet": _address("ifa-destination", split_part("/", 0)),
+    "subnet_mask": _address("ifa-destination", split_part("/", 1)),
+    "ip_address": _address("ifa-local", to_str),
+    "broadcast": _address("ifa-broadcast", to_str)
+})
+
+STRUCTURED = {
+    "show bgp neighbors": StructuredMapping(rows=("bgp-information", "bgp-peer"), fields={
+        "peer_addr": ("peer-address", split_part("+", 0)),
+        "peer_port": ("peer-address", split_part("+", 1)),
+        "peer_as": "peer-as",
+        "local_addr": ("local-address", split_part("+", 0)),
+        "local_port": ("local-address", split_part("+", 1)),
+        "local_as": "local-as",
+        "type": "peer-type",
+        "state": "peer-state",
+        "flags": ("peer-flags", lambda value: "<{}>".format(value.strip()))
+    }),
+    "show interfaces": StructuredMapping(rows=("interface-information", "physical-interface"), children=LOGICAL_INTERFACES, fields={
+        "interface_name": ("name", to_str),
+        "admin_status": ("admin-status", lambda value: "Enabled" if value == "up" else "Disabled"),
+        "link_status": ("oper-status", lambda value: value.capitalize()),
+        "description": ("description", to_str),
+        "vlan_tag_protocol": constant(None),
+        "vlan_tag": constant(None),
+        "encapsulation": constant(None),
+        "subnet": constant(None),
+        "subnet_mask": constant(None),
+        "ip_address": constant(None),
+        "broadcast": constant(None)
+    })
+}
+
+
 class JuniperJUNOSParser(ParserModule):
     """
-    Child class of `ParserModule` designed for `cisco_ios` device type.
+    Child class of `ParserModule` designed for `juniper_junos` device type. Outputs of commands in ``STRUCTURED`` requested with
+    `| display json` are mapped onto the same keys without regex, other commands and plaintext outputs are parsed by patterns from ``PatternsLib``.
     """
-    def __init__(self, DEBUG=False):
-        super(JuniperJUNOSParser, self).__init__(device_type="juniper_junos", DEBUG=DEBUG)
-    
\ No newline at end of file
+    structured = STRUCTURED
+    structured_suffix = "| display json"
+
+    def __init__(self, lazy=True, use_bundle=False, compact=False, verbosity=4, DEBUG=False):
+        super(JuniperJUNOSParser, self).__init__(device_type="juniper_junos", lazy=lazy, use_bundle=use_bundle, compact=compact, verbosity=verbosity, DEBUG=DEBUG)
@@ -0,0 +1,255 @@
+from nuaal.definitions import CACHE_PATH
+from nuaal.utils import get_logger, check_path
+from nuaal.Parsers.Records import Record
+from collections import OrderedDict
+import hashlib
+import marshal
+import os
+import sys
+import threading
+import timeit
+
+
+class ParseCache(object):
+    """
+    Cache of parsed outputs in front of ``ParserModule.autoparse()``. Results are keyed by device type, command, version of the pattern set
+    and hash of the text, so identical outputs (such as unchanged `show inventory` or `show vlan brief` of polled devices) are parsed only once.
+    Results are kept in memory (LRU with ``max_entries``) and optionally on disk in `~/.nuaal/cache/parsed/<device_type>`, where oldest
+    entries are evicted when the size exceeds ``max_disk_size`` bytes. Pattern modules are checked for changes at most every ``check_interval``
+    seconds, after a change the parser reloads its patterns and entries of the previous pattern set are never returned again.
+
+    Other attributes are delegated to the wrapped parser, so ``ParseCache`` can be used in place of the parser.
+    """
+    def __init__(self, parser, max_entries=1024, use_disk=True, path=None, max_disk_size=64 * 2 ** 20, check_interval=5.0, verbosity=4, DEBUG=False):
+        """
+
+        :param parser: Instance of ``ParserModule`` (or its child class) used for parsing on cache miss
+        :param int max_entries: Maximal number of results kept in memory
+        :param bool use_disk: Enables/disables disk tier of the cache
+        :param str path: Directory of the disk tier. Defaults to `~/.nuaal/cache/parsed/<device_type>`
+        :param int max_disk_size: Maximal size of the disk tier in bytes
+        :param float check_interval: Minimal number of seconds between checks of pattern modules for changes
+        :param bool DEBUG: Enables/disables debugging output
+        """
+        self.parser = parser
+        self.device_type = parser.device_type
+        self.max_entries = max_entries
+        self.use_disk = use_disk
+        self.path = path if path else os.path.join(CACHE_PATH, "parsed", self.device_type)
+        self.max_disk_size = max_disk_size
+        self.check_interval = check_interval
+        self.logger = get_logger(name="ParseCache_{}".format(self.device_type), verbosity=verbosity, DEBUG=DEBUG)
+        self.stats = {"hits": 0, "disk_hits": 0, "misses": 0}
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        # Guards size accounting and eviction of the disk tier, separate from ``self._lock`` so memory hits do not wait for disk operations
+        self._disk_lock = threading.Lock()
+        self._disk_size = None
+        self._checked = timeit.default_timer()
+        if self.use_disk and not check_path(self.path):
+            self.logger.error(msg="Could not create cache directory '{}', disk tier disabled.".format(self.path))
+            self.use_disk = False
+
+    def __getattr__(self, name):
+        if name == "parser":
+            raise AttributeError(name)
+        return getattr(self.parser, name)
+
+    def _check_patterns(self):
+        """
+        Checks pattern modules for changes, at most every ``self.check_interval`` seconds. Memory tier is cleared after the patterns changed.
+        """
+        now = timeit.default_timer()
+        if now - self._checked < self.check_interval:
+            return
+        self._checked = now
+        if self.parser.refresh_patterns():
+            with self._lock:
+                self._memory.clear()
+            self.logger.info(msg="Patterns of '{}' changed, cached results of previous version will not be used.".format(self.device_type))
+
+    def key(self, text, command, fields=None):
+        """
+        Computes cache key of parsed ``text``.
+
+        :param str text: Text output to be processed
+        :param str command: Command used to generate ``text`` output
+        :param list fields: Optional list of keys the caller needs
+        :return: (str) Hex digest
+        """
+        key_hash = hashlib.sha1("{}\0{}\0{}\0{}\0".format(
+            self.device_type, command, self.parser.library.version, None if fields is None else sorted(fields)
+        ).encode())
+        key_hash.update(text.encode(errors="surrogatepass"))
+        return key_hash.hexdigest()
+
+    def _disk_path(self, key):
+        return os.path.join(self.path, "{}.{}{}".format(key, *sys.version_info[:2]))
+
+    def _disk_get(self, key):
+        disk_path = self._disk_path(key)
+        try:
+            with open(disk_path, mode="rb") as f:
+                data = f.read()
+            os.utime(disk_path)
+            return data
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            self.logger.error(msg="Could not read cached result '{}'. Exception: {}".format(disk_path, repr(e)))
+            return None
+
+    def _disk_put(self, key, data):
+        disk_path = self._disk_path(key)
+        temp_path = "{}.{}.{}.tmp".format(disk_path, os.getpid(), threading.get_ident())
+        try:
+            with open(temp_path, mode="wb") as f:
+                f.write(data)
+        except OSError as e:
+            self.logger.error(msg="Could not store cached result '{}'. Exception: {}".format(disk_path, repr(e)))
+            return
+        with self._disk_lock:
+            try:
+                # Entry can be replaced, such as after it was found corrupted or parsed by two threads at once
+                replaced_size = os.path.getsize(disk_path)
+            except OSError:
+                replaced_size = 0
+            try:
+                os.replace(temp_path, disk_path)
+            except OSError as e:
+                self.logger.error(msg="Could not store cached result '{}'. Exception: {}".format(disk_path, repr(e)))
+                return
+            if self._disk_size is None:
+                self._disk_size = sum(entry.stat().st_size for entry in os.scandir(self.path) if entry.is_file() and entry.name[-4:] != ".tmp")
+            else:
+                self._disk_size += len(data) - replaced_size
+            if self._disk_size > self.max_disk_size:
+                self._evict()
+
+    def _evict(self):
+        """
+        Removes least recently used files of the disk tier until its size drops under 90 % of ``self.max_disk_size``.
+        Must be called with ``self._disk_lock`` held.
+        """
+        entries = []
+        for entry in os.scandir(self.path):
+            # Temporary files of entries being written by other threads are not part of the tier yet
+            if entry.name[-4:] == ".tmp" or not entry.is_file():
+                continue
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+        entries.sort()
+        size = sum(x[1] for x in entries)
+        removed = 0
+        for mtime, file_size, file_path in entries:
+            if size <= self.max_disk_size * 0.9:
+                break
+            try:
+                os.remove(file_path)
+                size -= file_size
+                removed += 1
+            except OSError:
+                pass
+        self._disk_size = size
+        self.logger.debug(msg="Evicted {} cached results, disk tier has {} bytes.".format(removed, size))
+
+    def _memory_put(self, key, data):
+        with self._lock:
+            self._memory[key] = data
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+    def _loads(self, data, command):
+        result = marshal.loads(data)
+        if isinstance(result, list):
+            result = list(self.parser.compact_entries(entries=result, command=command))
+        return result
+
+    def _dumps(self, result):
+        # Records are stored as dictionaries, so the cache is shared by compact and regular parsers
+        if isinstance(result, list):
+            result = [x.to_dict() if isinstance(x, Record) else x for x in result]
+        return marshal.dumps(result)
+
+    def autoparse(self, text, command, fields=None, layout="rows"):
+        """
+        Returns parsed ``text`` from the cache, or parses it with ``self.parser`` and stores the result. Every call returns new objects,
+        so the results can be modified by the caller.
+
+        :param str text: Text output to be processed
+        :param str command: Command used to generate ``text`` output
+        :param list fields: Optional list of keys the caller needs
+        :param str layout: `rows` (default) or `columns`, see ``ParserModule.autoparse()``. Results are cached as rows in both cases.
+        :return: List of found entities, usually list of dictionaries, or ``Columns`` object
+        """
+        if layout == "columns":
+            return self.parser.to_columns(entries=self.autoparse(text=text, command=command, fields=fields), command=command)
+        elif layout != "rows":
+            return self.parser.autoparse(text=text, command=command, fields=fields, layout=layout)
+        self._check_patterns()
+        key = self.key(text=text, command=command, fields=fields)
+        with self._lock:
+            data = self._memory.get(key)
+            if data is not None:
+                self._memory.move_to_end(key)
+                self.stats["hits"] += 1
+        if data is not None:
+            return self._loads(data=data, command=command)
+        if self.use_disk:
+            data = self._disk_get(key)
+            if data is not None:
+                try:
+                    result = self._loads(data=data, command=command)
+                    self._memory_put(key, data)
+                    with self._lock:
+                        self.stats["disk_hits"] += 1
+                    return result
+                except (EOFError, ValueError, TypeError):
+                    self.logger.error(msg="Cached result {} is corrupted, parsing again.".format(key))
+        with self._lock:
+            self.stats["misses"] += 1
+        result = self.parser.autoparse(text=text, command=command, fields=fields)
+        try:
+            data = self._dumps(result)
+        except ValueError as e:
+            self.logger.debug(msg="Result of '{}' cannot be cached. Exception: {}".format(command, repr(e)))
+            return result
+        self._memory_put(key, data)
+        if self.use_disk:
+            self._disk_put(key, data)
+        return result
+
+    def iterparse(self, text, command, fields=None):
+        """
+        Generator version of ``autoparse()``, used by filtered outputs (``out_filter`` of ``_command_handler``). Results are cached as
+        complete lists, so the whole ``text`` is parsed (or loaded from the cache) before the first entry is yielded.
+
+        :param str text: Text output to be processed
+        :param str command: Command used to generate ``text`` output
+        :param list fields: Optional list of keys the caller needs
+        :return: Generator of found entities, usually dictionaries
+        """
+        yield from self.autoparse(text=text, command=command, fields=fields)
+
+    def clear(self, disk=True):
+        """
+        Removes all cached results.
+
+        :param bool disk: If set to `True`, disk tier is cleared as well.
+        :return: ``None``
+        """
+        with self._lock:
+            self._memory.clear()
+        if disk and self.use_disk:
+            with self._disk_lock:
+                for entry in os.scandir(self.path):
+                    if entry.is_file() and entry.name[-4:] != ".tmp":
+                        try:
+                            os.remove(entry.path)
+                        except FileNotFoundError:
+                            pass
+                self._disk_size = 0
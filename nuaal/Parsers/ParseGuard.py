@@ -0,0 +1,185 @@
+from nuaal.utils import get_logger
+from nuaal.Parsers.GetParser import GetParser
+import multiprocessing
+import threading
+import timeit
+
+# Spawned processes do not inherit locks held by other threads (e.g. of CliMultiRunner), unlike forked ones
+_CONTEXT = multiprocessing.get_context("spawn")
+
+
+class ParseTimeout(list):
+    """
+    Empty result returned instead of parsed entries when parsing did not finish within the time budget. As it is a list, callers iterating
+    the result simply get no entries, ``isinstance(result, ParseTimeout)`` tells the timeout apart from an output without matches.
+    """
+    def __init__(self, command, timeout):
+        super(ParseTimeout, self).__init__()
+        self.command = command
+        self.timeout = timeout
+
+    def __repr__(self):
+        return "<ParseTimeout: '{}' after {} seconds>".format(self.command, self.timeout)
+
+
+def _call_worker(connection, function, kwargs):
+    try:
+        connection.send(("ok", function(**kwargs)))
+    except Exception as e:
+        connection.send(("error", repr(e)))
+    finally:
+        connection.close()
+
+
+def run_with_timeout(function, kwargs, timeout):
+    """
+    Runs ``function(**kwargs)`` in a new process, which is killed if it does not finish within ``timeout`` seconds.
+    Long running regex cannot be interrupted in the calling thread, as it does not release the GIL.
+
+    :param function: Module level function, its arguments and return value must be picklable
+    :param dict kwargs: Keyword arguments of ``function``
+    :param float timeout: Time budget in seconds
+    :return: Tuple ``(status, value)``, where status is `ok` (value is the result), `error` (value is the exception) or `timeout`
+    """
+    receiver, sender = _CONTEXT.Pipe(duplex=False)
+    process = _CONTEXT.Process(target=_call_worker, args=(sender, function, kwargs), daemon=True)
+    process.start()
+    sender.close()
+    try:
+        if receiver.poll(timeout):
+            return receiver.recv()
+        return "timeout", None
+    except EOFError:
+        return "error", "Worker process exited with code {}.".format(process.exitcode)
+    finally:
+        receiver.close()
+        if process.is_alive():
+            process.kill()
+        process.join()
+
+
+def _parse_worker(connection, device_type, use_bundle, compact):
+    parser = GetParser(device_type=device_type, use_bundle=use_bundle, compact=compact, verbosity=0)
+    while True:
+        try:
+            text, command, fields, layout = connection.recv()
+        except EOFError:
+            return
+        try:
+            connection.send(("ok", parser.autoparse(text=text, command=command, fields=fields, layout=layout)))
+        except Exception as e:
+            connection.send(("error", repr(e)))
+
+
+class ParseGuard(object):
+    """
+    Runs ``autoparse()`` of the wrapped parser in a separate worker process with a time budget. If a pattern backtracks catastrophically
+    on unexpected output, the worker is killed after ``timeout`` seconds and ``ParseTimeout`` is returned, instead of blocking the thread
+    (and, through the GIL, all other threads of ``CliMultiRunner``). The worker is started on first use, reused for following calls
+    and restarted after a timeout. It uses parser created by ``GetParser(device_type)``, so custom parser classes are not supported.
+
+    Other attributes are delegated to the wrapped parser, so ``ParseGuard`` can be used in place of the parser.
+    """
+    def __init__(self, parser, timeout=10.0, verbosity=4, DEBUG=False):
+        """
+
+        :param parser: Instance of ``ParserModule`` (or its child class)
+        :param float timeout: Time budget of single parse in seconds
+        :param bool DEBUG: Enables/disables debugging output
+        """
+        self.parser = parser
+        self.device_type = parser.device_type
+        self.timeout = timeout
+        self.logger = get_logger(name="ParseGuard_{}".format(self.device_type), verbosity=verbosity, DEBUG=DEBUG)
+        self.stats = {"ok": 0, "error": 0, "timeout": 0}
+        self._process = None
+        self._connection = None
+        self._lock = threading.Lock()
+
+    def __getattr__(self, name):
+        if name == "parser":
+            raise AttributeError(name)
+        return getattr(self.parser, name)
+
+    def _start(self):
+        self._connection, worker_connection = _CONTEXT.Pipe()
+        self._process = _CONTEXT.Process(
+            target=_parse_worker, args=(worker_connection, self.device_type, self.parser.library.use_bundle, self.parser.compact), daemon=True
+        )
+        self._process.start()
+        worker_connection.close()
+        self.logger.debug(msg="Started parse worker process {}.".format(self._process.pid))
+
+    def close(self):
+        """
+        Stops the worker process.
+
+        :return: ``None``
+        """
+        with self._lock:
+            self._stop()
+
+    def _stop(self):
+        if self._process is None:
+            return
+        self._connection.close()
+        self._process.join(timeout=1)
+        if self._process.is_alive():
+            self._process.kill()
+            self._process.join()
+        self._process = None
+        self._connection = None
+
+    def autoparse(self, text, command, fields=None, layout="rows"):
+        """
+        Parses ``text`` in the worker process, see ``ParserModule.autoparse()``.
+
+        :param str text: Text output to be processed
+        :param str command: Command used to generate ``text`` output
+        :param list fields: Optional list of keys the caller needs
+        :param str layout: `rows` (default) or `columns`
+        :return: List of found entities (or ``Columns`` object), ``ParseTimeout`` if parsing did not finish within ``self.timeout`` seconds
+        """
+        with self._lock:
+            if self._process is None or not self._process.is_alive():
+                self._stop()
+                self._start()
+            start_time = timeit.default_timer()
+            try:
+                self._connection.send((text, command, fields, layout))
+                if self._connection.poll(self.timeout):
+                    status, result = self._connection.recv()
+                else:
+                    status, result = "timeout", None
+            except (EOFError, OSError) as e:
+                status, result = "error", repr(e)
+            self.stats[status] += 1
+            if status == "ok":
+                return result
+            # Worker state is unknown after a timeout or failure, next call starts a new one
+            self._process.kill()
+            self._stop()
+        if status == "timeout":
+            self.logger.error(msg="Parsing of '{}' did not finish in {} seconds, worker process killed.".format(command, self.timeout))
+            return ParseTimeout(command=command, timeout=self.timeout)
+        self.logger.error(msg="Parsing of '{}' failed after {} seconds. Exception: {}".format(
+            command, round(timeit.default_timer() - start_time, 3), result
+        ))
+        return []
+
+    def iterparse(self, text, command, fields=None):
+        """
+        Generator version of ``autoparse()``. The whole output is parsed in the worker process before the first entry is yielded.
+
+        :param str text: Text output to be processed
+        :param str command: Command used to generate ``text`` output
+        :param list fields: Optional list of keys the caller needs
+        :return: Generator of found entities
+        """
+        yield from self.autoparse(text=text, command=command, fields=fields)
+
+    def __del__(self):
+        try:
+            self._stop()
+        except Exception:
+            pass
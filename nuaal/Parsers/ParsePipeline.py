@@ -0,0 +1,175 @@
+from nuaal.utils import get_logger
+from nuaal.Parsers.GetParser import GetParser
+from concurrent.futures import Future, ProcessPoolExecutor
+import multiprocessing
+import queue
+import threading
+import timeit
+
+# Worker processes are started by spawn, forking a process with running connection threads is not safe
+_CONTEXT = multiprocessing.get_context("spawn")
+# Parsers of the worker process, created on first use and reused for all outputs parsed by that process
+_WORKER_PARSERS = {}
+
+
+def _process_parse(device_type, use_bundle, compact, text, command, fields, layout):
+    key = (device_type, use_bundle, compact)
+    if key not in _WORKER_PARSERS:
+        _WORKER_PARSERS[key] = GetParser(device_type=device_type, use_bundle=use_bundle, compact=compact, verbosity=0)
+    return _WORKER_PARSERS[key].autoparse(text=text, command=command, fields=fields, layout=layout)
+
+
+class ParsePipeline(object):
+    """
+    Parsing stage of the collection pipeline. Connection hands the raw output over by ``submit()`` and continues with the next command,
+    while the output is parsed by pool of ``workers`` threads, consuming bounded queue of ``max_pending`` outputs. When the queue is full,
+    ``submit()`` blocks, so the connection never gets too far ahead of parsing. Outputs of ``process_commands`` (CPU-heavy commands, such as
+    `show interfaces`) are parsed by pool of worker processes instead, so they do not hold the GIL needed by other connection threads.
+    Worker processes use parser created by ``GetParser(device_type)``, so custom parser classes are not supported for these commands.
+
+    ``ParsePipeline`` is used in place of the parser, for example ``Cisco_IOS_Cli(parser=ParsePipeline(CiscoIOSParser()))``. Other attributes
+    are delegated to the wrapped parser. Single pipeline can be shared by all connections of ``CliMultiRunner``.
+    """
+    def __init__(self, parser, workers=2, max_pending=16, process_commands=None, process_workers=None, verbosity=4, DEBUG=False):
+        """
+
+        :param parser: Instance of ``ParserModule`` (or its child class), optionally wrapped in ``ParseCache``
+        :param int workers: Number of parsing threads
+        :param int max_pending: Maximal number of outputs waiting for parsing
+        :param list process_commands: Commands parsed by worker processes
+        :param int process_workers: Number of worker processes, defaults to number of CPUs
+        :param bool DEBUG: Enables/disables debugging output
+        """
+        self.parser = parser
+        self.device_type = parser.device_type
+        self.workers = workers
+        self.max_pending = max_pending
+        self.process_commands = set(process_commands or [])
+        self.process_workers = process_workers
+        self.logger = get_logger(name="ParsePipeline_{}".format(self.device_type), verbosity=verbosity, DEBUG=DEBUG)
+        self.stats = {"submitted": 0, "done": 0, "error": 0, "blocked_time": 0.0}
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._threads = []
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def __getattr__(self, name):
+        if name == "parser":
+            raise AttributeError(name)
+        return getattr(self.parser, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def _start(self):
+        with self._lock:
+            if self._threads:
+                return
+            for i in range(self.workers):
+                thread = threading.Thread(name="ParseWorker-{}".format(i), target=self._worker, daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def _worker(self):
+        while True:
+            job = self._queue.get()
+            try:
+                if job is None:
+                    return
+                future, function, kwargs = job
+                if not future.set_running_or_notify_cancel():
+                    continue
+                try:
+                    future.set_result(function(**kwargs))
+                    status = "done"
+                except Exception as e:
+                    future.set_exception(e)
+                    status = "error"
+                with self._lock:
+                    self.stats[status] += 1
+            finally:
+                self._queue.task_done()
+
+    def submit(self, function, **kwargs):
+        """
+        Queues ``function`` (usually parsing of single output) to be run by parsing thread. Blocks while ``self.max_pending`` outputs
+        are waiting.
+
+        :param function: Callable, called with ``kwargs``
+        :param kwargs: Keyword arguments of ``function``
+        :return: ``concurrent.futures.Future`` of the result
+        """
+        self._start()
+        future = Future()
+        start_time = timeit.default_timer()
+        self._queue.put((future, function, kwargs))
+        with self._lock:
+            self.stats["submitted"] += 1
+            self.stats["blocked_time"] += timeit.default_timer() - start_time
+        return future
+
+    def join(self):
+        """
+        Blocks until all submitted outputs are parsed.
+
+        :return: ``None``
+        """
+        self._queue.join()
+
+    def close(self):
+        """
+        Waits for the submitted outputs, stops parsing threads and worker processes.
+
+        :return: ``None``
+        """
+        with self._lock:
+            threads, self._threads = self._threads, []
+            executor, self._executor = self._executor, None
+        for _ in threads:
+            self._queue.put(None)
+        for thread in threads:
+            thread.join()
+        if executor is not None:
+            executor.shutdown()
+        self.logger.debug(msg="Parse pipeline closed, stats: {}".format(self.stats))
+
+    def _process_executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.process_workers, mp_context=_CONTEXT)
+            return self._executor
+
+    def autoparse(self, text, command, fields=None, layout="rows"):
+        """
+        Parses ``text`` in the calling thread, or in worker process if ``command`` is in ``self.process_commands``,
+        see ``ParserModule.autoparse()``.
+
+        :param str text: Text output to be processed
+        :param str command: Command used to generate ``text`` output
+        :param list fields: Optional list of keys the caller needs
+        :param str layout: `rows` (default) or `columns`
+        :return: List of found entities, usually list of dictionaries, or ``Columns`` object
+        """
+        if command in self.process_commands:
+            future = self._process_executor().submit(
+                _process_parse, self.device_type, self.parser.library.use_bundle, self.parser.compact, text, command, fields, layout
+            )
+            return future.result()
+        return self.parser.autoparse(text=text, command=command, fields=fields, layout=layout)
+
+    def iterparse(self, text, command, fields=None):
+        """
+        Generator version of ``autoparse()``. Outputs of ``self.process_commands`` are parsed whole before the first entry is yielded.
+
+        :param str text: Text output to be processed
+        :param str command: Command used to generate ``text`` output
+        :param list fields: Optional list of keys the caller needs
+        :return: Generator of found entities
+        """
+        if command in self.process_commands:
+            yield from self.autoparse(text=text, command=command, fields=fields)
+        else:
+            yield from self.parser.iterparse(text=text, command=command, fields=fields)
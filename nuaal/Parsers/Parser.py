@@ -1,6 +1,11 @@
 from nuaal.utils import *
 from nuaal.definitions import DATA_PATH
 from nuaal.Parsers.PatternsLib import PatternsLib
+from nuaal.Parsers.Extractors import PatternExtractor, BlockSplitter, TableExtractor
+from nuaal.Parsers.PatternProfiler import PatternProfiler
+from nuaal.Parsers.Records import compact_entries
+from nuaal.Parsers.Structured import is_structured, load_structured
+from nuaal.utils.Columns import Columns
 import json
 import re
 import timeit
@@ -10,18 +15,46 @@ class ParserModule(object):
     """
     This class provides necessary functions for parsing plaintext output of network devices. Uses patterns from ``PatternsLib`` for specified device type.
     The outputs are usually lists of dictionaries, which contain keys based on name groups of used regex patterns.
+
+    Child classes can define ``structured`` mappings of commands, for which the device can return structured (JSON) output by appending
+    ``structured_suffix`` to the command. Such outputs are mapped onto the same keys without regex, see ``StructuredMapping``.
     """
-    def __init__(self, device_type, verbosity=4, DEBUG=False):
+    # Command string -> StructuredMapping
+    structured = {}
+    # Suffix of commands requesting structured output, such as `| json`
+    structured_suffix = None
+
+    def __init__(self, device_type, lazy=True, use_bundle=False, compact=False, verbosity=4, DEBUG=False):
         """
 
         :param str device_type: String representation of device type, such as `cisco_ios`
+        :param bool lazy: If set to `True` (default), pattern modules are compiled on demand, the first time each command is parsed.
+        :param bool use_bundle: If set to `True`, patterns are loaded from precompiled ``PatternsBundle`` instead of JSON modules (experimental).
+        :param bool compact: If set to `True`, parsed dictionaries are returned as compact ``Record`` objects, see ``compact_entries()``.
         :param bool DEBUG: Enables/disables debugging output
         """
         self.device_type = device_type
         self.DEBUG = DEBUG
         self.logger = get_logger(name="ParserModule-{}".format(device_type), verbosity=verbosity, DEBUG=DEBUG)
         self.logger.info(msg="Creating ParserModule Object for {}".format(device_type))
-        self.patterns = PatternsLib(device_type=device_type, DEBUG=DEBUG).compiled_patterns
+        self.library = PatternsLib(device_type=device_type, lazy=lazy, use_bundle=use_bundle, DEBUG=DEBUG)
+        self.patterns = self.library.compiled_patterns
+        self.compact = compact
+        self.profiler = None
+
+    def refresh_patterns(self):
+        """
+        Reloads patterns if pattern modules of ``self.device_type`` changed on disk since they were loaded.
+
+        :return: ``True`` if patterns were reloaded, ``False`` otherwise.
+        """
+        PatternsLib.refresh(device_type=self.device_type)
+        if PatternsLib.current_version(device_type=self.device_type) == self.library.version:
+            return False
+        self.library = PatternsLib(device_type=self.device_type, lazy=self.library.lazy, use_bundle=self.library.use_bundle, DEBUG=self.DEBUG)
+        self.patterns = self.library.compiled_patterns
+        self.logger.info(msg="Reloaded patterns for '{}', version {}.".format(self.device_type, self.library.version))
+        return True
 
     def match_single_pattern(self, text, pattern):
         """
@@ -30,27 +63,12 @@ class ParserModule(object):
         list of matching strings is returned.
 
         :param str text:
-        :param pattern: ``re`` compiled regex pattern
+        :param pattern: ``PatternExtractor``, ``BlockSplitter`` or ``TableExtractor`` object from ``PatternsLib`` or ``re`` compiled regex pattern
         :return: List of matches, either dictionaries or strings
         """
-        if not re.search(pattern=pattern, string=text):
-            return []
-        named_groups = [x for x in pattern.groupindex.keys() if isinstance(x, str)]
-        if len(named_groups) == 0:
-            return re.findall(pattern=pattern, string=text)
-        else:
-            entries = []
-            for m in re.finditer(pattern=pattern, string=text):
-                entry = {}
-                for group_name in named_groups:
-                    try:
-                        entry[group_name] = int(m.group(group_name))
-                    except (ValueError, TypeError):
-                        entry[group_name] = m.group(group_name)
-                    except IndexError:
-                        entry[group_name] = None
-                entries.append(entry)
-            return entries
+        if isinstance(pattern, re.Pattern):
+            pattern = PatternExtractor(regex=pattern)
+        return pattern.extract(text)
 
     def update_entry(self, orig_entry, new_entry):
         """
@@ -77,67 +95,152 @@ class ParserModule(object):
         This functions tries to match multiple regex ``patterns`` against given ``text`` .
 
         :param str text: Text output to be processed
-        :param lst patterns: List of ``re`` compiled patterns for parsing.
+        :param lst patterns: List of ``PatternExtractor`` objects or ``re`` compiled patterns for parsing.
         :return: Dictionary with names of all groups from *all* ``patterns`` as keys, with matching strings as values.
         """
-        named_groups = []
-        entry = {}
         match_counter = 0
         start_time = timeit.default_timer()
+        patterns = [PatternExtractor(regex=x) if isinstance(x, re.Pattern) else x for x in patterns]
         # Populate named_groups
+        entry = dict.fromkeys(group_name for pattern in patterns for group_name in pattern.group_names)
+        self.logger.debug(msg="Found {} groups in patterns: {}".format(len(entry), list(entry.keys())))
         for pattern in patterns:
-            for group_name in pattern.groupindex.keys():
-                if isinstance(group_name, str) and group_name not in named_groups:
-                    named_groups.append(group_name)
-                    entry[group_name] = None
-        self.logger.debug(msg="Found {} groups in patterns: {}".format(len(named_groups), named_groups))
-        for pattern in patterns:
-            match = re.search(pattern=pattern, string=text)
-            if match:
+            pattern_match = pattern.search(text)
+            if pattern_match is not None:
                 match_counter += 1
-                pattern_match = {}
-                for group_name in [x for x in pattern.groupindex.keys() if isinstance(x, str)]:
-                    try:
-                        pattern_match[group_name] = int(match.group(group_name))
-                    except (TypeError, ValueError):
-                        pattern_match[group_name] = match.group(group_name)
                 entry = self.update_entry(entry, pattern_match)
-                if None not in list(entry.values()):
+                if None not in entry.values():
                     break
         self.logger.debug(msg="MultiPatternMatch: Matched {} pattern(s) in {} miliseconds.".format(match_counter, (timeit.default_timer() - start_time)*1000))
         return entry
 
+    def split_blocks(self, text, splitter):
+        """
+        Generator splitting sectioned ``text`` to blocks, such as individual interfaces of `show interfaces` output, using ``BlockSplitter``.
+        Blocks are yielded as copies of the text, use ``BlockSplitter.spans()`` for offsets only.
+
+        :param str text: Text output to be processed
+        :param splitter: ``BlockSplitter`` object or name of the splitter, such as `unindented`
+        :return: Generator of strings
+        """
+        if not isinstance(splitter, BlockSplitter):
+            splitter = BlockSplitter(splitter=splitter)
+        for start, end in splitter.spans(text):
+            yield text[start:end]
+
+    def supports(self, command):
+        """
+        Checks whether this parser can parse output of ``command``.
+
+        :param str command: Command string, such as `show vlan brief`
+        :return: Bool
+        """
+        return command in self.patterns or command in self.structured
+
+    def structured_command(self, command):
+        """
+        Returns variant of ``command`` requesting structured output, if the output can be parsed without regex.
+
+        :param str command: Command string, such as `show version`
+        :return: Command string, such as `show version | json`, or ``None`` if structured output of ``command`` is not supported
+        """
+        if command in self.structured and self.structured_suffix:
+            return "{} {}".format(command, self.structured_suffix)
+        return None
+
+    def _iter_structured(self, text, command):
+        """
+        Generator of entries mapped from structured ``text`` output of ``command`` by ``self.structured[command]``.
+
+        :param str text: Structured (JSON) output
+        :param str command: Command string, without the suffix
+        :return: Generator of dictionaries
+        """
+        start_time = timeit.default_timer()
+        try:
+            data = load_structured(text)
+        except ValueError as e:
+            self.logger.error(msg="Structured output of '{}' is not valid JSON. Exception: {}".format(command, repr(e)))
+            return
+        yield from self.structured[command].iter_entries(data)
+        self.logger.debug(msg="Mapping of structured output of '{}' took {} seconds.".format(command, timeit.default_timer() - start_time))
+
+    def enable_profiling(self):
+        """
+        Enables collection of per-pattern statistics (number of calls, hits and matches, cumulative and maximal time) for all following calls of
+        ``autoparse()`` and ``iterparse()``. Profiling adds overhead to every pattern call, so it is disabled by default.
+
+        :return: ``PatternProfiler`` object holding the statistics
+        """
+        if self.profiler is None:
+            self.profiler = PatternProfiler()
+        return self.profiler
+
+    def disable_profiling(self):
+        """
+        Disables profiling enabled by ``enable_profiling()``.
+
+        :return: ``PatternProfiler`` object with statistics collected so far, or ``None`` if profiling was not enabled
+        """
+        profiler, self.profiler = self.profiler, None
+        return profiler
+
+    def _module(self, command, fields=None):
+        """
+        Returns compiled pattern module of ``command``, projected to ``fields`` and instrumented by ``self.profiler`` if profiling is enabled.
+
+        :param str command: Command string
+        :param list fields: Optional list of field names
+        :return: Compiled pattern module
+        """
+        if fields is None:
+            module = self.patterns[command]
+            if self.profiler is not None:
+                module = self.profiler.instrument(command=command, module=module)
+        else:
+            module = self.library.project(command=command, fields=fields)
+            if self.profiler is not None:
+                module = self.profiler.instrument(command=command, module=module, base=self.patterns[command])
+        return module
+
     def split_to_list(self, text, delimiter=","):
 
         return [x.strip() for x in text.split(delimiter)]
 
 
-    def _level_zero(self, text, patterns):
+    def _iter_level_zero(self, text, patterns):
         """
-        This function handles parsing of less complex plaintext outputs, which can be parsed in  one step.
+        Generator version of ``_level_zero()``. Patterns are tried in order, matches of the first pattern which matches at least once are yielded lazily.
 
         :param str text: Plaintex output which will be parsed
         :param patterns: List of compiled regex patterns, which are used to parse the ``text``
-        :return: List dics (if ``patterns`` contain named groups) or list of strings (if they don't)
+        :return: Generator of dicts (if ``patterns`` contain named groups) or strings (if they don't)
         """
         if not isinstance(text, str):
             self.logger.debug(msg="Level Zero: Expected string, got {}".format(type(text)))
-            return []
-        level_zero_outputs = []
-        if not isinstance(patterns, list):
-            patterns = list(patterns)
+            return
         for pattern in patterns:
-            output = self.match_single_pattern(text=text, pattern=pattern)
-            if not output:
-                continue
-            if len(output) == 0:
-                continue
-            else:
-                level_zero_outputs = output
-                break
-        if len(level_zero_outputs) == 0:
-            self.logger.warning(msg="Level Zero found no matches.")
-        elif isinstance(level_zero_outputs[0], str):
+            if isinstance(pattern, re.Pattern):
+                pattern = PatternExtractor(regex=pattern)
+            matches = pattern.iter_extract(text)
+            for first in matches:
+                yield first
+                yield from matches
+                return
+        self.logger.warning(msg="Level Zero found no matches.")
+
+    def _level_zero(self, text, patterns):
+        """
+        This function handles parsing of less complex plaintext outputs, which can be parsed in  one step.
+
+        :param str text: Plaintex output which will be parsed
+        :param patterns: List of compiled regex patterns, which are used to parse the ``text``
+        :return: List dics (if ``patterns`` contain named groups) or list of strings (if they don't)
+        """
+        level_zero_outputs = list(self._iter_level_zero(text=text, patterns=patterns))
+        if not level_zero_outputs:
+            return level_zero_outputs
+        if isinstance(level_zero_outputs[0], str):
             self.logger.debug(msg="Level Zero: Found {} matches without named groups.".format(len(level_zero_outputs)))
         elif isinstance(level_zero_outputs[0], dict):
             self.logger.debug(msg="Level Zero: Found {} matches with named groups.".format(len(level_zero_outputs)))
@@ -145,27 +248,31 @@ class ParserModule(object):
             self.logger.critical(msg="Level Zero: Unexpected event when trying to match {} with patterns {}.".format(text, patterns))
         return level_zero_outputs
 
-    def _level_one(self, text, command):
+    def _iter_level_one(self, text, command, module=None):
         """
-        This function handles parsing of more complex plaintext outputs. First, the output of ``_level_zero()`` function is retrieved and then further parsed.
+        Generator version of ``_level_one()``. Each entry found by `level0` patterns is completed by `level1` patterns and yielded before
+        the next one is processed.
 
         :param str text: Plaintex output of given ``command``, which will be parsed
         :param str command: Command string used to generate the output
-        :return: List of dictionaries
+        :param module: Compiled pattern module to use instead of ``self.patterns[command]``, such as projection from ``PatternsLib.project()``
+        :return: Generator of dictionaries
         """
-        level_one_outputs = []
-        level_zero_outputs = self._level_zero(text=text, patterns=self.patterns[command]["level0"])
-        if len(level_zero_outputs) == 0:
-            self.logger.error(msg="Level Zero returned 0 outputs for command {}".format(command))
-            return level_zero_outputs
-        if "level1" not in self.patterns[command].keys():
+        if module is None:
+            module = self.patterns[command]
+        level_zero_outputs = self._iter_level_zero(text=text, patterns=module["level0"])
+        level_one_patterns = module.get("level1")
+        if level_one_patterns is None:
             self.logger.warning(msg="Command {} is not a 'level1' command.".format(command))
-            return level_zero_outputs
-        self.logger.debug(msg="Level Zero returned {} outputs.".format(len(level_zero_outputs)))
-        if isinstance(level_zero_outputs[0], dict):
-            for level_zero_entry in level_zero_outputs:
+            yield from level_zero_outputs
+            return
+        all_patterns = [pattern for patterns in level_one_patterns.values() for pattern in patterns]
+        entry_count = 0
+        for level_zero_entry in level_zero_outputs:
+            entry_count += 1
+            if isinstance(level_zero_entry, dict):
                 entry = level_zero_entry
-                for key, patterns in self.patterns[command]["level1"].items():
+                for key, patterns in level_one_patterns.items():
                     try:
                         entry[key] = self._level_zero(text=level_zero_entry[key], patterns=patterns)
                     except KeyError:
@@ -174,16 +281,52 @@ class ParserModule(object):
                     except TypeError as e:
                         self.logger.error(msg="Level Zero returned {} for key {}.".format(type(level_zero_entry[key]), key))
                         entry[key] = None
-                level_one_outputs.append(entry)
-        elif isinstance(level_zero_outputs[0], str):
-            all_patterns = []
-            for key, patterns in self.patterns[command]["level1"].items():
-                all_patterns += patterns
-            for level_zero_entry in level_zero_outputs:
-                entry = {}
-                entry = self.match_multi_pattern(text=level_zero_entry, patterns=all_patterns)
-                level_one_outputs.append(entry)
-        return level_one_outputs
+                yield entry
+            elif isinstance(level_zero_entry, str):
+                yield self.match_multi_pattern(text=level_zero_entry, patterns=all_patterns)
+        if entry_count == 0:
+            self.logger.error(msg="Level Zero returned 0 outputs for command {}".format(command))
+        else:
+            self.logger.debug(msg="Level Zero returned {} outputs.".format(entry_count))
+
+    def _level_one(self, text, command, module=None):
+        """
+        This function handles parsing of more complex plaintext outputs. First, the output of ``_level_zero()`` function is retrieved and then further parsed.
+
+        :param str text: Plaintex output of given ``command``, which will be parsed
+        :param str command: Command string used to generate the output
+        :param module: Compiled pattern module to use instead of ``self.patterns[command]``
+        :return: List of dictionaries
+        """
+        return list(self._iter_level_one(text=text, command=command, module=module))
+
+    def _project(self, entries, fields):
+        """
+        Generator reducing dictionaries in ``entries`` to keys in ``fields``. Missing keys are set to ``None``, other entries are yielded unchanged.
+
+        :param entries: Iterable of parsed entries
+        :param list fields: List of field names
+        :return: Generator of entries
+        """
+        for entry in entries:
+            if isinstance(entry, dict):
+                yield {field: entry.get(field) for field in fields}
+            else:
+                yield entry
+
+    def compact_entries(self, entries, command):
+        """
+        Converts parsed dictionaries in ``entries`` to ``Record`` objects if ``self.compact`` is set, otherwise returns ``entries`` unchanged.
+        Records of each command share their field names and store values in ``__slots__``, which takes half to a third of the memory of
+        dictionaries for large outputs, while records still behave as mappings for ``Filter``, ``OutputFilter`` and the Writers.
+
+        :param entries: Iterable of parsed entries
+        :param str command: Command used to generate the output
+        :return: Iterable of entries
+        """
+        if not self.compact:
+            return entries
+        return compact_entries(entries=entries, command=command)
 
     def command_mapping(self, command):
         """
@@ -201,7 +344,7 @@ class ParserModule(object):
         self.logger.debug(msg="Command '{}' level is: {}".format(command, max_level))
         return max_level
 
-    def autoparse(self, text, command):
+    def autoparse(self, text, command, fields=None, layout="rows"):
         """
         .. _autoparse:
 
@@ -209,15 +352,87 @@ class ParserModule(object):
 
         :param str text: Text output to be processed
         :param str command: Command used to generate ``text`` output. Based on this parameter, correct regex patterns are selected.
-        :return: List of found entities, usually list of dictionaries
+        :param list fields: Optional list of keys the caller needs. Only `level1` patterns producing these keys are run and returned
+            dictionaries contain only these keys.
+        :param str layout: `rows` (default) returns list of entries, `columns` returns ``Columns`` object with list or array of values per field,
+            built while the output is being parsed. Useful for analytics over large tables, such as MAC address table or ARP.
+        :return: List of found entities, usually list of dictionaries, or ``Columns`` object
         """
+        if layout == "columns":
+            return self.parse_columns(text=text, command=command, fields=fields)
+        elif layout != "rows":
+            self.logger.error(msg="AutoParse: Unknown layout '{}', expected 'rows' or 'columns'.".format(layout))
+            return None
+        if fields is not None or (command in self.structured and (is_structured(text) or command not in self.patterns)):
+            return list(self.iterparse(text=text, command=command, fields=fields))
         command_level = self.command_mapping(command=command)
         parsed_output = None
         if command_level == "level0":
-            #parsed_output = self._level_zero(text=text, patterns=self.patterns[command]["level0"])
-            return self._level_zero(text=text, patterns=self.patterns[command]["level0"])
+            parsed_output = self._level_zero(text=text, patterns=self._module(command=command)["level0"])
         elif command_level == "level1":
-            #parsed_output = self._level_one(text=text, command=command)
-            return self._level_one(text=text, command=command)
+            parsed_output = self._level_one(text=text, command=command, module=self._module(command=command))
         else:
             self.logger.critical(msg="AutoParse: Unknown level for command: '{}'".format(command))
+            return parsed_output
+        if self.compact:
+            parsed_output = list(self.compact_entries(entries=parsed_output, command=command))
+        return parsed_output
+
+    def parse_columns(self, text, command, fields=None):
+        """
+        Parses ``text`` to ``Columns``, see ``layout`` parameter of :ref:`autoparse <autoparse>`. Entries produced by ``iterparse()`` are added
+        to the columns one by one, so list of all entries is never built.
+
+        :param str text: Text output to be processed
+        :param str command: Command used to generate ``text`` output
+        :param list fields: Optional list of keys the caller needs
+        :return: ``Columns`` object, ``None`` if the output of ``command`` does not consist of named fields
+        """
+        start_time = timeit.default_timer()
+        columns = self.to_columns(entries=self.iterparse(text=text, command=command, fields=fields), command=command)
+        if columns is not None:
+            self.logger.debug(msg="Parsed {} entries of '{}' to columns in {} seconds.".format(columns.length, command, timeit.default_timer() - start_time))
+        return columns
+
+    def to_columns(self, entries, command):
+        """
+        Converts parsed ``entries`` to ``Columns``.
+
+        :param entries: Iterable of parsed entries
+        :param str command: Command used to generate the output
+        :return: ``Columns`` object, ``None`` if ``entries`` are not dictionaries
+        """
+        try:
+            return Columns.from_entries(entries=entries)
+        except TypeError as e:
+            self.logger.error(msg="Output of '{}' cannot be returned as columns. Exception: {}".format(command, repr(e)))
+            return None
+
+    def iterparse(self, text, command, fields=None):
+        """
+        Generator version of :ref:`autoparse <autoparse>`. Entries are parsed and yielded one at a time, so only the source ``text`` and the current
+        entry are held in memory, instead of list of all entries. Useful for very large outputs, such as MAC address table of core switch.
+
+        :param str text: Text output to be processed
+        :param str command: Command used to generate ``text`` output. Based on this parameter, correct regex patterns are selected.
+        :param list fields: Optional list of keys the caller needs, see :ref:`autoparse <autoparse>`
+        :return: Generator of found entities, usually dictionaries
+        """
+        if command in self.structured and is_structured(text):
+            entries = self._iter_structured(text=text, command=command)
+        elif command not in self.patterns:
+            self.logger.error(msg="IterParse: No patterns for plaintext output of command: '{}'".format(command))
+            return
+        else:
+            command_level = self.command_mapping(command=command)
+            module = self._module(command=command, fields=fields)
+            if command_level == "level0":
+                entries = self._iter_level_zero(text=text, patterns=module["level0"])
+            elif command_level == "level1":
+                entries = self._iter_level_one(text=text, command=command, module=module)
+            else:
+                self.logger.critical(msg="IterParse: Unknown level for command: '{}'".format(command))
+                return
+        if fields is not None:
+            entries = self._project(entries=entries, fields=fields)
+        yield from self.compact_entries(entries=entries, command=command)
@@ -0,0 +1,192 @@
+from types import MappingProxyType
+from collections.abc import Mapping
+import json
+import threading
+import timeit
+
+
+class ProfiledExtractor(object):
+    """
+    Wrapper of ``PatternExtractor``, ``BlockSplitter`` or ``TableExtractor`` which records number of calls, matches and time spent
+    in each call to ``PatternProfiler``. Other attributes are delegated to the wrapped extractor.
+    """
+    __slots__ = ("extractor", "record", "_lock")
+
+    def __init__(self, extractor, record, lock):
+        """
+
+        :param extractor: Wrapped extractor
+        :param dict record: Dictionary with counters, owned by ``PatternProfiler``
+        :param lock: Lock guarding the counters
+        """
+        self.extractor = extractor
+        self.record = record
+        self._lock = lock
+
+    def __getattr__(self, name):
+        return getattr(self.extractor, name)
+
+    def __repr__(self):
+        return "<ProfiledExtractor: {}>".format(repr(self.extractor))
+
+    def _add(self, elapsed, matches):
+        record = self.record
+        with self._lock:
+            record["calls"] += 1
+            record["matches"] += matches
+            if matches:
+                record["hits"] += 1
+            record["total_time"] += elapsed
+            if elapsed > record["max_time"]:
+                record["max_time"] = elapsed
+
+    def extract(self, text):
+        start_time = timeit.default_timer()
+        result = self.extractor.extract(text)
+        self._add(elapsed=timeit.default_timer() - start_time, matches=len(result))
+        return result
+
+    def iter_extract(self, text):
+        # Only time spent producing the matches is measured, not time the consumer spends between them
+        timer = timeit.default_timer
+        iterator = self.extractor.iter_extract(text)
+        elapsed = 0.0
+        matches = 0
+        try:
+            while True:
+                start_time = timer()
+                try:
+                    match = next(iterator)
+                except StopIteration:
+                    elapsed += timer() - start_time
+                    break
+                elapsed += timer() - start_time
+                matches += 1
+                yield match
+        finally:
+            self._add(elapsed=elapsed, matches=matches)
+
+    def search(self, text):
+        start_time = timeit.default_timer()
+        result = self.extractor.search(text)
+        self._add(elapsed=timeit.default_timer() - start_time, matches=0 if result is None else 1)
+        return result
+
+
+class PatternProfiler(object):
+    """
+    Collects statistics of individual patterns used by ``ParserModule``, per command and per pattern location, such as `level0[0]`
+    or `level1.duplex[1]`: number of calls, number of calls with at least one match (hits), total number of matches, cumulative time
+    and maximal time of single call. Enable it by ``ParserModule.enable_profiling()``.
+    """
+    def __init__(self):
+        self.records = {}
+        self._modules = {}
+        self._locations = {}
+        self._lock = threading.Lock()
+
+    def _record(self, command, location, extractor):
+        # Projected modules share extractors with the full module, so the statistics are kept under location of the extractor in the full module
+        record = self._locations.get((command, id(extractor)))
+        if record is None:
+            key = (command, location)
+            if key not in self.records:
+                self.records[key] = {"pattern": repr(extractor), "calls": 0, "hits": 0, "matches": 0, "total_time": 0.0, "max_time": 0.0}
+            record = self._locations[(command, id(extractor))] = self.records[key]
+        return record
+
+    def _wrap_patterns(self, command, location, patterns):
+        return tuple(
+            pattern if pattern is None else ProfiledExtractor(
+                extractor=pattern, record=self._record(command=command, location="{}[{}]".format(location, index), extractor=pattern), lock=self._lock
+            ) for index, pattern in enumerate(patterns)
+        )
+
+    def instrument(self, command, module, base=None):
+        """
+        Returns copy of compiled pattern module with all patterns wrapped in ``ProfiledExtractor``. Instrumented modules are memoized.
+
+        :param str command: Command string, such as `show interfaces`
+        :param module: Compiled pattern module
+        :param base: Full pattern module of ``command``, if ``module`` is its projection. Patterns are then reported under their location in ``base``.
+        :return: Compiled pattern module
+        """
+        if base is not None and base is not module:
+            self.instrument(command=command, module=base)
+        key = (command, id(module))
+        instrumented = self._modules.get(key)
+        if instrumented is not None and instrumented[0] is module:
+            return instrumented[1]
+        levels = {}
+        with self._lock:
+            for level, patterns in module.items():
+                if isinstance(patterns, Mapping):
+                    levels[level] = MappingProxyType({
+                        key: self._wrap_patterns(command=command, location="{}.{}".format(level, key), patterns=key_patterns)
+                        for key, key_patterns in patterns.items()
+                    })
+                else:
+                    levels[level] = self._wrap_patterns(command=command, location=level, patterns=patterns)
+        instrumented = MappingProxyType(levels)
+        self._modules[key] = (module, instrumented)
+        return instrumented
+
+    def reset(self):
+        """
+        Resets all collected statistics.
+
+        :return: ``None``
+        """
+        with self._lock:
+            for record in self.records.values():
+                record.update(calls=0, hits=0, matches=0, total_time=0.0, max_time=0.0)
+
+    def to_dict(self):
+        """
+        Returns collected statistics.
+
+        :return: Dictionary with commands as keys and dictionaries with pattern locations as keys and statistics as values
+        """
+        data = {}
+        with self._lock:
+            for (command, location), record in self.records.items():
+                entry = dict(record)
+                entry["hit_rate"] = round(record["hits"] / record["calls"], 4) if record["calls"] else None
+                data.setdefault(command, {})[location] = entry
+        return data
+
+    def to_json(self, path=None):
+        """
+        Exports collected statistics as JSON.
+
+        :param str path: Optional path of the file to write
+        :return: (str) JSON string
+        """
+        data = json.dumps(self.to_dict(), indent=2)
+        if path is not None:
+            with open(path, mode="w") as f:
+                f.write(data)
+        return data
+
+    def report(self, sort_by="total_time", limit=None, unused=True):
+        """
+        Returns text report with one line per pattern, sorted in descending order.
+
+        :param str sort_by: Statistic to sort by, one of `calls`, `hits`, `matches`, `total_time`, `max_time`, `hit_rate`
+        :param int limit: Maximal number of lines
+        :param bool unused: If set to `False`, patterns which have never been called are omitted.
+        :return: (str) Report
+        """
+        rows = [(command, location, record) for command, locations in self.to_dict().items() for location, record in locations.items()]
+        if not unused:
+            rows = [x for x in rows if x[2]["calls"]]
+        rows.sort(key=lambda x: (x[2][sort_by] is not None, x[2][sort_by] or 0), reverse=True)
+        lines = ["{:<40} {:<28} {:>8} {:>8} {:>9} {:>8} {:>12} {:>10}".format(
+            "Command", "Pattern", "Calls", "Hits", "Hit rate", "Matches", "Total [ms]", "Max [ms]"
+        )]
+        for command, location, record in rows[:limit]:
+            lines.append("{:<40} {:<28} {:>8} {:>8} {:>9} {:>8} {:>12.3f} {:>10.3f}".format(
+                command, location, record["calls"], record["hits"], "-" if record["hit_rate"] is None else "{:.1%}".format(record["hit_rate"]),
+                record["matches"], record["total_time"] * 1000, record["max_time"] * 1000
+            ))
+        return "\n".join(lines)
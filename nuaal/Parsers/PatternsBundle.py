@@ -0,0 +1,274 @@
+from nuaal.definitions import DATA_PATH, CACHE_PATH
+from nuaal.utils import get_logger, check_path
+from array import array
+import hashlib
+import marshal
+import json
+import os
+import re
+import sys
+import timeit
+try:
+    from re import _compiler as sre_compile, _parser as sre_parse
+except ImportError:
+    import sre_compile
+    import sre_parse
+try:
+    import _sre
+except ImportError:
+    _sre = None
+
+BUNDLE_MAGIC = b"NUAALPB"
+BUNDLE_FORMAT = 3
+
+FLAGS_MAP = {
+    "multiline": re.MULTILINE,
+    "dotall": re.DOTALL,
+    "ignorecase": re.IGNORECASE,
+    "verbose": re.VERBOSE
+}
+
+
+def interpreter_key():
+    """
+    Identifies the interpreter, precompiled regex code is used only by exactly the same implementation, version and ``_sre`` engine
+    which produced it.
+
+    :return: List of implementation name, version, ``_sre.MAGIC`` and ``_sre.CODESIZE``
+    """
+    return [sys.implementation.name, list(sys.version_info[:3]), getattr(_sre, "MAGIC", None), getattr(_sre, "CODESIZE", None)]
+
+
+def precompiled_supported():
+    """
+    Checks whether regex code can be precompiled on this interpreter. Requires CPython with private ``_sre.compile()`` and
+    ``sre_compile._code()``, on other interpreters bundles contain just the normalized modules.
+
+    :return: Bool
+    """
+    return sys.implementation.name == "cpython" and hasattr(_sre, "compile") and hasattr(_sre, "MAGIC") and hasattr(sre_compile, "_code")
+
+
+def precompile_pattern(pattern, flags):
+    """
+    Runs the (pure Python) parsing and code generation stage of regex compilation and returns its result in serializable form.
+
+    :param str pattern: Regex pattern
+    :param int flags: Regex flags
+    :return: List of arguments for ``_sre.compile``, without the pattern itself
+    """
+    parsed = sre_parse.parse(pattern, flags)
+    code = sre_compile._code(parsed, flags)
+    groupindex = dict(parsed.state.groupdict)
+    indexgroup = [None] * parsed.state.groups
+    for name, index in groupindex.items():
+        indexgroup[index] = name
+    return [int(flags | parsed.state.flags), array("I", code).tobytes(), parsed.state.groups - 1, groupindex, indexgroup]
+
+
+def compile_pattern(pattern_dict, logger=None):
+    """
+    Compiles pattern dictionary, using precompiled code from the bundle if available. Precompiled code relies on private ``_sre.compile()``,
+    whose signature changes between Python versions, so bundles built by other interpreter are rebuilt (see ``interpreter_key()``).
+    If the code still cannot be used, the pattern is compiled by ``re.compile()`` and warning is logged.
+
+    :param dict pattern_dict: Dictionary with `pattern` and `flags` keys and optional `sre` key with precompiled code
+    :param logger: Logger for the warning about fallback to ``re.compile()``
+    :return: Compiled pattern
+    """
+    if "sre" in pattern_dict:
+        try:
+            flags, code, groups, groupindex, indexgroup = pattern_dict["sre"]
+            code_array = array("I")
+            code_array.frombytes(code)
+            return _sre.compile(pattern_dict["pattern"], flags, code_array.tolist(), groups, groupindex, tuple(indexgroup))
+        except (TypeError, ValueError, RuntimeError, AttributeError) as e:
+            if logger is not None:
+                logger.warning(msg="Precompiled code of pattern '{}' could not be loaded on Python {}, compiling it again. Exception: {}".format(
+                    pattern_dict["pattern"], sys.version.split()[0], repr(e)
+                ))
+    return re.compile(pattern=pattern_dict["pattern"], flags=pattern_dict["flags"])
+
+
+class PatternsBundle:
+    """
+    This class handles precompiled pattern bundles. Bundle contains all pattern modules of single device type, with normalized flags,
+    group names, level structure and precompiled regex code, stored in one versioned binary file in `~/.nuaal/cache/patterns`.
+    Loading a bundle skips listing, reading and parsing of individual JSON modules, as well as parsing of the regular expressions themselves.
+    The bundle is invalidated when modification times and hashes of the JSON modules change, or when it was built by different interpreter,
+    compared by ``interpreter_key()``.
+
+    Bundles are experimental. Precompiled code is built by private ``sre_compile._code()`` and loaded by private ``_sre.compile()`` of CPython,
+    on other interpreters the bundle contains just the normalized modules and patterns are compiled by ``re.compile()``.
+    """
+    def __init__(self, device_type, path=None, verbosity=4, DEBUG=False):
+        """
+
+        :param str device_type: String representation of device type, such as `cisco_ios`
+        :param str path: Path of the bundle file. Defaults to `~/.nuaal/cache/patterns/<device_type>.bundle`
+        :param bool DEBUG: Enables/disables debugging output
+        """
+        self.device_type = device_type
+        self.logger = get_logger(name="PatternsBundle_{}".format(device_type), verbosity=verbosity, DEBUG=DEBUG)
+        self.patterns_path = os.path.abspath(os.path.join(DATA_PATH, "patterns", device_type))
+        self.path = path if path else os.path.join(CACHE_PATH, "patterns", "{}.bundle".format(device_type))
+
+    @staticmethod
+    def _file_hash(file_path):
+        with open(file_path, mode="rb") as f:
+            return hashlib.sha1(f.read()).hexdigest()
+
+    def _module_files(self):
+        return sorted(x for x in os.listdir(self.patterns_path) if x[-5:] == ".json")
+
+    def _normalize_flags(self, flags):
+        """
+        Converts flags given as integer, flag name or list of flag names to integer.
+
+        :param flags: Flags of the pattern
+        :return: (int) Flags
+        """
+        if isinstance(flags, int):
+            return flags
+        if isinstance(flags, str):
+            flags = [flags]
+        normalized_flags = 0
+        for flag in flags or []:
+            try:
+                normalized_flags |= FLAGS_MAP[flag.lower()]
+            except KeyError:
+                self.logger.error(msg="Flag '{}' is not a recognized regex flag.".format(flag))
+        return normalized_flags
+
+    def _normalize_pattern(self, pattern_dict):
+        normalized = dict(pattern_dict)
+        if "pattern" in normalized:
+            normalized["flags"] = self._normalize_flags(normalized.get("flags", 0))
+            try:
+                if precompiled_supported():
+                    normalized["sre"] = precompile_pattern(pattern=normalized["pattern"], flags=normalized["flags"])
+                    normalized["groups"] = [x for x in normalized["sre"][4] if x is not None]
+                else:
+                    normalized["groups"] = list(re.compile(normalized["pattern"], normalized["flags"]).groupindex)
+            except re.error as e:
+                self.logger.error(msg="Encountered exception when compiling pattern '{}'. Exception: {}".format(normalized["pattern"], repr(e)))
+                normalized["groups"] = []
+        return normalized
+
+    def normalize_module(self, pattern_data):
+        """
+        Returns copy of pattern module with normalized flags, group names and precompiled code of every pattern.
+
+        :param dict pattern_data: Content of JSON pattern module
+        :return: Normalized pattern module
+        """
+        normalized = dict(pattern_data)
+        for level in [x for x in pattern_data.keys() if "level" in x]:
+            if isinstance(pattern_data[level], list):
+                normalized[level] = [self._normalize_pattern(pattern_dict=x) for x in pattern_data[level]]
+            elif isinstance(pattern_data[level], dict):
+                normalized[level] = {key: [self._normalize_pattern(pattern_dict=x) for x in patterns] for key, patterns in pattern_data[level].items()}
+        return normalized
+
+    def build(self):
+        """
+        Reads all JSON pattern modules of the device type and stores them as a bundle.
+
+        :return: (dict) Content of the bundle
+        """
+        start_time = timeit.default_timer()
+        files = {}
+        modules = {}
+        for module in self._module_files():
+            module_path = os.path.join(self.patterns_path, module)
+            stat = os.stat(module_path)
+            with open(module_path, mode="r") as f:
+                pattern_data = json.load(f)
+            files[module] = [stat.st_size, stat.st_mtime_ns, self._file_hash(file_path=module_path)]
+            modules[module] = self.normalize_module(pattern_data=pattern_data)
+        bundle = {
+            "format": BUNDLE_FORMAT,
+            "interpreter": interpreter_key(),
+            "device_type": self.device_type,
+            "files": files,
+            "modules": modules
+        }
+        temp_path = "{}.{}.tmp".format(self.path, os.getpid())
+        try:
+            check_path(os.path.dirname(self.path))
+            with open(temp_path, mode="wb") as f:
+                f.write(BUNDLE_MAGIC + bytes([BUNDLE_FORMAT]) + marshal.dumps(bundle))
+            os.replace(temp_path, self.path)
+            self.logger.debug(msg="Built pattern bundle '{}' with {} modules in {} ms.".format(self.path, len(modules), round((timeit.default_timer() - start_time) * 1000, 3)))
+        except (OSError, ValueError) as e:
+            self.logger.error(msg="Could not store pattern bundle '{}'. Exception: {}".format(self.path, repr(e)))
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+        return bundle
+
+    def is_valid(self, bundle):
+        """
+        Checks whether given bundle matches the JSON pattern modules on disk. Files with changed modification time are compared by hash.
+
+        :param dict bundle: Content of the bundle
+        :return: Bool
+        """
+        if bundle.get("format") != BUNDLE_FORMAT or bundle.get("device_type") != self.device_type:
+            return False
+        if bundle.get("interpreter") != interpreter_key():
+            self.logger.debug(msg="Pattern bundle '{}' was built by different interpreter.".format(self.path))
+            return False
+        files = bundle.get("files", {})
+        if sorted(files.keys()) != self._module_files():
+            return False
+        for module, (size, mtime_ns, file_hash) in files.items():
+            module_path = os.path.join(self.patterns_path, module)
+            stat = os.stat(module_path)
+            if stat.st_size == size and stat.st_mtime_ns == mtime_ns:
+                continue
+            if stat.st_size != size or self._file_hash(file_path=module_path) != file_hash:
+                self.logger.debug(msg="Pattern module '{}' changed since the bundle was built.".format(module))
+                return False
+        return True
+
+    def load(self):
+        """
+        Loads the bundle from disk.
+
+        :return: (dict) Content of the bundle, or ``None`` if the bundle does not exist or is not valid.
+        """
+        header = BUNDLE_MAGIC + bytes([BUNDLE_FORMAT])
+        try:
+            with open(self.path, mode="rb") as f:
+                content = f.read()
+            if content[:len(header)] != header:
+                self.logger.debug(msg="Pattern bundle '{}' has unsupported format.".format(self.path))
+                return None
+            bundle = marshal.loads(content[len(header):])
+        except FileNotFoundError:
+            return None
+        except (OSError, EOFError, ValueError, TypeError) as e:
+            self.logger.error(msg="Could not load pattern bundle '{}'. Exception: {}".format(self.path, repr(e)))
+            return None
+        if not isinstance(bundle, dict) or not self.is_valid(bundle=bundle):
+            return None
+        return bundle
+
+    def load_or_build(self):
+        """
+        Loads the bundle from disk, rebuilding it first if it is missing or outdated.
+
+        :return: (dict) Content of the bundle
+        """
+        bundle = self.load()
+        if bundle is None:
+            self.logger.debug(msg="Pattern bundle for '{}' is missing or outdated, rebuilding.".format(self.device_type))
+            bundle = self.build()
+        return bundle
+
+
+if __name__ == '__main__':
+    for device_type in sorted(os.listdir(os.path.join(DATA_PATH, "patterns"))):
+        bundle = PatternsBundle(device_type=device_type)
+        bundle.build()
+        print("Built pattern bundle for '{}': {}".format(device_type, bundle.path))
@@ -1,24 +1,274 @@
 from nuaal.definitions import DATA_PATH
 from nuaal.utils import get_logger, check_path
+from nuaal.Parsers.PatternsBundle import PatternsBundle, compile_pattern
+from nuaal.Parsers.Extractors import PatternExtractor, BlockSplitter, TableExtractor, CONVERTERS
+from types import MappingProxyType
+from collections.abc import Mapping
+import hashlib
 import os
 import json
 import re
+import threading
 import timeit
 
 
+def module_fields(module):
+    """
+    Returns names of all fields compiled pattern module can produce, named groups of all patterns and keys of `level1`.
+
+    :param module: Compiled pattern module
+    :return: (frozenset) Field names
+    """
+    fields = set()
+    for level, patterns in module.items():
+        if isinstance(patterns, Mapping):
+            fields.update(patterns.keys())
+            patterns = [x for y in patterns.values() for x in y]
+        fields.update(name for pattern in patterns if pattern is not None for name in pattern.group_names)
+    return frozenset(fields)
+
+
+def project_module(module, fields):
+    """
+    Returns compiled pattern module reduced to `level1` patterns needed for producing ``fields``. If `level0` patterns produce dictionaries,
+    only `level1` keys in ``fields`` are kept, if they produce strings (blocks of text), only patterns with at least one named group in ``fields``
+    are kept. `level0` is never reduced, as it is needed for finding the entries.
+
+    :param module: Compiled pattern module
+    :param fields: Iterable of field names
+    :return: Compiled pattern module
+    """
+    if "level1" not in module:
+        return module
+    fields = frozenset(fields)
+    produces_dicts = any(pattern.group_names for pattern in module["level0"] if pattern is not None)
+    level_one = {}
+    for key, patterns in module["level1"].items():
+        if produces_dicts:
+            if key in fields:
+                level_one[key] = patterns
+        else:
+            selected = tuple(pattern for pattern in patterns if pattern is not None and fields.intersection(pattern.group_names))
+            if selected:
+                level_one[key] = selected
+    projected = dict(module)
+    projected["level1"] = MappingProxyType(level_one)
+    return MappingProxyType(projected)
+
+
+class PatternsTable(Mapping):
+    """
+    Read-only mapping of commands to compiled pattern modules. Only a light index of command name -> module path is built up front,
+    each module is compiled on first access and memoized. Safe to be shared between threads.
+    """
+    def __init__(self, index, compile_module):
+        """
+
+        :param dict index: Dictionary with command names as keys and paths of pattern modules as values
+        :param compile_module: Callable which takes module path and returns compiled module
+        """
+        self._index = dict(index)
+        self._compile_module = compile_module
+        self._compiled = {}
+        self._lock = threading.Lock()
+        self.projections = {}
+
+    def __getitem__(self, command):
+        try:
+            return self._compiled[command]
+        except KeyError:
+            pass
+        module_path = self._index[command]
+        with self._lock:
+            if command not in self._compiled:
+                self._compiled[command] = self._compile_module(module_path)
+            return self._compiled[command]
+
+    def __iter__(self):
+        return iter(self._index)
+
+    def __len__(self):
+        return len(self._index)
+
+    def __contains__(self, command):
+        return command in self._index
+
+    @property
+    def compiled_count(self):
+        """
+        Number of pattern modules which have been compiled so far.
+        """
+        return len(self._compiled)
+
+    def compile_all(self):
+        """
+        Compiles all modules which have not been compiled yet.
+
+        :return: ``None``
+        """
+        for command in self._index:
+            self[command]
+
+
 class PatternsLib:
+    """
+    This class loads regex patterns for given device type from JSON modules stored in `nuaal/data/patterns/<device_type>` and compiles them.
+
+    Compiled pattern tables are kept in a process-wide registry keyed by device type and pattern-set version, so all instances of ``PatternsLib``
+    (and therefore all ``ParserModule`` objects) for the same device type share one read-only table, which is safe to use from multiple threads.
+    Use ``PatternsLib.refresh()`` or ``PatternsLib.invalidate()`` when pattern files change on disk.
 
-    def __init__(self, device_type, verbosity=4, DEBUG=False):
+    With ``lazy=True`` pattern modules are compiled on demand, the first time patterns for given command are requested.
+    With ``use_bundle=True`` pattern modules are read from precompiled ``PatternsBundle`` instead of individual JSON files (experimental).
+    """
+    _registry = {}
+    _versions = {}
+    _registry_lock = threading.RLock()
+
+    def __init__(self, device_type, lazy=False, use_bundle=False, verbosity=4, DEBUG=False):
+        """
+
+        :param str device_type: String representation of device type, such as `cisco_ios`
+        :param bool lazy: If set to `True`, pattern modules are compiled on first use instead of all at once.
+        :param bool use_bundle: If set to `True`, pattern modules are loaded from bundle, which is (re)built when missing or outdated. Experimental, see ``PatternsBundle``.
+        :param bool DEBUG: Enables/disables debugging output
+        """
         start_time = timeit.default_timer()
         self.device_type = device_type
+        self.lazy = lazy
+        self.use_bundle = use_bundle
+        self.verbosity = verbosity
+        self.DEBUG = DEBUG
         self.logger = get_logger(name="PatternsLib_{}".format(self.device_type), verbosity=verbosity, DEBUG=DEBUG)
-        self.compiled_patterns = {}
-        self._compile_all()
+        self.version = None
+        self._bundle_modules = {}
+        self.compiled_patterns = self._get_shared()
+        if not self.lazy:
+            self.compiled_patterns.compile_all()
+        self.logger.debug(msg="Compiled {} of {} pattern modules for '{}'.".format(self.compiled_count, len(self.compiled_patterns), self.device_type))
         total_time = round((timeit.default_timer() - start_time) * 1000, 3)
         self.logger.debug(msg="Initialization of PatternsLib took {} ms.".format(total_time))
 
+    @classmethod
+    def invalidate(cls, device_type=None):
+        """
+        Removes compiled pattern tables from the shared registry. Next instance of ``PatternsLib`` will rescan and recompile the pattern modules.
+        Instances created before invalidation keep using their (unchanged) tables.
+
+        :param str device_type: Device type to invalidate, if ``None``, all device types are invalidated.
+        :return: ``None``
+        """
+        with cls._registry_lock:
+            for key in list(cls._registry.keys()):
+                if device_type is None or key[0] == device_type:
+                    del cls._registry[key]
+            if device_type is None:
+                cls._versions.clear()
+            else:
+                cls._versions.pop(device_type, None)
+
+    @classmethod
+    def refresh(cls, device_type):
+        """
+        Checks whether pattern modules of given device type changed on disk since they were compiled and invalidates the registry if they did.
+
+        :param str device_type: String representation of device type, such as `cisco_ios`
+        :return: ``True`` if the pattern set changed, ``False`` otherwise.
+        """
+        with cls._registry_lock:
+            current_version = cls._versions.get(device_type)
+            if current_version is None:
+                return False
+            if cls._pattern_set_version(device_type=device_type) == current_version:
+                return False
+            cls.invalidate(device_type=device_type)
+            return True
+
+    @classmethod
+    def current_version(cls, device_type):
+        """
+        Returns version of pattern set of given device type currently used by the shared registry.
+
+        :param str device_type: String representation of device type, such as `cisco_ios`
+        :return: (str) Version string, ``None`` if patterns of ``device_type`` have not been loaded yet or were invalidated.
+        """
+        return cls._versions.get(device_type)
+
+    @property
+    def compiled_count(self):
+        """
+        Number of pattern modules of this device type which have actually been compiled.
+        """
+        return self.compiled_patterns.compiled_count
+
+    def project(self, command, fields):
+        """
+        Returns patterns of ``command`` reduced to those needed for producing ``fields``, see ``project_module()``. Projections are computed once
+        and shared by all users of the pattern table.
+
+        :param str command: Command string, such as `show interfaces`
+        :param fields: Iterable of field names
+        :return: Compiled pattern module
+        """
+        key = (command, frozenset(fields))
+        projected = self.compiled_patterns.projections.get(key)
+        if projected is None:
+            module = self.compiled_patterns[command]
+            unknown_fields = key[1].difference(module_fields(module))
+            if unknown_fields:
+                self.logger.warning(msg="Command '{}' does not produce fields {}.".format(command, sorted(unknown_fields)))
+            projected = project_module(module=module, fields=key[1])
+            self.compiled_patterns.projections[key] = projected
+        return projected
+
+    @staticmethod
+    def _patterns_path(device_type):
+        return check_path(os.path.abspath(os.path.join(DATA_PATH, "patterns", device_type)))
+
+    @classmethod
+    def _pattern_set_version(cls, device_type):
+        """
+        Computes version of pattern set based on names, sizes and modification times of the pattern modules.
+
+        :param str device_type: String representation of device type, such as `cisco_ios`
+        :return: (str) Version string
+        """
+        path = cls._patterns_path(device_type=device_type)
+        version_hash = hashlib.sha1()
+        for module in sorted(x for x in os.listdir(path) if x[-5:] == ".json"):
+            stat = os.stat(os.path.join(path, module))
+            version_hash.update("{}:{}:{};".format(module, stat.st_size, stat.st_mtime_ns).encode())
+        return version_hash.hexdigest()[:16]
+
+    def _get_shared(self):
+        """
+        Returns pattern table for ``self.device_type`` from the shared registry, creating it on first use.
+
+        :return: ``PatternsTable`` object
+        """
+        version = PatternsLib._versions.get(self.device_type)
+        table = PatternsLib._registry.get((self.device_type, version))
+        if table is not None:
+            self.version = version
+            self.logger.debug(msg="Using shared patterns for '{}' (version {}).".format(self.device_type, version))
+            return table
+        with PatternsLib._registry_lock:
+            version = PatternsLib._versions.get(self.device_type)
+            if version is None:
+                version = self._pattern_set_version(device_type=self.device_type)
+            table = PatternsLib._registry.get((self.device_type, version))
+            if table is None:
+                if self.use_bundle:
+                    bundle = PatternsBundle(device_type=self.device_type, verbosity=self.verbosity, DEBUG=self.DEBUG).load_or_build()
+                    self._bundle_modules = bundle["modules"]
+                table = PatternsTable(index=self._dir_modules(), compile_module=self._compile_module)
+                PatternsLib._registry[(self.device_type, version)] = table
+                PatternsLib._versions[self.device_type] = version
+            self.version = version
+            return table
+
     def _dir_modules(self):
-        path = check_path(os.path.abspath(os.path.join(DATA_PATH, "patterns", self.device_type)))
+        path = self._patterns_path(device_type=self.device_type)
         modules = [x for x in os.listdir(path) if x[-5:] == ".json"]
         self.logger.debug(msg="Found {} pattern modules for '{}'.".format(len(modules), self.device_type))
         module_paths = {}
@@ -28,42 +278,106 @@ class PatternsLib:
             module_paths[module_name] = module_path
         return module_paths
 
-    def _compile_pattern(self, pattern_dict):
+    def _read_module(self, module_path):
+        """
+        Returns content of pattern module, either from loaded bundle or from the JSON file.
+
+        :param str module_path: Path of the JSON pattern module
+        :return: (dict) Pattern module
+        """
+        pattern_data = self._bundle_modules.get(os.path.basename(module_path))
+        if pattern_data is not None:
+            return pattern_data
+        with open(module_path, mode="r") as file:
+            return json.load(file)
+
+    def _get_converters(self, types):
+        """
+        Translates type declarations of named groups to converter functions.
+
+        :param dict types: Dictionary with group names as keys and type names (such as `int`, `str`, `mac`, `vlan-list`, `interface-name`, `bool`) as values
+        :return: Dictionary with group names as keys and converter functions as values
+        """
+        converters = {}
+        for group_name, type_name in types.items():
+            try:
+                converters[group_name] = CONVERTERS[type_name]
+            except KeyError:
+                self.logger.error(msg="Unknown type '{}' declared for group '{}', using 'str'.".format(type_name, group_name))
+                converters[group_name] = CONVERTERS["str"]
+        return converters
+
+    def _compile_pattern(self, pattern_dict, types=None, default_type="auto"):
         if not isinstance(pattern_dict, dict):
             self.logger.error(msg="Given parameter 'pattern_dict' is not a dictionary.")
+        if "splitter" in pattern_dict:
+            try:
+                return BlockSplitter(splitter=pattern_dict["splitter"], prefix=pattern_dict.get("prefix"), end=pattern_dict.get("end"))
+            except ValueError as e:
+                self.logger.error(msg="Encountered exception when creating block splitter. Exception: {}".format(repr(e)))
+                return None
+        pattern_types = dict(types or {})
+        pattern_types.update(pattern_dict.get("types", {}))
+        if "table" in pattern_dict:
+            try:
+                return TableExtractor(
+                    columns=pattern_dict["table"]["columns"],
+                    continuation=pattern_dict["table"].get("continuation"),
+                    join=pattern_dict["table"].get("join", " "),
+                    tokens=pattern_dict["table"].get("tokens", False),
+                    converters=self._get_converters(types=pattern_types),
+                    default_converter=CONVERTERS[default_type]
+                )
+            except (KeyError, IndexError, ValueError, re.error) as e:
+                self.logger.error(msg="Encountered exception when creating table extractor. Exception: {}".format(repr(e)))
+                return None
         # Take pattern and flags from dictionary and return compiled pattern
         try:
-            return re.compile(pattern=pattern_dict["pattern"], flags=pattern_dict["flags"])
+            regex = compile_pattern(pattern_dict=pattern_dict, logger=self.logger)
+            return PatternExtractor(
+                regex=regex,
+                converters=self._get_converters(types=pattern_types),
+                default_converter=CONVERTERS[default_type]
+            )
         except Exception as e:
             # TODO: More specific exceptions
             self.logger.error(msg="Encountered exception when compiling pattern '{}'. Exception: {}".format(pattern_dict["pattern"], repr(e)))
 
+    def _get_default_type(self, pattern_data):
+        """
+        Returns type used for named groups without type declaration. Modules without any type declarations keep the legacy behavior
+        (`auto`, conversion to integer where possible), modules with declarations leave undeclared groups as strings, unless `default_type` is set.
+
+        :param dict pattern_data: Content of pattern module
+        :return: (str) Type name
+        """
+        if "default_type" in pattern_data:
+            if pattern_data["default_type"] not in CONVERTERS:
+                self.logger.error(msg="Unknown default type '{}' in module '{}', using 'str'.".format(pattern_data["default_type"], pattern_data["command"]))
+                return "str"
+            return pattern_data["default_type"]
+        if "types" in pattern_data:
+            return "str"
+        for level in [x for x in pattern_data.keys() if "level" in x]:
+            patterns = pattern_data[level] if isinstance(pattern_data[level], list) else [x for y in pattern_data[level].values() for x in y]
+            if any("types" in x for x in patterns):
+                return "str"
+        return "auto"
+
     def _compile_module(self, module_path):
         start_time = timeit.default_timer()
-        with open(module_path, mode="r") as file:
-            pattern_data = json.load(file)
+        pattern_data = self._read_module(module_path=module_path)
+        types = pattern_data.get("types", {})
+        default_type = self._get_default_type(pattern_data=pattern_data)
 
         compiled_pattern_data = {"command": pattern_data["command"]}
         for level in [x for x in pattern_data.keys() if "level" in x]:
             if isinstance(pattern_data[level], list):
-                compiled_pattern_data[level] = []
-                for pattern_dict in pattern_data[level]:
-                    compiled_pattern_data[level].append(self._compile_pattern(pattern_dict=pattern_dict))
+                compiled_pattern_data[level] = tuple(self._compile_pattern(pattern_dict=pattern_dict, types=types, default_type=default_type) for pattern_dict in pattern_data[level])
             elif isinstance(pattern_data[level], dict):
-                compiled_pattern_data[level] = {}
+                compiled_level = {}
                 for key, patterns in pattern_data[level].items():
-                    compiled_pattern_data[level][key] = []
-                    for pattern_dict in patterns:
-                        compiled_pattern_data[level][key].append(self._compile_pattern(pattern_dict=pattern_dict))
+                    compiled_level[key] = tuple(self._compile_pattern(pattern_dict=pattern_dict, types=types, default_type=default_type) for pattern_dict in patterns)
+                compiled_pattern_data[level] = MappingProxyType(compiled_level)
         self.logger.debug(msg="Compiling of patterns for '{}' took {} ms.".format(compiled_pattern_data["command"], round((timeit.default_timer() - start_time)*1000, 3)))
-        return compiled_pattern_data
-
-    def _compile_all(self):
-        start_time = timeit.default_timer()
-        for command, path in self._dir_modules().items():
-            self.compiled_patterns[command] = {}
-            compiled_module = self._compile_module(module_path=path)
-            for level in [x for x in compiled_module.keys() if "level" in x]:
-                self.compiled_patterns[command][level] = compiled_module[level]
-        total_time = round((timeit.default_timer() - start_time)*1000, 3)
-        self.logger.debug(msg="Compiling of all patterns for '{}' took {} ms.".format(self.device_type, total_time))
+        return MappingProxyType({level: compiled_pattern_data[level] for level in compiled_pattern_data.keys() if "level" in level})
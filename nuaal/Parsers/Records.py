@@ -0,0 +1,112 @@
+from collections.abc import Mapping
+import sys
+import threading
+
+# Record classes by command and field names, shared by all parsers
+_RECORD_CLASSES = {}
+_LOCK = threading.Lock()
+# Longer strings (such as descriptions) are rarely repeated, so interning them only costs time
+MAX_INTERNED_LENGTH = 64
+
+
+class Record(Mapping):
+    """
+    Base class of compact parsed entries. Each record class has fixed field names, values are stored in ``__slots__`` instead of
+    per-entry dictionary, so records take half to a third of the memory of equivalent dictionaries. Records behave as read-only
+    mappings (``record["name"]``, ``record.get()``, ``keys()``, ``items()``, comparison with dictionaries), values of existing fields
+    can be replaced by ``record["name"] = value``. Use ``dict(record)`` where real dictionary is needed, such as for ``json.dumps()``.
+    """
+    __slots__ = ()
+    _fields = ()
+    _slots = {}
+    _setters = ()
+
+    def __init__(self, values):
+        for setter, value in zip(self._setters, values):
+            setter(self, value)
+
+    def __getitem__(self, key):
+        return getattr(self, self._slots[key])
+
+    def __setitem__(self, key, value):
+        setattr(self, self._slots[key], value)
+
+    def __contains__(self, key):
+        return key in self._slots
+
+    def __iter__(self):
+        return iter(self._fields)
+
+    def __len__(self):
+        return len(self._fields)
+
+    def __repr__(self):
+        return "{}({})".format(type(self).__name__, dict(self))
+
+    def __reduce__(self):
+        return make_record, (self._command, self._fields, tuple(self.values()))
+
+    def to_dict(self):
+        """
+        Returns content of the record as dictionary.
+
+        :return: Dictionary
+        """
+        return dict(zip(self._fields, self.values()))
+
+
+def record_class(command, fields):
+    """
+    Returns ``Record`` subclass for entries of ``command`` with given field names. Classes are created once and shared.
+
+    :param str command: Command string, such as `show mac address-table`
+    :param tuple fields: Field names, in the order of the parsed dictionaries
+    :return: Subclass of ``Record``
+    """
+    key = (command, fields)
+    cls = _RECORD_CLASSES.get(key)
+    if cls is None:
+        with _LOCK:
+            cls = _RECORD_CLASSES.get(key)
+            if cls is None:
+                # Field names are not necessarily valid identifiers, slots are therefore named by position
+                slots = tuple("_{}".format(index) for index in range(len(fields)))
+                name = "".join(x.capitalize() for x in command.replace("-", " ").split()) + "Record"
+                cls = type(name, (Record, ), {"__slots__": slots, "_command": command, "_fields": fields, "_slots": dict(zip(fields, slots))})
+                cls._setters = tuple(getattr(cls, slot).__set__ for slot in slots)
+                _RECORD_CLASSES[key] = cls
+    return cls
+
+
+def make_record(command, fields, values):
+    """
+    Creates record of ``command`` with ``fields`` and ``values``. Used for unpickling and copying of records.
+
+    :param str command: Command string
+    :param tuple fields: Field names
+    :param values: Iterable of values
+    :return: Instance of ``Record`` subclass
+    """
+    return record_class(command=command, fields=fields)(values)
+
+
+def compact_entries(entries, command):
+    """
+    Generator converting parsed dictionaries to records of ``command``. Short string values are interned, so repeated values such as
+    `DYNAMIC` or interface names are stored only once. Other entries, such as strings or existing records, are yielded unchanged.
+
+    :param entries: Iterable of parsed entries
+    :param str command: Command string
+    :return: Generator of records
+    """
+    classes = {}
+    intern = sys.intern
+    for entry in entries:
+        if type(entry) is not dict:
+            yield entry
+            continue
+        fields = tuple(entry)
+        cls = classes.get(fields)
+        if cls is None:
+            cls = classes[fields] = record_class(command=command, fields=fields)
+        yield cls([intern(x) if type(x) is str and len(x) <= MAX_INTERNED_LENGTH else x for x in entry.values()])
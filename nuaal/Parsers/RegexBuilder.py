@@ -1,12 +1,244 @@
 import re
+import os
 import json
+import math
+import timeit
 from nuaal.definitions import DATA_PATH
 from nuaal.utils import get_logger
+from nuaal.Parsers.ParseGuard import run_with_timeout
+try:
+    from re import _parser as sre_parse, _constants as sre_constants
+except ImportError:
+    import sre_parse
+    import sre_constants
+
+# Characters used for approximating character sets of patterns
+ALPHABET = frozenset(chr(x) for x in range(128)) | frozenset("\u00e9\u00a0")
+# Strings repeated in lines of adversarial inputs, extended by characters taken from repeats of analyzed pattern
+PUMPS = (" ", "a", "0", "a ", "0 ", "a:", "0/", "a-", "0.")
+_CATEGORIES = {
+    getattr(sre_constants, name): frozenset(x for x in ALPHABET if re.match(regex, x))
+    for name, regex in [("CATEGORY_DIGIT", r"\d"), ("CATEGORY_NOT_DIGIT", r"\D"), ("CATEGORY_SPACE", r"\s"), ("CATEGORY_NOT_SPACE", r"\S"),
+                        ("CATEGORY_WORD", r"\w"), ("CATEGORY_NOT_WORD", r"\W"), ("CATEGORY_LINEBREAK", r"\n"), ("CATEGORY_NOT_LINEBREAK", r"[^\n]")]
+}
+_REPEATS = tuple(getattr(sre_constants, x) for x in ("MAX_REPEAT", "MIN_REPEAT", "POSSESSIVE_REPEAT") if hasattr(sre_constants, x))
+_LINE_STARTS = (sre_constants.AT_BEGINNING, sre_constants.AT_BEGINNING_STRING)
+_POSSESSIVE = getattr(sre_constants, "POSSESSIVE_REPEAT", None)
+_ATOMIC = getattr(sre_constants, "ATOMIC_GROUP", None)
+
+
+def _char_set(op, av, flags):
+    """
+    Returns set of characters from ``ALPHABET`` matched by single-character node of parsed regex, ``None`` for other nodes.
+    """
+    if op is sre_constants.LITERAL:
+        chars = {chr(av)}
+    elif op is sre_constants.NOT_LITERAL:
+        chars = ALPHABET - {chr(av)}
+    elif op is sre_constants.ANY:
+        return ALPHABET if flags & re.DOTALL else ALPHABET - {"\n"}
+    elif op is sre_constants.IN:
+        chars = set()
+        negate = False
+        for item_op, item_av in av:
+            if item_op is sre_constants.NEGATE:
+                negate = True
+            elif item_op is sre_constants.LITERAL:
+                chars.add(chr(item_av))
+            elif item_op is sre_constants.RANGE:
+                chars.update(x for x in ALPHABET if item_av[0] <= ord(x) <= item_av[1])
+            elif item_op is sre_constants.CATEGORY:
+                chars.update(_CATEGORIES.get(item_av, ALPHABET))
+        if negate:
+            return ALPHABET - chars
+    else:
+        return None
+    if flags & re.IGNORECASE:
+        chars.update(x.swapcase() for x in list(chars))
+    return frozenset(chars)
+
+
+def _children(op, av):
+    """
+    Returns list of sub-sequences of parsed regex node.
+    """
+    if op is sre_constants.SUBPATTERN:
+        return [av[3]]
+    if op in _REPEATS:
+        return [av[2]]
+    if op is sre_constants.BRANCH:
+        return list(av[1])
+    if op in (sre_constants.ASSERT, sre_constants.ASSERT_NOT):
+        return [av[1]]
+    if op is _ATOMIC:
+        return [av]
+    if op is sre_constants.GROUPREF_EXISTS:
+        return [x for x in av[1:] if x is not None]
+    return []
+
+
+def _first(items, flags):
+    """
+    Returns set of characters a match of sequence ``items`` can start with and whether the sequence can match empty string.
+    """
+    first = set()
+    for op, av in items:
+        chars = _char_set(op, av, flags)
+        if chars is not None:
+            return first.union(chars), False
+        if op is sre_constants.SUBPATTERN or op is _ATOMIC:
+            chars, nullable = _first(av[3] if op is sre_constants.SUBPATTERN else av, flags)
+        elif op in _REPEATS:
+            chars, nullable = _first(av[2], flags)
+            nullable = nullable or av[0] == 0
+        elif op is sre_constants.BRANCH or op is sre_constants.GROUPREF_EXISTS:
+            results = [_first(x, flags) for x in _children(op, av)]
+            chars = set().union(*(x[0] for x in results))
+            nullable = any(x[1] for x in results) or op is sre_constants.GROUPREF_EXISTS
+        elif op is sre_constants.GROUPREF:
+            chars, nullable = ALPHABET, True
+        else:
+            # Anchors and lookarounds do not consume characters
+            chars, nullable = (), True
+        first.update(chars)
+        if not nullable:
+            return first, False
+    return first, True
+
+
+def _starts_at_line(items):
+    """
+    Checks whether sequence ``items`` is anchored to the beginning of a line (or string) before consuming any character.
+    """
+    for op, av in items:
+        if op is sre_constants.AT:
+            if av in _LINE_STARTS:
+                return True
+            continue
+        if op is sre_constants.SUBPATTERN:
+            return _starts_at_line(av[3])
+        return False
+    return False
+
+
+def _chars(items, flags):
+    """
+    Returns set of all characters sequence ``items`` can consume.
+    """
+    chars = set()
+    for op, av in items:
+        node_chars = _char_set(op, av, flags)
+        if node_chars is not None:
+            chars.update(node_chars)
+        elif op is sre_constants.GROUPREF:
+            chars.update(ALPHABET)
+        elif op not in (sre_constants.ASSERT, sre_constants.ASSERT_NOT):
+            for child in _children(op, av):
+                chars.update(_chars(child, flags))
+    return chars
+
+
+def _flatten(items):
+    """
+    Returns sequence ``items`` with groups replaced by their content. Atomic groups are kept, as they never backtrack.
+    """
+    flat = []
+    for op, av in items:
+        if op is sre_constants.SUBPATTERN:
+            flat.extend(_flatten(av[3]))
+        else:
+            flat.append((op, av))
+    return flat
+
+
+def _describe(chars):
+    return "".join(sorted(chars)[:8]).encode("unicode_escape").decode()
+
+
+def _find_issues(items, flags, issues, tail=True):
+    """
+    Walks parsed regex and appends unbounded repeats which can split the same text to iterations in more than one way to ``issues``.
+    That happens when inner repeat can consume the rest of the iteration and the beginning of the next one. Bounded repeats, such as
+    ``(?:\\d{1,3}\\.?){4}``, backtrack only polynomially and are not reported. Neither are repeats at the very end of the pattern,
+    because nothing after them can fail and force the backtracking.
+    """
+    for position, (op, av) in enumerate(items):
+        node_tail = tail and position == len(items) - 1
+        if op in _REPEATS and op is not _POSSESSIVE and av[1] == sre_constants.MAXREPEAT and not node_tail:
+            body = _flatten(av[2])
+            body_first = _first(body, flags)[0]
+            anchored = _starts_at_line(body)
+            for index, (inner_op, inner_av) in enumerate(body):
+                if inner_op in _REPEATS and inner_op is not _POSSESSIVE and inner_av[1] > 1:
+                    inner_chars = _chars(inner_av[2], flags)
+                    rest = body[index + 1:]
+                    if not (_first(rest, flags)[1] or _chars(rest, flags).issubset(inner_chars)):
+                        continue
+                    if anchored and "\n" not in inner_chars:
+                        # Next iteration can only start after a newline, which the inner repeat cannot consume
+                        continue
+                    overlap = inner_chars.intersection(body_first)
+                    if overlap:
+                        issues.append({
+                            "issue": "nested_quantifier",
+                            "detail": "Inner repeat can also consume the beginning of the next iteration, e.g. '{}'.".format(_describe(overlap))
+                        })
+                elif inner_op is sre_constants.BRANCH:
+                    alternatives = [_first(x, flags)[0] for x in inner_av[1]]
+                    for i, first in enumerate(alternatives):
+                        overlap = set().union(*(set(first).intersection(x) for x in alternatives[i + 1:]))
+                        if overlap:
+                            issues.append({
+                                "issue": "ambiguous_alternation",
+                                "detail": "Alternatives of repeated group can start with the same characters, e.g. '{}'.".format(_describe(overlap))
+                            })
+                            break
+        for child in _children(op, av):
+            _find_issues(child, flags, issues, tail=node_tail or op in (sre_constants.ASSERT, sre_constants.ASSERT_NOT))
+
+
+def _repeat_chars(items, flags, chars):
+    for op, av in items:
+        if op in _REPEATS and av[1] > 1:
+            chars.update(_first(av[2], flags)[0])
+        for child in _children(op, av):
+            _repeat_chars(child, flags, chars)
+
+
+def _measure_growth(pattern, flags, inputs, counts, repeats, max_time):
+    """
+    Measures time of matching ``pattern`` against inputs of growing size. Runs in a separate process, see ``RegexBuilder.check_growth()``.
+
+    :return: List of lists of times in seconds, one list per input, one time per count. Input is not grown further once single match
+        takes more than ``max_time`` seconds, so the lists can be shorter than ``counts``.
+    """
+    regex = re.compile(pattern, flags)
+    results = []
+    for unit, suffix in inputs:
+        times = []
+        for count in counts:
+            text = unit * count + suffix
+            best = None
+            for _ in range(repeats):
+                start_time = timeit.default_timer()
+                for _ in regex.finditer(text):
+                    pass
+                elapsed = timeit.default_timer() - start_time
+                best = elapsed if best is None else min(best, elapsed)
+                if elapsed > max_time / 10:
+                    # Slow enough for the noise not to matter
+                    break
+            times.append(best)
+            if best > max_time:
+                break
+        results.append(times)
+    return results
+
 
 class RegexBuilder:
-    def __init__(self, device_type, DEBUG=False):
+    def __init__(self, device_type, verbosity=4, DEBUG=False):
         self.device_type = device_type
-        self.logger = get_logger(name="RegexBuilder", DEBUG=DEBUG)
+        self.logger = get_logger(name="RegexBuilder", verbosity=verbosity, DEBUG=DEBUG)
 
     def _flags_map(self, flag_str):
         if not isinstance(flag_str, str):
@@ -52,6 +284,131 @@ class RegexBuilder:
             except Exception as e:
                 self.logger.error(msg="Encountered exception when trying to save JSON pattern. Exception: {}".format(repr(e)))
 
+    def analyze_pattern(self, pattern_dict):
+        """
+        Statically checks regex pattern for constructs prone to catastrophic backtracking: nested quantifiers, where inner repeat can be
+        followed by characters it consumes itself (such as ``(\\w+\\s?)+``), and repeated alternations with alternatives starting with
+        the same characters (such as ``(\\w|\\d)+``). Possessive repeats and atomic groups are not reported.
+
+        :param dict pattern_dict: Dictionary with `pattern` and `flags` keys
+        :return: List of dictionaries with `issue` and `detail` keys, empty if no issue was found
+        """
+        try:
+            parsed = sre_parse.parse(pattern_dict["pattern"], pattern_dict.get("flags", 0))
+        except re.error as e:
+            self.logger.error(msg="Could not parse pattern '{}'. Exception: {}".format(pattern_dict["pattern"], repr(e)))
+            return [{"issue": "invalid", "detail": repr(e)}]
+        issues = []
+        _find_issues(parsed, parsed.state.flags, issues)
+        return issues
+
+    def adversarial_inputs(self, pattern_dict, line_length=200):
+        """
+        Returns inputs likely to trigger backtracking of the pattern: lines of characters its repeats consume, each terminated by a character
+        which does not occur in network device outputs, so that the match fails at the very end of the line. Length of the lines is bounded
+        by ``line_length`` like in real outputs, the inputs grow by number of lines.
+
+        :param dict pattern_dict: Dictionary with `pattern` and `flags` keys
+        :param int line_length: Length of single line
+        :return: List of ``(unit, suffix)`` tuples, the input is ``unit`` (single line) repeated many times followed by ``suffix``
+        """
+        parsed = sre_parse.parse(pattern_dict["pattern"], pattern_dict.get("flags", 0))
+        chars = set()
+        _repeat_chars(parsed, parsed.state.flags, chars)
+        units = list(PUMPS)
+        for preferred in (" ", "a", "0", "A", "-", ".", ":", "/", "\t"):
+            chars.discard(preferred)
+        units.extend(sorted(x for x in chars if x.isprintable())[:8])
+        return [((unit * line_length)[:line_length] + "\x00\n", "") for unit in units]
+
+    def check_growth(self, pattern_dict, inputs, counts=(25, 50, 100, 200), max_exponent=1.5, min_time=0.002, max_time=0.5, timeout=10.0, repeats=3):
+        """
+        Measures how matching time of the pattern grows with size of the inputs. Growth is estimated as exponent ``k`` of ``time ~ size ** k``
+        between the smallest and the largest input. Measurement runs in a separate process, which is killed after ``timeout`` seconds.
+
+        :param dict pattern_dict: Dictionary with `pattern` and `flags` keys
+        :param list inputs: List of ``(unit, suffix)`` tuples, see ``adversarial_inputs()``
+        :param tuple counts: Numbers of repetitions of ``unit`` in the inputs
+        :param float max_exponent: Growth with higher exponent is reported as superlinear
+        :param float min_time: Inputs matched faster than this (in seconds) at the largest size are considered linear
+        :param float max_time: Input is not grown further once single match takes more than this (in seconds)
+        :param float timeout: Time budget of the whole measurement in seconds
+        :param int repeats: Number of measurements of each input, the fastest one is used
+        :return: Dictionary with `ok` (bool), `timeout` (bool), `exponent` (highest exponent) and `worst` (input with the highest exponent) keys
+        """
+        status, times = run_with_timeout(function=_measure_growth, kwargs={
+            "pattern": pattern_dict["pattern"], "flags": pattern_dict.get("flags", 0), "inputs": inputs, "counts": counts, "repeats": repeats, "max_time": max_time
+        }, timeout=timeout)
+        if status == "timeout":
+            return {"ok": False, "timeout": True, "exponent": None, "worst": None}
+        if status == "error":
+            self.logger.error(msg="Could not measure pattern '{}'. Exception: {}".format(pattern_dict["pattern"], times))
+            return {"ok": False, "timeout": False, "exponent": None, "worst": None}
+        result = {"ok": True, "timeout": False, "exponent": 1.0, "worst": None}
+        for (unit, suffix), input_times in zip(inputs, times):
+            if input_times[-1] < min_time or len(input_times) < 2:
+                continue
+            exponent = math.log(input_times[-1] / max(input_times[0], 1e-9)) / math.log(counts[len(input_times) - 1] / counts[0])
+            if exponent > result["exponent"]:
+                result["exponent"] = round(exponent, 2)
+                result["worst"] = unit[:40]
+        result["ok"] = result["exponent"] <= max_exponent
+        return result
+
+    def iter_patterns(self):
+        """
+        Generator of all regex patterns of pattern modules of ``self.device_type``.
+
+        :return: Generator of ``(command, location, pattern_dict)`` tuples, location being such as `level0[0]` or `level1.duplex[1]`
+        """
+        patterns_path = os.path.join(DATA_PATH, "patterns", self.device_type)
+        for file_name in sorted(os.listdir(patterns_path)):
+            if file_name[-5:] != ".json":
+                continue
+            with open(os.path.join(patterns_path, file_name), mode="r") as f:
+                pattern_data = json.load(f)
+            command = pattern_data.get("command", file_name[:-5].replace("_", " "))
+            for index, pattern_dict in enumerate(pattern_data.get("level0", [])):
+                if "pattern" in pattern_dict:
+                    yield command, "level0[{}]".format(index), pattern_dict
+            for key, patterns in pattern_data.get("level1", {}).items():
+                for index, pattern_dict in enumerate(patterns):
+                    if "pattern" in pattern_dict:
+                        yield command, "level1.{}[{}]".format(key, index), pattern_dict
+
+    def check_patterns(self, corpus_path=None, dynamic=True, **kwargs):
+        """
+        Checks all patterns of ``self.device_type`` by ``analyze_pattern()`` and (if ``dynamic`` is `True`) by ``check_growth()`` with
+        adversarial inputs and with sample outputs from ``corpus_path``, repeated to growing size.
+
+        :param str corpus_path: Directory with sample outputs, named `<device_type>_<command_underscored>_<nn>.txt`
+        :param bool dynamic: Enables/disables measuring of matching time
+        :param kwargs: Keyword arguments of ``check_growth()``
+        :return: List of dictionaries with `command`, `location`, `pattern`, `issues`, `growth` and `ok` keys
+        """
+        corpus = {}
+        if corpus_path is not None:
+            prefix = "{}_".format(self.device_type)
+            for file_name in sorted(os.listdir(corpus_path)):
+                if file_name.startswith(prefix) and file_name[-4:] == ".txt":
+                    command = file_name[len(prefix):-4].rstrip("0123456789").rstrip("_").replace("_", " ")
+                    with open(os.path.join(corpus_path, file_name), mode="r") as f:
+                        corpus.setdefault(command, []).append((f.read() + "\n", ""))
+        results = []
+        for command, location, pattern_dict in self.iter_patterns():
+            result = {"command": command, "location": location, "pattern": pattern_dict["pattern"], "growth": None}
+            result["issues"] = self.analyze_pattern(pattern_dict=pattern_dict)
+            if dynamic:
+                result["growth"] = self.check_growth(pattern_dict=pattern_dict, inputs=self.adversarial_inputs(pattern_dict=pattern_dict), **kwargs)
+                if command in corpus and result["growth"]["ok"]:
+                    corpus_kwargs = dict(kwargs, counts=(1, 2, 4, 8))
+                    result["growth"] = self.check_growth(pattern_dict=pattern_dict, inputs=corpus[command], **corpus_kwargs)
+            result["ok"] = not result["issues"] and (result["growth"] is None or result["growth"]["ok"])
+            if not result["ok"]:
+                self.logger.warning(msg="Pattern {} of '{}' failed the check: {} {}".format(location, command, result["issues"], result["growth"]))
+            results.append(result)
+        return results
+
 
 if __name__ == '__main__':
     device_type = "cisco_ios"
@@ -0,0 +1,173 @@
+from nuaal.Parsers.Extractors import auto_int
+from nuaal.utils import int_name_convert
+import json
+
+_DECODER = json.JSONDecoder()
+
+
+def is_structured(text):
+    """
+    Checks whether ``text`` is structured (JSON) output, such as output of `show version | json` on NX-OS.
+
+    :param str text: Text output of command
+    :return: Bool
+    """
+    return isinstance(text, str) and text.lstrip()[:1] == "{"
+
+
+def load_structured(text):
+    """
+    Decodes JSON object at the beginning of ``text``. Trailing text, such as `{master:0}` line printed by JUNOS after the object, is ignored.
+
+    :param str text: Text output of command
+    :return: Decoded object
+    """
+    return _DECODER.raw_decode(text.lstrip())[0]
+
+
+def _value(data, path):
+    """
+    Returns value at ``path`` of nested dictionaries. Lists on the way are replaced by their first item and JUNOS leaf values
+    (``[{"data": "value"}]``) are unwrapped.
+    """
+    for key in path:
+        if isinstance(data, list):
+            data = data[0] if data else None
+        if not isinstance(data, dict):
+            return None
+        data = data.get(key)
+    if isinstance(data, list) and data and isinstance(data[0], dict):
+        data = data[0]
+    if isinstance(data, dict) and "data" in data:
+        data = data["data"]
+    return data
+
+
+def _rows(data, path):
+    """
+    Generator of all rows at ``path``. Unlike in ``_value()``, all items of lists on the way are followed, so that for example
+    ARP entries of all VRFs are found. NX-OS returns single row as dictionary instead of list, both forms are accepted.
+    """
+    if isinstance(data, list):
+        for item in data:
+            yield from _rows(item, path)
+    elif not path:
+        if isinstance(data, dict):
+            yield data
+    elif isinstance(data, dict):
+        yield from _rows(data.get(path[0]), path[1:])
+
+
+def short_interface(value):
+    """
+    Converts interface name to its short form, as printed in tabular outputs, such as `"Ethernet1/1"` -> `"Eth1/1"`.
+    """
+    if not isinstance(value, str):
+        return value
+    if value.lower().startswith("port-channel"):
+        return "Po" + value[len("port-channel"):]
+    if value[:1].isupper():
+        return int_name_convert(value, out_type="short")
+    return value
+
+
+def port_list(value):
+    """
+    Converts NX-OS list of ports, such as `"Ethernet1/1-3, Ethernet1/7"` (or list of such strings), to list of short names of individual ports.
+    """
+    if value is None:
+        return []
+    if isinstance(value, list):
+        value = ",".join(value)
+    ports = []
+    for port in value.split(","):
+        port = port.strip()
+        if not port:
+            continue
+        prefix, separator, last = port.rpartition("-")
+        first = prefix.rpartition("/")[2]
+        if separator and first.isdigit() and last.isdigit():
+            base = prefix[:len(prefix) - len(first)]
+            ports.extend(short_interface("{}{}".format(base, number)) for number in range(int(first), int(last) + 1))
+        else:
+            ports.append(short_interface(port))
+    return ports
+
+
+def split_part(separator, index):
+    """
+    Returns converter which splits value on the first ``separator`` and returns ``index``-th part (0 or 1), ``None`` if the part is empty.
+    """
+    def convert(value):
+        if not isinstance(value, str):
+            return value
+        part = value.partition(separator)[2 * index]
+        return auto_int(part) if part else None
+    return convert
+
+
+def constant(value):
+    """
+    Returns field specification which always produces ``value``.
+    """
+    return lambda row: value
+
+
+class StructuredMapping(object):
+    """
+    Maps structured (JSON) output of single command onto entries with the same keys as the regex pattern module of the command produces,
+    so that the rest of the application does not depend on the output format.
+
+    Fields are specified by dictionary with resulting keys and one of following values:
+
+    - Path - Key (or tuple of keys) of the value in the row. Strings are converted by ``auto_int``, same as values captured by regex.
+    - Tuple ``(path, converter)`` - Value at path converted by ``converter``, ``None`` values are not converted.
+    - Function - Called with the whole row, returns the value.
+    """
+    __slots__ = ("rows", "fields", "children", "_getters")
+
+    def __init__(self, rows, fields, children=None):
+        """
+
+        :param tuple rows: Path of keys leading to the rows, such as ``("TABLE_vlanbriefxbrief", "ROW_vlanbriefxbrief")``
+        :param dict fields: Dictionary with resulting keys and field specifications
+        :param children: Optional ``StructuredMapping`` of rows nested in each row (with ``rows`` path relative to the row), such as logical
+            interfaces of physical interface. Nested entries are yielded right after their parent entry.
+        """
+        self.rows = tuple(rows)
+        self.fields = fields
+        self.children = children
+        self._getters = tuple((key, self._getter(spec)) for key, spec in fields.items())
+
+    def __repr__(self):
+        return "<StructuredMapping: {}>".format("/".join(self.rows))
+
+    @staticmethod
+    def _getter(spec):
+        if callable(spec):
+            return spec
+        converter = auto_int
+        if isinstance(spec, tuple) and len(spec) == 2 and callable(spec[1]):
+            spec, converter = spec
+        path = (spec, ) if isinstance(spec, str) else tuple(spec)
+
+        def getter(row):
+            value = _value(row, path)
+            if value is None:
+                return None
+            if converter is auto_int and not isinstance(value, str):
+                return value
+            return converter(value)
+        return getter
+
+    def iter_entries(self, data):
+        """
+        Generator of entries mapped from decoded structured output ``data``.
+
+        :param data: Decoded JSON output
+        :return: Generator of dictionaries
+        """
+        for row in _rows(data, self.rows):
+            yield {key: getter(row) for key, getter in self._getters}
+            if self.children is not None:
+                yield from self.children.iter_entries(row)
@@ -1,5 +1,14 @@
+from nuaal.Parsers.PatternsBundle import PatternsBundle
 from nuaal.Parsers.PatternsLib import PatternsLib
 from nuaal.Parsers.Parser import ParserModule
 from nuaal.Parsers.CiscoIOSParser import CiscoIOSParser
 from nuaal.Parsers.CiscoNXOSParser import CiscoNXOSParser
-from nuaal.Parsers.JuniperJUNOSParser import JuniperJUNOSParser
\ No newline at end of file
+from nuaal.Parsers.JuniperJUNOSParser import JuniperJUNOSParser
+from nuaal.Parsers.GetParser import GetParser
+from nuaal.Parsers.ParseCache import ParseCache
+from nuaal.Parsers.BulkParser import BulkParser
+from nuaal.Parsers.PatternProfiler import PatternProfiler
+from nuaal.Parsers.Records import Record
+from nuaal.Parsers.Structured import StructuredMapping
+from nuaal.Parsers.ParseGuard import ParseGuard, ParseTimeout
+from nuaal.Parsers.ParsePipeline import ParsePipeline
@@ -1,5 +1,5 @@
 from nuaal.Writers import Writer
-from nuaal.utils import check_path
+from nuaal.utils import check_path, Columns
 from nuaal.definitions import DATA_PATH
 import xlsxwriter
 
@@ -50,7 +50,7 @@ class ExcelWriter(Writer):
                     worksheet.write_row(row_pointer, column_pointer, entry)
                     row_pointer += 1
             if headers:
-                worksheet.autofilter(0, 0, row_pointer-1, len(data[0])-1)
+                worksheet.autofilter(0, 0, row_pointer-1, len(headers)-1)
             self.logger.info(msg="{} entries written.".format(len(data)))
 
     def write_json(self, workbook, data, worksheetname=None, headers=None):
@@ -58,12 +58,18 @@ class ExcelWriter(Writer):
         Function for writing JSON-like data to worksheet.
 
         :param workbook: Reference of the ``xlsxwriter`` workbook object.
-        :param data:
+        :param data: List of dictionaries or ``Columns`` object
         :param str worksheetname: Name of the worksheet
         :param list headers: List of column headers.
         :return: ``None``
         """
-        if isinstance(data, list):
+        if isinstance(data, Columns):
+            if not headers:
+                headers = list(data.keys())
+            rows = [[str(element) if isinstance(element, list) else element for element in row] for row in data.iter_lists(headers=headers)]
+            self.write_list(workbook=workbook, data=rows, worksheetname=worksheetname, headers=headers)
+
+        elif isinstance(data, list):
             if not headers:
                 # Generate headers from first dict
                 headers = list(data[0].keys())
@@ -1,7 +1,8 @@
 import os
 import sys
 import json
-from nuaal.utils import get_logger, check_path
+from collections.abc import Mapping
+from nuaal.utils import get_logger, check_path, Columns
 from nuaal.definitions import ROOT_DIR, DATA_PATH
 
 
@@ -30,13 +31,18 @@ class Writer:
         This function transfers list of dictionaries into two lists, one containing the column headers (keys of dictionary) and the
         other containing individual list of values (representing rows).
 
-        :param list data: List of dictionaries with common structure
+        :param list data: List of dictionaries with common structure, or ``Columns`` object
         :return: Dict with "headers" list and "list_data" list containing rows.
         """
         headers = []
         list_data = []
+        if isinstance(data, Columns):
+            headers = list(data.keys())
+            for entry_list in data.iter_lists(headers=headers):
+                list_data.append([str(element) if isinstance(element, list) else element for element in entry_list])
+            return {"headers": headers, "list_data": list_data}
         if isinstance(data, list) and len(data) > 0:
-            if isinstance(data[0], dict):
+            if isinstance(data[0], Mapping):
                 headers = list(data[0].keys())
                 self.logger.debug(msg="Successfully created headers: {}".format(headers))
                 for entry in data:
@@ -62,7 +68,7 @@ class Writer:
         elif isinstance(data, list):
             headers = set()
             for entry in data:
-                if isinstance(entry, dict):
+                if isinstance(entry, Mapping):
                     for key in entry.keys():
                         headers.add(key)
             headers = list(headers)
@@ -89,7 +95,11 @@ class Writer:
                     if section not in common_headers:
                         section_content[section] = []
                         sections.add(section)
-                        if isinstance(device[section], list):
+                        if isinstance(device[section], Columns):
+                            section_headers[section] = common_headers + list(device[section].keys())
+                            for entry in device[section].iter_lists(headers=section_headers[section][len(common_headers):]):
+                                section_content[section].append([device[x] for x in common_headers] + entry)
+                        elif isinstance(device[section], list):
                             section_headers[section] = common_headers + list(device[section][0].keys())
                             for entry in device[section]:
                                 section_content[section].append([device[x] for x in common_headers] + [entry[x] for x in section_headers[section][len(common_headers):]])
@@ -0,0 +1,262 @@
+from nuaal.utils import get_logger
+from nuaal.connections.cli.Cisco_IOS_Cli import COMMAND_MAPPINGS
+from nuaal.Parsers import CiscoIOSParser, ParsePipeline
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import functools
+import re
+import timeit
+try:
+    import asyncssh
+except ImportError:
+    asyncssh = None
+
+PROMPT_PATTERN = re.compile(r"(?P<hostname>[\w\-.:/]+)(?:\(config[^)]*\))?(?P<level>[>#])\s*$")
+PASSWORD_PATTERN = re.compile(r"(?:[Pp]assword:|[>#])\s*$")
+INVALID_OUTPUTS = ("% Invalid input detected at '^' marker.", "% Ambiguous command:")
+
+# Actions of CliMultiRunner, in the order they are run, with key of the parsed result and command variants
+ACTIONS = [
+    ("get_vlans", "vlans", COMMAND_MAPPINGS["get_vlans"]),
+    ("get_neighbors", "neighbors", COMMAND_MAPPINGS["get_neighbors"]),
+    ("get_interfaces", "interfaces", COMMAND_MAPPINGS["get_interfaces"]),
+    ("get_interfaces_status", "interfaces_status", COMMAND_MAPPINGS["get_interfaces_status"]),
+    ("get_trunks", "trunk_interfaces", ["show interfaces trunk"]),
+    ("get_portchannels", "portchannels", COMMAND_MAPPINGS["get_portchannels"]),
+    ("get_version", "version", COMMAND_MAPPINGS["get_version"]),
+    ("get_license", "license", COMMAND_MAPPINGS["get_license"]),
+    ("get_inventory", "inventory", COMMAND_MAPPINGS["get_inventory"]),
+    ("get_config", "running_config", ["show running-config"])
+]
+
+
+class AsyncCliConnection(object):
+    """
+    Asynchronous CLI session with device running Cisco IOS over SSH, based on `asyncssh`. Unlike netmiko connection, the session does not
+    need its own thread, so thousands of sessions can wait for their devices in single event loop.
+    """
+    def __init__(self, ip, username=None, password=None, secret=None, enable=False, port=22, timeout=30.0, ssh_params=None, logger=None):
+        """
+
+        :param str ip: IP address or FQDN of the device
+        :param str username: Username used for login to device
+        :param str password: Password used for login to device
+        :param str secret: Enable secret for accessing Privileged EXEC Mode
+        :param bool enable: Whether or not enable Privileged EXEC Mode on device
+        :param int port: SSH port
+        :param float timeout: Timeout of connecting and of single command in seconds
+        :param dict ssh_params: Additional keyword arguments of ``asyncssh.connect()``
+        """
+        self.ip = ip
+        self.username = username
+        self.password = password
+        self.secret = secret
+        self.enable = enable
+        self.port = port
+        self.timeout = timeout
+        self.ssh_params = ssh_params if isinstance(ssh_params, dict) else {}
+        self.logger = logger if logger is not None else get_logger(name="AsyncConnection-{}".format(ip))
+        self.hostname = None
+        self.prompt = None
+        self.connection = None
+        self.process = None
+
+    async def connect(self):
+        """
+        Connects to the device, finds the prompt, enters Privileged EXEC Mode if requested and disables paging.
+
+        :return: ``None``
+        """
+        if asyncssh is None:
+            raise RuntimeError("AsyncCliConnection requires 'asyncssh' package.")
+        params = dict(known_hosts=None)
+        if self.username is not None:
+            params.update(username=self.username, password=self.password)
+        params.update(self.ssh_params)
+        self.connection = await asyncio.wait_for(asyncssh.connect(self.ip, port=self.port, **params), timeout=self.timeout)
+        self.process = await self.connection.create_process(term_type="vt100", term_size=(511, 24))
+        self.process.stdin.write("\n")
+        match = PROMPT_PATTERN.search(await self._read_until(PROMPT_PATTERN))
+        if match.group("level") == ">" and (self.enable or self.secret):
+            self.process.stdin.write("enable\n")
+            if (await self._read_until(PASSWORD_PATTERN, echo="enable")).rstrip().endswith(":"):
+                self.process.stdin.write("{}\n".format(self.secret or ""))
+                match = PROMPT_PATTERN.search(await self._read_until(PROMPT_PATTERN))
+            else:
+                match = PROMPT_PATTERN.search(await self._read_until(PROMPT_PATTERN, echo="enable"))
+            if match.group("level") != "#":
+                self.logger.error(msg="Device {}: Could not enter Privileged EXEC Mode.".format(self.ip))
+        self.hostname = match.group("hostname")
+        self.prompt = re.compile(r"{}(?:\(config[^)]*\))?[>#]\s*$".format(re.escape(self.hostname)))
+        await self.send_command("terminal length 0")
+        await self.send_command("terminal width 511")
+
+    async def _read_until(self, pattern, echo=None):
+        # Output is read from the echo of the last command, so that prompts printed before (such as the one of the initial newline)
+        # are not mistaken for the end of the output
+        buffer = ""
+        start = 0 if echo is None else None
+        while True:
+            if start is None:
+                index = buffer.find(echo)
+                if index != -1:
+                    start = index + len(echo)
+            # Only the end of the buffer can contain the prompt
+            if start is not None and pattern.search(buffer[max(start, len(buffer) - 256):]):
+                return buffer[start:]
+            chunk = await asyncio.wait_for(self.process.stdout.read(65536), timeout=self.timeout)
+            if not chunk:
+                raise ConnectionError("Device {} closed the session.".format(self.ip))
+            buffer += chunk.replace("\r\n", "\n").replace("\r", "")
+
+    async def send_command(self, command):
+        """
+        Sends ``command`` to the device and waits for the prompt.
+
+        :param str command: Command to run
+        :return: (str) Output of the command, without the echoed command and the prompt
+        """
+        self.process.stdin.write("{}\n".format(command))
+        output = await self._read_until(self.prompt, echo=command)
+        return "\n".join(output.split("\n")[1:-1])
+
+    async def close(self):
+        """
+        Closes the session.
+
+        :return: ``None``
+        """
+        if self.connection is not None:
+            self.connection.close()
+            await self.connection.wait_closed()
+            self.connection = None
+
+
+class AsyncCliRunner(object):
+    """
+    Alternative to ``CliMultiRunner`` running all sessions in single asyncio event loop instead of one thread per session, so thousands of
+    devices can be collected concurrently. Takes the same ``provider``, ``ips`` and ``actions`` and produces the same ``data`` (list of
+    dictionaries, one per device) and ``error_hosts``. CPU-bound parsing is handed off to pool of ``parse_workers`` threads, outputs of
+    ``process_commands`` (such as `show interfaces`) to worker processes of ``ParsePipeline``, so the event loop keeps serving other sessions.
+    Requires `asyncssh` package.
+    """
+    def __init__(self, provider, ips, actions=None, workers=1000, parse_workers=4, process_commands=None, port=22, timeout=30.0,
+                 DEBUG=False, verbosity=3, ssh_params={}):
+        """
+
+        :param dict provider: Dictionary with `username`, `password` and optionally `secret`, `enable` and `port` keys
+        :param list ips: List of IP addresses of the devices, optionally with port, such as `127.0.0.1:10022`
+        :param list actions: List of actions to be run in each connection, same as in ``CliMultiRunner``
+        :param int workers: Maximal number of concurrent sessions
+        :param int parse_workers: Number of parsing threads
+        :param list process_commands: Commands parsed by worker processes
+        :param int port: Default SSH port
+        :param float timeout: Timeout of connecting and of single command in seconds
+        :param bool DEBUG: Enables/disables debugging output
+        :param dict ssh_params: Additional keyword arguments of ``asyncssh.connect()``
+        """
+        self.provider = provider
+        self.ips = ips
+        self.actions = actions if isinstance(actions, list) else []
+        self.workers = workers
+        self.parse_workers = parse_workers
+        self.port = provider.get("port", port)
+        self.timeout = timeout
+        self.ssh_params = ssh_params
+        self.logger = get_logger(name="AsyncCliRunner", DEBUG=DEBUG, verbosity=verbosity)
+        self.parser = CiscoIOSParser(verbosity=verbosity)
+        if process_commands:
+            self.parser = ParsePipeline(parser=self.parser, process_commands=process_commands, DEBUG=DEBUG, verbosity=verbosity)
+        self.data = []
+        self.error_hosts = []
+        self.stats = {"ok": 0, "error": 0, "time": 0.0}
+        self._executor = None
+        self._semaphore = None
+
+    def _address(self, ip):
+        host, separator, port = ip.rpartition(":")
+        if separator and port.isdigit() and ":" not in host:
+            return host, int(port)
+        return ip, self.port
+
+    async def _parse(self, function, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(function, **kwargs))
+
+    async def _run_action(self, session, action, key, commands, data):
+        output = None
+        for command in commands:
+            output = await session.send_command(command)
+            if not output.strip():
+                self.logger.error(msg="Device {} returned empty output for command '{}'".format(session.ip, command))
+            elif any(x in output for x in INVALID_OUTPUTS):
+                self.logger.error(msg="Device {} does not support command '{}'".format(session.ip, command))
+            else:
+                break
+            output = None
+        if output is None:
+            return
+        if action == "get_config":
+            data[key] = output
+        elif action == "get_trunks":
+            data[key] = await self._parse(self.parser.trunk_parser, text=output)
+        else:
+            data[key] = await self._parse(self.parser.autoparse, text=output, command=commands[0])
+
+    async def _device(self, ip):
+        host, port = self._address(ip)
+        async with self._semaphore:
+            start_time = timeit.default_timer()
+            session = AsyncCliConnection(
+                ip=host, username=self.provider.get("username"), password=self.provider.get("password"), secret=self.provider.get("secret"),
+                enable=self.provider.get("enable", False), port=port, timeout=self.timeout, ssh_params=self.ssh_params, logger=self.logger
+            )
+            data = {"ipAddress": ip}
+            try:
+                await session.connect()
+                data["hostname"] = session.hostname
+                for action, key, commands in ACTIONS:
+                    if action in self.actions:
+                        await self._run_action(session=session, action=action, key=key, commands=commands, data=data)
+                self.data.append(data)
+                self.stats["ok"] += 1
+            except Exception as e:
+                self.logger.error(msg="Unhandled Exception occurred for host {}. Exception: {}".format(ip, repr(e)))
+                self.error_hosts.append(ip)
+                self.stats["error"] += 1
+            finally:
+                try:
+                    await session.close()
+                except Exception:
+                    pass
+            self.logger.debug(msg="Device {} processed in {} seconds.".format(ip, timeit.default_timer() - start_time))
+
+    async def run_async(self):
+        """
+        Coroutine collecting data of all devices in ``self.ips``.
+
+        :return: (list) ``self.data``
+        """
+        if asyncssh is None:
+            self.logger.critical(msg="AsyncCliRunner requires 'asyncssh' package.")
+            return self.data
+        start_time = timeit.default_timer()
+        self._semaphore = asyncio.Semaphore(self.workers)
+        self._executor = ThreadPoolExecutor(max_workers=self.parse_workers, thread_name_prefix="AsyncParseWorker")
+        try:
+            await asyncio.gather(*(self._device(ip) for ip in self.ips))
+        finally:
+            self._executor.shutdown()
+            if isinstance(self.parser, ParsePipeline):
+                self.parser.close()
+        self.stats["time"] += timeit.default_timer() - start_time
+        self.logger.info(msg="Collected {} devices ({} failed) in {} seconds.".format(self.stats["ok"], self.stats["error"], round(self.stats["time"], 3)))
+        return self.data
+
+    def run(self):
+        """
+        Main entry function, runs ``run_async()`` in new event loop. Blocks until all devices are processed.
+
+        :return: (list) ``self.data``
+        """
+        return asyncio.run(self.run_async())
@@ -8,6 +8,42 @@ import queue
 import datetime
 
 
+COMMAND_MAPPINGS = {
+    "get_vlans": [
+        "show vlan brief",
+        "show vlan-switch brief"
+    ],
+    "get_mac_address_table": [
+        "show mac address-table",
+        "show mac-address-table"
+    ],
+    "get_neighbors": [
+        "show cdp neighbors detail"
+    ],
+    "get_inventory": [
+        "show inventory"
+    ],
+    "get_interfaces": [
+        "show interfaces"
+    ],
+    "get_interfaces_status": [
+        "show interfaces status"
+    ],
+    "get_portchannels": [
+        "show etherchannel summary"
+    ],
+    "get_arp": [
+        "show ip arp"
+    ],
+    "get_license": [
+        "show license"
+    ],
+    "get_version": [
+        "show version"
+    ]
+}
+
+
 class Cisco_IOS_Cli(CliBaseConnection):
     """
     Object for interaction with network devices running Cisco IOS (or IOS XE) software via CLI interface.
@@ -17,66 +53,42 @@ class Cisco_IOS_Cli(CliBaseConnection):
             self, ip=None, username=None, password=None,
             parser=None, secret=None, method="ssh", enable=False,
             store_outputs=False, DEBUG=False, verbosity=3,
-            netmiko_params={}
+            netmiko_params={}, record=None, replay=None, pool=None, command_cache=None
     ):
         """
 
         :param ip: (str) IP address or FQDN of the device you're trying to connect to
         :param username: (str) Username used for login to device
         :param password: (str) Password used for login to device
-        :param parser: (ParserModule) Instance of ParserModule class which will be used for parsing of text outputs.
-        By default, new instance of ParserModule is created.
+        :param parser: (ParserModule) Instance of ParserModule class which will be used for parsing of text outputs, optionally wrapped in ParseCache,
+        ParseGuard or ParsePipeline. By default, new instance of ParserModule is created.
         :param secret: (str) Enable secret for accessing Privileged EXEC Mode
         :param method: (str) Primary method of connection, 'ssh' or 'telnet'. (Default is 'ssh')
         :param enable: (bool) Whether or not enable Privileged EXEC Mode on device
         :param store_outputs: (bool) Whether or not store text outputs of sent commands
         :param DEBUG: (bool) Enable debugging logging
+        :param record: (SessionArchive) Archive to record all commands and outputs of the session to
+        :param replay: (SessionArchive) Archive to replay the session from, instead of connecting to the device
+        :param pool: (SessionPool) Pool to lease the session from when connecting and to return it to when disconnecting
+        :param command_cache: (CommandCache) Cache of command variants working on each platform, shared by connections
         """
+        # Parser can be wrapped in ParseCache, ParseGuard and/or ParsePipeline
+        wrapped_parser = parser
+        while hasattr(wrapped_parser, "parser"):
+            wrapped_parser = wrapped_parser.parser
         super(Cisco_IOS_Cli, self).__init__(
             ip=ip, username=username, password=password,
-            parser=parser if isinstance(parser, CiscoIOSParser) else CiscoIOSParser(),
+            parser=parser if isinstance(wrapped_parser, CiscoIOSParser) else CiscoIOSParser(),
             secret=secret, enable=enable, store_outputs=store_outputs,
-            DEBUG=DEBUG, verbosity=verbosity, netmiko_params=netmiko_params
+            DEBUG=DEBUG, verbosity=verbosity, netmiko_params=netmiko_params,
+            record=record, replay=replay, pool=pool, command_cache=command_cache
         )
         self.prompt_end = [">", "#"]
         self.ssh_method = "cisco_ios"
         self.telnet_method = "cisco_ios_telnet"
         self.primary_method = self.ssh_method if method == "ssh" else self.telnet_method
         self.secondary_method = self.telnet_method if method == "ssh" else self.ssh_method
-        self.command_mappings = {
-            "get_vlans": [
-                "show vlan brief",
-                "show vlan-switch brief"
-            ],
-            "get_mac_address_table": [
-                "show mac address-table",
-                "show mac-address-table"
-            ],
-            "get_neighbors": [
-                "show cdp neighbors detail"
-            ],
-            "get_inventory": [
-                "show inventory"
-            ],
-            "get_interfaces": [
-                "show interfaces"
-            ],
-            "get_interfaces_status": [
-                "show interfaces status"
-            ],
-            "get_portchannels": [
-                "show etherchannel summary"
-            ],
-            "get_arp": [
-                "show ip arp"
-            ],
-            "get_license": [
-                "show license"
-            ],
-            "get_version": [
-                "show version"
-            ]
-        }
+        self.command_mappings = {action: list(commands) for action, commands in COMMAND_MAPPINGS.items()}
 
     def get_neighbors(self, output_filter=None, strip_domain=False):
         """
@@ -92,12 +104,20 @@ class Cisco_IOS_Cli(CliBaseConnection):
             return []
         if self.store_outputs:
             self.save_output(filename=command, data=raw_output)
-        parsed_output = self.parser.autoparse(text=raw_output, command=command)
-        if output_filter:
-            parsed_output = output_filter.universal_cleanup(data=parsed_output)
-        if strip_domain:
-            for neighbor in parsed_output:
-                neighbor["hostname"] = neighbor["hostname"].split(".")[0]
+
+        def parse(text):
+            if output_filter:
+                parsed_output = list(output_filter.iter_cleanup(data=self.parser.iterparse(text=text, command=command)))
+            else:
+                parsed_output = self.parser.autoparse(text=text, command=command)
+            if strip_domain:
+                for neighbor in parsed_output:
+                    neighbor["hostname"] = neighbor["hostname"].split(".")[0]
+            return parsed_output
+
+        if self.pipeline is not None:
+            return self._submit(key="neighbors", command=command, function=parse, kwargs={"text": raw_output})
+        parsed_output = parse(text=raw_output)
         self.data["neighbors"] = parsed_output
         return parsed_output
 
@@ -115,12 +135,19 @@ class Cisco_IOS_Cli(CliBaseConnection):
             return []
         if self.store_outputs:
             self.save_output(filename=command, data=raw_output)
-        parsed_output = self.parser.trunk_parser(text=raw_output)
-        if expand_vlan_groups:
-            for trunk in parsed_output:
-                trunk["allowed"] = vlan_range_expander(trunk["allowed"])
-                trunk["active"] = vlan_range_expander(trunk["active"])
-                trunk["forwarding"] = vlan_range_expander(trunk["forwarding"])
+
+        def parse(text):
+            parsed_output = self.parser.trunk_parser(text=text)
+            if expand_vlan_groups:
+                for trunk in parsed_output:
+                    trunk["allowed"] = vlan_range_expander(trunk["allowed"])
+                    trunk["active"] = vlan_range_expander(trunk["active"])
+                    trunk["forwarding"] = vlan_range_expander(trunk["forwarding"])
+            return parsed_output
+
+        if self.pipeline is not None:
+            return self._submit(key="trunk_interfaces", command=command, function=parse, kwargs={"text": raw_output})
+        parsed_output = parse(text=raw_output)
         self.data["trunk_interfaces"] = parsed_output
         return parsed_output
 
@@ -2,7 +2,10 @@ from netmiko import ConnectHandler
 from netmiko.ssh_exception import *
 import json
 from nuaal.utils import get_logger, check_path, write_output
-from nuaal.utils import Filter
+from nuaal.utils import Filter, OutputFilter
+from nuaal.Parsers.Structured import is_structured
+from nuaal.Parsers.ParsePipeline import ParsePipeline
+from nuaal.connections.cli.SessionArchive import RecordingConnection, ReplayConnection
 from nuaal.definitions import DATA_PATH, OUTPUT_PATH
 import timeit
 import os
@@ -23,7 +26,7 @@ class CliBaseConnection(object):
     def __init__(
             self, ip=None, username=None, password=None,
             parser=None, secret=None, enable=False, store_outputs=False,
-            DEBUG=False, verbosity=3, netmiko_params={}
+            DEBUG=False, verbosity=3, netmiko_params={}, record=None, replay=None, pool=None, command_cache=None
     ):
         """
 
@@ -31,11 +34,16 @@ class CliBaseConnection(object):
         :param username: (str) Username used for login to device
         :param password: (str) Password used for login to device
         :param parser: (ParserModule) Instance of ParserModule class which will be used for parsing of text outputs.
-        By default, new instance of ParserModule is created.
+        By default, new instance of ParserModule is created. If ``ParsePipeline`` is used, outputs are parsed in the background while next
+        commands are sent, ``_command_handler`` returns ``Future`` of the result and ``self.data`` is filled by ``wait_parsing()``.
         :param secret: (str) Enable secret for accessing Privileged EXEC Mode
         :param enable: (bool) Whether or not enable Privileged EXEC Mode on device
         :param store_outputs: (bool) Whether or not store text outputs of sent commands
         :param DEBUG: (bool) Enable debugging logging
+        :param record: (SessionArchive) Archive to record all commands and outputs of the session to
+        :param replay: (SessionArchive) Archive to replay the session from, instead of connecting to the device
+        :param pool: (SessionPool) Pool to lease the session from when connecting and to return it to when disconnecting
+        :param command_cache: (CommandCache) Cache of command variants working on each platform, shared by connections
         """
         self.ip = ip
         self.username = username
@@ -47,6 +55,14 @@ class CliBaseConnection(object):
         self.secret = secret
         self.enable = enable
         self.netmiko_params = netmiko_params if isinstance(netmiko_params, dict) else {}
+        self.record = record
+        self.replay = replay
+        self.pool = pool
+        self._pool_key = None
+        self.command_cache = command_cache
+        self._platform = None
+        self._variants = {}
+        self._unstructured = set()
         self.provider = None
         self._get_provider()
         self.store_outputs = store_outputs
@@ -61,6 +77,7 @@ class CliBaseConnection(object):
         self.outputs = {}
         self.data = {"ipAddress": self.ip}
         self.device = None
+        self._pending = []
 
     def __enter__(self):
         """
@@ -78,6 +95,7 @@ class CliBaseConnection(object):
         :return: ``None``
         """
         try:
+            self.wait_parsing()
             self.save_output(filename=self.data["hostname"], data=self.data)
         except KeyError:
             self.logger.error(msg="Could not store data of device {}. Reason: Could not retrieve any data".format(self.ip))
@@ -176,9 +194,22 @@ class CliBaseConnection(object):
                     self._check_enable_level(self.device)
                 except Exception as e:
                     self.logger.critical(msg="Failed to reconnect do device.")
+        elif self.replay is not None:
+            self.is_alive = False
+            if self.ip in self.replay:
+                self._check_enable_level(ReplayConnection(archive=self.replay, ip=self.ip))
+            else:
+                self.failures.append("replay_missing")
+                self.logger.error(msg="Device '{}' is not recorded in the replayed archive.".format(self.ip))
         else:
             self.is_alive = False
             device = None
+            if self.pool is not None:
+                if not self._lease_session():
+                    return
+                if self.device is not None:
+                    return
+            start_time = timeit.default_timer()
 
             if self.primary_method == self.ssh_method:
                 device = self._connect_ssh()
@@ -190,9 +221,43 @@ class CliBaseConnection(object):
                 elif self.secondary_method == self.ssh_method:
                     self._connect_ssh()
             if device is not None:
+                if self.record is not None:
+                    device = RecordingConnection(device=device, archive=self.record, ip=self.ip, connect_time=timeit.default_timer() - start_time)
                 self._check_enable_level(device)
             else:
                 self.logger.error(msg="Could not connect to device '{}'".format(self.ip))
+                if self._pool_key is not None:
+                    self.pool.release(key=self._pool_key, session=None)
+                    self._pool_key = None
+
+    def _lease_session(self):
+        """
+        Leases session from ``self.pool``. If the pool has healthy idle session to the device, it is set as ``self.device``,
+        otherwise new session needs to be opened by ``self._connect()``.
+
+        :return: ``True`` if the session was leased, ``False`` if the pool did not release any session in time
+        """
+        key = (self.ip, self.netmiko_params.get("port"), self.username, self.primary_method)
+        try:
+            device = self.pool.lease(key=key, timeout=self.pool.lease_timeout)
+        except TimeoutError as e:
+            self.failures.append("pool_timeout")
+            self.logger.error(msg="Could not lease session to device '{}'. Reason: {}".format(self.ip, e))
+            return False
+        self._pool_key = key
+        if device is not None:
+            self._check_enable_level(RecordingConnection(device=device, archive=self.record, ip=self.ip) if self.record is not None else device)
+            if self.is_alive and "hostname" in self.data:
+                self.logger.debug(msg="Leased session to device '{}' from pool.".format(self.ip))
+                return True
+            # Session passed the health check of the pool, but does not respond, open new one in its place
+            self.is_alive = False
+            self.device = None
+            try:
+                device.disconnect()
+            except Exception as e:
+                self.logger.debug(msg="Failed to disconnect leased session. Exception: {}".format(repr(e)))
+        return True
 
     def _check_enable_level(self, device):
         """
@@ -240,7 +305,17 @@ class CliBaseConnection(object):
 
         :return: ``None``
         """
-        if self.device is not None:
+        if self._pool_key is not None:
+            device = self.device.device if isinstance(self.device, RecordingConnection) else self.device
+            if self.is_alive:
+                self.pool.release(key=self._pool_key, session=device)
+                self.logger.info(msg="Returned session to device {} to pool".format(self.ip))
+            else:
+                self.pool.discard(key=self._pool_key, session=device)
+            self._pool_key = None
+            self.device = None
+            self.is_alive = False
+        elif self.device is not None:
             self.device.disconnect()
             if not self.device.is_alive():
                 self.is_alive = False
@@ -286,26 +361,52 @@ class CliBaseConnection(object):
             output[command] = self._send_command(command)
         return output
 
-    def _command_handler(self, commands=None, action=None, out_filter=None, return_raw=False):
+    def _command_handler(self, commands=None, action=None, out_filter=None, return_raw=False, fields=None):
         """
         This function tries to send multiple 'types' of given command and waits for correct output.
         This should solve the problem with different command syntax, such as 'show mac address-table' vs
         'show mac-address-table' on different versions of Cisco IOS.
-        When correct output is returned, it is then parsed and the result is returned.
+        When correct output is returned, it is then parsed and the result is returned. If the parser supports structured output of the command
+        (see ``ParserModule.structured_command()``), it is requested first and plaintext command is sent only if the device does not support it.
+        Structured commands not supported by the device are not sent again by this connection, nor by connections to the same platform
+        sharing ``self.command_cache``.
 
         :param str action: Action to perform - has to be key of self.command_mappings
         :param list commands: List of command string to try, such as ['show mac-address-table', 'show mac address-table']
-        :param out_filter: Instance of Filter class
+        :param out_filter: Instance of Filter class, or instance of OutputFilter class, which required keys are used as ``fields``
         :param bool return_raw: If set to `True`, raw output will be returned.
-        :return: JSON representation of command output
+        :param list fields: List of keys the caller needs, only patterns producing these keys are used for parsing.
+        :return: JSON representation of command output, or ``Future`` of it if ``self.parser`` is ``ParsePipeline``
         """
         start_time = timeit.default_timer()
         if commands is None:
             commands = self.command_mappings[action]
         command_output = ""
         used_command = ""
+        parse_command = commands[0]
         parsed_output = []
+        variant_key = action if action is not None else commands[0]
+        if self.command_cache is not None and self._platform is not None and len(commands) > 1:
+            # Variant which worked on other device of the same platform is tried first
+            preferred = self.command_cache.get(platform=self._platform, key=variant_key)
+            if preferred in commands:
+                commands = [preferred] + [x for x in commands if x != preferred]
         for command in commands:
+            # Structured output (such as `| json` on NX-OS) is mapped without regex, plaintext output is the fallback
+            structured_command = None if return_raw or self.parser is None else self.parser.structured_command(command)
+            if structured_command is not None and self._supports_structured(structured_command=structured_command):
+                command_output = self._send_command(structured_command)
+                if is_structured(command_output):
+                    self.logger.debug(msg="Device {} returned structured output for command '{}'".format(self.ip, structured_command))
+                    used_command = structured_command
+                    parse_command = command
+                    break
+                if command_output is not None:
+                    self.logger.debug(msg="Device {} does not support structured command '{}'".format(self.ip, structured_command))
+                    self._unstructured.add(structured_command)
+                    if self.command_cache is not None:
+                        # Plaintext command is stored as the variant which works in place of the structured one
+                        self._remember_variant(key=structured_command, command=command)
             command_output = self._send_command(command)
             if not command_output:
                 self.logger.error(msg="Could not retrieve any output. Possibly non-active connection.")
@@ -320,6 +421,11 @@ class CliBaseConnection(object):
                 self.logger.debug(msg="Device {} returned output for command '{}'".format(self.ip, command))
                 used_command = command
                 break
+        if self.command_cache is not None and used_command:
+            if action == "get_version" and self._platform is None:
+                self._learn_platform(text=command_output, command=parse_command)
+            if len(commands) > 1:
+                self._remember_variant(key=variant_key, command=command)
         if self.store_outputs and command_output != "":
             self.save_output(filename=used_command, data=command_output)
         if command_output == "" or command_output is None:
@@ -330,20 +436,136 @@ class CliBaseConnection(object):
                 return []
         if return_raw:
             return command_output
+        if self.pipeline is not None:
+            return self._submit(
+                key=action[4:] if action is not None else None, command=used_command, function=self._parse_output,
+                kwargs={"text": command_output, "command": parse_command, "out_filter": out_filter, "fields": fields}
+            )
+        # Try parsing the output
+        try:
+            parsed_output = self._parse_output(text=command_output, command=parse_command, out_filter=out_filter, fields=fields)
+            if action is not None:
+                self.data[action[4:]] = parsed_output
+        except Exception as e:
+            print(repr(e))
+            self.logger.error(msg="Device {}: Failed to parse output of command '{}'".format(self.ip, used_command))
+        finally:
+            self.logger.debug(msg="Processing of action {} took {} seconds.".format(action, timeit.default_timer()-start_time))
+            return parsed_output
+
+    def _learn_platform(self, text, command):
+        """
+        Identifies platform of the device from output of `show version` for ``self.command_cache``. Command variants used before
+        the platform was known are stored to the cache.
+
+        :param str text: Output of `show version`
+        :param str command: Command used to generate ``text`` output
+        :return: ``None``
+        """
+        try:
+            version = self.parser.autoparse(text=text, command=command, fields=["platform", "version"])
+        except Exception as e:
+            self.logger.error(msg="Device {}: Failed to identify platform. Exception: {}".format(self.ip, repr(e)))
+            return
+        if not version or not version[0].get("platform"):
+            self.logger.debug(msg="Device {}: Could not identify platform from output of '{}'".format(self.ip, command))
+            return
+        self._platform = self.command_cache.platform_key(device_type=self.ssh_method, platform=version[0]["platform"], version=version[0].get("version"))
+        for key, variant in self._variants.items():
+            self.command_cache.set(platform=self._platform, key=key, command=variant)
+        self._variants = {}
+
+    def _supports_structured(self, structured_command):
+        """
+        Checks whether ``structured_command`` is worth sending, it is not if the device, or other device of the same platform
+        sharing ``self.command_cache``, did not return structured output for it.
+
+        :param str structured_command: Command requesting structured output, such as `show version | json`
+        :return: ``bool``
+        """
+        if structured_command in self._unstructured:
+            return False
+        if self.command_cache is not None and self._platform is not None:
+            if self.command_cache.get(platform=self._platform, key=structured_command) is not None:
+                self._unstructured.add(structured_command)
+                return False
+        return True
+
+    def _remember_variant(self, key, command):
+        """
+        Stores ``command`` as the working variant of ``key`` to ``self.command_cache``, or until the platform of the device is known.
+
+        :param str key: Action (such as `get_vlans`) or the first variant of the command
+        :param str command: Working command
+        :return: ``None``
+        """
+        if self._platform is not None:
+            self.command_cache.set(platform=self._platform, key=key, command=command)
         else:
-            # Try parsing the output
+            self._variants[key] = command
+
+    def _parse_output(self, text, command, out_filter=None, fields=None):
+        """
+        Parses ``text`` output of ``command`` by ``self.parser``.
+
+        :param str text: Text output of command
+        :param str command: Command used to generate ``text`` output
+        :param out_filter: Instance of Filter class, or instance of OutputFilter class, which required keys are used as ``fields``
+        :param list fields: List of keys the caller needs
+        :return: List of parsed entries
+        """
+        if isinstance(out_filter, OutputFilter) and fields is None:
+            fields = out_filter.fields
+        if isinstance(out_filter, Filter):
+            # Entries are filtered as they are parsed, the full unfiltered list is never built. Keys used by the filter have to be parsed as well.
+            parse_fields = fields
+            if fields is not None:
+                parse_fields = list(fields) + [x for x in list(out_filter.required) + list(out_filter.excluded) if x not in fields]
+            entries = out_filter.iter_cleanup(data=self.parser.iterparse(command=command, text=text, fields=parse_fields))
+            if parse_fields != fields:
+                entries = ({field: entry.get(field) for field in fields} for entry in entries)
+            return list(entries)
+        return self.parser.autoparse(command=command, text=text, fields=fields)
+
+    @property
+    def pipeline(self):
+        """
+        ``ParsePipeline`` used as parser of this connection, or ``None`` if outputs are parsed inline.
+        """
+        return self.parser if isinstance(self.parser, ParsePipeline) else None
+
+    def _submit(self, key, command, function, kwargs):
+        """
+        Submits parsing ``function`` of output of ``command`` to ``self.pipeline``. The result is stored in ``self.data[key]`` by
+        ``wait_parsing()``.
+
+        :param str key: Key of ``self.data``, ``None`` if the result should not be stored
+        :param str command: Command used to generate the output
+        :param function: Parsing function
+        :param dict kwargs: Keyword arguments of ``function``
+        :return: ``concurrent.futures.Future`` of the parsed output
+        """
+        future = self.pipeline.submit(function, **kwargs)
+        self._pending.append((key, command, future))
+        return future
+
+    def wait_parsing(self):
+        """
+        Waits for outputs submitted to ``ParsePipeline`` and stores the results in ``self.data``, in the order the commands were sent.
+        Called automatically when leaving the ``with`` statement.
+
+        :return: (dict) ``self.data``
+        """
+        pending, self._pending = self._pending, []
+        for key, command, future in pending:
             try:
-                parsed_output = self.parser.autoparse(command=commands[0], text=command_output)
-                if isinstance(out_filter, Filter):
-                    parsed_output = out_filter.universal_cleanup(data=parsed_output)
-                if action is not None:
-                    self.data[action[4:]] = parsed_output
+                result = future.result()
             except Exception as e:
-                print(repr(e))
-                self.logger.error(msg="Device {}: Failed to parse output of command '{}'".format(self.ip, used_command))
-            finally:
-                self.logger.debug(msg="Processing of action {} took {} seconds.".format(action, timeit.default_timer()-start_time))
-                return parsed_output
+                self.logger.error(msg="Device {}: Failed to parse output of command '{}'. Exception: {}".format(self.ip, command, repr(e)))
+                continue
+            if key is not None:
+                self.data[key] = result
+        return self.data
 
     def store_raw_output(self, command, raw_output, ext="txt"):
         """
@@ -433,14 +655,15 @@ class CliBaseConnection(object):
         """
         return self._command_handler(action="get_inventory")
 
-    def get_interfaces(self):
+    def get_interfaces(self, fields=None):
         """
         This function returns JSON representation of all physical and virtual interfaces of the device, containing all available info about each interface.
         In Cisco terms, this represents usage of command `show interfaces`.
 
+        :param list fields: Optional list of keys to parse, such as `["name", "status", "lineProtocol"]`. All keys are parsed by default.
         :return: List of dictionaries.
         """
-        return self._command_handler(action="get_interfaces")
+        return self._command_handler(action="get_interfaces", fields=fields)
 
     def get_portchannels(self):
         """
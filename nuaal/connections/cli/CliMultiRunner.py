@@ -1,6 +1,6 @@
 from nuaal.utils import get_logger
 from nuaal.connections.cli import Cisco_IOS_Cli
-from nuaal.Parsers import CiscoIOSParser
+from nuaal.Parsers import CiscoIOSParser, ParsePipeline
 import queue
 import threading
 import time
@@ -9,7 +9,8 @@ class CliMultiRunner(object):
     """
     This class allows running set of CLI commands on multiple devices in parallel, using Worker threads
     """
-    def __init__(self, provider, ips, actions=None, workers=4, DEBUG=False, verbosity=3, netmiko_params={}):
+    def __init__(self, provider, ips, actions=None, workers=4, DEBUG=False, verbosity=3, netmiko_params={}, parse_workers=0, process_commands=None,
+                 pool=None, command_cache=None):
         """
 
         :param dict provider: Dictionary with necessary info for creating connection
@@ -17,9 +18,17 @@ class CliMultiRunner(object):
         :param list actions: List of actions to be run in each connection
         :param int workers: Number of worker threads to spawn
         :param bool DEBUG: Enables/disables debugging output
+        :param int parse_workers: Number of threads of shared ``ParsePipeline``. If set, outputs are parsed while the workers send next
+            commands, otherwise (default) each output is parsed before the next command is sent.
+        :param list process_commands: Commands parsed by worker processes of the ``ParsePipeline``, such as `show interfaces`
+        :param SessionPool pool: Pool of sessions leased by the connections, kept open for subsequent runs. The pool is not closed by the runner.
+        :param CommandCache command_cache: Cache of command variants working on each platform. If set, `get_version` runs first, so the
+            platform of each device is known before the other commands are sent.
         """
         self.provider = provider
         self.netmiko_params = netmiko_params
+        self.pool = pool
+        self.command_cache = command_cache
         self.ips = ips
         self.workers = workers
         self.DEBUG = DEBUG
@@ -29,6 +38,12 @@ class CliMultiRunner(object):
         self.actions = actions if isinstance(actions, list) else []
         self.data = []
         self.error_hosts = []
+        self.pipeline = None
+        if parse_workers:
+            self.pipeline = ParsePipeline(
+                parser=CiscoIOSParser(), workers=parse_workers, max_pending=4 * max(workers, parse_workers), process_commands=process_commands,
+                DEBUG=DEBUG, verbosity=verbosity
+            )
 
     def fill_queue(self):
         """
@@ -55,7 +70,12 @@ class CliMultiRunner(object):
                 self.logger.info(msg="Queue Empty")
                 break
             try:
-                with Cisco_IOS_Cli(**provider, netmiko_params=self.netmiko_params) as device:
+                if self.pipeline is not None:
+                    provider["parser"] = self.pipeline
+                with Cisco_IOS_Cli(**provider, netmiko_params=self.netmiko_params, pool=self.pool, command_cache=self.command_cache) as device:
+                    version_first = self.command_cache is not None
+                    if "get_version" in self.actions and version_first:
+                        device.get_version()
                     if "get_vlans" in self.actions:
                         device.get_vlans()
                     if "get_neighbors" in self.actions:
@@ -68,7 +88,7 @@ class CliMultiRunner(object):
                         device.get_trunks()
                     if "get_portchannels" in self.actions:
                         device.get_portchannels()
-                    if "get_version" in self.actions:
+                    if "get_version" in self.actions and not version_first:
                         device.get_version()
                     if "get_license" in self.actions:
                         device.get_license()
@@ -76,7 +96,7 @@ class CliMultiRunner(object):
                         device.get_inventory()
                     if "get_config" in self.actions:
                         device.get_config()
-                    self.data.append(device.data)
+                    self.data.append(device.wait_parsing())
             except Exception as e:
                 self.logger.error(msg="Unhandled Exception occurred in thread '{}' for host {}. Exception: {}".format(threading.current_thread().getName(), provider["ip"], repr(e)))
                 self.error_hosts.append(provider["ip"])
@@ -109,3 +129,5 @@ class CliMultiRunner(object):
         self.thread_factory()
         [t.start() for t in self.threads]
         self.queue.join()
+        if self.pipeline is not None:
+            self.pipeline.close()
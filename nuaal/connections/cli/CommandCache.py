@@ -0,0 +1,137 @@
+from nuaal.definitions import CACHE_PATH
+from nuaal.utils import get_logger, check_path
+import json
+import os
+import threading
+
+
+class CommandCache(object):
+    """
+    Cache of command variants which work on each platform. ``_command_handler`` of ``CliBaseConnection`` tries variants of command (such
+    as `show vlan brief` and `show vlan-switch brief`) in order until one of them works. With ``command_cache``, the working variant is
+    stored per platform, identified by device type, hardware platform and software version from `show version`, and the following devices
+    of the same platform send that variant first, without the failing ones. The platform is known after ``get_version()``, variants used
+    by the device before that are stored as soon as it is known.
+
+    Single cache can be shared by all connections of ``CliMultiRunner``. Learned variants are saved to `~/.nuaal/cache/commands.json`
+    (or ``path``), so they are reused by later runs. Variants saved by other caches using the same file are merged in when saving.
+    """
+    def __init__(self, path=None, use_disk=True, DEBUG=False, verbosity=3):
+        """
+
+        :param str path: Path of the JSON file with learned variants. Defaults to `~/.nuaal/cache/commands.json`
+        :param bool use_disk: Enables/disables loading and saving of the learned variants
+        :param bool DEBUG: Enables/disables debugging output
+        """
+        self.path = os.path.abspath(path) if path else os.path.join(CACHE_PATH, "commands.json")
+        self.use_disk = use_disk
+        self.logger = get_logger(name="CommandCache", DEBUG=DEBUG, verbosity=verbosity)
+        self.stats = {"hits": 0, "misses": 0, "learned": 0}
+        self.variants = {}
+        self._learned = {}
+        self._lock = threading.Lock()
+        if self.use_disk and os.path.isfile(self.path):
+            self.load()
+
+    def __len__(self):
+        return sum(len(x) for x in self.variants.values())
+
+    @staticmethod
+    def platform_key(device_type, platform, version):
+        """
+        Builds key of the platform.
+
+        :param str device_type: Device type, such as `cisco_ios`
+        :param str platform: Hardware platform, such as `WS-C3750G-24TS`
+        :param str version: Software version
+        :return: (str) Key of the platform
+        """
+        return "{}|{}|{}".format(device_type, platform, version)
+
+    def get(self, platform, key):
+        """
+        Returns command variant which worked on ``platform``.
+
+        :param str platform: Key of the platform, see ``platform_key()``
+        :param str key: Action (such as `get_vlans`) or the first variant of the command
+        :return: Command or ``None`` if the variant was not learned yet
+        """
+        with self._lock:
+            command = self.variants.get(platform, {}).get(key)
+            self.stats["hits" if command is not None else "misses"] += 1
+        return command
+
+    def set(self, platform, key, command):
+        """
+        Stores ``command`` as the working variant of ``key`` on ``platform`` and saves the cache, if the variant changed.
+
+        :param str platform: Key of the platform, see ``platform_key()``
+        :param str key: Action (such as `get_vlans`) or the first variant of the command
+        :param str command: Working command
+        :return: ``None``
+        """
+        with self._lock:
+            if self.variants.get(platform, {}).get(key) == command:
+                return
+            self.variants.setdefault(platform, {})[key] = command
+            self._learned.setdefault(platform, {})[key] = command
+            self.stats["learned"] += 1
+            self.logger.info(msg="Learned command '{}' for '{}' on platform '{}'".format(command, key, platform))
+            if self.use_disk:
+                self._save()
+
+    def _read(self):
+        """
+        Reads variants saved in ``self.path``.
+
+        :return: (dict) Variants keyed by platform, empty if the file does not exist or could not be read
+        """
+        try:
+            with open(self.path, mode="r") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            self.logger.error(msg="Could not load command cache '{}'. Exception: {}".format(self.path, repr(e)))
+            return {}
+
+    def _save(self):
+        """
+        Merges variants learned by this cache into the variants saved in ``self.path`` (possibly by other caches) and replaces the file
+        atomically. Must be called with ``self._lock`` held.
+        """
+        if not check_path(os.path.dirname(self.path)):
+            self.logger.error(msg="Could not create directory of command cache '{}'.".format(self.path))
+            return
+        variants = self._read()
+        for platform, commands in self._learned.items():
+            variants.setdefault(platform, {}).update(commands)
+        temp_path = "{}.{}.{}.tmp".format(self.path, os.getpid(), threading.get_ident())
+        try:
+            with open(temp_path, mode="w") as f:
+                json.dump(variants, f, indent=2, sort_keys=True)
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            self.logger.error(msg="Could not save command cache '{}'. Exception: {}".format(self.path, repr(e)))
+            return
+        for platform, commands in variants.items():
+            self.variants.setdefault(platform, {}).update(commands)
+
+    def save(self):
+        """
+        Saves learned variants to ``self.path``.
+
+        :return: ``None``
+        """
+        with self._lock:
+            self._save()
+
+    def load(self):
+        """
+        Loads learned variants from ``self.path``.
+
+        :return: ``None``
+        """
+        with self._lock:
+            self.variants = self._read()
+        self.logger.debug(msg="Loaded {} command variants from '{}'.".format(len(self), self.path))
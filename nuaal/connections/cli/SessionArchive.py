@@ -0,0 +1,266 @@
+from nuaal.utils import get_logger
+import gzip
+import json
+import pathlib
+import threading
+import time
+import timeit
+
+ARCHIVE_VERSION = 1
+INVALID_INPUT = "% Invalid input detected at '^' marker."
+
+
+class SessionArchive(object):
+    """
+    Archive of CLI sessions, storing every command sent to each device with its output and the time it took. Identical outputs (such as
+    `show license` of devices with the same software) are stored only once and the archive is saved as gzip-compressed JSON.
+
+    Used as ``record`` of ``CliBaseConnection``, the connection wraps the netmiko session in ``RecordingConnection``. Used as ``replay``,
+    the connection uses ``ReplayConnection`` instead of netmiko, which serves the recorded outputs without network, so ``_send_command``,
+    parsing and all higher layers run as with the real device. With ``timing`` set, replayed commands take the recorded time multiplied by
+    ``timing`` (``1.0`` for the original speed), so that slow runs can be reproduced. Single archive can be shared by all connections of
+    ``CliMultiRunner``, passed in ``provider``, such as ``{"username": ..., "password": ..., "record": archive}``.
+    """
+    def __init__(self, path=None, timing=0.0, DEBUG=False, verbosity=3):
+        """
+
+        :param path: Path of the archive file, loaded if it exists
+        :param float timing: Factor of recorded times emulated by replay, ``0.0`` (default) replays without delays
+        :param bool DEBUG: Enables/disables debugging output
+        """
+        self.path = pathlib.Path(path) if path is not None else None
+        self.timing = timing
+        self.logger = get_logger(name="SessionArchive", DEBUG=DEBUG, verbosity=verbosity)
+        self.devices = {}
+        self.outputs = []
+        self._output_ids = {}
+        self._cursors = {}
+        self._index = {}
+        self._lock = threading.Lock()
+        if self.path is not None and self.path.exists():
+            self.load()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if self.path is not None:
+            self.save()
+
+    def __contains__(self, ip):
+        return ip in self.devices
+
+    def __len__(self):
+        return len(self.devices)
+
+    @property
+    def ips(self):
+        """
+        IP addresses of the recorded devices.
+        """
+        return list(self.devices)
+
+    def _device(self, ip):
+        if ip not in self.devices:
+            self.devices[ip] = {"prompt": None, "connect_time": 0.0, "commands": []}
+        return self.devices[ip]
+
+    def add_device(self, ip, connect_time):
+        """
+        Records new session to device ``ip``. Commands of previous sessions to the same device are kept.
+
+        :param str ip: IP address of the device
+        :param float connect_time: Time in seconds it took to connect
+        :return: ``None``
+        """
+        with self._lock:
+            self._device(ip)["connect_time"] = connect_time
+
+    def set_prompt(self, ip, prompt):
+        """
+        Records the last prompt of device ``ip``.
+        """
+        with self._lock:
+            self._device(ip)["prompt"] = prompt
+
+    def add(self, ip, command, output, elapsed):
+        """
+        Records ``command`` sent to device ``ip``.
+
+        :param str ip: IP address of the device
+        :param str command: Command sent to the device
+        :param str output: Output of the command
+        :param float elapsed: Time in seconds it took to receive the output
+        :return: ``None``
+        """
+        with self._lock:
+            output_id = self._output_ids.get(output)
+            if output_id is None:
+                output_id = self._output_ids[output] = len(self.outputs)
+                self.outputs.append(output)
+            self._device(ip)["commands"].append([command, output_id, round(elapsed, 6)])
+            self._index.pop(ip, None)
+
+    def replay(self, ip, command):
+        """
+        Returns recorded output of ``command`` of device ``ip``. If the command was sent multiple times, the outputs are returned in the
+        recorded order and the last one is repeated after that.
+
+        :param str ip: IP address of the device
+        :param str command: Command sent to the device
+        :return: Tuple of output and recorded time, ``(None, 0.0)`` if the command was not recorded
+        """
+        with self._lock:
+            if ip not in self._index:
+                # Records of each command of the device, built on first replay
+                index = self._index[ip] = {}
+                for record in self.devices.get(ip, {}).get("commands", []):
+                    index.setdefault(record[0], []).append(record)
+            records = self._index[ip].get(command)
+            if not records:
+                return None, 0.0
+            cursor = self._cursors.get((ip, command), 0)
+            self._cursors[(ip, command)] = cursor + 1
+        _, output_id, elapsed = records[min(cursor, len(records) - 1)]
+        return self.outputs[output_id], elapsed
+
+    def rewind(self):
+        """
+        Restarts replay of all devices from their first recorded commands.
+
+        :return: ``None``
+        """
+        with self._lock:
+            self._cursors = {}
+
+    def stats(self):
+        """
+        Returns number of recorded devices, commands and unique outputs, size of all outputs and size of the compressed archive in bytes.
+        """
+        with self._lock:
+            raw_size = sum(len(self.outputs[x[1]].encode("utf-8")) for device in self.devices.values() for x in device["commands"])
+            return {
+                "devices": len(self.devices),
+                "commands": sum(len(x["commands"]) for x in self.devices.values()),
+                "outputs": len(self.outputs),
+                "raw_size": raw_size,
+                "size": len(self._dump())
+            }
+
+    def _dump(self):
+        data = {"version": ARCHIVE_VERSION, "outputs": self.outputs, "devices": self.devices}
+        return gzip.compress(json.dumps(data, separators=(",", ":")).encode("utf-8"), mtime=0)
+
+    def save(self, path=None):
+        """
+        Saves the archive.
+
+        :param path: Path of the archive file, defaults to ``self.path``
+        :return: ``None``
+        """
+        path = pathlib.Path(path) if path is not None else self.path
+        with self._lock:
+            data = self._dump()
+        path.write_bytes(data)
+        self.logger.info(msg="Saved {} devices to archive {} ({} bytes).".format(len(self.devices), path, len(data)))
+
+    def load(self, path=None):
+        """
+        Loads the archive, replacing recorded sessions.
+
+        :param path: Path of the archive file, defaults to ``self.path``
+        :return: ``None``
+        """
+        path = pathlib.Path(path) if path is not None else self.path
+        data = json.loads(gzip.decompress(path.read_bytes()).decode("utf-8"))
+        if data.get("version") != ARCHIVE_VERSION:
+            self.logger.error(msg="Unsupported version of archive {}: {}".format(path, data.get("version")))
+            return
+        with self._lock:
+            self.outputs = data["outputs"]
+            self.devices = data["devices"]
+            self._output_ids = {output: i for i, output in enumerate(self.outputs)}
+            self._cursors = {}
+            self._index = {}
+        self.logger.info(msg="Loaded {} devices from archive {}.".format(len(self.devices), path))
+
+
+class RecordingConnection(object):
+    """
+    Wrapper of netmiko connection, recording the outputs of ``send_command()`` and the prompt to ``SessionArchive``.
+    Other attributes are delegated to the netmiko connection.
+    """
+    def __init__(self, device, archive, ip, connect_time=0.0):
+        """
+
+        :param device: Netmiko connection
+        :param SessionArchive archive: Archive to record to
+        :param str ip: IP address of the device
+        :param float connect_time: Time in seconds it took to connect
+        """
+        self.device = device
+        self.archive = archive
+        self.ip = ip
+        archive.add_device(ip=ip, connect_time=connect_time)
+
+    def __getattr__(self, name):
+        if name == "device":
+            raise AttributeError(name)
+        return getattr(self.device, name)
+
+    def find_prompt(self, *args, **kwargs):
+        prompt = self.device.find_prompt(*args, **kwargs)
+        self.archive.set_prompt(ip=self.ip, prompt=prompt)
+        return prompt
+
+    def send_command(self, command_string, *args, **kwargs):
+        start_time = timeit.default_timer()
+        output = self.device.send_command(command_string, *args, **kwargs)
+        self.archive.add(ip=self.ip, command=command_string, output=output, elapsed=timeit.default_timer() - start_time)
+        return output
+
+
+class ReplayConnection(object):
+    """
+    Replacement of netmiko connection, serving outputs recorded in ``SessionArchive``. Commands which were not recorded are answered
+    by `% Invalid input`, so ``_command_handler`` falls back to the next variant of the command, as it did in the recorded session.
+    """
+    def __init__(self, archive, ip):
+        """
+
+        :param SessionArchive archive: Archive to replay from
+        :param str ip: IP address of the device
+        """
+        self.archive = archive
+        self.ip = ip
+        self.prompt = archive.devices[ip]["prompt"]
+        self.alive = True
+        if archive.timing:
+            time.sleep(archive.devices[ip]["connect_time"] * archive.timing)
+
+    def is_alive(self):
+        return self.alive
+
+    def find_prompt(self, *args, **kwargs):
+        return self.prompt
+
+    def enable(self, *args, **kwargs):
+        return ""
+
+    def exit_enable_mode(self, *args, **kwargs):
+        return ""
+
+    def establish_connection(self, *args, **kwargs):
+        self.alive = True
+
+    def session_preparation(self):
+        pass
+
+    def disconnect(self):
+        self.alive = False
+
+    def send_command(self, command_string, *args, **kwargs):
+        output, elapsed = self.archive.replay(ip=self.ip, command=command_string)
+        if self.archive.timing:
+            time.sleep(elapsed * self.archive.timing)
+        return output if output is not None else INVALID_INPUT
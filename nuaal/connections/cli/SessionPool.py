@@ -0,0 +1,156 @@
+from nuaal.utils import get_logger
+import threading
+import timeit
+
+
+class SessionPool(object):
+    """
+    Pool of authenticated netmiko sessions, kept open between connections to the same device. ``CliBaseConnection`` with ``pool``
+    leases the session from the pool when connecting and returns it when disconnecting, instead of opening new SSH session with its
+    handshake, login and prompt detection each time. Sessions are keyed by device (IP address, port, username and connection method).
+
+    Sessions idle for more than ``idle_timeout`` seconds are closed and every session is health-checked by ``is_alive()`` before it is
+    leased again. At most ``max_per_device`` sessions (leased and idle) are open to single device, further leases wait for a session
+    to be returned. Single pool can be shared by all connections and by subsequent runs of ``CliMultiRunner``, such as periodic
+    polling jobs, and should be closed by ``close()`` (or by leaving ``with SessionPool() as pool:``) when no longer needed.
+    """
+    def __init__(self, max_per_device=1, idle_timeout=300.0, lease_timeout=None, DEBUG=False, verbosity=3):
+        """
+
+        :param int max_per_device: Maximal number of sessions to single device
+        :param float idle_timeout: Seconds after which idle session is closed, ``None`` keeps idle sessions open until ``close()``
+        :param float lease_timeout: Maximal seconds connections wait for session to device, ``None`` (default) waits indefinitely
+        :param bool DEBUG: Enables/disables debugging output
+        """
+        self.max_per_device = max_per_device
+        self.idle_timeout = idle_timeout
+        self.lease_timeout = lease_timeout
+        self.logger = get_logger(name="SessionPool", DEBUG=DEBUG, verbosity=verbosity)
+        self.closed = False
+        self.counters = {"created": 0, "reused": 0, "expired": 0, "failed_checks": 0}
+        self._idle = {}
+        self._leased = {}
+        self._condition = threading.Condition()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def _expire(self, now):
+        """
+        Removes sessions idle for more than ``self.idle_timeout`` seconds. Must be called with ``self._condition`` held.
+
+        :return: List of expired sessions to disconnect
+        """
+        expired = []
+        if self.idle_timeout is None:
+            return expired
+        for key in list(self._idle):
+            sessions = [x for x in self._idle[key] if now - x[1] <= self.idle_timeout]
+            expired.extend(x[0] for x in self._idle[key] if now - x[1] > self.idle_timeout)
+            if sessions:
+                self._idle[key] = sessions
+            else:
+                del self._idle[key]
+        self.counters["expired"] += len(expired)
+        return expired
+
+    def _disconnect(self, sessions):
+        for session in sessions:
+            try:
+                session.disconnect()
+            except Exception as e:
+                self.logger.debug(msg="Failed to disconnect session. Exception: {}".format(repr(e)))
+
+    def lease(self, key, timeout=None):
+        """
+        Leases session to device ``key``. Waits until the number of sessions to the device is lower than ``self.max_per_device``.
+        Returns idle session which passed the health check, or ``None``, in which case the caller opens new session and passes it to
+        ``release()`` (or ``None`` if it failed to connect) when done, so the session is counted against ``self.max_per_device``.
+
+        :param tuple key: Key of the device, such as ``(ip, port, username, device_type)``
+        :param float timeout: Maximal seconds to wait for the session, ``None`` waits indefinitely
+        :return: Netmiko connection or ``None``
+        """
+        with self._condition:
+            if not self._condition.wait_for(lambda: self._leased.get(key, 0) < self.max_per_device, timeout=timeout):
+                raise TimeoutError("No session to device {} was released in {} seconds.".format(key, timeout))
+            self._leased[key] = self._leased.get(key, 0) + 1
+            expired = self._expire(now=timeit.default_timer())
+        self._disconnect(expired)
+        while True:
+            with self._condition:
+                idle = self._idle.get(key)
+                if not idle:
+                    self.counters["created"] += 1
+                    return None
+                # The most recently used session is the least likely to be closed by the device
+                session = idle.pop()[0]
+                if not idle:
+                    del self._idle[key]
+            try:
+                if session.is_alive():
+                    with self._condition:
+                        self.counters["reused"] += 1
+                    self.logger.debug(msg="Reusing session to device {}".format(key))
+                    return session
+            except Exception as e:
+                self.logger.debug(msg="Health check of session to device {} failed. Exception: {}".format(key, repr(e)))
+            with self._condition:
+                self.counters["failed_checks"] += 1
+            self._disconnect([session])
+
+    def release(self, key, session):
+        """
+        Returns session leased by ``lease()`` to the pool. Unless the pool is closed, the session is kept open for next lease.
+
+        :param tuple key: Key of the device
+        :param session: Netmiko connection, ``None`` if no session was opened
+        :return: ``None``
+        """
+        with self._condition:
+            self._leased[key] -= 1
+            if not self._leased[key]:
+                del self._leased[key]
+            if session is not None and not self.closed:
+                self._idle.setdefault(key, []).append((session, timeit.default_timer()))
+                session = None
+            expired = self._expire(now=timeit.default_timer())
+            self._condition.notify_all()
+        self._disconnect(expired + ([session] if session is not None else []))
+
+    def discard(self, key, session):
+        """
+        Returns leased session which is not usable anymore, the session is closed and not kept in the pool.
+
+        :param tuple key: Key of the device
+        :param session: Netmiko connection, ``None`` if no session was opened
+        :return: ``None``
+        """
+        if session is not None:
+            self._disconnect([session])
+        self.release(key=key, session=None)
+
+    def stats(self):
+        """
+        Returns numbers of created, reused, expired and health-check failed sessions and numbers of currently idle and leased sessions.
+        """
+        with self._condition:
+            return dict(
+                self.counters, idle=sum(len(x) for x in self._idle.values()), leased=sum(self._leased.values())
+            )
+
+    def close(self):
+        """
+        Closes all idle sessions. Sessions leased at the time are closed when released.
+
+        :return: ``None``
+        """
+        with self._condition:
+            self.closed = True
+            sessions = [x[0] for sessions in self._idle.values() for x in sessions]
+            self._idle = {}
+        self._disconnect(sessions)
+        self.logger.info(msg="Closed {} idle sessions.".format(len(sessions)))
@@ -1,7 +1,12 @@
 import logging
+from nuaal.connections.cli.SessionArchive import SessionArchive
+from nuaal.connections.cli.SessionPool import SessionPool
+from nuaal.connections.cli.CommandCache import CommandCache
 from nuaal.connections.cli.CliBase import CliBaseConnection
 from nuaal.connections.cli.Cisco_IOS_Cli import Cisco_IOS_Cli
 from nuaal.connections.cli.CliMultiRunner import CliMultiRunner
+from nuaal.connections.cli.AsyncCliRunner import AsyncCliRunner, AsyncCliConnection
 from nuaal.connections.cli.GetCliHandler import GetCliHandler
 # Disable error logging for Paramiko library
 logging.getLogger("paramiko").setLevel(logging.CRITICAL)
+logging.getLogger("asyncssh").setLevel(logging.CRITICAL)
@@ -28,9 +28,9 @@ class CliTopology(Topology):
 
     def build_topology(self, data):
         if isinstance(data, list):
-            data = {x["hostname"]: x["neighbors"] for x in data}
+            data = {x["hostname"]: x.get("neighbors", []) for x in data}
         elif isinstance(data, dict):
-            data = {k: data[k]["neighbors"] for k in data.keys()}
+            data = {k: data[k].get("neighbors", []) for k in data.keys()}
         
         self.logger.info(msg="Building topology based on {} visited devices.".format(len(data)))
         all_nodes = []
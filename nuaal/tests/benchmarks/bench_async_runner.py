@@ -0,0 +1,47 @@
+"""
+Benchmark of collecting data from many simulated devices by ``AsyncCliRunner`` (all sessions in single event loop) and ``CliMultiRunner``
+(one netmiko session per worker thread). The devices are run by ``DeviceSimulator`` in separate thread, answering every command
+after ``latency`` seconds with sample outputs of tests. Reports devices/s, 95th percentile of session time and peak RSS of the process.
+
+Usage: python -m nuaal.tests.benchmarks.bench_async_runner [devices] [--threads]
+"""
+import logging
+import sys
+import timeit
+from nuaal.connections.cli import AsyncCliRunner, CliMultiRunner
+from nuaal.connections.cli.AsyncCliRunner import asyncssh
+from nuaal.tests.simulator import DeviceSimulator
+
+ACTIONS = ["get_vlans", "get_neighbors", "get_interfaces", "get_interfaces_status", "get_trunks", "get_version"]
+PROVIDER = {"username": "admin", "password": "admin"}
+
+
+def measure(name, runner_factory, devices, latency):
+    with DeviceSimulator(devices=devices, latency=latency, verbosity=0) as simulator:
+        start_time = timeit.default_timer()
+        runner = runner_factory(simulator.ips, simulator.port)
+        runner.run()
+        total_time = timeit.default_timer() - start_time
+    stats = simulator.stats()
+    print("{:<16} {:>5} devices ({} failed) in {:>8.0f} ms, {:>7.1f} devices/s, p95 {:>6.0f} ms per device, max RSS {:>8.1f} MB".format(
+        name, len(runner.data), len(runner.error_hosts), total_time * 1000, len(runner.data) / total_time, (stats["p95"] or 0) * 1000,
+        stats["max_rss"] or 0
+    ))
+
+
+def main(devices=200, latency=0.05, threads=False):
+    if asyncssh is None:
+        print("asyncssh is not installed")
+        return
+    logging.getLogger("asyncssh").setLevel(logging.CRITICAL)
+    measure("AsyncCliRunner", lambda ips, port: AsyncCliRunner(
+        provider=dict(PROVIDER, port=port), ips=ips, actions=ACTIONS, verbosity=0
+    ), devices=devices, latency=latency)
+    if threads:
+        measure("CliMultiRunner", lambda ips, port: CliMultiRunner(
+            provider=PROVIDER, ips=ips, actions=ACTIONS, workers=16, verbosity=0, netmiko_params={"port": port}
+        ), devices=devices, latency=latency)
+
+
+if __name__ == '__main__':
+    main(devices=int(sys.argv[1]) if len(sys.argv) > 1 and sys.argv[1].isdigit() else 200, threads="--threads" in sys.argv)
@@ -0,0 +1,34 @@
+"""
+Checks all shipped patterns for catastrophic backtracking: statically by ``RegexBuilder.analyze_pattern()`` and by measuring growth of matching
+time on adversarial inputs and on test resources repeated to growing size. Exits with 1 if any pattern failed the check.
+
+Usage: python -m nuaal.tests.benchmarks.bench_backtracking [timeout]
+"""
+import os
+import pathlib
+import sys
+import timeit
+from nuaal.definitions import DATA_PATH
+from nuaal.Parsers.RegexBuilder import RegexBuilder
+
+CORPUS_PATH = str(pathlib.Path(__file__).parent.parent.joinpath("resources"))
+
+
+def main(timeout=10.0):
+    failed = 0
+    for device_type in sorted(os.listdir(os.path.join(DATA_PATH, "patterns"))):
+        start_time = timeit.default_timer()
+        results = RegexBuilder(device_type=device_type, verbosity=0).check_patterns(corpus_path=CORPUS_PATH, timeout=timeout)
+        worst = max((x for x in results if x["growth"]["exponent"] is not None), key=lambda x: x["growth"]["exponent"], default=None)
+        print("{}: checked {} patterns in {:.1f} s, worst growth exponent {}".format(
+            device_type, len(results), timeit.default_timer() - start_time, worst["growth"]["exponent"] if worst else None
+        ))
+        for result in results:
+            if not result["ok"]:
+                failed += 1
+                print("  FAILED {} {}: {} {}\n    {}".format(result["command"], result["location"], result["issues"], result["growth"], result["pattern"]))
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(timeout=float(sys.argv[1]) if len(sys.argv) > 1 else 10.0))
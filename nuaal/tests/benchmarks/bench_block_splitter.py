@@ -0,0 +1,57 @@
+"""
+Benchmark of splitting synthetic `show interfaces` and `show cdp neighbors detail` outputs to blocks, comparing the previous level0
+regex patterns with ``BlockSplitter``.
+
+Usage: python -m nuaal.tests.benchmarks.bench_block_splitter [interfaces]
+"""
+import pathlib
+import re
+import sys
+import timeit
+from nuaal.Parsers.Extractors import BlockSplitter
+
+LEGACY_PATTERN = re.compile(r"^\S+.*\n(?:^.*(?:\n)?)+?(?=^\S+|\Z)", flags=re.MULTILINE)
+LEGACY_CDP_PATTERN = re.compile(r"Device ID:.*?\n(?:.*?)(?=-{10,50}|\n\n\n)", flags=re.DOTALL)
+
+
+def get_resource(name):
+    return pathlib.Path(__file__).parent.parent.joinpath("resources/{}.txt".format(name)).read_text()
+
+
+def generate_show_interfaces(interfaces):
+    resource = get_resource("cisco_ios_show_interfaces_01")
+    template = resource[resource.index("GigabitEthernet1/0/2 "):]
+    return "".join(template.replace("GigabitEthernet1/0/2 ", "GigabitEthernet{}/0/{} ".format(i // 48 + 1, i % 48 + 1), 1) for i in range(interfaces))
+
+
+def generate_show_cdp_neighbors_detail(neighbors):
+    resource = get_resource("cisco_ios_show_cdp_neighbors_detail_01")
+    return resource[:resource.index("\n\nTotal") + 1] * (neighbors // 3) + "\n\n"
+
+
+def compare(name, text, legacy_pattern, splitter, repeat):
+    assert [x.rstrip() for x in legacy_pattern.findall(text)] == [x.rstrip() for x in splitter.extract(text)]
+    legacy = min(timeit.repeat(lambda: legacy_pattern.findall(text), number=1, repeat=repeat))
+    current = min(timeit.repeat(lambda: splitter.extract(text), number=1, repeat=repeat))
+    print("{}: legacy {:.1f} ms, splitter {:.1f} ms, speedup {:.2f}x".format(name, legacy * 1000, current * 1000, legacy / current))
+
+
+def main(interfaces=500, repeat=5):
+    compare(
+        name="show interfaces ({} interfaces)".format(interfaces),
+        text=generate_show_interfaces(interfaces=interfaces),
+        legacy_pattern=LEGACY_PATTERN,
+        splitter=BlockSplitter(splitter="unindented"),
+        repeat=repeat
+    )
+    compare(
+        name="show cdp neighbors detail ({} neighbors)".format(interfaces),
+        text=generate_show_cdp_neighbors_detail(neighbors=interfaces),
+        legacy_pattern=LEGACY_CDP_PATTERN,
+        splitter=BlockSplitter(splitter="prefix", prefix="Device ID:", end="----------"),
+        repeat=repeat
+    )
+
+
+if __name__ == '__main__':
+    main(interfaces=int(sys.argv[1]) if len(sys.argv) > 1 else 500)
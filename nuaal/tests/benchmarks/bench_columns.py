@@ -0,0 +1,37 @@
+"""
+Benchmark of memory retained by parsed results of large synthetic outputs, comparing list of dictionaries with columnar layout
+(``autoparse(..., layout="columns")``), and time of filtering both layouts with ``Filter``.
+
+Usage: python -m nuaal.tests.benchmarks.bench_columns [rows]
+"""
+import sys
+import timeit
+from nuaal.Parsers import CiscoIOSParser
+from nuaal.utils import Filter
+from nuaal.tests.benchmarks.bench_records import measure
+from nuaal.tests.benchmarks.bench_table import generate_mac_table, generate_interfaces_status
+
+
+def main(rows=100000):
+    parser = CiscoIOSParser(verbosity=0)
+    for command, generator, row_filter in [
+        ("show mac address-table", generate_mac_table, Filter(required={"type": "DYNAMIC"}, excluded={"ports": ["Gi1/0/1", "Gi2/0/2"]})),
+        ("show interfaces status", generate_interfaces_status, Filter(required={"status": "connected"}))
+    ]:
+        text = generator(rows)
+        parser.patterns[command]
+        dicts = measure(lambda: parser.autoparse(text=text, command=command))
+        columns = measure(lambda: parser.autoparse(text=text, command=command, layout="columns"))
+        assert list(columns[0].iter_rows()) == dicts[0]
+        filtered = row_filter.columns_cleanup(data=columns[0])
+        assert list(filtered.iter_rows()) == list(row_filter.iter_cleanup(data=dicts[0]))
+        rows_filter_time = min(timeit.repeat(lambda: list(row_filter.iter_cleanup(data=dicts[0])), number=1, repeat=3))
+        columns_filter_time = min(timeit.repeat(lambda: row_filter.columns_cleanup(data=columns[0]), number=1, repeat=3))
+        print("{} ({} rows, {} filtered): rows {:.0f} B/entry, filtered in {:.0f} ms, columns {:.0f} B/entry, filtered in {:.0f} ms".format(
+            command, rows, filtered.length, dicts[2] / rows, rows_filter_time * 1000, columns[2] / rows, columns_filter_time * 1000
+        ))
+        del dicts, columns
+
+
+if __name__ == '__main__':
+    main(rows=int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
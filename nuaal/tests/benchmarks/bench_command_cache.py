@@ -0,0 +1,51 @@
+"""
+Benchmark of ``CommandCache`` against simulated older platforms, which support only the second variants of `show vlan brief` and
+`show mac address-table`. Collects the devices by ``CliMultiRunner`` with and without the cache and reports the number of commands
+answered by the simulator and the time of the collection.
+
+Usage: python -m nuaal.tests.benchmarks.bench_command_cache [devices]
+"""
+import argparse
+import logging
+import pathlib
+import sys
+import tempfile
+import timeit
+from nuaal.connections.cli import CliMultiRunner, CommandCache
+from nuaal.tests.simulator import DeviceSimulator, default_outputs
+
+ACTIONS = ["get_vlans", "get_version"]
+PROVIDER = {"username": "admin", "password": "admin"}
+RESOURCES_PATH = pathlib.Path(__file__).parent.parent.joinpath("resources")
+
+
+def measure(name, devices, workers, latency, command_cache=None):
+    outputs = dict(default_outputs(), **{"show vlan-switch brief": RESOURCES_PATH.joinpath("cisco_ios_show_vlan_brief_01.txt").read_text()})
+    with DeviceSimulator(devices=devices, latency=latency, outputs=outputs, unsupported=["show vlan brief"], verbosity=0) as simulator:
+        start_time = timeit.default_timer()
+        runner = CliMultiRunner(
+            provider=PROVIDER, ips=simulator.ips, actions=ACTIONS, workers=workers, verbosity=0, netmiko_params={"port": simulator.port},
+            command_cache=command_cache
+        )
+        runner.run()
+        total_time = timeit.default_timer() - start_time
+    print("{:<14} {:>5} devices in {:>8.0f} ms, {:>6} commands".format(name, len(runner.data), total_time * 1000, simulator.stats()["commands"]))
+
+
+def main(argv=None):
+    argument_parser = argparse.ArgumentParser(description="Benchmark of collection with and without command cache.")
+    argument_parser.add_argument("devices", type=int, nargs="?", default=50, help="Number of simulated devices")
+    argument_parser.add_argument("--workers", type=int, default=16, help="Worker threads of CliMultiRunner")
+    argument_parser.add_argument("--latency", type=float, default=0.2, help="Seconds before output of each command")
+    args = argument_parser.parse_args(argv)
+    logging.getLogger("asyncssh").setLevel(logging.CRITICAL)
+    measure("Without cache", devices=args.devices, workers=args.workers, latency=args.latency)
+    with tempfile.TemporaryDirectory() as directory:
+        command_cache = CommandCache(path=pathlib.Path(directory).joinpath("commands.json"), verbosity=0)
+        measure("CommandCache", devices=args.devices, workers=args.workers, latency=args.latency, command_cache=command_cache)
+        measure("Learned cache", devices=args.devices, workers=args.workers, latency=args.latency, command_cache=command_cache)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
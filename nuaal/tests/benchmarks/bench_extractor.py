@@ -0,0 +1,53 @@
+"""
+Benchmark of ``ParserModule.match_single_pattern`` on synthetic `show mac address-table` output, comparing the previous implementation
+(``re.search`` followed by ``re.finditer`` and ``int()`` attempt on every group) with ``PatternExtractor``.
+
+Usage: python -m nuaal.tests.benchmarks.bench_extractor [lines]
+"""
+import re
+import sys
+import timeit
+from nuaal.Parsers import CiscoIOSParser
+from nuaal.Parsers.Extractors import PatternExtractor
+
+
+def generate_mac_table(lines):
+    rows = ["Vlan    Mac Address       Type        Ports", "----    -----------       --------    -----"]
+    for i in range(lines):
+        rows.append(" {:>3}    0050.{:04x}.{:04x}    DYNAMIC     Gi{}/0/{}".format(i % 4000 + 1, i >> 16, i & 0xffff, i % 8 + 1, i % 48 + 1))
+    return "\n".join(rows) + "\n"
+
+
+def legacy_match_single_pattern(text, pattern):
+    if not re.search(pattern=pattern, string=text):
+        return []
+    named_groups = [x for x in pattern.groupindex.keys() if isinstance(x, str)]
+    if len(named_groups) == 0:
+        return re.findall(pattern=pattern, string=text)
+    else:
+        entries = []
+        for m in re.finditer(pattern=pattern, string=text):
+            entry = {}
+            for group_name in named_groups:
+                try:
+                    entry[group_name] = int(m.group(group_name))
+                except (ValueError, TypeError):
+                    entry[group_name] = m.group(group_name)
+                except IndexError:
+                    entry[group_name] = None
+            entries.append(entry)
+        return entries
+
+
+def main(lines=50000, repeat=5):
+    parser = CiscoIOSParser(verbosity=0)
+    text = generate_mac_table(lines=lines)
+    extractor = [x for x in parser.patterns["show mac address-table"]["level0"] if isinstance(x, PatternExtractor)][0]
+    assert legacy_match_single_pattern(text, extractor.regex) == parser.match_single_pattern(text, extractor)
+    legacy = min(timeit.repeat(lambda: legacy_match_single_pattern(text, extractor.regex), number=1, repeat=repeat))
+    current = min(timeit.repeat(lambda: parser.match_single_pattern(text, extractor), number=1, repeat=repeat))
+    print("{} lines: legacy {:.1f} ms, extractor {:.1f} ms, speedup {:.2f}x".format(lines, legacy * 1000, current * 1000, legacy / current))
+
+
+if __name__ == '__main__':
+    main(lines=int(sys.argv[1]) if len(sys.argv) > 1 else 50000)
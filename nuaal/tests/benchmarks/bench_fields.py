@@ -0,0 +1,30 @@
+"""
+Benchmark of field projection, parsing synthetic `show interfaces` output with all fields and with only a few of them.
+
+Usage: python -m nuaal.tests.benchmarks.bench_fields [interfaces]
+"""
+import sys
+import timeit
+from nuaal.Parsers import CiscoIOSParser
+from nuaal.tests.benchmarks.bench_block_splitter import generate_show_interfaces
+
+PROJECTIONS = [
+    ["name", "status", "lineProtocol"],
+    ["name", "status", "lineProtocol", "description", "hardware", "mac", "duplex", "bandwidth", "ipv4Address", "ipv4Mask"]
+]
+
+
+def main(interfaces=500, repeat=5):
+    parser = CiscoIOSParser(verbosity=0)
+    command = "show interfaces"
+    text = generate_show_interfaces(interfaces)
+    legacy = min(timeit.repeat(lambda: parser.autoparse(text=text, command=command), number=1, repeat=repeat))
+    for fields in PROJECTIONS:
+        current = min(timeit.repeat(lambda: parser.autoparse(text=text, command=command, fields=fields), number=1, repeat=repeat))
+        print("{} ({} interfaces, {} fields): all fields {:.1f} ms, projection {:.1f} ms, speedup {:.2f}x".format(
+            command, interfaces, len(fields), legacy * 1000, current * 1000, legacy / current
+        ))
+
+
+if __name__ == '__main__':
+    main(interfaces=int(sys.argv[1]) if len(sys.argv) > 1 else 500)
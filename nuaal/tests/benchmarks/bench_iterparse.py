@@ -0,0 +1,40 @@
+"""
+Benchmark of peak memory of parsing large synthetic outputs, comparing ``autoparse()`` with consuming ``iterparse()`` entry by entry.
+
+Usage: python -m nuaal.tests.benchmarks.bench_iterparse [rows]
+"""
+import sys
+import timeit
+import tracemalloc
+from nuaal.Parsers import CiscoIOSParser
+from nuaal.tests.benchmarks.bench_table import generate_mac_table, generate_interfaces_status
+
+
+def measure(function):
+    tracemalloc.start()
+    start_time = timeit.default_timer()
+    count = function()
+    total_time = timeit.default_timer() - start_time
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return count, total_time, peak
+
+
+def main(rows=200000):
+    parser = CiscoIOSParser(verbosity=0)
+    for command, generator in [
+        ("show mac address-table", generate_mac_table),
+        ("show interfaces status", generate_interfaces_status)
+    ]:
+        text = generator(rows)
+        parser.patterns[command]
+        legacy = measure(lambda: len(parser.autoparse(text=text, command=command)))
+        current = measure(lambda: sum(1 for _ in parser.iterparse(text=text, command=command)))
+        assert legacy[0] == current[0] == rows
+        print("{} ({} rows, {:.1f} MB of text): autoparse {:.1f} MB peak in {:.0f} ms, iterparse {:.1f} MB peak in {:.0f} ms".format(
+            command, rows, len(text) / 2 ** 20, legacy[2] / 2 ** 20, legacy[1] * 1000, current[2] / 2 ** 20, current[1] * 1000
+        ))
+
+
+if __name__ == '__main__':
+    main(rows=int(sys.argv[1]) if len(sys.argv) > 1 else 200000)
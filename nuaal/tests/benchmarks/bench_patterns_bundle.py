@@ -0,0 +1,48 @@
+"""
+Benchmark of ``CiscoIOSParser`` construction in a fresh interpreter (as in short-lived cron jobs), comparing eager compilation
+of JSON pattern modules with loading of warm ``PatternsBundle``.
+
+Usage: python -m nuaal.tests.benchmarks.bench_patterns_bundle [runs]
+"""
+import statistics
+import subprocess
+import sys
+
+SNIPPET = """
+import timeit
+from nuaal.Parsers import CiscoIOSParser
+start_time = timeit.default_timer()
+parser = CiscoIOSParser(verbosity=0, {params})
+construct_time = timeit.default_timer() - start_time
+parser.autoparse(text="", command="show version")
+print(construct_time, timeit.default_timer() - start_time)
+"""
+
+MODES = {
+    "json_eager": "lazy=False",
+    "json_lazy": "lazy=True",
+    "bundle_eager": "lazy=False, use_bundle=True",
+    "bundle_lazy": "lazy=True, use_bundle=True",
+}
+
+
+def run(params):
+    output = subprocess.check_output([sys.executable, "-c", SNIPPET.format(params=params)], stderr=subprocess.DEVNULL)
+    return [float(x) * 1000 for x in output.split()]
+
+
+def main(runs=10):
+    from nuaal.Parsers import PatternsBundle
+    PatternsBundle(device_type="cisco_ios").build()
+    print("{:<12} {:>16} {:>24}".format("mode", "construct [ms]", "construct+parse [ms]"))
+    for mode, params in MODES.items():
+        results = [run(params) for _ in range(runs)]
+        print("{:<12} {:>16.3f} {:>24.3f}".format(
+            mode,
+            statistics.median(x[0] for x in results),
+            statistics.median(x[1] for x in results)
+        ))
+
+
+if __name__ == '__main__':
+    main(runs=int(sys.argv[1]) if len(sys.argv) > 1 else 10)
@@ -0,0 +1,72 @@
+"""
+Benchmark of wall time of collecting outputs from simulated devices, comparing parsing of each output before the next command is sent
+with parsing in ``ParsePipeline`` while the connection waits for the next output. Every command takes ``latency`` seconds on the device.
+
+Usage: python -m nuaal.tests.benchmarks.bench_pipeline [devices]
+"""
+import sys
+import threading
+import time
+import timeit
+from nuaal.Parsers import CiscoIOSParser, ParsePipeline
+from nuaal.connections.cli import Cisco_IOS_Cli
+from nuaal.tests.benchmarks.bench_suite import RESOURCES_PATH, scale_text
+
+COMMANDS = [
+    ("get_version", "show version", "cisco_ios_show_version_01"),
+    ("get_interfaces", "show interfaces", "cisco_ios_show_interfaces_01"),
+    ("get_vlans", "show vlan brief", "cisco_ios_show_vlan_brief_01"),
+    ("get_mac_address_table", "show mac address-table", "cisco_ios_show_mac_address-table_01"),
+    ("get_arp", "show ip arp", "cisco_ios_show_ip_arp_01"),
+    ("get_interfaces_status", "show interfaces status", "cisco_ios_show_interfaces_status_01"),
+    ("get_portchannels", "show etherchannel summary", "cisco_ios_show_etherchannel_summary_01"),
+    ("get_neighbors", "show cdp neighbors detail", "cisco_ios_show_cdp_neighbors_detail_01"),
+    ("get_trunks", "show interfaces trunk", "cisco_ios_show_interfaces_trunk_01"),
+    ("get_auth_sessions", "show authentication sessions", "cisco_ios_show_authentication_sessions_interface_01")
+]
+
+
+def collect(ip, parser, outputs, latency):
+    device = Cisco_IOS_Cli(ip=ip, parser=parser, verbosity=0)
+
+    def send_command(command):
+        time.sleep(latency)
+        return outputs[command]
+
+    device._send_command = send_command
+    for action, command, name in COMMANDS:
+        getattr(device, action)()
+    return device.wait_parsing()
+
+
+def run(devices, parser, outputs, latency):
+    results = [None] * devices
+    threads = [
+        threading.Thread(target=lambda i=i: results.__setitem__(i, collect(ip="192.0.2.{}".format(i), parser=parser, outputs=outputs, latency=latency)))
+        for i in range(devices)
+    ]
+    start_time = timeit.default_timer()
+    [t.start() for t in threads]
+    [t.join() for t in threads]
+    return results, timeit.default_timer() - start_time
+
+
+def main(devices=4, scale=20, latency=0.05):
+    parser = CiscoIOSParser(verbosity=0)
+    outputs = {}
+    for action, command, name in COMMANDS:
+        text = RESOURCES_PATH.joinpath("{}.txt".format(name)).read_text()
+        # Sections of `show interfaces trunk` cannot be repeated
+        outputs[command] = text if command == "show interfaces trunk" else scale_text(text=text, factor=scale)
+    inline, inline_time = run(devices=devices, parser=parser, outputs=outputs, latency=latency)
+    with ParsePipeline(parser=parser, workers=2, verbosity=0) as pipeline:
+        pipelined, pipeline_time = run(devices=devices, parser=pipeline, outputs=outputs, latency=latency)
+    assert inline == pipelined
+    io_time = len(COMMANDS) * latency
+    print("{} devices, {} commands with {:.0f} ms latency ({:.0f} ms of I/O per device): inline {:.0f} ms, pipeline {:.0f} ms".format(
+        devices, len(COMMANDS), latency * 1000, io_time * 1000, inline_time * 1000, pipeline_time * 1000
+    ))
+
+
+if __name__ == '__main__':
+    main(devices=int(sys.argv[1]) if len(sys.argv) > 1 else 4)
@@ -0,0 +1,46 @@
+"""
+Benchmark of memory retained by parsed results of large synthetic outputs, comparing dictionaries with compact records
+(``ParserModule(compact=True)``) and plain tuples of the same values, which are not interned.
+
+Usage: python -m nuaal.tests.benchmarks.bench_records [rows]
+"""
+import sys
+import timeit
+import tracemalloc
+from nuaal.Parsers import CiscoIOSParser
+from nuaal.tests.benchmarks.bench_table import generate_mac_table, generate_interfaces_status
+
+
+def measure(function):
+    tracemalloc.start()
+    start_time = timeit.default_timer()
+    result = function()
+    total_time = timeit.default_timer() - start_time
+    # Memory still held by the result, the source text was allocated before tracing started
+    retained = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, total_time, retained
+
+
+def main(rows=100000):
+    parser = CiscoIOSParser(verbosity=0)
+    compact_parser = CiscoIOSParser(compact=True, verbosity=0)
+    for command, generator in [
+        ("show mac address-table", generate_mac_table),
+        ("show interfaces status", generate_interfaces_status)
+    ]:
+        text = generator(rows)
+        parser.patterns[command]
+        compact_parser.patterns[command]
+        dicts = measure(lambda: parser.autoparse(text=text, command=command))
+        records = measure(lambda: compact_parser.autoparse(text=text, command=command))
+        tuples = measure(lambda: [tuple(x.values()) for x in parser.iterparse(text=text, command=command)])
+        assert dicts[0] == records[0] and len(tuples[0]) == rows
+        print("{} ({} rows): dicts {:.0f} B/entry in {:.0f} ms, records {:.0f} B/entry in {:.0f} ms, tuples {:.0f} B/entry in {:.0f} ms".format(
+            command, rows, dicts[2] / rows, dicts[1] * 1000, records[2] / rows, records[1] * 1000, tuples[2] / rows, tuples[1] * 1000
+        ))
+        del dicts, records, tuples
+
+
+if __name__ == '__main__':
+    main(rows=int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,70 @@
+"""
+Benchmark of replaying recorded CLI sessions by ``SessionArchive``: records ``devices`` simulated devices once through ``CliMultiRunner``,
+then replays the archive through the same runner without network and reports size of the archive compared to the raw outputs, time of
+the recording and of the replay (without delays and with the recorded timing) and whether the replayed data equals the recorded ones.
+
+Usage: python -m nuaal.tests.benchmarks.bench_replay [devices] [--archive sessions.json.gz]
+"""
+import argparse
+import logging
+import sys
+import timeit
+from nuaal.connections.cli import CliMultiRunner, SessionArchive
+from nuaal.tests.simulator import DeviceSimulator
+
+ACTIONS = ["get_vlans", "get_neighbors", "get_interfaces", "get_trunks", "get_version", "get_license", "get_inventory"]
+PROVIDER = {"username": "admin", "password": "admin"}
+
+
+def collect(ips, workers, **kwargs):
+    """
+    Collects data of ``ips`` by ``CliMultiRunner``.
+
+    :return: Tuple of the runner and time in seconds
+    """
+    start_time = timeit.default_timer()
+    runner = CliMultiRunner(ips=ips, actions=ACTIONS, workers=workers, verbosity=0, **kwargs)
+    runner.run()
+    return runner, timeit.default_timer() - start_time
+
+
+def report(name, runner, total_time):
+    print("{:<18} {:>5} devices ({} failed) in {:>8.0f} ms, {:>8.1f} devices/s".format(
+        name, len(runner.data), len(runner.error_hosts), total_time * 1000, len(runner.data) / total_time
+    ))
+
+
+def main(argv=None):
+    argument_parser = argparse.ArgumentParser(description="Benchmark of record and replay of CLI sessions.")
+    argument_parser.add_argument("devices", type=int, nargs="?", default=100, help="Number of simulated devices")
+    argument_parser.add_argument("--workers", type=int, default=16, help="Worker threads of CliMultiRunner")
+    argument_parser.add_argument("--latency", type=float, default=0.02, help="Seconds before output of each command")
+    argument_parser.add_argument("--archive", default=None, help="Path to save the recorded archive to")
+    args = argument_parser.parse_args(argv)
+    logging.getLogger("asyncssh").setLevel(logging.CRITICAL)
+
+    archive = SessionArchive(verbosity=0)
+    with DeviceSimulator(devices=args.devices, latency=args.latency, verbosity=0) as simulator:
+        recorder, total_time = collect(
+            ips=simulator.ips, workers=args.workers, provider=dict(PROVIDER, record=archive), netmiko_params={"port": simulator.port}
+        )
+    report("Record (simulator)", recorder, total_time)
+    stats = archive.stats()
+    print("Archive: {} devices, {} commands, {} unique outputs, {:.1f} kB of outputs stored in {:.1f} kB ({:.1f}x)".format(
+        stats["devices"], stats["commands"], stats["outputs"], stats["raw_size"] / 1024, stats["size"] / 1024, stats["raw_size"] / stats["size"]
+    ))
+    if args.archive is not None:
+        archive.save(args.archive)
+
+    recorded = sorted(recorder.data, key=lambda x: x["ipAddress"])
+    for name, timing in [("Replay", 0.0), ("Replay (timing)", 1.0)]:
+        archive.rewind()
+        archive.timing = timing
+        replayer, total_time = collect(ips=simulator.ips, workers=args.workers, provider=dict(PROVIDER, replay=archive))
+        report(name, replayer, total_time)
+        print("{:<18} data equal to recorded: {}".format("", recorded == sorted(replayer.data, key=lambda x: x["ipAddress"])))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
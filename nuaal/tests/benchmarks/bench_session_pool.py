@@ -0,0 +1,50 @@
+"""
+Benchmark of repeated polling of simulated devices by ``CliMultiRunner`` with and without ``SessionPool``. Runs the same collection
+``runs`` times, as periodic polling jobs do, and reports time of each run and the number of SSH sessions opened to the simulator.
+
+Usage: python -m nuaal.tests.benchmarks.bench_session_pool [devices] [--runs 5]
+"""
+import argparse
+import logging
+import sys
+import timeit
+from nuaal.connections.cli import CliMultiRunner, SessionPool
+from nuaal.tests.simulator import DeviceSimulator
+
+ACTIONS = ["get_version", "get_interfaces_status"]
+PROVIDER = {"username": "admin", "password": "admin"}
+
+
+def measure(name, devices, runs, workers, latency, pool=None):
+    with DeviceSimulator(devices=devices, latency=latency, verbosity=0) as simulator:
+        times = []
+        for _ in range(runs):
+            start_time = timeit.default_timer()
+            runner = CliMultiRunner(
+                provider=PROVIDER, ips=simulator.ips, actions=ACTIONS, workers=workers, verbosity=0, netmiko_params={"port": simulator.port},
+                pool=pool
+            )
+            runner.run()
+            times.append(timeit.default_timer() - start_time)
+        if pool is not None:
+            pool.close()
+    print("{:<14} {:>5} devices, {} runs, first {:>7.0f} ms, next {:>7.0f} ms on average, {:>5} sessions opened".format(
+        name, devices, runs, times[0] * 1000, sum(times[1:]) / max(len(times) - 1, 1) * 1000, simulator.stats()["sessions"]
+    ))
+
+
+def main(argv=None):
+    argument_parser = argparse.ArgumentParser(description="Benchmark of repeated collection with and without session pool.")
+    argument_parser.add_argument("devices", type=int, nargs="?", default=50, help="Number of simulated devices")
+    argument_parser.add_argument("--runs", type=int, default=5, help="Number of collection runs")
+    argument_parser.add_argument("--workers", type=int, default=16, help="Worker threads of CliMultiRunner")
+    argument_parser.add_argument("--latency", type=float, default=0.02, help="Seconds before output of each command")
+    args = argument_parser.parse_args(argv)
+    logging.getLogger("asyncssh").setLevel(logging.CRITICAL)
+    measure("Without pool", devices=args.devices, runs=args.runs, workers=args.workers, latency=args.latency)
+    measure("SessionPool", devices=args.devices, runs=args.runs, workers=args.workers, latency=args.latency, pool=SessionPool(verbosity=0))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
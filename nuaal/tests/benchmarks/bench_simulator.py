@@ -0,0 +1,72 @@
+"""
+Load test of the collection against ``DeviceSimulator``: runs ``AsyncCliRunner``, ``CliMultiRunner`` or ``Neighbor_Discovery`` (crawling
+the CDP tree from the first device) against ``devices`` simulated devices and reports devices/minute, percentiles of session time
+measured by the simulator, injected failures and peak RSS of the process. Scales such as 1k-10k devices are limited by the number of open
+files (`ulimit -n`), as the simulator and the runner share the process.
+
+Usage: python -m nuaal.tests.benchmarks.bench_simulator [--runner async threads discovery] [--devices 1000] [--latency 0.05]
+    [--failure drop=0.01 slow=0.05]
+"""
+import argparse
+import logging
+import sys
+import timeit
+from nuaal.connections.cli import AsyncCliRunner, CliMultiRunner
+from nuaal.discovery.Neighbor_Discovery import Neighbor_Discovery
+from nuaal.tests.simulator import DeviceSimulator
+
+ACTIONS = ["get_vlans", "get_neighbors", "get_interfaces", "get_trunks", "get_version"]
+PROVIDER = {"username": "admin", "password": "admin"}
+
+
+def run(runner, simulator, workers):
+    """
+    Collects data of all simulated devices by ``runner``.
+
+    :return: Tuple of number of collected and failed devices
+    """
+    if runner == "async":
+        collector = AsyncCliRunner(provider=dict(PROVIDER, port=simulator.port), ips=simulator.ips, actions=ACTIONS, workers=workers, verbosity=0)
+        collector.run()
+        return len(collector.data), len(collector.error_hosts)
+    netmiko_params = {"port": simulator.port}
+    if runner == "threads":
+        collector = CliMultiRunner(provider=PROVIDER, ips=simulator.ips, actions=ACTIONS, workers=workers, verbosity=0, netmiko_params=netmiko_params)
+        collector.run()
+        return len(collector.data), len(collector.error_hosts)
+    collector = Neighbor_Discovery(provider=PROVIDER, workers=workers, verbosity=0, netmiko_params=netmiko_params)
+    collector.run(ip=simulator.ips[0])
+    return len(collector.data), len(collector.failed)
+
+
+def main(argv=None):
+    argument_parser = argparse.ArgumentParser(description="Load test of the collection against simulated devices.")
+    argument_parser.add_argument("--runner", nargs="+", choices=["async", "threads", "discovery"], default=["async"], help="Collection runners")
+    argument_parser.add_argument("--devices", type=int, nargs="+", default=[1000], help="Numbers of devices")
+    argument_parser.add_argument("--workers", type=int, default=None, help="Concurrent sessions, defaults to 1000 for async and 16 otherwise")
+    argument_parser.add_argument("--latency", type=float, default=0.05, help="Seconds before output of each command")
+    argument_parser.add_argument("--jitter", type=float, default=0.0, help="Maximal random seconds added to latency")
+    argument_parser.add_argument("--failure", nargs="+", default=[], metavar="NAME=PROBABILITY", help="Injected failures, such as drop=0.01")
+    argument_parser.add_argument("--seed", type=int, default=1, help="Seed of random failures and jitter")
+    args = argument_parser.parse_args(argv)
+    logging.getLogger("asyncssh").setLevel(logging.CRITICAL)
+    failures = {name: float(probability) for name, probability in (x.split("=") for x in args.failure)}
+    print("{:<10} {:>7} {:>10} {:>7} {:>11} {:>9} {:>9} {:>9} {:>9}  {}".format(
+        "Runner", "Devices", "Collected", "Failed", "Devices/min", "p50 [ms]", "p95 [ms]", "p99 [ms]", "RSS [MB]", "Injected"
+    ))
+    for runner in args.runner:
+        for devices in args.devices:
+            with DeviceSimulator(devices=devices, latency=args.latency, jitter=args.jitter, failures=failures, seed=args.seed, verbosity=0) as simulator:
+                start_time = timeit.default_timer()
+                collected, failed = run(runner=runner, simulator=simulator, workers=args.workers or (1000 if runner == "async" else 16))
+                total_time = timeit.default_timer() - start_time
+            stats = simulator.stats()
+            print("{:<10} {:>7} {:>10} {:>7} {:>11.0f} {:>9.0f} {:>9.0f} {:>9.0f} {:>9.1f}  {}".format(
+                runner, devices, collected, failed, 60 * collected / total_time, (stats["p50"] or 0) * 1000, (stats["p95"] or 0) * 1000,
+                (stats["p99"] or 0) * 1000, stats["max_rss"] or 0, stats["failures"]
+            ))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
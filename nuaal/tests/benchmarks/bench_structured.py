@@ -0,0 +1,80 @@
+"""
+Benchmark of parsing large synthetic `show lldp neighbors detail` output of NX-OS, comparing plaintext output parsed by regex patterns
+with the same neighbors requested as `show lldp neighbors detail | json` and mapped by ``StructuredMapping``.
+
+Usage: python -m nuaal.tests.benchmarks.bench_structured [neighbors]
+"""
+import sys
+import json
+import timeit
+from nuaal.Parsers import CiscoNXOSParser
+
+
+def generate_neighbors(neighbors):
+    rows = []
+    for i in range(neighbors):
+        rows.append({
+            "chassis_type": "Mac Address",
+            "chassis_id": "00be.75{:02x}.{:04x}".format(i // 65536 % 256, i % 65536),
+            "port_type": "Interface Name",
+            "port_id": "Ethernet1/{}".format(i % 48 + 1),
+            "l_port_id": "Eth{}/{}".format(i // 48 % 8 + 1, i % 48 + 1),
+            "port_desc": "Uplink {}".format(i % 4),
+            "sys_name": "leaf-{:05d}.example.com".format(i),
+            "sys_desc": "Cisco Nexus Operating System (NX-OS) Software 9.3(8)\nTAC support: http://www.cisco.com/tac\n"
+                        "Copyright (c) 2002-2021, Cisco Systems, Inc. All rights reserved.",
+            "ttl": 90 + i % 30,
+            "system_capability": "B, R",
+            "enabled_capability": "R" if i % 3 else "B, R",
+            "mgmt_addr_type": "IPV4",
+            "mgmt_addr": "10.{}.{}.{}".format(i // 65536 % 256, i // 256 % 256, i % 256),
+            "mgmt_addr_ipv6_type": "IPV6",
+            "mgmt_addr_ipv6": "not advertised",
+            "vlan_id": "not advertised"
+        })
+    return rows
+
+
+def to_text(rows):
+    lines = [
+        "Capability codes:",
+        "  (R) Router, (B) Bridge, (T) Telephone, (C) DOCSIS Cable Device",
+        "  (W) WLAN Access Point, (P) Repeater, (S) Station, (O) Other",
+        "Device ID            Local Intf      Hold-time  Capability  Port ID",
+        ""
+    ]
+    for row in rows:
+        lines.extend([
+            "Chassis id: {}".format(row["chassis_id"]),
+            "Port id: {}".format(row["port_id"]),
+            "Local Port id: {}".format(row["l_port_id"]),
+            "Port Description: {}".format(row["port_desc"]),
+            "System Name: {}".format(row["sys_name"]),
+            "System Description: {}".format(row["sys_desc"]),
+            "Time remaining: {} seconds".format(row["ttl"]),
+            "System Capabilities: {}".format(row["system_capability"]),
+            "Enabled Capabilities: {}".format(row["enabled_capability"]),
+            "Management Address: {}".format(row["mgmt_addr"]),
+            "Management Address IPV6: not advertised",
+            "Vlan ID: not advertised",
+            ""
+        ])
+    lines.append("Total entries displayed: {}".format(len(rows)))
+    return "\n".join(lines)
+
+
+def main(neighbors=20000):
+    parser = CiscoNXOSParser(verbosity=0)
+    command = "show lldp neighbors detail"
+    rows = generate_neighbors(neighbors)
+    text = to_text(rows)
+    structured = json.dumps({"TABLE_nbor_detail": {"ROW_nbor_detail": rows}}, indent=2)
+    parser.patterns[command]
+    assert parser.autoparse(text=text, command=command) == parser.autoparse(text=structured, command=command)
+    for name, output in [("regex", text), ("json", structured)]:
+        duration = min(timeit.repeat(lambda: parser.autoparse(text=output, command=command), number=1, repeat=3))
+        print("{} ({} neighbors, {} kB): {:.0f} ms, {:.1f} us/neighbor".format(name, neighbors, len(output) // 1024, duration * 1000, duration / neighbors * 1e6))
+
+
+if __name__ == '__main__':
+    main(neighbors=int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
@@ -0,0 +1,242 @@
+"""
+Benchmark suite of all parsers, driven by the sample outputs in `nuaal/tests/resources` (named `<device_type>_<command_underscored>_<nn>.txt`,
+structured outputs `<device_type>_<command_underscored>_json_<nn>.txt`). Every sample is parsed as it is and scaled up by repeating its
+entries (``scales``), reporting throughput in lines/s and entries/s, peak memory allocated while parsing and time spent in each level
+of patterns, measured by ``PatternProfiler``. Results can be saved as baseline and later runs compared against it, so that changes of
+pattern modules which slow the parsing down (or change number of parsed entries) fail the comparison run with exit code 1.
+
+Usage: python -m nuaal.tests.benchmarks.bench_suite [--scales 1 10 100 1000] [--save baseline.json] [--compare baseline.json]
+"""
+import argparse
+import json
+import os
+import pathlib
+import platform
+import sys
+import timeit
+import tracemalloc
+from nuaal.Parsers.GetParser import PARSERS, GetParser
+from nuaal.Parsers.Structured import load_structured
+
+RESOURCES_PATH = pathlib.Path(__file__).parent.parent.joinpath("resources")
+
+
+def discover_fixtures(path=RESOURCES_PATH, device_types=None):
+    """
+    Finds sample outputs of commands supported by the parsers.
+
+    :param path: Directory with sample outputs
+    :param list device_types: Device types to include, defaults to all device types in ``GetParser.PARSERS``
+    :return: List of ``(device_type, command, name, structured)`` tuples
+    """
+    fixtures = []
+    for file_name in sorted(os.listdir(str(path))):
+        if file_name[-4:] != ".txt":
+            continue
+        name = file_name[:-4]
+        for device_type in device_types or PARSERS:
+            prefix = "{}_".format(device_type)
+            if not name.startswith(prefix):
+                continue
+            command = name[len(prefix):].rstrip("0123456789")
+            if command == name[len(prefix):]:
+                # Sample without number, such as stray copy of another sample
+                continue
+            command = command.rstrip("_")
+            structured = command.endswith("_json")
+            if structured:
+                command = command[:-5]
+            fixtures.append((device_type, command.replace("_", " "), name, structured))
+    return fixtures
+
+
+def scale_text(text, factor):
+    """
+    Scales plaintext output up by repeating it ``factor`` times, separated by blank line.
+    """
+    return (text.rstrip("\n") + "\n\n") * factor
+
+
+def scale_structured(text, rows, factor):
+    """
+    Scales structured output up by repeating the rows at path ``rows`` of the JSON document ``factor`` times. Documents without rows,
+    such as `show version`, are returned unchanged.
+    """
+    data = load_structured(text)
+
+    def scale(node, path):
+        if isinstance(node, list):
+            for item in node:
+                scale(item, path)
+        elif isinstance(node, dict) and path:
+            if len(path) == 1:
+                value = node.get(path[0])
+                if value is not None:
+                    node[path[0]] = (value if isinstance(value, list) else [value]) * factor
+            else:
+                scale(node.get(path[0]), path[1:])
+
+    scale(data, rows)
+    return json.dumps(data, indent=2)
+
+
+def _levels(profiler, command):
+    levels = {}
+    for location, record in profiler.to_dict().get(command, {}).items():
+        level = location.split(".")[0].split("[")[0]
+        levels[level] = levels.get(level, 0.0) + record["total_time"]
+    return levels
+
+
+def run_case(parser, command, text, structured=False, repeat=3):
+    """
+    Measures parsing of single output.
+
+    :param parser: Parser instance
+    :param str command: Command string
+    :param str text: Text output
+    :param bool structured: Whether ``text`` is structured output, which is not parsed by patterns
+    :param int repeat: Number of timed runs, the fastest one is reported
+    :return: Dictionary with measured values
+    """
+    if command in parser.patterns:
+        # Patterns are compiled before timing
+        parser.patterns[command]
+    times = []
+    entries = None
+    for _ in range(repeat):
+        start_time = timeit.default_timer()
+        entries = parser.autoparse(text=text, command=command)
+        times.append(timeit.default_timer() - start_time)
+    total_time = min(times)
+    entries = len(entries) if entries is not None else 0
+    tracemalloc.start()
+    parser.autoparse(text=text, command=command)
+    peak_memory = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    if structured:
+        levels = {"structured": total_time}
+    else:
+        profiler = parser.enable_profiling()
+        profiler.reset()
+        parser.autoparse(text=text, command=command)
+        levels = _levels(profiler=parser.disable_profiling(), command=command)
+    lines = text.count("\n") + 1
+    return {
+        "lines": lines,
+        "entries": entries,
+        "time": total_time,
+        "lines_per_second": lines / total_time if total_time else None,
+        "entries_per_second": entries / total_time if total_time else None,
+        "peak_memory": peak_memory,
+        "levels": levels
+    }
+
+
+def run(scales=(1, 10, 100, 1000), repeat=3, max_lines=1000000, device_types=None, path=RESOURCES_PATH, verbose=True):
+    """
+    Runs the benchmark of all sample outputs at all ``scales``.
+
+    :param scales: Factors the samples are scaled up by
+    :param int repeat: Number of timed runs of every case
+    :param int max_lines: Scaled outputs with more lines are skipped
+    :param list device_types: Device types to include
+    :param path: Directory with sample outputs
+    :param bool verbose: Print result of every case
+    :return: Dictionary with environment info and results of cases, keyed by `<sample>/x<scale>`
+    """
+    results = {"python": platform.python_version(), "patterns": {}, "cases": {}}
+    parsers = {}
+    if verbose:
+        print("{:<64} {:>9} {:>8} {:>10} {:>12} {:>12} {:>10}  {}".format(
+            "Sample", "Lines", "Entries", "Time [ms]", "Lines/s", "Entries/s", "Peak [kB]", "Levels [ms]"
+        ))
+    for device_type, command, name, structured in discover_fixtures(path=path, device_types=device_types):
+        if device_type not in parsers:
+            parsers[device_type] = GetParser(device_type=device_type, verbosity=0)
+            results["patterns"][device_type] = parsers[device_type].library.version
+        parser = parsers[device_type]
+        if not parser.supports(command) or (structured and command not in parser.structured):
+            if verbose:
+                print("{:<64} skipped, '{}' is not supported".format(name, command))
+            continue
+        text = pathlib.Path(path).joinpath("{}.txt".format(name)).read_text()
+        sample_entries = len(parser.autoparse(text=text, command=command) or [])
+        for scale in scales:
+            lines = (text.rstrip("\n").count("\n") + 2) * scale
+            if lines > max_lines:
+                continue
+            if structured:
+                if scale > 1 and not parser.structured[command].rows:
+                    continue
+                scaled = scale_structured(text=text, rows=parser.structured[command].rows, factor=scale)
+            else:
+                scaled = scale_text(text=text, factor=scale)
+            result = run_case(parser=parser, command=command, text=scaled, structured=structured, repeat=repeat)
+            if scale > 1 and sample_entries and not result["entries"]:
+                # Outputs which cannot be repeated, such as `show interfaces trunk` expecting each section once
+                if verbose:
+                    print("{:<64} skipped, output cannot be scaled by repeating".format("{} x{}".format(name, scale)))
+                continue
+            result.update(device_type=device_type, command=command, sample=name, scale=scale)
+            results["cases"]["{}/x{}".format(name, scale)] = result
+            if verbose:
+                print("{:<64} {:>9} {:>8} {:>10.3f} {:>12.0f} {:>12.0f} {:>10.1f}  {}".format(
+                    "{} x{}".format(name, scale), result["lines"], result["entries"], result["time"] * 1000, result["lines_per_second"] or 0,
+                    result["entries_per_second"] or 0, result["peak_memory"] / 1024,
+                    ", ".join("{} {:.3f}".format(level, level_time * 1000) for level, level_time in sorted(result["levels"].items()))
+                ))
+    return results
+
+
+def compare(results, baseline, tolerance=0.25, min_time=0.001):
+    """
+    Compares ``results`` with ``baseline`` results of the same cases.
+
+    :param dict results: Results of ``run()``
+    :param dict baseline: Results of ``run()`` saved earlier
+    :param float tolerance: Allowed relative increase of time and peak memory
+    :param float min_time: Cases faster than this number of seconds in baseline are not compared by time, as they are dominated by noise
+    :return: List of regressions, as strings
+    """
+    regressions = []
+    for key, base in baseline.get("cases", {}).items():
+        result = results["cases"].get(key)
+        if result is None:
+            continue
+        if result["entries"] != base["entries"]:
+            regressions.append("{}: {} entries, baseline {}".format(key, result["entries"], base["entries"]))
+        if base["time"] >= min_time and result["time"] > base["time"] * (1 + tolerance):
+            regressions.append("{}: {:.3f} ms, baseline {:.3f} ms".format(key, result["time"] * 1000, base["time"] * 1000))
+        if result["peak_memory"] > base["peak_memory"] * (1 + tolerance):
+            regressions.append("{}: peak memory {} B, baseline {} B".format(key, result["peak_memory"], base["peak_memory"]))
+    return regressions
+
+
+def main(argv=None):
+    argument_parser = argparse.ArgumentParser(description="Benchmark parsers on sample outputs of tests.")
+    argument_parser.add_argument("--scales", type=int, nargs="+", default=[1, 10, 100, 1000], help="Factors the samples are scaled up by")
+    argument_parser.add_argument("--repeat", type=int, default=3, help="Number of timed runs of every case")
+    argument_parser.add_argument("--max-lines", type=int, default=1000000, help="Scaled outputs with more lines are skipped")
+    argument_parser.add_argument("--device-type", nargs="+", default=None, help="Device types to include")
+    argument_parser.add_argument("--save", default=None, help="Path of JSON file to save the results to, as baseline")
+    argument_parser.add_argument("--compare", default=None, help="Path of baseline JSON file to compare the results with")
+    argument_parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed relative slowdown compared to baseline")
+    args = argument_parser.parse_args(argv)
+    results = run(scales=args.scales, repeat=args.repeat, max_lines=args.max_lines, device_types=args.device_type)
+    if args.save:
+        with open(args.save, mode="w") as f:
+            json.dump(results, f, indent=2)
+    if args.compare:
+        with open(args.compare, mode="r") as f:
+            baseline = json.load(f)
+        regressions = compare(results=results, baseline=baseline, tolerance=args.tolerance)
+        for regression in regressions:
+            print("REGRESSION {}".format(regression))
+        print("{} regressions compared to {} (patterns {})".format(len(regressions), args.compare, baseline.get("patterns")))
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,110 @@
+"""
+Benchmark of level0 parsing of synthetic column-aligned outputs, comparing the regex patterns of the pattern modules with ``TableExtractor``
+built from the ``TABLES`` entries below. Pattern modules use the regex patterns, table entries are opt-in and can be added to `level0` of
+the modules where this benchmark shows a gain.
+
+Usage: python -m nuaal.tests.benchmarks.bench_table [rows]
+"""
+import sys
+import timeit
+from nuaal.Parsers import CiscoIOSParser
+from nuaal.Parsers.Extractors import TableExtractor
+
+TABLES = {
+    "show interfaces status": {
+        "columns": [
+            {"header": "Port", "group": "interface", "pattern": "[A-Za-z]+\\d+(?:/\\d+)*"},
+            {"header": "Name", "group": "name", "default": ""},
+            {"header": "Status", "group": "status", "pattern": "connected|notconnect|disabled|monitoring|err-disabled"},
+            {"header": "Vlan", "group": "vlan"},
+            {"header": "Duplex", "group": "duplex", "align": "right"},
+            {"header": "Speed", "group": "speed", "align": "right"},
+            {"header": "Type", "group": "type", "default": ""}
+        ]
+    },
+    "show mac address-table": {
+        "columns": [
+            {"header": "Vlan", "group": "vlan", "pattern": "All|\\d+", "align": "right"},
+            {"header": "Mac Address", "group": "mac", "pattern": "(?:[\\da-f]{4}\\.?){3}"},
+            {"header": "Type", "group": "type"},
+            {"header": "Ports", "group": "ports"}
+        ],
+        "tokens": True
+    },
+    "show ip arp": {
+        "columns": [
+            {"header": "Protocol", "group": "protocol"},
+            {"header": "Address", "group": "ipAddress", "pattern": "(?:\\d{1,3}\\.?){4}"},
+            {"header": "Age (min)", "group": "age", "align": "right"},
+            {"header": "Hardware Addr", "group": "mac", "pattern": "(?:[\\da-f]{4}\\.?){3}"},
+            {"header": "Type", "group": "type"},
+            {"header": "Interface", "group": "interface"}
+        ],
+        "tokens": True
+    },
+    "show vlan brief": {
+        "columns": [
+            {"header": "VLAN", "group": "id", "pattern": "\\d+"},
+            {"header": "Name", "group": "name"},
+            {"header": "Status", "group": "status"},
+            {"header": "Ports", "group": "access_ports"}
+        ],
+        "continuation": "access_ports"
+    }
+}
+
+
+def generate_interfaces_status(rows):
+    lines = ["Port      Name               Status       Vlan       Duplex  Speed Type"]
+    for i in range(rows):
+        lines.append("{:<9} {:<18} {:<12} {:<10} {:>6} {:>6} 10/100/1000BaseTX".format(
+            "Gi{}/{}/{}".format(i // 4800 % 9 + 1, i // 48 % 100, i % 48 + 1), "AP-{}".format(i) if i % 3 else "", "connected" if i % 2 else "notconnect",
+            "trunk" if i % 5 == 0 else i % 4000 + 1, "a-full", "a-1000"
+        ))
+    return "\n".join(lines) + "\n"
+
+
+def generate_mac_table(rows):
+    lines = ["Vlan    Mac Address       Type        Ports", "----    -----------       --------    -----"]
+    for i in range(rows):
+        lines.append(" {:>3}    0050.{:04x}.{:04x}    DYNAMIC     Gi{}/0/{}".format(i % 4000 + 1, i >> 16, i & 0xffff, i % 8 + 1, i % 48 + 1))
+    return "\n".join(lines) + "\n"
+
+
+def generate_ip_arp(rows):
+    lines = ["Protocol  Address          Age (min)  Hardware Addr   Type   Interface"]
+    for i in range(rows):
+        lines.append("Internet  {:<15} {:>9}   0050.{:04x}.{:04x}  ARPA   Vlan{}".format(
+            "10.{}.{}.{}".format(i >> 16, (i >> 8) & 0xff, i & 0xff), i % 240 if i % 7 else "-", i >> 16, i & 0xffff, i % 4000 + 1
+        ))
+    return "\n".join(lines) + "\n"
+
+
+def generate_vlan_brief(rows):
+    lines = ["VLAN Name                             Status    Ports", "---- -------------------------------- --------- -------------------------------"]
+    for i in range(rows):
+        lines.append("{:<4} {:<32} active    Gi{}/0/1, Gi{}/0/2, Gi{}/0/3, Gi{}/0/4".format(i % 4000 + 1, "VLAN{:04d}".format(i % 4000 + 1), *[i % 9 + 1] * 4))
+        if i % 4 == 0:
+            lines.append("{:<48}Gi{}/0/5, Gi{}/0/6".format("", i % 9 + 1, i % 9 + 1))
+    return "\n".join(lines) + "\n"
+
+
+def main(rows=100000, repeat=3):
+    parser = CiscoIOSParser(verbosity=0)
+    for command, generator in [
+        ("show interfaces status", generate_interfaces_status),
+        ("show mac address-table", generate_mac_table),
+        ("show ip arp", generate_ip_arp),
+        ("show vlan brief", generate_vlan_brief)
+    ]:
+        text = generator(rows)
+        regex = parser.patterns[command]["level0"][0]
+        table = TableExtractor(**TABLES[command])
+        assert len(table.extract(text)) == len(regex.extract(text)) == rows
+        legacy = min(timeit.repeat(lambda: regex.extract(text), number=1, repeat=repeat))
+        current = min(timeit.repeat(lambda: table.extract(text), number=1, repeat=repeat))
+        print("{} ({} rows): regex {:.1f} ms, table {:.1f} ms, speedup {:.2f}x".format(command, rows, legacy * 1000, current * 1000, legacy / current))
+
+
+if __name__ == '__main__':
+    main(rows=int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,58 @@
+"""
+Benchmark of ``CiscoIOSParser.trunk_parser()`` on synthetic `show interfaces trunk` outputs, comparing the single-pass section reader
+with interface-keyed join against the previous implementation, which scanned the VLAN sections once for every trunk.
+
+Usage: python -m nuaal.tests.benchmarks.bench_trunk [trunks]
+"""
+import re
+import sys
+import timeit
+from nuaal.Parsers import CiscoIOSParser
+
+
+def generate_trunks(trunks):
+    names = ["Po{}".format(i + 1) if i % 2 else "Gi{}/{}/{}".format(i // 4800 % 9 + 1, i // 48 % 100, i % 48 + 1) for i in range(trunks)]
+    lines = ["", "Port        Mode             Encapsulation  Status        Native vlan"]
+    lines.extend("{:<11} {:<16} {:<14} {:<13} {}".format(name, "on", "802.1q", "trunking", 1 if i % 3 else 999) for i, name in enumerate(names))
+    for header in ["Vlans allowed on trunk", "Vlans allowed and active in management domain", "Vlans in spanning tree forwarding state and not pruned"]:
+        lines.extend(["", "Port        {}".format(header)])
+        lines.extend("{:<11} 1,{},{}-{}".format(name, i % 4000 + 2, i % 100 + 100, i % 100 + 110) for i, name in enumerate(names))
+    return "\n".join(lines) + "\n"
+
+
+def legacy_trunk_parser(parser, text):
+    section_pattern = re.compile(pattern=r"(?:^Port.*$(?:\s^\S.*$)+)", flags=re.MULTILINE)
+    sections = parser.match_single_pattern(pattern=section_pattern, text=text)
+    if len(sections) != 4:
+        return []
+    mode_pattern = re.compile(
+        pattern=r"^(?P<interface>[A-Za-z]+\d+(\/\d+){0,2})\s+(?P<mode>\S+)\s+(?P<encapsulation>\S+)\s+(?P<status>\S+)\s+(?P<nativeVlan>\d+)",
+        flags=re.MULTILINE
+    )
+    interface_pattern = re.compile(pattern=r"^(?P<interface>[A-Za-z]+\d+(\/\d+){0,2})\s+(?P<vlanGroup>(?:\d{1,4}(?:-\d{1,4})?,?)+)", flags=re.MULTILINE)
+    mode = parser.match_single_pattern(text=sections[0], pattern=mode_pattern)
+    allowed = parser.match_single_pattern(text=sections[1], pattern=interface_pattern)
+    active = parser.match_single_pattern(text=sections[2], pattern=interface_pattern)
+    forwarding = parser.match_single_pattern(text=sections[3], pattern=interface_pattern)
+    trunks = []
+    for trunk in mode:
+        entry = dict(trunk)
+        entry["allowed"] = parser.vlanGroup_check([x["vlanGroup"] for x in allowed if x["interface"] == entry["interface"]])
+        entry["active"] = parser.vlanGroup_check([x["vlanGroup"] for x in active if x["interface"] == entry["interface"]])
+        entry["forwarding"] = parser.vlanGroup_check([x["vlanGroup"] for x in forwarding if x["interface"] == entry["interface"]])
+        trunks.append(entry)
+    return trunks
+
+
+def main(trunks=1000):
+    parser = CiscoIOSParser(verbosity=0)
+    for count in sorted({trunks // 10, trunks}):
+        text = generate_trunks(count)
+        assert parser.trunk_parser(text=text) == legacy_trunk_parser(parser=parser, text=text)
+        legacy = min(timeit.repeat(lambda: legacy_trunk_parser(parser=parser, text=text), number=1, repeat=3))
+        current = min(timeit.repeat(lambda: parser.trunk_parser(text=text), number=1, repeat=5))
+        print("{} trunks: legacy {:.2f} ms, current {:.2f} ms, speedup {:.1f}x".format(count, legacy * 1000, current * 1000, legacy / current))
+
+
+if __name__ == '__main__':
+    main(trunks=int(sys.argv[1]) if len(sys.argv) > 1 else 1000)
@@ -0,0 +1,424 @@
+"""
+Simulator of Cisco IOS devices for load testing of the collection (``CliMultiRunner``, ``AsyncCliRunner``, ``Neighbor_Discovery``)
+without real gear. Every simulated device listens on its own loopback address (`127.x.y.z`), so the clients connect to plain IP addresses
+and CDP neighbors point to other simulated devices. All devices are served by single SSH (and optionally Telnet) listener in background thread.
+
+Usage: python -m nuaal.tests.simulator.DeviceSimulator [--devices 1000] [--latency 0.05] [--telnet 10023] [--failure drop=0.01]
+"""
+from nuaal.utils import get_logger
+from nuaal.tests.simulator.SimulatedDevice import INVALID_INPUT, build_devices
+import argparse
+import asyncio
+import re
+import sys
+import threading
+import timeit
+try:
+    import asyncssh
+except ImportError:
+    asyncssh = None
+try:
+    import resource
+except ImportError:
+    resource = None
+
+# Telnet commands (IAC sequences) sent by clients, such as option negotiation
+TELNET_COMMANDS = re.compile(rb"\xff(?:[\xfb-\xfe].|\xfa.*?\xff\xf0|[\xf0-\xf9])", flags=re.S)
+MORE = " --More-- "
+
+
+def loopback_address(index):
+    """
+    Returns loopback address of simulated device with ``index``, starting at `127.1.1.1`.
+    """
+    return "127.{}.{}.{}".format(1 + index // 64516, 1 + (index // 254) % 254, 1 + index % 254)
+
+
+class _Terminal(object):
+    """
+    Line discipline of simulated device, on top of ``read`` coroutine (returning empty string at the end of input) and ``write`` function.
+    """
+    def __init__(self, read, write):
+        self._read = read
+        self.write = write
+        self._pending = ""
+        self._skip_lf = False
+
+    async def read_char(self):
+        while not self._pending:
+            data = await self._read()
+            if not data:
+                return None
+            self._pending = data
+        char, self._pending = self._pending[0], self._pending[1:]
+        if char == "\n" and self._skip_lf:
+            self._skip_lf = False
+            return await self.read_char()
+        self._skip_lf = char == "\r"
+        return char
+
+    async def read_line(self, echo=True):
+        line = []
+        while True:
+            char = await self.read_char()
+            if char is None:
+                return None
+            if char in "\r\n":
+                # Line is echoed at once, not char by char
+                self.write("{}\r\n".format("".join(line) if echo else ""))
+                return "".join(line)
+            if char in "\x08\x7f":
+                if line:
+                    line.pop()
+            elif char >= " " or char == "\t":
+                # Other control characters, such as NUL sent by netmiko, are ignored
+                line.append(char)
+
+
+class _SSHServer(asyncssh.SSHServer if asyncssh is not None else object):
+
+    def __init__(self, simulator):
+        self.simulator = simulator
+        self.device = None
+
+    def connection_made(self, conn):
+        self.device = self.simulator.device_for(conn.get_extra_info("sockname"))
+        if self.device is None or self.device.failure == "refuse":
+            conn.abort()
+
+    def begin_auth(self, username):
+        return True
+
+    def password_auth_supported(self):
+        return True
+
+    def validate_password(self, username, password):
+        return self.simulator.authenticate(device=self.device, username=username, password=password)
+
+
+class DeviceSimulator(object):
+    """
+    Runs ``devices`` simulated Cisco IOS devices (see ``SimulatedDevice``) in background thread. Each device serves recorded outputs
+    of tests, with `show version`, `show cdp neighbors detail` (following ``topology``) and `show running-config` generated for the device.
+    Sessions support `enable` (when ``enable_secret`` is set), `terminal length` with `--More--` paging, `terminal width` and `exit`.
+    Other commands are answered by `% Invalid input`. Failures are injected to devices randomly by their probability in ``failures``:
+
+    - `refuse` - connection is closed right after it is accepted
+    - `auth` - authentication fails
+    - `drop` - session is closed in the middle of output of the first command
+    - `hang` - device stops responding after the prompt
+    - `slow` - latency of the device is ten times higher
+
+    With ``per_address`` (default), devices listen on loopback addresses `127.1.1.1`, `127.1.1.2`, ... on the same ``port``, served by
+    single listener bound to ``listen_address``. Connections to other addresses are closed. Otherwise every device listens on its own port
+    of `127.0.0.1`, and the devices are addressed as `127.0.0.1:<port>`, which is supported only by ``AsyncCliRunner``.
+    """
+    def __init__(self, devices=10, ssh=True, telnet=False, port=0, telnet_port=0, per_address=True, listen_address="0.0.0.0",
+                 username=None, password=None, outputs=None, topology="tree", fanout=4, failures=None, seed=None, DEBUG=False, verbosity=3,
+                 **device_params):
+        """
+
+        :param int devices: Number of devices
+        :param bool ssh: Whether or not devices accept SSH connections, requires `asyncssh` package
+        :param bool telnet: Whether or not devices accept Telnet connections
+        :param int port: SSH port, ``0`` selects free port
+        :param int telnet_port: Telnet port, ``0`` selects free port
+        :param bool per_address: Whether or not each device listens on its own loopback address
+        :param str listen_address: Address of the listener in ``per_address`` mode
+        :param str username: Accepted username, any username is accepted if not set
+        :param str password: Accepted password
+        :param dict outputs: Outputs added to (or replacing) ``default_outputs()``
+        :param topology: CDP neighbor graph, see ``build_devices()``
+        :param int fanout: Number of children of each device in `tree` topology
+        :param dict failures: Dictionary of ``{failure: probability}``
+        :param int seed: Seed of random failures and jitter
+        :param device_params: Other keyword arguments of ``SimulatedDevice``, such as ``latency``, ``jitter``, ``banner`` or ``enable_secret``
+        """
+        self.ssh = ssh
+        self.telnet = telnet
+        self.port = port
+        self.telnet_port = telnet_port
+        self.per_address = per_address
+        self.listen_address = listen_address
+        self.username = username
+        self.password = password
+        self.logger = get_logger(name="DeviceSimulator", DEBUG=DEBUG, verbosity=verbosity)
+        self.devices = build_devices(
+            count=devices, ips=[loopback_address(i) if per_address else "127.0.0.1" for i in range(devices)], outputs=outputs,
+            topology=topology, fanout=fanout, failures=failures, seed=seed, **device_params
+        )
+        self.sessions = []
+        self._devices = {}
+        self._servers = []
+        self._loop = None
+        self._thread = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    @property
+    def ips(self):
+        """
+        Addresses of the devices, as expected by the collection runners.
+        """
+        if self.per_address:
+            return [device.ip for device in self.devices]
+        return ["{}:{}".format(device.ip, device.port if self.ssh else device.telnet_port) for device in self.devices]
+
+    def device_for(self, sockname):
+        """
+        Returns device listening on local address ``sockname`` of the connection, or ``None``.
+        """
+        return self._devices.get(tuple(sockname[:2]))
+
+    def authenticate(self, device, username, password):
+        """
+        Checks credentials of session to ``device``.
+        """
+        if device is None or device.failure == "auth":
+            return False
+        return self.username is None or (username == self.username and password == self.password)
+
+    async def _listen_ssh(self, host_key, address, port):
+        return await asyncssh.listen(
+            address, port, server_host_keys=[host_key], server_factory=lambda: _SSHServer(self), process_factory=self._ssh_session,
+            line_editor=False, backlog=4096, reuse_address=True
+        )
+
+    async def _listen_telnet(self, address, port):
+        return await asyncio.start_server(self._telnet_session, address, port, backlog=4096, reuse_address=True)
+
+    async def _start(self):
+        host_key = asyncssh.generate_private_key("ssh-ed25519") if self.ssh else None
+        if self.per_address:
+            if self.ssh:
+                self._servers.append(await self._listen_ssh(host_key=host_key, address=self.listen_address, port=self.port))
+                self.port = self._servers[-1].sockets[0].getsockname()[1]
+            if self.telnet:
+                self._servers.append(await self._listen_telnet(address=self.listen_address, port=self.telnet_port))
+                self.telnet_port = self._servers[-1].sockets[0].getsockname()[1]
+        for device in self.devices:
+            if self.ssh:
+                if not self.per_address:
+                    self._servers.append(await self._listen_ssh(host_key=host_key, address=device.ip, port=0))
+                    self.port = self._servers[-1].sockets[0].getsockname()[1]
+                device.port = self.port
+                self._devices[(device.ip, device.port)] = device
+            if self.telnet:
+                if not self.per_address:
+                    self._servers.append(await self._listen_telnet(address=device.ip, port=0))
+                    self.telnet_port = self._servers[-1].sockets[0].getsockname()[1]
+                device.telnet_port = self.telnet_port
+                self._devices[(device.ip, device.telnet_port)] = device
+
+    def start(self):
+        """
+        Starts the devices in background thread.
+
+        :return: ``None``
+        """
+        if self.ssh and asyncssh is None:
+            self.logger.critical(msg="SSH devices require 'asyncssh' package.")
+            self.ssh = False
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(name="DeviceSimulator", target=self._loop.run_forever, daemon=True)
+        self._thread.start()
+        asyncio.run_coroutine_threadsafe(self._start(), self._loop).result()
+        self.logger.info(msg="Started {} simulated devices, SSH port {}, Telnet port {}.".format(
+            len(self.devices), self.port if self.ssh else None, self.telnet_port if self.telnet else None
+        ))
+
+    def stop(self):
+        """
+        Closes the listeners and all sessions and stops the background thread.
+
+        :return: ``None``
+        """
+        if self._loop is None:
+            return
+
+        async def close():
+            for server in self._servers:
+                server.close()
+            tasks = [x for x in asyncio.all_tasks() if x is not asyncio.current_task()]
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        asyncio.run_coroutine_threadsafe(close(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+        self._loop = None
+        self._servers = []
+
+    async def _ssh_session(self, process):
+        device = self.device_for(process.get_extra_info("sockname"))
+        terminal = _Terminal(read=lambda: process.stdin.read(4096), write=process.stdout.write)
+        try:
+            await self._session(device=device, terminal=terminal)
+            process.exit(0)
+        except (asyncssh.Error, OSError):
+            pass
+
+    async def _telnet_session(self, reader, writer):
+        device = self.device_for(writer.get_extra_info("sockname"))
+
+        async def read():
+            while True:
+                data = await reader.read(4096)
+                if not data:
+                    return ""
+                text = TELNET_COMMANDS.sub(b"", data).decode("utf-8", errors="ignore")
+                if text:
+                    return text
+
+        terminal = _Terminal(read=read, write=lambda text: writer.write(text.encode("utf-8")))
+        try:
+            if device is not None and device.failure != "refuse":
+                terminal.write("\r\n\r\nUser Access Verification\r\n\r\nUsername: ")
+                username = await terminal.read_line()
+                terminal.write("Password: ")
+                password = await terminal.read_line(echo=False)
+                if self.authenticate(device=device, username=username, password=password):
+                    await self._session(device=device, terminal=terminal)
+                else:
+                    terminal.write("% Authentication failed\r\n\r\n")
+            writer.close()
+        except OSError:
+            pass
+
+    async def _output(self, terminal, output, length):
+        lines = output.rstrip("\n").split("\n")
+        page = len(lines) if length == 0 else max(length - 1, 1)
+        for i in range(0, len(lines), page):
+            terminal.write("\r\n".join(lines[i:i + page]) + "\r\n")
+            if i + page < len(lines):
+                terminal.write(MORE)
+                char = await terminal.read_char()
+                terminal.write("\x08" * len(MORE) + " " * len(MORE) + "\x08" * len(MORE))
+                if char is None or char == "q":
+                    return
+
+    async def _session(self, device, terminal):
+        record = {"device": device.ip, "start": timeit.default_timer(), "end": None, "commands": 0}
+        self.sessions.append(record)
+        level = ">" if device.enable_secret else "#"
+        length = 24
+        try:
+            if device.banner:
+                terminal.write(device.banner.replace("\n", "\r\n") + "\r\n")
+            terminal.write("\r\n{}{}".format(device.hostname, level))
+            while True:
+                command = await terminal.read_line()
+                if command is None:
+                    return
+                command = command.strip()
+                if device.failure == "hang":
+                    continue
+                if command in ("exit", "quit", "logout"):
+                    return
+                elif command == "enable" and level == ">":
+                    terminal.write("Password: ")
+                    secret = await terminal.read_line(echo=False)
+                    if secret is None:
+                        return
+                    if secret == device.enable_secret:
+                        level = "#"
+                    else:
+                        terminal.write("% Bad secrets\r\n\r\n")
+                elif command == "disable" and device.enable_secret:
+                    level = ">"
+                elif command.startswith("terminal "):
+                    words = command.split()
+                    if words[1:2] == ["length"] and words[2:3] and words[2].isdigit():
+                        length = int(words[2])
+                elif command and command != "enable":
+                    record["commands"] += 1
+                    output = device.output(command)
+                    delay = device.delay()
+                    if delay:
+                        await asyncio.sleep(delay)
+                    if output is None:
+                        terminal.write("{}^\r\n{}\r\n\r\n".format(" " * (len(device.hostname) + 1 + len(command.split()[0])), INVALID_INPUT))
+                    elif device.failure == "drop":
+                        terminal.write(output[:len(output) // 2].replace("\n", "\r\n"))
+                        return
+                    else:
+                        await self._output(terminal=terminal, output=output, length=length)
+                terminal.write("{}{}".format(device.hostname, level))
+        finally:
+            record["end"] = timeit.default_timer()
+
+    def stats(self):
+        """
+        Statistics of the sessions served so far: number of sessions and commands, injected failures, finished sessions per minute,
+        percentiles of session time in seconds and peak RSS of the process in MB.
+
+        :return: Dictionary of statistics
+        """
+        finished = [x for x in self.sessions if x["end"] is not None]
+        times = sorted(x["end"] - x["start"] for x in finished)
+        span = max(x["end"] for x in finished) - min(x["start"] for x in finished) if finished else 0.0
+
+        def percentile(value):
+            return times[int(value * (len(times) - 1))] if times else None
+
+        failures = {}
+        for device in self.devices:
+            if device.failure:
+                failures[device.failure] = failures.get(device.failure, 0) + 1
+        return {
+            "devices": len(self.devices),
+            "sessions": len(self.sessions),
+            "commands": sum(x["commands"] for x in self.sessions),
+            "failures": failures,
+            "sessions_per_minute": 60 * len(finished) / span if span else None,
+            "p50": percentile(0.5),
+            "p95": percentile(0.95),
+            "p99": percentile(0.99),
+            "max_rss": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024 if resource is not None else None
+        }
+
+
+def main(argv=None):
+    argument_parser = argparse.ArgumentParser(description="Run simulated Cisco IOS devices on loopback addresses.")
+    argument_parser.add_argument("--devices", type=int, default=100, help="Number of devices")
+    argument_parser.add_argument("--port", type=int, default=10022, help="SSH port")
+    argument_parser.add_argument("--telnet", type=int, default=None, metavar="PORT", help="Accept Telnet on this port")
+    argument_parser.add_argument("--no-ssh", action="store_true", help="Do not accept SSH")
+    argument_parser.add_argument("--latency", type=float, default=0.0, help="Seconds before output of each command")
+    argument_parser.add_argument("--jitter", type=float, default=0.0, help="Maximal random seconds added to latency")
+    argument_parser.add_argument("--fanout", type=int, default=4, help="Number of CDP children of each device")
+    argument_parser.add_argument("--banner", default=None, help="Banner printed after login")
+    argument_parser.add_argument("--enable-secret", default=None, help="Start in User EXEC Mode, enable with this secret")
+    argument_parser.add_argument("--username", default=None, help="Accepted username, any by default")
+    argument_parser.add_argument("--password", default=None, help="Accepted password")
+    argument_parser.add_argument("--failure", nargs="+", default=[], metavar="NAME=PROBABILITY", help="Injected failures, such as drop=0.01")
+    argument_parser.add_argument("--seed", type=int, default=None, help="Seed of random failures and jitter")
+    args = argument_parser.parse_args(argv)
+    simulator = DeviceSimulator(
+        devices=args.devices, ssh=not args.no_ssh, telnet=args.telnet is not None, port=args.port, telnet_port=args.telnet or 0,
+        username=args.username, password=args.password, fanout=args.fanout, seed=args.seed, verbosity=4,
+        failures={name: float(probability) for name, probability in (x.split("=") for x in args.failure)},
+        latency=args.latency, jitter=args.jitter, banner=args.banner, enable_secret=args.enable_secret
+    )
+    with simulator:
+        print("{} devices on {} - {}, SSH port {}, Telnet port {}. Press Ctrl+C to stop.".format(
+            len(simulator.devices), simulator.devices[0].ip, simulator.devices[-1].ip, simulator.port if simulator.ssh else None,
+            simulator.telnet_port if simulator.telnet else None
+        ))
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            pass
+    print(simulator.stats())
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,205 @@
+from nuaal.tests.benchmarks.bench_suite import RESOURCES_PATH, discover_fixtures
+import functools
+import random
+import re
+
+# Failures which can be injected, see ``SimulatedDevice``
+FAILURES = ["refuse", "auth", "drop", "hang", "slow"]
+INVALID_INPUT = "% Invalid input detected at '^' marker."
+CDP_TEMPLATE = """-------------------------
+Device ID: {hostname}{domain}
+Entry address(es): 
+  IP address: {ip}
+Platform: cisco {platform},  Capabilities: Router Switch IGMP 
+Interface: {local_interface},  Port ID (outgoing port): {remote_interface}
+Holdtime : 142 sec
+
+Version :
+Cisco IOS Software, IOS-XE Software, Catalyst L3 Switch Software (CAT9K_IOSXE), Version {version}, RELEASE SOFTWARE (fc1)
+Technical Support: http://www.cisco.com/techsupport
+Copyright (c) 1986-2020 by Cisco Systems, Inc.
+Compiled Thu 30-Jan-20 18:53 by mcpre
+
+advertisement version: 2
+VTP Management Domain: ''
+Native VLAN: 1
+Duplex: full
+Management address(es): 
+  IP address: {ip}
+"""
+
+
+def recorded_outputs(device_type="cisco_ios", path=RESOURCES_PATH):
+    """
+    Loads sample outputs of tests, the first sample of each command.
+
+    :param str device_type: Device type of the samples
+    :param path: Directory with sample outputs
+    :return: Dictionary of ``{command: text}``
+    """
+    outputs = {}
+    for _, command, name, structured in discover_fixtures(path=path, device_types=[device_type]):
+        if not structured and command not in outputs:
+            outputs[command] = path.joinpath("{}.txt".format(name)).read_text()
+    return outputs
+
+
+def render_version(device, template):
+    """
+    Renders `show version` of ``device`` from recorded output ``template``, with hostname of the device.
+    """
+    return re.sub(r"^\S+(?= uptime is)", device.hostname, template, count=1, flags=re.M)
+
+
+def render_neighbors(device):
+    """
+    Renders `show cdp neighbors detail` of ``device`` from its ``neighbors``.
+    """
+    return "\n".join(
+        CDP_TEMPLATE.format(
+            hostname=neighbor.hostname, domain=device.domain, ip=neighbor.ip, platform=neighbor.platform, version=neighbor.version,
+            local_interface=local_interface, remote_interface=remote_interface
+        ) for neighbor, local_interface, remote_interface in device.neighbors
+    )
+
+
+def render_config(device):
+    """
+    Renders minimal `show running-config` of ``device``.
+    """
+    return "Building configuration...\n\nCurrent configuration : 64 bytes\n!\nhostname {}\n!\nend\n".format(device.hostname)
+
+
+def default_outputs():
+    """
+    Outputs served by simulated devices by default, ``recorded_outputs()`` of Cisco IOS with `show version`, `show cdp neighbors detail`
+    and `show running-config` generated for each device.
+
+    :return: Dictionary of ``{command: text or callable}``
+    """
+    outputs = recorded_outputs()
+    outputs["show version"] = functools.partial(render_version, template=outputs["show version"])
+    outputs["show cdp neighbors detail"] = render_neighbors
+    outputs["show running-config"] = render_config
+    return outputs
+
+
+class SimulatedDevice(object):
+    """
+    Simulated Cisco IOS device, serving recorded or generated outputs of commands. Values of ``outputs`` are either text, or callable
+    taking the device and returning text, such as ``render_neighbors``.
+    """
+    def __init__(self, hostname, ip, port=22, telnet_port=23, outputs=None, unsupported=None, platform="C9300-48P", version="16.9.5", domain=".example.com",
+                 banner=None, enable_secret=None, latency=0.0, jitter=0.0, failure=None, seed=None):
+        """
+
+        :param str hostname: Hostname, used in prompt and generated outputs
+        :param str ip: IP address the device listens on
+        :param int port: SSH port the device listens on
+        :param int telnet_port: Telnet port the device listens on
+        :param dict outputs: Dictionary of ``{command: text or callable}``
+        :param list unsupported: Commands answered by `% Invalid input`, such as variants not supported by older platforms
+        :param str platform: Platform advertised to CDP neighbors
+        :param str version: Software version advertised to CDP neighbors
+        :param str domain: Domain name appended to hostname in CDP outputs of neighbors
+        :param str banner: Banner printed after login, before the first prompt
+        :param str enable_secret: If set, session starts in User EXEC Mode and `enable` requires this secret
+        :param float latency: Time in seconds before output of each command
+        :param float jitter: Maximal random time in seconds added to ``latency``
+        :param str failure: One of ``FAILURES`` injected to sessions of this device, or ``None``
+        :param int seed: Seed of random jitter
+        """
+        self.hostname = hostname
+        self.ip = ip
+        self.port = port
+        self.telnet_port = telnet_port
+        self.outputs = outputs if isinstance(outputs, dict) else {}
+        self.unsupported = set(unsupported or [])
+        self.platform = platform
+        self.version = version
+        self.domain = domain
+        self.banner = banner
+        self.enable_secret = enable_secret
+        self.latency = latency
+        self.jitter = jitter
+        self.failure = failure
+        self.neighbors = []
+        self.random = random.Random(seed)
+
+    def __repr__(self):
+        return "SimulatedDevice({}, {})".format(self.hostname, self.ip)
+
+    def add_neighbor(self, neighbor, local_interface, remote_interface):
+        """
+        Adds CDP neighbor of the device.
+
+        :param SimulatedDevice neighbor: Neighbor device
+        :param str local_interface: Interface of this device
+        :param str remote_interface: Interface of the neighbor
+        :return: ``None``
+        """
+        self.neighbors.append((neighbor, local_interface, remote_interface))
+
+    def delay(self):
+        """
+        Returns time in seconds the device waits before output of command.
+        """
+        delay = self.latency + (self.random.uniform(0, self.jitter) if self.jitter else 0.0)
+        return delay * 10 if self.failure == "slow" else delay
+
+    def output(self, command):
+        """
+        Returns output of ``command``, or ``None`` if the command is not supported by the device.
+        """
+        if command in self.unsupported:
+            return None
+        output = self.outputs.get(command)
+        return output(self) if callable(output) else output
+
+
+def build_devices(count, ips, outputs=None, topology="tree", fanout=4, failures=None, seed=None, **kwargs):
+    """
+    Creates ``count`` simulated devices, connected to CDP neighbor graph.
+
+    :param int count: Number of devices
+    :param list ips: IP addresses of the devices
+    :param dict outputs: Outputs served by all devices, added to (or replacing) ``default_outputs()``
+    :param topology: `tree` (each device has ``fanout`` children), `none`, or list of ``(index, index)`` tuples of connected devices
+    :param int fanout: Number of children of each device in `tree` topology
+    :param dict failures: Dictionary of ``{failure: probability}``, such as ``{"drop": 0.01}``
+    :param int seed: Seed of random failures and jitter
+    :param kwargs: Other keyword arguments of ``SimulatedDevice``
+    :return: List of ``SimulatedDevice``
+    """
+    outputs = dict(default_outputs(), **(outputs or {}))
+    failures = failures or {}
+    unknown = set(failures) - set(FAILURES)
+    if unknown:
+        raise ValueError("Unknown failures: {}, supported are: {}".format(sorted(unknown), FAILURES))
+    rng = random.Random(seed)
+    devices = []
+    for i in range(count):
+        failure = None
+        for name in FAILURES:
+            if rng.random() < failures.get(name, 0.0):
+                failure = name
+                break
+        devices.append(SimulatedDevice(
+            hostname="SW-{:05d}".format(i), ip=ips[i], outputs=outputs, failure=failure, seed=rng.random(), **kwargs
+        ))
+    if topology == "tree":
+        edges = [((i - 1) // fanout, i) for i in range(1, count)]
+    elif topology == "none":
+        edges = []
+    else:
+        edges = list(topology)
+    ports = [0] * count
+    for a, b in edges:
+        # Uplinks are ten-gigabit interfaces of the child, downlinks gigabit interfaces of the parent
+        ports[a] += 1
+        ports[b] += 1
+        local_interface = "GigabitEthernet1/0/{}".format(ports[a])
+        remote_interface = "TenGigabitEthernet1/1/{}".format(ports[b])
+        devices[a].add_neighbor(devices[b], local_interface=local_interface, remote_interface=remote_interface)
+        devices[b].add_neighbor(devices[a], local_interface=remote_interface, remote_interface=local_interface)
+    return devices
@@ -0,0 +1,2 @@
+from nuaal.tests.simulator.SimulatedDevice import SimulatedDevice, build_devices, default_outputs, recorded_outputs
+from nuaal.tests.simulator.DeviceSimulator import DeviceSimulator
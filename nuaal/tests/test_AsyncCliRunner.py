@@ -0,0 +1,72 @@
+import unittest
+import pathlib
+import json
+from nuaal.connections.cli import AsyncCliRunner
+from nuaal.connections.cli.AsyncCliRunner import asyncssh
+from nuaal.discovery.Topology import CliTopology
+from nuaal.tests.simulator import DeviceSimulator
+
+
+class TestAsyncCliRunner(unittest.TestCase):
+
+    OUTPUTS = {
+        "show vlan brief": "cisco_ios_show_vlan_brief_01",
+        "show version": "cisco_ios_show_version_01",
+        "show interfaces": "cisco_ios_show_interfaces_01",
+        "show interfaces trunk": "cisco_ios_show_interfaces_trunk_01"
+    }
+    PROVIDER = {"username": "admin", "password": "cisco", "secret": "enable", "enable": True}
+
+    @staticmethod
+    def get_text(test_file_name):
+        test_file_path = pathlib.Path(__file__).parent.joinpath("resources/{}.txt".format(test_file_name))
+        return test_file_path.read_text()
+
+    @staticmethod
+    def get_results(results_file_name):
+        result_file_path = pathlib.Path(__file__).parent.joinpath("results/{}.json".format(results_file_name))
+        return json.loads(result_file_path.read_text())
+
+    def collect(self, devices, **kwargs):
+        with DeviceSimulator(devices=devices, enable_secret=self.PROVIDER["secret"], verbosity=0) as simulator:
+            # Address not served by any device
+            ips = simulator.ips + ["127.0.0.1"]
+            runner = AsyncCliRunner(provider=dict(self.PROVIDER, port=simulator.port), ips=ips, verbosity=0, **kwargs)
+            runner.run()
+        return runner, ips
+
+    def setUp(self):
+        if asyncssh is None:
+            self.skipTest("asyncssh is not installed")
+
+    def test_run(self):
+        actions = ["get_version", "get_vlans", "get_neighbors", "get_trunks", "get_license", "get_config"]
+        runner, ips = self.collect(devices=3, actions=actions, workers=2)
+        self.assertEqual([ips[-1]], runner.error_hosts)
+        self.assertEqual(sorted(ips[:-1]), sorted(x["ipAddress"] for x in runner.data))
+        for data in runner.data:
+            self.assertEqual(["ipAddress", "hostname", "vlans", "neighbors", "trunk_interfaces", "version"], [x for x in data if x != "running_config"][:6])
+            self.assertEqual(data["version"][0]["hostname"], data["hostname"])
+            self.assertEqual(self.get_results(self.OUTPUTS["show vlan brief"]), data["vlans"])
+            version = self.get_results(self.OUTPUTS["show version"])
+            version[0]["hostname"] = data["version"][0]["hostname"]
+            self.assertEqual(version, data["version"])
+            self.assertEqual(self.get_results(self.OUTPUTS["show interfaces trunk"]), data["trunk_interfaces"])
+            self.assertNotIn("license", data)
+            self.assertIn("hostname {}\n".format(data["version"][0]["hostname"]), data["running_config"])
+        neighbors = {x["version"][0]["hostname"]: [y["hostname"].split(".")[0] for y in x["neighbors"]] for x in runner.data}
+        self.assertEqual({"SW-00000": ["SW-00001", "SW-00002"], "SW-00001": ["SW-00000"], "SW-00002": ["SW-00000"]}, neighbors)
+        # Data are usable by the same consumers as data of CliMultiRunner
+        topology = CliTopology()
+        topology.build_topology(data=runner.data)
+        self.assertEqual(["SW-00000", "SW-00001", "SW-00002"], sorted(x.split(".")[0] for x in topology.topology["nodes"]))
+        self.assertEqual(2, len(topology.topology["links"]))
+        self.assertEqual({"ok": 3, "error": 1}, {key: runner.stats[key] for key in ["ok", "error"]})
+
+    def test_process_commands(self):
+        runner, ips = self.collect(devices=1, actions=["get_interfaces"], process_commands=["show interfaces"])
+        self.assertEqual(self.get_results(self.OUTPUTS["show interfaces"]), runner.data[0]["interfaces"])
+
+
+if __name__ == '__main__':
+    unittest.main()
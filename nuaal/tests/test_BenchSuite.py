@@ -0,0 +1,46 @@
+import unittest
+import copy
+import pathlib
+from nuaal.Parsers import CiscoIOSParser, CiscoNXOSParser
+from nuaal.tests.benchmarks.bench_suite import discover_fixtures, scale_text, scale_structured, run_case, compare
+
+
+class TestBenchSuite(unittest.TestCase):
+
+    @staticmethod
+    def get_text(test_file_name):
+        test_file_path = pathlib.Path(__file__).parent.joinpath("resources/{}.txt".format(test_file_name))
+        return test_file_path.read_text()
+
+    def test_discover_fixtures(self):
+        fixtures = {x[2]: x for x in discover_fixtures()}
+        self.assertEqual(("cisco_ios", "show mac address-table", "cisco_ios_show_mac_address-table_01", False), fixtures["cisco_ios_show_mac_address-table_01"])
+        self.assertEqual(("cisco_nxos", "show ip arp", "cisco_nxos_show_ip_arp_json_01", True), fixtures["cisco_nxos_show_ip_arp_json_01"])
+        self.assertNotIn("cisco_ios_show_spanning_tree", fixtures)
+        self.assertEqual(["juniper_junos"], list({x[0] for x in discover_fixtures(device_types=["juniper_junos"])}))
+
+    def test_scaling(self):
+        parser = CiscoIOSParser(verbosity=0)
+        text = self.get_text("cisco_ios_show_mac_address-table_01")
+        entries = len(parser.autoparse(text=text, command="show mac address-table"))
+        self.assertEqual(entries * 10, len(parser.autoparse(text=scale_text(text=text, factor=10), command="show mac address-table")))
+        nxos_parser = CiscoNXOSParser(verbosity=0)
+        text = self.get_text("cisco_nxos_show_ip_arp_json_01")
+        scaled = scale_structured(text=text, rows=nxos_parser.structured["show ip arp"].rows, factor=10)
+        self.assertEqual(20, len(nxos_parser.autoparse(text=scaled, command="show ip arp")))
+
+    def test_compare(self):
+        parser = CiscoIOSParser(verbosity=0)
+        text = scale_text(text=self.get_text("cisco_ios_show_interfaces_01"), factor=10)
+        result = run_case(parser=parser, command="show interfaces", text=text, repeat=1)
+        self.assertEqual(40, result["entries"])
+        self.assertGreater(result["levels"]["level1"], 0)
+        baseline = {"cases": {"cisco_ios_show_interfaces_01/x10": result}}
+        results = copy.deepcopy(baseline)
+        self.assertEqual([], compare(results=results, baseline=baseline))
+        results["cases"]["cisco_ios_show_interfaces_01/x10"].update(time=result["time"] * 2, entries=39)
+        self.assertEqual(2, len(compare(results=results, baseline=baseline)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+import unittest
+import pathlib
+import tempfile
+import shutil
+import json
+import io
+import os
+import multiprocessing
+import sys
+from unittest import mock
+from nuaal.Parsers import BulkParser, GetParser, CiscoIOSParser
+from nuaal.Parsers.BulkParser import parse_file
+
+
+def crashing_parse_file(path, **kwargs):
+    # Kills the worker process, as the OS does when it runs out of memory
+    if path.endswith("show_interfaces_status.txt"):
+        os._exit(1)
+    return parse_file(path=path, **kwargs)
+
+
+class TestBulkParser(unittest.TestCase):
+
+    RESOURCES = {
+        "10.0.0.1_SW1": {
+            "show_vlan_brief": "cisco_ios_show_vlan_brief_01",
+            "show_interfaces_status": "cisco_ios_show_interfaces_status_01",
+            "show_mac_address-table": "cisco_ios_show_mac_address-table_01"
+        },
+        "10.0.0.2_SW2": {
+            "show_interfaces": "cisco_ios_show_interfaces_01",
+            "show_running-config": "cisco_ios_show_vlan_brief_01"
+        },
+        "10.0.0.3_FW1": {
+            "show_version": "cisco_ios_show_vlan_brief_01"
+        }
+    }
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        resources = pathlib.Path(__file__).parent.joinpath("resources")
+        for device, files in self.RESOURCES.items():
+            os.makedirs(os.path.join(self.temp_dir, device))
+            for filename, resource in files.items():
+                shutil.copy(str(resources.joinpath("{}.txt".format(resource))), os.path.join(self.temp_dir, device, "{}.txt".format(filename)))
+        # Parsed outputs stored next to the raw ones are ignored
+        with open(os.path.join(self.temp_dir, "10.0.0.1_SW1", "get_vlans.json"), mode="w") as f:
+            json.dump([], f)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def get_results(self, results_file_name):
+        result_file_path = pathlib.Path(__file__).parent.joinpath("results/{}.json".format(results_file_name))
+        return json.loads(result_file_path.read_text())
+
+    def test_get_parser(self):
+        self.assertIsInstance(GetParser(device_type="cisco_ios", verbosity=0), CiscoIOSParser)
+        self.assertIsNone(GetParser(device_type="unknown_os"))
+
+    def test_find_files(self):
+        bulk_parser = BulkParser(path=self.temp_dir, verbosity=0)
+        files = bulk_parser.find_files()
+        self.assertEqual(6, len(files))
+        self.assertEqual(("10.0.0.1_SW1", "cisco_ios", "show interfaces status"), files[0][1:])
+
+    def test_run(self):
+        for workers in [1, 2]:
+            with self.subTest(msg="workers={}".format(workers)):
+                bulk_parser = BulkParser(path=self.temp_dir, device_types={"10.0.0.3_FW1": "unknown_os"}, workers=workers, chunk_size=2, verbosity=0)
+                progress = []
+                output = io.StringIO()
+                stats = bulk_parser.run(output=output, progress=lambda done, total: progress.append((done, total)))
+                self.assertEqual({"files": 6, "ok": 4, "unsupported": 1, "error": 1}, {k: v for k, v in stats.items() if k != "time"})
+                self.assertEqual([(2, 6), (4, 6), (6, 6)], sorted(progress))
+                results = {(x["device"], x["command"]): x for x in map(json.loads, output.getvalue().splitlines())}
+                self.assertEqual(6, len(results))
+                self.assertEqual(self.get_results("cisco_ios_show_vlan_brief_01"), results[("10.0.0.1_SW1", "show vlan brief")]["entries"])
+                self.assertEqual(self.get_results("cisco_ios_show_interfaces_01"), results[("10.0.0.2_SW2", "show interfaces")]["entries"])
+                self.assertEqual("unsupported", results[("10.0.0.2_SW2", "show running-config")]["status"])
+                self.assertEqual("error", results[("10.0.0.3_FW1", "show version")]["status"])
+                self.assertIn("unknown_os", results[("10.0.0.3_FW1", "show version")]["error"])
+
+    def test_worker_crash(self):
+        if multiprocessing.get_start_method() != "fork":
+            self.skipTest("Workers inherit patched function only when forked")
+        bulk_parser = BulkParser(path=self.temp_dir, device_types={"10.0.0.3_FW1": "unknown_os"}, workers=2, chunk_size=1, verbosity=0)
+        output = io.StringIO()
+        # `nuaal.Parsers.BulkParser` is the class exported by the package, the module is patched through `sys.modules`
+        with mock.patch.object(sys.modules["nuaal.Parsers.BulkParser"], "parse_file", side_effect=crashing_parse_file):
+            stats = bulk_parser.run(output=output)
+        # Only the shard which crashed the worker fails, other shards are parsed again by new pool
+        self.assertEqual({"files": 6, "ok": 3, "unsupported": 1, "error": 2}, {k: v for k, v in stats.items() if k != "time"})
+        results = {(x["device"], x["command"]): x for x in map(json.loads, output.getvalue().splitlines())}
+        self.assertEqual(6, len(results))
+        self.assertIn("BrokenProcessPool", results[("10.0.0.1_SW1", "show interfaces status")]["error"])
+        self.assertEqual(self.get_results("cisco_ios_show_vlan_brief_01"), results[("10.0.0.1_SW1", "show vlan brief")]["entries"])
+
+    def test_run_to_file(self):
+        output = os.path.join(self.temp_dir, "results.ndjson")
+        stats = BulkParser(path=self.temp_dir, workers=1, verbosity=0).run(output=output)
+        with open(output) as f:
+            self.assertEqual(stats["files"], len(f.readlines()))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -34,6 +34,143 @@ class TestCiscoIosParser(unittest.TestCase):
                 # jprint(have)
                 self.assertEqual(want, have)
 
+    def test_show_interfaces_trunk(self):
+        command = "show interfaces trunk"
+        test_file_base = "cisco_ios_show_interfaces_trunk_01"
+        with self.subTest(msg=test_file_base):
+            text = self.get_text(test_file_name=test_file_base)
+            want = self.get_results(results_file_name=test_file_base)
+            have = self.PARSER.autoparse(text=text, command=command)
+            # jprint(have)
+            self.assertEqual(want, have)
+        with self.subTest(msg="missing section"):
+            self.assertEqual([], self.PARSER.autoparse(text=text.split("\n\nPort        Vlans in spanning tree")[0], command=command))
+
+    def test_show_mac_address_table(self):
+        command = "show mac address-table"
+        test_file_bases = [
+            "cisco_ios_show_mac_address-table_01",
+        ]
+        for test_file_base in test_file_bases:
+            with self.subTest(msg=test_file_base):
+                text = self.get_text(test_file_name=test_file_base)
+                want = self.get_results(results_file_name=test_file_base)
+                have = self.PARSER.autoparse(text=text, command=command)
+                # jprint(have)
+                self.assertEqual(want, have)
+
+    def test_show_interfaces(self):
+        command = "show interfaces"
+        test_file_base = "cisco_ios_show_interfaces_01"
+        with self.subTest(msg=test_file_base):
+            text = self.get_text(test_file_name=test_file_base)
+            want = self.get_results(results_file_name=test_file_base)
+            have = self.PARSER.autoparse(text=text, command=command)
+            # jprint(have)
+            self.assertEqual(want, have)
+
+    def test_show_cdp_neighbors_detail(self):
+        command = "show cdp neighbors detail"
+        test_file_base = "cisco_ios_show_cdp_neighbors_detail_01"
+        with self.subTest(msg=test_file_base):
+            text = self.get_text(test_file_name=test_file_base)
+            want = self.get_results(results_file_name=test_file_base)
+            have = self.PARSER.autoparse(text=text, command=command)
+            # jprint(have)
+            self.assertEqual(want, have)
+
+    def test_show_lldp_neighbors_detail(self):
+        command = "show lldp neighbors detail"
+        test_file_base = "cisco_ios_show_lldp_neighbors_detail_01"
+        with self.subTest(msg=test_file_base):
+            text = self.get_text(test_file_name=test_file_base)
+            want = self.get_results(results_file_name=test_file_base)
+            have = self.PARSER.autoparse(text=text, command=command)
+            # jprint(have)
+            self.assertEqual(want, have)
+
+    def test_show_authentication_sessions_interface(self):
+        command = "show authentication sessions interface"
+        test_file_base = "cisco_ios_show_authentication_sessions_interface_01"
+        with self.subTest(msg=test_file_base):
+            text = self.get_text(test_file_name=test_file_base)
+            want = self.get_results(results_file_name=test_file_base)
+            have = self.PARSER.autoparse(text=text, command=command)
+            # jprint(have)
+            self.assertEqual(want, have)
+
+    def test_show_interfaces_status(self):
+        command = "show interfaces status"
+        test_file_base = "cisco_ios_show_interfaces_status_01"
+        with self.subTest(msg=test_file_base):
+            text = self.get_text(test_file_name=test_file_base)
+            want = self.get_results(results_file_name=test_file_base)
+            have = self.PARSER.autoparse(text=text, command=command)
+            # jprint(have)
+            self.assertEqual(want, have)
+
+    def test_show_vlan_brief(self):
+        command = "show vlan brief"
+        test_file_base = "cisco_ios_show_vlan_brief_01"
+        with self.subTest(msg=test_file_base):
+            text = self.get_text(test_file_name=test_file_base)
+            want = self.get_results(results_file_name=test_file_base)
+            have = self.PARSER.autoparse(text=text, command=command)
+            # jprint(have)
+            self.assertEqual(want, have)
+
+    def test_show_ip_arp(self):
+        command = "show ip arp"
+        test_file_base = "cisco_ios_show_ip_arp_01"
+        with self.subTest(msg=test_file_base):
+            text = self.get_text(test_file_name=test_file_base)
+            want = self.get_results(results_file_name=test_file_base)
+            have = self.PARSER.autoparse(text=text, command=command)
+            # jprint(have)
+            self.assertEqual(want, have)
+
+    def test_show_etherchannel_summary(self):
+        command = "show etherchannel summary"
+        test_file_base = "cisco_ios_show_etherchannel_summary_01"
+        with self.subTest(msg=test_file_base):
+            text = self.get_text(test_file_name=test_file_base)
+            want = self.get_results(results_file_name=test_file_base)
+            have = self.PARSER.autoparse(text=text, command=command)
+            # jprint(have)
+            self.assertEqual(want, have)
+
+    def test_iterparse(self):
+        test_cases = [
+            ("show mac address-table", "cisco_ios_show_mac_address-table_01"),
+            ("show interfaces", "cisco_ios_show_interfaces_01"),
+            ("show cdp neighbors detail", "cisco_ios_show_cdp_neighbors_detail_01"),
+            ("show interfaces status", "cisco_ios_show_interfaces_status_01"),
+            ("show vlan brief", "cisco_ios_show_vlan_brief_01"),
+            ("show etherchannel summary", "cisco_ios_show_etherchannel_summary_01"),
+            ("show interfaces switchport", "cisco_ios_show_interfaces_switchport_01")
+        ]
+        for command, test_file_base in test_cases:
+            with self.subTest(msg=test_file_base):
+                text = self.get_text(test_file_name=test_file_base)
+                want = self.get_results(results_file_name=test_file_base)
+                entries = self.PARSER.iterparse(text=text, command=command)
+                self.assertFalse(isinstance(entries, list))
+                self.assertEqual(want, list(entries))
+
+    def test_fields(self):
+        test_cases = [
+            ("show interfaces", "cisco_ios_show_interfaces_01", ["name", "lineProtocol", "description"]),
+            ("show cdp neighbors detail", "cisco_ios_show_cdp_neighbors_detail_01", ["hostname", "ipAddress"]),
+            ("show vlan brief", "cisco_ios_show_vlan_brief_01", ["id", "access_ports"]),
+            ("show interfaces switchport", "cisco_ios_show_interfaces_switchport_01", ["name", "trunk_enabled_vlans"])
+        ]
+        for command, test_file_base, fields in test_cases:
+            with self.subTest(msg=test_file_base):
+                text = self.get_text(test_file_name=test_file_base)
+                want = [{field: entry[field] for field in fields} for entry in self.get_results(results_file_name=test_file_base)]
+                self.assertEqual(want, self.PARSER.autoparse(text=text, command=command, fields=fields))
+                self.assertEqual(want, list(self.PARSER.iterparse(text=text, command=command, fields=fields)))
+
     def test_show_spanning_tree(self):
         command = "show spanning-tree"
         test_file_base = "cisco_ios_show_spanning_tree"
@@ -0,0 +1,103 @@
+import unittest
+import pathlib
+import tempfile
+import shutil
+import pickle
+import json
+from array import array
+from nuaal.Parsers import CiscoIOSParser, ParseCache
+from nuaal.utils import Columns, Filter, OutputFilter
+from nuaal.Writers.Writer import Writer
+
+
+class TestColumns(unittest.TestCase):
+
+    PARSER = CiscoIOSParser(verbosity=0)
+    TESTS = [
+        ("cisco_ios_show_mac_address-table_01", "show mac address-table"),
+        ("cisco_ios_show_interfaces_01", "show interfaces"),
+        ("cisco_ios_show_vlan_brief_01", "show vlan brief"),
+        ("cisco_ios_show_interfaces_trunk_01", "show interfaces trunk")
+    ]
+
+    @staticmethod
+    def get_text(test_file_name):
+        test_file_path = pathlib.Path(__file__).parent.joinpath("resources/{}.txt".format(test_file_name))
+        return test_file_path.read_text()
+
+    @staticmethod
+    def get_results(results_file_name):
+        result_file_path = pathlib.Path(__file__).parent.joinpath("results/{}.json".format(results_file_name))
+        return json.loads(result_file_path.read_text())
+
+    def test_results_unchanged(self):
+        for name, command in self.TESTS:
+            with self.subTest(command=command):
+                want = self.get_results(name)
+                have = self.PARSER.autoparse(text=self.get_text(name), command=command, layout="columns")
+                self.assertIsInstance(have, Columns)
+                self.assertEqual(len(want), have.length)
+                self.assertEqual(want, list(have.iter_rows()))
+                self.assertEqual(have, pickle.loads(pickle.dumps(have)))
+        compact_parser = CiscoIOSParser(compact=True, verbosity=0)
+        name, command = self.TESTS[0]
+        self.assertEqual(self.get_results(name), list(compact_parser.autoparse(text=self.get_text(name), command=command, layout="columns").iter_rows()))
+
+    def test_from_entries(self):
+        columns = Columns.from_entries(entries=iter([
+            {"vlan": 1, "port": "Gi1/0/1", "mtu": 1500},
+            {"vlan": 2, "port": "Gi1/0/2", "mtu": None},
+            {"vlan": 3, "speed": 2 ** 70}
+        ]))
+        self.assertEqual(3, columns.length)
+        self.assertEqual(array("l", [1, 2, 3]), columns["vlan"])
+        self.assertEqual([1500, None, None], columns["mtu"])
+        self.assertEqual(["Gi1/0/1", "Gi1/0/2", None], columns["port"])
+        self.assertEqual([None, None, 2 ** 70], columns["speed"])
+        self.assertEqual([[1, "Gi1/0/1"], [2, "Gi1/0/2"], [3, None]], list(columns.iter_lists(headers=["vlan", "port"])))
+        with self.assertRaises(TypeError):
+            Columns.from_entries(entries=["Gi1/0/1"])
+        self.assertIsNone(self.PARSER.autoparse(text="", command="show vlan brief", layout="unknown"))
+
+    def test_filter(self):
+        name, command = self.TESTS[0]
+        rows = self.get_results(name)
+        columns = self.PARSER.autoparse(text=self.get_text(name), command=command, layout="columns")
+        filters = [
+            Filter(required={"type": "DYNAMIC"}),
+            Filter(required={"vlan": [1, 2]}, excluded={"ports": "Gi1/0/48"}),
+            Filter(required={"ports": ["Gi"]}, excluded={"mac": "0000"}, exact_match=False),
+            Filter(excluded={"type": "STATIC"})
+        ]
+        for column_filter in filters:
+            with self.subTest(msg=str(column_filter)):
+                have = column_filter.universal_cleanup(data=columns)
+                self.assertIsInstance(have, Columns)
+                self.assertEqual(column_filter.universal_cleanup(data=rows), list(have.iter_rows()))
+        self.assertEqual(["vlan", "mac"], list(OutputFilter(data=columns, required=["vlan", "mac"]).get().keys()))
+        self.assertEqual(["vlan", "mac", "type"], list(OutputFilter(data=columns, excluded=["ports"]).get().keys()))
+
+    def test_writer(self):
+        writer = Writer(type="Test")
+        for name, command in self.TESTS:
+            with self.subTest(command=command):
+                rows = self.get_results(name)
+                columns = self.PARSER.autoparse(text=self.get_text(name), command=command, layout="columns")
+                self.assertEqual(writer.json_to_lists(data=rows), writer.json_to_lists(data=columns))
+
+    def test_parse_cache(self):
+        temp_dir = tempfile.mkdtemp()
+        try:
+            name, command = self.TESTS[0]
+            cache = ParseCache(parser=self.PARSER, path=temp_dir, verbosity=0)
+            want = self.PARSER.autoparse(text=self.get_text(name), command=command, layout="columns")
+            for _ in range(2):
+                self.assertEqual(want, cache.autoparse(text=self.get_text(name), command=command, layout="columns"))
+            self.assertEqual(self.get_results(name), cache.autoparse(text=self.get_text(name), command=command))
+            self.assertEqual({"hits": 2, "disk_hits": 0, "misses": 1}, cache.stats)
+        finally:
+            shutil.rmtree(temp_dir)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+import unittest
+import pathlib
+import json
+import os
+import tempfile
+from nuaal.connections.cli import CliMultiRunner, Cisco_IOS_Cli, CommandCache, SessionArchive
+from nuaal.tests.simulator import DeviceSimulator, default_outputs
+from nuaal.tests.simulator.DeviceSimulator import asyncssh
+
+
+class TestCommandCache(unittest.TestCase):
+
+    PROVIDER = {"username": "admin", "password": "cisco", "secret": "enable", "enable": True}
+    # Older platforms support only the second variants of the commands
+    UNSUPPORTED = ["show vlan brief", "show mac address-table"]
+
+    @staticmethod
+    def get_text(test_file_name):
+        test_file_path = pathlib.Path(__file__).parent.joinpath("resources/{}.txt".format(test_file_name))
+        return test_file_path.read_text()
+
+    @staticmethod
+    def get_results(results_file_name):
+        result_file_path = pathlib.Path(__file__).parent.joinpath("results/{}.json".format(results_file_name))
+        return json.loads(result_file_path.read_text())
+
+    def test_shared_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "commands.json")
+            first = CommandCache(path=path, verbosity=0)
+            second = CommandCache(path=path, verbosity=0)
+            first.set(platform="cisco_ios|WS-C3560-24PS|12.2(55)SE", key="get_vlans", command="show vlan-switch brief")
+            # Variants saved by the first cache are kept by the second one
+            second.set(platform="cisco_ios|WS-C3560-24PS|12.2(55)SE", key="get_mac_address_table", command="show mac-address-table")
+            second.set(platform="cisco_ios|C9300-48P|16.09.05", key="get_vlans", command="show vlan brief")
+            first.set(platform="cisco_ios|WS-C3560-24PS|12.2(55)SE", key="get_vlans", command="show vlan-switch brief")
+            expected = {
+                "cisco_ios|C9300-48P|16.09.05": {"get_vlans": "show vlan brief"},
+                "cisco_ios|WS-C3560-24PS|12.2(55)SE": {"get_mac_address_table": "show mac-address-table", "get_vlans": "show vlan-switch brief"}
+            }
+            self.assertEqual(expected, CommandCache(path=path, verbosity=0).variants)
+            self.assertEqual(expected, second.variants)
+            self.assertEqual(["commands.json"], os.listdir(directory))
+            # Damaged file is logged and replaced by the next save
+            with open(path, mode="w") as f:
+                f.write('{"cisco_ios|C9300')
+            third = CommandCache(path=path, verbosity=0)
+            self.assertEqual({}, third.variants)
+            third.set(platform="cisco_ios|C9300-48P|16.09.05", key="get_vlans", command="show vlan brief")
+            self.assertEqual({"cisco_ios|C9300-48P|16.09.05": {"get_vlans": "show vlan brief"}}, CommandCache(path=path, verbosity=0).variants)
+
+    def test_variants(self):
+        if asyncssh is None:
+            self.skipTest("asyncssh is not installed")
+        outputs = dict(
+            default_outputs(), **{
+                "show vlan-switch brief": self.get_text("cisco_ios_show_vlan_brief_01"),
+                "show mac-address-table": self.get_text("cisco_ios_show_mac_address-table_01")
+            }
+        )
+        archive = SessionArchive(verbosity=0)
+        with tempfile.TemporaryDirectory() as directory, \
+                DeviceSimulator(devices=3, enable_secret=self.PROVIDER["secret"], outputs=outputs, unsupported=self.UNSUPPORTED, verbosity=0) as simulator:
+            path = os.path.join(directory, "commands.json")
+            cache = CommandCache(path=path, verbosity=0)
+            runner = CliMultiRunner(
+                provider=dict(self.PROVIDER, record=archive), ips=simulator.ips, actions=["get_vlans", "get_version"], workers=1, verbosity=0,
+                netmiko_params={"port": simulator.port}, command_cache=cache
+            )
+            runner.run()
+            # Variants are loaded by the next run
+            cache = CommandCache(path=path, verbosity=0)
+            with Cisco_IOS_Cli(ip=simulator.ips[0], **self.PROVIDER, netmiko_params={"port": simulator.port}, command_cache=cache, record=archive, verbosity=0) as device:
+                device.get_version()
+                mac_address_table = device.get_mac_address_table()
+            with Cisco_IOS_Cli(ip=simulator.ips[1], **self.PROVIDER, netmiko_params={"port": simulator.port}, command_cache=cache, record=archive, verbosity=0) as device:
+                device.get_version()
+                device.get_mac_address_table()
+                vlans = device.get_vlans()
+            with open(path) as f:
+                variants = json.load(f)
+        commands = {ip: [x[0] for x in archive.devices[ip]["commands"]] for ip in simulator.ips}
+        self.assertEqual(["show version", "show vlan brief", "show vlan-switch brief"], commands[simulator.ips[0]][:3])
+        self.assertEqual(["show version", "show vlan-switch brief"], commands[simulator.ips[2]])
+        self.assertEqual(["show version", "show mac address-table", "show mac-address-table"], commands[simulator.ips[0]][3:])
+        self.assertEqual(["show version", "show vlan-switch brief", "show version", "show mac-address-table", "show vlan-switch brief"], commands[simulator.ips[1]])
+        self.assertEqual({"cisco_ios|C9300-48P|16.09.05": {"get_mac_address_table": "show mac-address-table", "get_vlans": "show vlan-switch brief"}}, variants)
+        self.assertEqual({"hits": 2, "misses": 1, "learned": 1}, cache.stats)
+        self.assertEqual([self.get_results("cisco_ios_show_vlan_brief_01")] * 4, [x["vlans"] for x in runner.data] + [vlans])
+        self.assertTrue(mac_address_table)
+
+
+if __name__ == '__main__':
+    unittest.main()
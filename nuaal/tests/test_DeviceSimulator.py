@@ -0,0 +1,88 @@
+import unittest
+import asyncio
+import re
+from nuaal.Parsers import CiscoIOSParser
+from nuaal.connections.cli import AsyncCliRunner, AsyncCliConnection
+from nuaal.tests.simulator import DeviceSimulator, build_devices
+from nuaal.tests.simulator.DeviceSimulator import asyncssh
+
+
+class TestDeviceSimulator(unittest.TestCase):
+
+    PROVIDER = {"username": "admin", "password": "cisco", "secret": "enable", "enable": True}
+
+    def test_devices(self):
+        devices = build_devices(count=6, ips=["192.0.2.{}".format(i) for i in range(6)], fanout=2, unsupported=["show vlan brief"])
+        parser = CiscoIOSParser(verbosity=0)
+        neighbors = parser.autoparse(text=devices[1].output("show cdp neighbors detail"), command="show cdp neighbors detail")
+        self.assertEqual(["SW-00000", "SW-00003", "SW-00004"], [x["hostname"].split(".")[0] for x in neighbors])
+        self.assertEqual(["192.0.2.0", "192.0.2.3", "192.0.2.4"], [x["ipAddress"] for x in neighbors])
+        self.assertEqual(["TenGigabitEthernet1/1/1", "GigabitEthernet1/0/2", "GigabitEthernet1/0/3"], [x["localInterface"] for x in neighbors])
+        self.assertEqual("SW-00005", parser.autoparse(text=devices[5].output("show version"), command="show version")[0]["hostname"])
+        self.assertIsNone(devices[0].output("show vlan brief"))
+        self.assertIsNone(devices[0].output("show unknown"))
+        failed = [x.failure for x in build_devices(count=100, ips=[None] * 100, failures={"drop": 0.1, "slow": 0.2}, seed=1)]
+        self.assertEqual(failed, [x.failure for x in build_devices(count=100, ips=[None] * 100, failures={"drop": 0.1, "slow": 0.2}, seed=1)])
+        self.assertEqual({None, "drop", "slow"}, set(failed))
+        self.assertRaises(ValueError, build_devices, count=1, ips=[None], failures={"reboot": 0.1})
+
+    def setUp(self):
+        if asyncssh is None:
+            self.skipTest("asyncssh is not installed")
+
+    def test_sessions(self):
+        with DeviceSimulator(devices=5, telnet=True, enable_secret="enable", banner="Authorized access only", verbosity=0) as simulator:
+            for device, failure in zip(simulator.devices[1:], ["refuse", "auth", "drop", "hang"]):
+                device.failure = failure
+            runner = AsyncCliRunner(
+                provider=dict(self.PROVIDER, port=simulator.port), ips=simulator.ips, actions=["get_version", "get_neighbors"], timeout=1, verbosity=0
+            )
+            runner.run()
+            stats = simulator.stats()
+        self.assertEqual(simulator.ips[1:], sorted(runner.error_hosts))
+        self.assertEqual(["SW-00000"], [x["version"][0]["hostname"] for x in runner.data])
+        self.assertEqual(["SW-{:05d}".format(i) for i in range(1, 5)], [x["hostname"].split(".")[0] for x in runner.data[0]["neighbors"]])
+        # Refused and failed authentication do not start a session
+        self.assertEqual((3, {"refuse": 1, "auth": 1, "drop": 1, "hang": 1}), (stats["sessions"], stats["failures"]))
+
+    def test_paging(self):
+        async def run(simulator):
+            session = AsyncCliConnection(ip=simulator.ips[0], username="admin", password="cisco", port=simulator.port, timeout=5)
+            await session.connect()
+            await session.send_command("terminal length 10")
+            session.process.stdin.write("show version\n")
+            first = await session._read_until(re.compile(r"--More-- $"), echo="show version")
+            session.process.stdin.write(" ")
+            second = await session._read_until(re.compile(r"--More-- $"))
+            session.process.stdin.write("q")
+            await session._read_until(session.prompt)
+            invalid = await session.send_command("show unknown")
+            await session.close()
+            return first, second, invalid
+
+        with DeviceSimulator(devices=1, verbosity=0) as simulator:
+            first, second, invalid = asyncio.run(run(simulator))
+        # Terminal length includes the line of `--More--`
+        lines = first.strip("\n").split("\n")
+        self.assertEqual((9, " --More-- "), (len(lines[:-1]), lines[-1]))
+        self.assertTrue(second.startswith("\x08"))
+        self.assertIn("% Invalid input detected at '^' marker.", invalid)
+
+    def test_telnet(self):
+        async def run(port):
+            reader, writer = await asyncio.open_connection("127.1.1.2", port)
+            # Option negotiation of the client is ignored
+            writer.write(b"\xff\xfd\x01admin\r\ncisco\r\nshow running-config\r\nexit\r\n")
+            output = (await reader.read()).decode()
+            writer.close()
+            return output
+
+        with DeviceSimulator(devices=2, ssh=False, telnet=True, username="admin", password="cisco", verbosity=0) as simulator:
+            output = asyncio.run(run(simulator.telnet_port))
+        self.assertEqual(["127.1.1.1", "127.1.1.2"], simulator.ips)
+        self.assertIn("Username: admin\r\nPassword: \r\n", output)
+        self.assertIn("hostname SW-00001\r\n", output)
+
+
+if __name__ == '__main__':
+    unittest.main()
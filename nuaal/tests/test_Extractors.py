@@ -0,0 +1,126 @@
+import unittest
+import re
+from nuaal.Parsers.Extractors import PatternExtractor, BlockSplitter, TableExtractor, CONVERTERS, auto_int, to_str, iter_lines
+
+
+class TestExtractors(unittest.TestCase):
+
+    def test_auto_int(self):
+        for value, want in [("12", 12), (" 12 ", 12), ("-1", -1), ("1_000", 1000), ("Gi1/0/1", "Gi1/0/1"), ("", ""), (None, None), ("1.2", "1.2")]:
+            with self.subTest(msg=repr(value)):
+                self.assertEqual(want, auto_int(value))
+
+    def test_pattern_extractor(self):
+        extractor = PatternExtractor(regex=re.compile(r"^(?P<vlan>\d+)\s+(?P<name>\S+)(\s+(?P<status>\S+))?", flags=re.MULTILINE))
+        self.assertEqual(extractor.group_names, ("vlan", "name", "status"))
+        text = "1    default    active\n10   DATA\n"
+        self.assertEqual(
+            [{"vlan": 1, "name": "default", "status": "active"}, {"vlan": 10, "name": "DATA", "status": None}],
+            extractor.extract(text)
+        )
+        self.assertEqual({"vlan": 1, "name": "default", "status": "active"}, extractor.search(text))
+        self.assertIsNone(extractor.search("VLAN Name"))
+
+    def test_pattern_extractor_without_groups(self):
+        extractor = PatternExtractor(regex=re.compile(r"[A-Za-z]+\d+(?:\/\d+){0,2}"))
+        self.assertEqual(["Gi1/0/1", "Gi1/0/2"], extractor.extract("Gi1/0/1, Gi1/0/2"))
+
+    def test_iter_extract(self):
+        text = "Gi1/0/1 up, Gi1/0/2, Po1 down"
+        for pattern in [r"[A-Za-z]+\d+(?:\/\d+){0,2}", r"([A-Za-z]+)\d+", r"([A-Za-z]+)\d+(?: (up|down))?", r"(?P<name>[A-Za-z]+\d+)"]:
+            with self.subTest(msg=pattern):
+                extractor = PatternExtractor(regex=re.compile(pattern))
+                self.assertEqual(extractor.extract(text), list(extractor.iter_extract(text)))
+
+    def test_iter_lines(self):
+        for text in ["", "\n", "a", "a\nb", "a\nb\n", "abc\n\nde\nf\n\n", "abcdef\ngh"]:
+            for chunk_size in [1, 2, 3, 1 << 16]:
+                with self.subTest(msg="{!r} {}".format(text, chunk_size)):
+                    self.assertEqual(text.split("\n"), list(iter_lines(text, chunk_size=chunk_size)))
+
+    def test_converters(self):
+        for type_name, value, want in [
+            ("int", "0001", 1), ("int", "All", "All"), ("str", "0001", "0001"), ("mac", "aabb.cc00.0100", "AA:BB:CC:00:01:00"),
+            ("vlan-list", "1-3,10", [1, 2, 3, 10]), ("vlan-list", "none", []), ("vlan-list", "ALL", "ALL"),
+            ("interface-name", "Gi1/0/1", "GigabitEthernet1/0/1"), ("bool", "Enabled", True), ("bool", "no", False), ("bool", "maybe", "maybe")
+        ]:
+            with self.subTest(msg="{} {}".format(type_name, value)):
+                self.assertEqual(want, CONVERTERS[type_name](value))
+
+    def test_pattern_extractor_declared_types(self):
+        extractor = PatternExtractor(
+            regex=re.compile(r"^(?P<vlan>\d+)\s+(?P<port>\d+)\s+(?P<trunks>\S+)", flags=re.MULTILINE),
+            converters={"vlan": CONVERTERS["int"], "trunks": CONVERTERS["vlan-list"]},
+            default_converter=to_str
+        )
+        self.assertEqual([{"vlan": 10, "port": "1", "trunks": [1, 2, 5]}], extractor.extract("0010  1  1-2,5\n"))
+
+    def test_block_splitter_unindented(self):
+        splitter = BlockSplitter(splitter="unindented")
+        text = "header\n continued\n\nVlan1 is up\n  MTU 1500\nVlan2 is down"
+        self.assertEqual([(0, 19), (19, 42), (42, 55)], list(splitter.spans(text)))
+        self.assertEqual(["header\n continued\n\n", "Vlan1 is up\n  MTU 1500\n", "Vlan2 is down"], splitter.extract(text))
+        self.assertEqual([], splitter.extract(""))
+
+    def test_block_splitter_prefix(self):
+        splitter = BlockSplitter(splitter="prefix", prefix="Device ID:", end="-----")
+        text = "-----\nDevice ID: A\nIP: 1\n-----\nDevice ID: A\nIP: 2\n\nDevice ID: B\n  IP: 3\n"
+        self.assertEqual(["Device ID: A\nIP: 1\n", "Device ID: A\nIP: 2\n\n", "Device ID: B\n  IP: 3\n"], splitter.extract(text))
+        # Indented prefixes begin blocks, prefix wins over end starting with the same text
+        splitter = BlockSplitter(splitter="prefix", prefix=["Local Intf:", "Chassis id:"], end=["Local", "Total"])
+        text = "  Local Intf: Gi1/0/1\n  Chassis id: a\nLocal x\nChassis id: b\nTotal entries: 2\n"
+        self.assertEqual([(0, 22), (22, 38), (46, 60)], list(splitter.spans(text)))
+        with self.assertRaises(ValueError):
+            BlockSplitter(splitter="prefix")
+        with self.assertRaises(ValueError):
+            BlockSplitter(splitter="regex")
+
+    def test_table_extractor(self):
+        extractor = TableExtractor(
+            columns=[
+                {"header": "Port", "group": "interface", "pattern": "[A-Za-z]+\\d+(?:/\\d+)*"},
+                {"header": "Name", "group": "name", "default": ""},
+                {"header": "Vlan", "group": "vlan"},
+                {"header": "Duplex", "group": "duplex", "align": "right"},
+                {"header": "Speed", "group": "speed", "align": "right"},
+                {"header": "Ports", "group": "ports"}
+            ],
+            continuation="ports",
+            converters={"vlan": CONVERTERS["int"]},
+            default_converter=to_str
+        )
+        text = "\n".join([
+            "Port      Name          Vlan  Duplex  Speed Ports",
+            "--------- ------------- ----- ------ ------ -----",
+            "Gi1/0/1   Uplink to A   1     a-full a-1000 Gi1/0/1, Gi1/0/2",
+            "                                            Gi1/0/3",
+            "Gi1/0/2                 10      auto   auto",
+            "Total: 2"
+        ])
+        self.assertEqual(
+            [
+                {"interface": "Gi1/0/1", "name": "Uplink to A", "vlan": 1, "duplex": "a-full", "speed": "a-1000", "ports": "Gi1/0/1, Gi1/0/2 Gi1/0/3"},
+                {"interface": "Gi1/0/2", "name": "", "vlan": 10, "duplex": "auto", "speed": "auto", "ports": None}
+            ],
+            extractor.extract(text)
+        )
+        self.assertEqual([], extractor.extract("Gi1/0/1   Uplink to A   1     a-full a-1000\n"))
+
+    def test_table_extractor_expand_and_tokens(self):
+        extractor = TableExtractor(
+            columns=[
+                {"header": "Group", "group": "group", "pattern": "\\d+"},
+                {"header": "Port-channel", "group": "portchannel", "pattern": "(?P<portchannel>Po\\d+)\\((?P<status>\\w+)\\)"},
+                {"header": "Protocol", "group": "protocol"}
+            ],
+            tokens=True
+        )
+        text = "Group  Port-channel  Protocol\n------+-------------+---------\n1      Po1(SU)         LACP\n10     Po10(RD)         -\n"
+        self.assertEqual(
+            [{"group": 1, "portchannel": "Po1", "status": "SU", "protocol": "LACP"}, {"group": 10, "portchannel": "Po10", "status": "RD", "protocol": "-"}],
+            extractor.extract(text)
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
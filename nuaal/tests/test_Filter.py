@@ -0,0 +1,38 @@
+import unittest
+import copy
+from nuaal.utils import Filter
+
+
+class TestFilter(unittest.TestCase):
+
+    DATA = [
+        {"hostname": "SW1", "capabilities": ["Switch", "IGMP"], "vendor": "Cisco", "portMode": "access"},
+        {"hostname": "R1", "capabilities": ["Router"], "vendor": "Cisco", "portMode": "routed"},
+        {"hostname": "PHONE1", "capabilities": ["Host", "Phone"], "vendor": None, "portMode": "trunk"},
+        {"hostname": "AP1", "capabilities": None, "vendor": "Cisco", "portMode": None}
+    ]
+
+    def test_iter_cleanup(self):
+        filters = [
+            Filter(required={"portMode": "routed"}, exact_match=True),
+            Filter(required={"portMode": ["access", "trunk"]}),
+            Filter(required={"capabilities": ["Router", "Switch"], "vendor": ["Cisco"]}, exact_match=False),
+            Filter(excluded={"capabilities": ["Host"]}, exact_match=False),
+            Filter(excluded={"hostname": "R1"}),
+            Filter(required={"vendor": "Cis"}, excluded={"capabilities": "Router"}, exact_match=False)
+        ]
+        for out_filter in filters:
+            with self.subTest(msg=str(out_filter)):
+                want = out_filter.universal_cleanup(data=self.DATA)
+                have = list(out_filter.iter_cleanup(data=iter(copy.deepcopy(self.DATA))))
+                self.assertEqual(want, have)
+
+    def test_list_cleanup(self):
+        out_filter = Filter(required={"capabilities": ["Router", "Switch"], "vendor": ["Cisco"]}, exact_match=False)
+        self.assertEqual(["SW1", "R1"], [x["hostname"] for x in out_filter.universal_cleanup(data=self.DATA)])
+        out_filter = Filter(excluded={"capabilities": ["Host"]}, exact_match=False)
+        self.assertEqual(["SW1", "R1", "AP1"], [x["hostname"] for x in out_filter.universal_cleanup(data=self.DATA)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,105 @@
+import unittest
+import pathlib
+import tempfile
+import shutil
+import json
+import os
+import threading
+from unittest import mock
+from nuaal.Parsers import CiscoIOSParser, ParseCache, PatternsLib
+
+
+class TestParseCache(unittest.TestCase):
+
+    PARSER = CiscoIOSParser(verbosity=0)
+
+    @staticmethod
+    def get_text(test_file_name):
+        test_file_path = pathlib.Path(__file__).parent.joinpath("resources/{}.txt".format(test_file_name))
+        return test_file_path.read_text()
+
+    @staticmethod
+    def get_results(results_file_name):
+        result_file_path = pathlib.Path(__file__).parent.joinpath("results/{}.json".format(results_file_name))
+        return json.loads(result_file_path.read_text())
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_hits_and_misses(self):
+        cache = ParseCache(parser=self.PARSER, path=self.temp_dir, verbosity=0)
+        text = self.get_text("cisco_ios_show_vlan_brief_01")
+        want = self.get_results("cisco_ios_show_vlan_brief_01")
+        self.assertEqual(want, cache.autoparse(text=text, command="show vlan brief"))
+        have = cache.autoparse(text=text, command="show vlan brief")
+        self.assertEqual(want, have)
+        # Returned results are copies
+        have[0]["name"] = "changed"
+        self.assertEqual(want, cache.autoparse(text=text, command="show vlan brief"))
+        self.assertEqual([{"id": x["id"]} for x in want], cache.autoparse(text=text, command="show vlan brief", fields=["id"]))
+        self.assertEqual({"hits": 2, "disk_hits": 0, "misses": 2}, cache.stats)
+        # New cache with empty memory tier uses the disk tier
+        cache = ParseCache(parser=self.PARSER, path=self.temp_dir, verbosity=0)
+        self.assertEqual(want, cache.autoparse(text=text, command="show vlan brief"))
+        self.assertEqual(want, cache.autoparse(text=text, command="show vlan brief"))
+        self.assertEqual({"hits": 1, "disk_hits": 1, "misses": 0}, cache.stats)
+        # Filtered outputs are parsed by iterparse()
+        self.assertEqual(want, list(cache.iterparse(text=text, command="show vlan brief")))
+        self.assertEqual([{"id": x["id"]} for x in want], list(cache.iterparse(text=text, command="show vlan brief", fields=["id"])))
+        self.assertEqual({"hits": 2, "disk_hits": 2, "misses": 0}, cache.stats)
+        # Other attributes are delegated to the parser
+        self.assertEqual("cisco_ios", cache.device_type)
+        self.assertTrue(cache.supports(command="show interfaces trunk"))
+
+    def test_eviction(self):
+        cache = ParseCache(parser=self.PARSER, path=self.temp_dir, max_entries=2, max_disk_size=2000, verbosity=0)
+        text = self.get_text("cisco_ios_show_interfaces_status_01")
+        lines = text.splitlines()
+        for i in range(len(lines) - 10):
+            cache.autoparse(text="\n".join(lines[:i + 10]), command="show interfaces status")
+        self.assertEqual(2, len(cache._memory))
+        self.assertLessEqual(sum(entry.stat().st_size for entry in os.scandir(self.temp_dir)), 2000)
+        # Replaced entry is counted only once
+        key = cache.key(text=text, command="show interfaces status")
+        cache._disk_put(key, b"x" * 100)
+        cache._disk_put(key, b"x" * 100)
+        self.assertEqual(sum(entry.stat().st_size for entry in os.scandir(self.temp_dir)), cache._disk_size)
+        # Threads writing the same and other entries neither fail nor miscount the size
+        cache.logger = mock.Mock()
+
+        def put(index):
+            for i in range(50):
+                cache._disk_put(key, b"x" * 100)
+                cache._disk_put(cache.key(text="{} {}".format(index, i), command="show interfaces status"), b"y" * 10)
+
+        threads = [threading.Thread(target=put, args=(x, )) for x in range(8)]
+        [t.start() for t in threads]
+        [t.join() for t in threads]
+        cache.logger.error.assert_not_called()
+        self.assertFalse([x for x in os.listdir(self.temp_dir) if x.endswith(".tmp")])
+        self.assertEqual(sum(entry.stat().st_size for entry in os.scandir(self.temp_dir)), cache._disk_size)
+        cache.clear()
+        self.assertEqual([], os.listdir(self.temp_dir))
+
+    def test_invalidation(self):
+        parser = CiscoIOSParser(verbosity=0)
+        cache = ParseCache(parser=parser, use_disk=False, check_interval=0, verbosity=0)
+        text = self.get_text("cisco_ios_show_vlan_brief_01")
+        cache.autoparse(text=text, command="show vlan brief")
+        cache.autoparse(text=text, command="show vlan brief")
+        version = parser.library.version
+        try:
+            with mock.patch.object(PatternsLib, "_pattern_set_version", return_value="changed"):
+                self.assertEqual(self.get_results("cisco_ios_show_vlan_brief_01"), cache.autoparse(text=text, command="show vlan brief"))
+                self.assertEqual("changed", parser.library.version)
+            self.assertNotEqual(version, parser.library.version)
+            self.assertEqual({"hits": 1, "disk_hits": 0, "misses": 2}, cache.stats)
+        finally:
+            PatternsLib.invalidate(device_type="cisco_ios")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+import unittest
+import pathlib
+import json
+from nuaal.Parsers import CiscoIOSParser, ParseGuard, ParseTimeout
+
+
+class TestParseGuard(unittest.TestCase):
+
+    @staticmethod
+    def get_text(test_file_name):
+        test_file_path = pathlib.Path(__file__).parent.joinpath("resources/{}.txt".format(test_file_name))
+        return test_file_path.read_text()
+
+    @staticmethod
+    def get_results(results_file_name):
+        result_file_path = pathlib.Path(__file__).parent.joinpath("results/{}.json".format(results_file_name))
+        return json.loads(result_file_path.read_text())
+
+    def setUp(self):
+        self.guard = ParseGuard(parser=CiscoIOSParser(verbosity=0), timeout=30.0, verbosity=0)
+
+    def tearDown(self):
+        self.guard.close()
+
+    def test_autoparse(self):
+        for name, command in [("cisco_ios_show_vlan_brief_01", "show vlan brief"), ("cisco_ios_show_interfaces_switchport_01", "show interfaces switchport")]:
+            with self.subTest(command=command):
+                want = self.get_results(name)
+                self.assertEqual(want, self.guard.autoparse(text=self.get_text(name), command=command))
+                self.assertEqual(want, list(self.guard.iterparse(text=self.get_text(name), command=command)))
+        self.assertEqual(4, self.guard.stats["ok"])
+
+    def test_timeout(self):
+        text = self.get_text("cisco_ios_show_vlan_brief_01")
+        # Worker process cannot even start within the budget
+        self.guard.timeout = 0.001
+        result = self.guard.autoparse(text=text, command="show vlan brief")
+        self.assertIsInstance(result, ParseTimeout)
+        self.assertEqual([], result)
+        self.assertEqual("show vlan brief", result.command)
+        self.assertIsNone(self.guard._process)
+        # New worker is started after the timeout
+        self.guard.timeout = 30.0
+        self.assertEqual(self.get_results("cisco_ios_show_vlan_brief_01"), self.guard.autoparse(text=text, command="show vlan brief"))
+        self.assertEqual({"ok": 1, "error": 0, "timeout": 1}, self.guard.stats)
+
+    def test_delegation(self):
+        self.assertTrue(self.guard.supports(command="show interfaces trunk"))
+        self.assertEqual("cisco_ios", self.guard.device_type)
+
+
+if __name__ == '__main__':
+    unittest.main()
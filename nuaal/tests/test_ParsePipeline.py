@@ -0,0 +1,94 @@
+import unittest
+import pathlib
+import json
+import threading
+from nuaal.Parsers import CiscoIOSParser, ParsePipeline
+from nuaal.connections.cli import Cisco_IOS_Cli
+from nuaal.utils import Filter
+
+
+class TestParsePipeline(unittest.TestCase):
+
+    OUTPUTS = {
+        "show vlan brief": "cisco_ios_show_vlan_brief_01",
+        "show interfaces": "cisco_ios_show_interfaces_01",
+        "show version": "cisco_ios_show_version_01",
+        "show cdp neighbors detail": "cisco_ios_show_cdp_neighbors_detail_01",
+        "show interfaces trunk": "cisco_ios_show_interfaces_trunk_01"
+    }
+
+    @staticmethod
+    def get_text(test_file_name):
+        test_file_path = pathlib.Path(__file__).parent.joinpath("resources/{}.txt".format(test_file_name))
+        return test_file_path.read_text()
+
+    @staticmethod
+    def get_results(results_file_name):
+        result_file_path = pathlib.Path(__file__).parent.joinpath("results/{}.json".format(results_file_name))
+        return json.loads(result_file_path.read_text())
+
+    def setUp(self):
+        self.pipeline = ParsePipeline(parser=CiscoIOSParser(verbosity=0), workers=2, max_pending=2, verbosity=0)
+
+    def tearDown(self):
+        self.pipeline.close()
+
+    def test_submit(self):
+        futures = [
+            self.pipeline.submit(self.pipeline.autoparse, text=self.get_text(name), command=command) for command, name in self.OUTPUTS.items()
+            if command != "show interfaces trunk"
+        ]
+        failed = self.pipeline.submit(self.pipeline.autoparse, text="", command="show unknown")
+        self.pipeline.join()
+        self.assertEqual([self.get_results(name) for command, name in self.OUTPUTS.items() if command != "show interfaces trunk"], [x.result() for x in futures])
+        self.assertRaises(KeyError, failed.result)
+        self.assertEqual({"submitted": 5, "done": 4, "error": 1}, {key: self.pipeline.stats[key] for key in ["submitted", "done", "error"]})
+
+    def test_bounded_queue(self):
+        release = threading.Event()
+        for _ in range(4):
+            # Two jobs block both workers, two more fill the queue
+            self.pipeline.submit(release.wait)
+        submitted = threading.Event()
+        thread = threading.Thread(target=lambda: self.pipeline.submit(len, obj="") and submitted.set())
+        thread.start()
+        self.assertFalse(submitted.wait(timeout=0.2))
+        release.set()
+        self.assertTrue(submitted.wait(timeout=5))
+        thread.join()
+
+    def test_process_commands(self):
+        pipeline = ParsePipeline(parser=CiscoIOSParser(verbosity=0), workers=1, process_commands=["show interfaces"], process_workers=1, verbosity=0)
+        name = self.OUTPUTS["show interfaces"]
+        try:
+            future = pipeline.submit(pipeline.autoparse, text=self.get_text(name), command="show interfaces")
+            self.assertEqual(self.get_results(name), future.result(timeout=60))
+            self.assertEqual(self.get_results(name), list(pipeline.iterparse(text=self.get_text(name), command="show interfaces")))
+        finally:
+            pipeline.close()
+
+    def test_connection(self):
+        device = Cisco_IOS_Cli(ip="192.0.2.1", parser=self.pipeline, verbosity=0)
+        sent = []
+        device._send_command = lambda command: sent.append(command) or self.get_text(self.OUTPUTS.get(command, "cisco_ios_show_boot_01"))
+        self.assertIs(self.pipeline, device.pipeline)
+        device.get_version()
+        device.get_interfaces(fields=["name", "status"])
+        device.get_neighbors(output_filter=Filter(required={"platform": ["WS-C4500X-16"]}))
+        device.get_vlans()
+        device.get_trunks()
+        device.get_auth_sessions()
+        self.assertEqual(["show version", "show interfaces", "show cdp neighbors detail", "show vlan brief", "show interfaces trunk", "show authentication sessions"], sent)
+        # Results are stored only when they are awaited, in the order the commands were sent
+        self.assertEqual({"ipAddress": "192.0.2.1"}, device.data)
+        data = device.wait_parsing()
+        self.assertEqual(["ipAddress", "version", "interfaces", "neighbors", "vlans", "trunk_interfaces"], list(data))
+        self.assertEqual(self.get_results(self.OUTPUTS["show vlan brief"]), data["vlans"])
+        self.assertEqual(self.get_results(self.OUTPUTS["show interfaces trunk"]), data["trunk_interfaces"])
+        self.assertEqual([{"name": x["name"], "status": x["status"]} for x in self.get_results(self.OUTPUTS["show interfaces"])], data["interfaces"])
+        self.assertEqual(["WS-C4500X-16"], [x["platform"] for x in data["neighbors"]])
+        self.assertEqual([], device._pending)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+import unittest
+import pathlib
+import tempfile
+import json
+import os
+from nuaal.Parsers import CiscoIOSParser
+
+
+class TestPatternProfiler(unittest.TestCase):
+
+    @staticmethod
+    def get_text(test_file_name):
+        test_file_path = pathlib.Path(__file__).parent.joinpath("resources/{}.txt".format(test_file_name))
+        return test_file_path.read_text()
+
+    @staticmethod
+    def get_results(results_file_name):
+        result_file_path = pathlib.Path(__file__).parent.joinpath("results/{}.json".format(results_file_name))
+        return json.loads(result_file_path.read_text())
+
+    def setUp(self):
+        self.parser = CiscoIOSParser(verbosity=0)
+
+    def test_results_unchanged(self):
+        profiler = self.parser.enable_profiling()
+        for name, command in [("cisco_ios_show_interfaces_01", "show interfaces"), ("cisco_ios_show_vlan_brief_01", "show vlan brief"),
+                              ("cisco_ios_show_interfaces_switchport_01", "show interfaces switchport")]:
+            with self.subTest(command=command):
+                text = self.get_text(name)
+                want = self.get_results(name)
+                self.assertEqual(want, self.parser.autoparse(text=text, command=command))
+                self.assertEqual(want, list(self.parser.iterparse(text=text, command=command)))
+                self.assertIn(command, profiler.to_dict())
+
+    def test_statistics(self):
+        profiler = self.parser.enable_profiling()
+        text = self.get_text("cisco_ios_show_interfaces_01")
+        entries = self.parser.autoparse(text=text, command="show interfaces")
+        stats = profiler.to_dict()["show interfaces"]
+        self.assertEqual(1, stats["level0[0]"]["calls"])
+        self.assertEqual(len(entries), stats["level0[0]"]["matches"])
+        for location, record in stats.items():
+            self.assertLessEqual(record["hits"], record["calls"])
+            self.assertLessEqual(record["max_time"], record["total_time"])
+            if location.startswith("level1."):
+                self.assertLessEqual(record["calls"], len(entries))
+        self.assertTrue(any(record["hits"] for location, record in stats.items() if location.startswith("level1.")))
+        # Second run doubles the counters, reset clears them
+        self.parser.autoparse(text=text, command="show interfaces")
+        self.assertEqual(2, profiler.to_dict()["show interfaces"]["level0[0]"]["calls"])
+        profiler.reset()
+        self.assertEqual(0, profiler.to_dict()["show interfaces"]["level0[0]"]["calls"])
+        self.assertIsNone(profiler.to_dict()["show interfaces"]["level0[0]"]["hit_rate"])
+
+    def test_fields(self):
+        profiler = self.parser.enable_profiling()
+        text = self.get_text("cisco_ios_show_interfaces_01")
+        self.parser.autoparse(text=text, command="show interfaces")
+        full = profiler.to_dict()["show interfaces"]
+        profiler.reset()
+        self.parser.autoparse(text=text, command="show interfaces", fields=["name", "status"])
+        projected = profiler.to_dict()["show interfaces"]
+        # Patterns of projected module are reported under the same locations as in the full module
+        self.assertEqual(set(full.keys()), set(projected.keys()))
+        self.assertEqual(full["level0[0]"]["calls"], projected["level0[0]"]["calls"])
+        self.assertLess(sum(x["calls"] for x in projected.values()), sum(x["calls"] for x in full.values()))
+
+    def test_export(self):
+        profiler = self.parser.enable_profiling()
+        self.parser.autoparse(text=self.get_text("cisco_ios_show_vlan_brief_01"), command="show vlan brief")
+        self.parser.autoparse(text=self.get_text("cisco_ios_show_interfaces_01"), command="show interfaces")
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "profile.json")
+            data = profiler.to_json(path=path)
+            with open(path) as f:
+                self.assertEqual(json.loads(data), json.load(f))
+        lines = profiler.report(sort_by="calls", unused=False).splitlines()
+        self.assertTrue(lines[0].startswith("Command"))
+        calls = [int(line[70:78]) for line in lines[1:]]
+        self.assertEqual(sorted(calls, reverse=True), calls)
+        self.assertNotIn(0, calls)
+        self.assertEqual(3, len(profiler.report(limit=2).splitlines()))
+
+    def test_disable(self):
+        profiler = self.parser.enable_profiling()
+        text = self.get_text("cisco_ios_show_vlan_brief_01")
+        self.parser.autoparse(text=text, command="show vlan brief")
+        self.assertIs(profiler, self.parser.disable_profiling())
+        self.assertIsNone(self.parser.profiler)
+        self.parser.autoparse(text=text, command="show vlan brief")
+        self.assertEqual(1, profiler.to_dict()["show vlan brief"]["level0[0]"]["calls"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,7 +1,15 @@
 import unittest
 import pathlib
 import json
-from nuaal.Parsers import PatternsLib
+import threading
+import tempfile
+import os
+import re
+import sys
+from unittest import mock
+from nuaal.Parsers import PatternsLib, PatternsBundle
+from nuaal.Parsers.PatternsBundle import compile_pattern, precompiled_supported
+from nuaal.Parsers.Extractors import BlockSplitter, TableExtractor
 
 def jprint(data):
     print(json.dumps(obj=data, indent=2))
@@ -18,6 +26,149 @@ class TestPatternsLib(unittest.TestCase):
             self.fail(msg=msg)
         self.assertIsInstance(obj=pl, cls=PatternsLib)
 
+    def test_patterns_are_shared(self):
+        pl_1 = PatternsLib(device_type="cisco_ios")
+        pl_2 = PatternsLib(device_type="cisco_ios")
+        self.assertIs(pl_1.compiled_patterns, pl_2.compiled_patterns)
+        self.assertEqual(pl_1.version, pl_2.version)
+        with self.assertRaises(TypeError):
+            pl_1.compiled_patterns["show version"] = {}
+
+    def test_patterns_shared_between_threads(self):
+        PatternsLib.invalidate(device_type="cisco_ios")
+        tables = []
+
+        def worker():
+            tables.append(PatternsLib(device_type="cisco_ios").compiled_patterns)
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        [t.start() for t in threads]
+        [t.join() for t in threads]
+        self.assertEqual(len(tables), 8)
+        for table in tables:
+            self.assertIs(table, tables[0])
+
+    def test_invalidate(self):
+        pl_1 = PatternsLib(device_type="cisco_ios")
+        self.assertFalse(PatternsLib.refresh(device_type="cisco_ios"))
+        PatternsLib.invalidate(device_type="cisco_ios")
+        pl_2 = PatternsLib(device_type="cisco_ios")
+        self.assertIsNot(pl_1.compiled_patterns, pl_2.compiled_patterns)
+        self.assertEqual(list(pl_1.compiled_patterns.keys()), list(pl_2.compiled_patterns.keys()))
+
+    def test_lazy_compilation(self):
+        PatternsLib.invalidate(device_type="cisco_ios")
+        pl = PatternsLib(device_type="cisco_ios", lazy=True)
+        self.assertEqual(pl.compiled_count, 0)
+        self.assertIn("show cdp neighbors detail", pl.compiled_patterns)
+        self.assertIn("level0", pl.compiled_patterns["show cdp neighbors detail"])
+        self.assertIs(pl.compiled_patterns["show cdp neighbors detail"], pl.compiled_patterns["show cdp neighbors detail"])
+        self.assertEqual(pl.compiled_count, 1)
+        eager_pl = PatternsLib(device_type="cisco_ios", lazy=False)
+        self.assertEqual(eager_pl.compiled_count, len(eager_pl.compiled_patterns))
+
+    def test_bundle(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            bundle = PatternsBundle(device_type="cisco_ios", path=os.path.join(temp_dir, "cisco_ios.bundle"))
+            self.assertIsNone(bundle.load())
+            built = bundle.build()
+            loaded = bundle.load()
+            self.assertEqual(built, loaded)
+            self.assertIn("show_interfaces.json", loaded["modules"])
+            pattern_dict = loaded["modules"]["show_version.json"]["level0"][0]
+            self.assertIsInstance(pattern_dict["flags"], int)
+            self.assertIsInstance(pattern_dict["groups"], list)
+            # Touched file with same content is still valid
+            loaded["files"]["show_version.json"][1] -= 1
+            self.assertTrue(bundle.is_valid(bundle=loaded))
+            # Changed content invalidates the bundle
+            loaded["files"]["show_version.json"][2] = "0" * 40
+            self.assertFalse(bundle.is_valid(bundle=loaded))
+            # Bundle built by other interpreter is rebuilt, even if only the patch version differs
+            built["interpreter"][1][2] += 1
+            self.assertFalse(bundle.is_valid(bundle=built))
+
+    def test_bundle_precompiled(self):
+        # Regex code is precompiled on the CPython versions the tests run on
+        self.assertTrue(precompiled_supported())
+        logger = mock.Mock()
+        with tempfile.TemporaryDirectory() as temp_dir:
+            bundle = PatternsBundle(device_type="cisco_ios", path=os.path.join(temp_dir, "cisco_ios.bundle")).build()
+        pattern_dicts = []
+        for module in bundle["modules"].values():
+            for level in [x for x in module.keys() if "level" in x]:
+                patterns = module[level] if isinstance(module[level], list) else [x for y in module[level].values() for x in y]
+                pattern_dicts.extend(x for x in patterns if "pattern" in x)
+        # Every pattern is precompiled on this Python version and loaded without falling back to `re.compile()`
+        self.assertTrue(all("sre" in x for x in pattern_dicts))
+        with mock.patch.object(sys.modules["nuaal.Parsers.PatternsBundle"].re, "compile", side_effect=AssertionError("re.compile() was used")):
+            compiled = [compile_pattern(pattern_dict=x, logger=logger) for x in pattern_dicts]
+        logger.warning.assert_not_called()
+        for pattern_dict, pattern in zip(pattern_dicts, compiled):
+            # Compiled patterns are equal only if their code is equal
+            self.assertEqual(re.compile(pattern_dict["pattern"], pattern_dict["flags"]), pattern)
+        # Code which does not fit this Python version is compiled again, with warning
+        broken = dict(pattern_dicts[0], sre=pattern_dicts[0]["sre"][:3])
+        self.assertEqual(re.compile(broken["pattern"], broken["flags"]), compile_pattern(pattern_dict=broken, logger=logger))
+        logger.warning.assert_called_once()
+        # Other interpreters get bundle without precompiled code, patterns are compiled by `re.compile()` without warning
+        with tempfile.TemporaryDirectory() as temp_dir, \
+                mock.patch.object(sys.modules["nuaal.Parsers.PatternsBundle"], "precompiled_supported", return_value=False):
+            bundle = PatternsBundle(device_type="cisco_ios", path=os.path.join(temp_dir, "cisco_ios.bundle")).build()
+        pattern_dict = bundle["modules"]["show_version.json"]["level0"][0]
+        self.assertNotIn("sre", pattern_dict)
+        self.assertEqual(list(re.compile(pattern_dict["pattern"], pattern_dict["flags"]).groupindex), pattern_dict["groups"])
+        self.assertEqual(re.compile(pattern_dict["pattern"], pattern_dict["flags"]), compile_pattern(pattern_dict=pattern_dict, logger=logger))
+        logger.warning.assert_called_once()
+
+    def test_bundle_patterns_match_json(self):
+        PatternsLib.invalidate(device_type="cisco_ios")
+        json_patterns = PatternsLib(device_type="cisco_ios").compiled_patterns
+        PatternsLib.invalidate(device_type="cisco_ios")
+        bundle_patterns = PatternsLib(device_type="cisco_ios", use_bundle=True).compiled_patterns
+        for command in json_patterns.keys():
+            with self.subTest(msg=command):
+                for json_pattern, bundle_pattern in zip(json_patterns[command]["level0"], bundle_patterns[command]["level0"]):
+                    if isinstance(json_pattern, (BlockSplitter, TableExtractor)):
+                        self.assertEqual(repr(json_pattern), repr(bundle_pattern))
+                        continue
+                    self.assertEqual(json_pattern.pattern, bundle_pattern.pattern)
+                    self.assertEqual(json_pattern.flags, bundle_pattern.flags)
+                    self.assertEqual(json_pattern.groupindex, bundle_pattern.groupindex)
+
+
+    def test_declared_types(self):
+        pl = PatternsLib(device_type="cisco_ios", lazy=True)
+        vlan_brief = pl.compiled_patterns["show vlan brief"]["level0"][-1]
+        self.assertEqual([{"id": 1, "name": "0001", "status": "active", "access_ports": None}], vlan_brief.extract("0001 0001 active\n"))
+        module = {
+            "command": "show test",
+            "types": {"vlan": "int"},
+            "level0": [{"pattern": "^(?P<vlan>\\d+) (?P<port>\\d+) (?P<state>\\S+)", "flags": 8, "types": {"state": "bool", "port": "unknown"}}]
+        }
+        with tempfile.TemporaryDirectory() as temp_dir:
+            module_path = os.path.join(temp_dir, "show_test.json")
+            with open(module_path, mode="w") as f:
+                json.dump(module, f)
+            extractor = pl._compile_module(module_path=module_path)["level0"][0]
+            self.assertEqual([{"vlan": 10, "port": "01", "state": True}], extractor.extract("10 01 up\n"))
+            module["default_type"] = "auto"
+            with open(module_path, mode="w") as f:
+                json.dump(module, f)
+            extractor = pl._compile_module(module_path=module_path)["level0"][0]
+            self.assertEqual([{"vlan": 10, "port": "01", "state": True}], extractor.extract("10 01 up\n"))
+
+    def test_project(self):
+        pl = PatternsLib(device_type="cisco_ios", lazy=True)
+        projected = pl.project(command="show interfaces", fields=["name", "description"])
+        self.assertEqual(["name", "description"], list(projected["level1"].keys()))
+        self.assertIs(projected["level0"], pl.compiled_patterns["show interfaces"]["level0"])
+        self.assertIs(projected, pl.project(command="show interfaces", fields=["description", "name"]))
+        projected = pl.project(command="show vlan brief", fields=["id", "name"])
+        self.assertEqual({}, dict(projected["level1"]))
+        self.assertEqual(1, len(pl.project(command="show version", fields=["version"])["level1"]["version"]))
+        self.assertIs(pl.compiled_patterns["show ip arp"], pl.project(command="show ip arp", fields=["ipAddress"]))
+
 
 if __name__ == '__main__':
     unittest.main()
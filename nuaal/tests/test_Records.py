@@ -0,0 +1,106 @@
+import unittest
+import pathlib
+import tempfile
+import shutil
+import pickle
+import copy
+import json
+from nuaal.Parsers import CiscoIOSParser, ParseCache, Record
+from nuaal.Parsers.Records import compact_entries, record_class
+from nuaal.utils import Filter, OutputFilter
+from nuaal.Writers.Writer import Writer
+
+
+class TestRecords(unittest.TestCase):
+
+    PARSER = CiscoIOSParser(compact=True, verbosity=0)
+    TESTS = [
+        ("cisco_ios_show_interfaces_01", "show interfaces"),
+        ("cisco_ios_show_vlan_brief_01", "show vlan brief"),
+        ("cisco_ios_show_interfaces_switchport_01", "show interfaces switchport"),
+        ("cisco_ios_show_interfaces_trunk_01", "show interfaces trunk")
+    ]
+
+    @staticmethod
+    def get_text(test_file_name):
+        test_file_path = pathlib.Path(__file__).parent.joinpath("resources/{}.txt".format(test_file_name))
+        return test_file_path.read_text()
+
+    @staticmethod
+    def get_results(results_file_name):
+        result_file_path = pathlib.Path(__file__).parent.joinpath("results/{}.json".format(results_file_name))
+        return json.loads(result_file_path.read_text())
+
+    def test_results_unchanged(self):
+        for name, command in self.TESTS:
+            with self.subTest(command=command):
+                text = self.get_text(name)
+                want = self.get_results(name)
+                have = self.PARSER.autoparse(text=text, command=command)
+                self.assertEqual(want, have)
+                self.assertTrue(all(isinstance(x, Record) for x in have))
+                self.assertEqual(want, list(self.PARSER.iterparse(text=text, command=command)))
+                self.assertEqual(want, json.loads(json.dumps([dict(x) for x in have])))
+
+    def test_fields(self):
+        text = self.get_text("cisco_ios_show_interfaces_01")
+        have = self.PARSER.autoparse(text=text, command="show interfaces", fields=["name", "status"])
+        self.assertEqual(["name", "status"], list(have[0].keys()))
+        self.assertIsInstance(have[0], Record)
+
+    def test_mapping(self):
+        record = next(compact_entries(entries=[{"interface": "Gi1/0/1", "vlan id": 10, "ports": []}], command="show test"))
+        self.assertIs(type(record), record_class(command="show test", fields=("interface", "vlan id", "ports")))
+        self.assertEqual(10, record["vlan id"])
+        self.assertIsNone(record.get("missing"))
+        self.assertIn("ports", record)
+        self.assertNotIn("missing", record)
+        self.assertEqual(3, len(record))
+        record["vlan id"] = 20
+        self.assertEqual({"interface": "Gi1/0/1", "vlan id": 20, "ports": []}, record.to_dict())
+        with self.assertRaises(KeyError):
+            record["missing"] = 1
+        with self.assertRaises(AttributeError):
+            record.missing = 1
+        for clone in [pickle.loads(pickle.dumps(record)), copy.deepcopy(record)]:
+            self.assertIs(type(record), type(clone))
+            self.assertEqual(record, clone)
+        # Strings and other entries are passed unchanged
+        self.assertEqual(["Gi1/0/1", record], list(compact_entries(entries=["Gi1/0/1", record], command="show test")))
+
+    def test_filters_and_writer(self):
+        have = self.PARSER.autoparse(text=self.get_text("cisco_ios_show_vlan_brief_01"), command="show vlan brief")
+        want = self.get_results("cisco_ios_show_vlan_brief_01")
+        vlan_filter = Filter(required={"name": "default"})
+        self.assertEqual(vlan_filter.universal_cleanup(data=want), vlan_filter.universal_cleanup(data=have))
+        self.assertEqual(vlan_filter.universal_cleanup(data=want), list(vlan_filter.iter_cleanup(data=have)))
+        self.assertEqual(
+            OutputFilter(data=want, required=["id", "name"]).get(),
+            OutputFilter(data=have, required=["id", "name"]).get()
+        )
+        writer = Writer(type="Test")
+        self.assertEqual(writer.json_to_lists(data=want), writer.json_to_lists(data=have))
+
+    def test_parse_cache(self):
+        temp_dir = tempfile.mkdtemp()
+        try:
+            text = self.get_text("cisco_ios_show_vlan_brief_01")
+            want = self.get_results("cisco_ios_show_vlan_brief_01")
+            cache = ParseCache(parser=self.PARSER, path=temp_dir, verbosity=0)
+            for _ in range(2):
+                have = cache.autoparse(text=text, command="show vlan brief")
+                self.assertEqual(want, have)
+                self.assertIsInstance(have[0], Record)
+            self.assertEqual({"hits": 1, "disk_hits": 0, "misses": 1}, cache.stats)
+            # Cached records are shared with regular parser
+            cache = ParseCache(parser=CiscoIOSParser(verbosity=0), path=temp_dir, verbosity=0)
+            have = cache.autoparse(text=text, command="show vlan brief")
+            self.assertEqual(want, have)
+            self.assertIs(dict, type(have[0]))
+            self.assertEqual(1, cache.stats["disk_hits"])
+        finally:
+            shutil.rmtree(temp_dir)
+
+
+if __name__ == '__main__':
+    unittest.main()
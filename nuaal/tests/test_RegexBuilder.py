@@ -0,0 +1,57 @@
+import unittest
+import os
+from nuaal.definitions import DATA_PATH
+from nuaal.Parsers.RegexBuilder import RegexBuilder
+
+
+class TestRegexBuilder(unittest.TestCase):
+
+    BUILDER = RegexBuilder(device_type="cisco_ios", verbosity=0)
+
+    def test_analyze_pattern(self):
+        flagged = [
+            (r"^(?P<words>(\w+\s?)+)$", "nested_quantifier"),
+            (r"(a+)+b", "nested_quantifier"),
+            (r"(?:\w+|\d+)+x", "ambiguous_alternation"),
+        ]
+        for pattern, issue in flagged:
+            with self.subTest(pattern=pattern):
+                self.assertEqual([issue], [x["issue"] for x in self.BUILDER.analyze_pattern({"pattern": pattern, "flags": 40})])
+        clean = [
+            r"^\s+Description:\s(?P<description>.*)$",
+            r"(?P<port>[A-Za-z]+\d+(?:\/\d+)*)\((?P<status>\w)\)",
+            r"(?P<ipAddress>(?:\d{1,3}\.?){4})\s",
+            r"Name:.*\n(?:^.*(?:\n)?)+?(?=^Name|\Z)",
+            # Nothing after the repeat can fail
+            r"^Index.*(?:(?:$\s+^\s.*)+)?",
+            # Possessive repeats and atomic groups do not backtrack
+            r"(?:a++)+b",
+        ]
+        for pattern in clean:
+            with self.subTest(pattern=pattern):
+                self.assertEqual([], self.BUILDER.analyze_pattern({"pattern": pattern, "flags": 40}))
+
+    def test_shipped_patterns(self):
+        for device_type in sorted(os.listdir(os.path.join(DATA_PATH, "patterns"))):
+            builder = RegexBuilder(device_type=device_type, verbosity=0)
+            for command, location, pattern_dict in builder.iter_patterns():
+                with self.subTest(device_type=device_type, command=command, location=location):
+                    self.assertEqual([], builder.analyze_pattern(pattern_dict=pattern_dict))
+
+    def test_check_growth(self):
+        pattern_dict = {"pattern": r"^(?P<name>\S+)\s+(?P<status>up|down)$", "flags": 40}
+        result = self.BUILDER.check_growth(pattern_dict=pattern_dict, inputs=self.BUILDER.adversarial_inputs(pattern_dict=pattern_dict))
+        self.assertTrue(result["ok"])
+        pattern_dict = {"pattern": r"^(?P<words>(\w+\s?)+)$", "flags": 40}
+        result = self.BUILDER.check_growth(pattern_dict=pattern_dict, inputs=self.BUILDER.adversarial_inputs(pattern_dict=pattern_dict), timeout=2.0)
+        self.assertFalse(result["ok"])
+        self.assertTrue(result["timeout"])
+        # Quadratic growth in size of single line
+        pattern_dict = {"pattern": r"\w+\d+\(", "flags": 0}
+        result = self.BUILDER.check_growth(pattern_dict=pattern_dict, inputs=[("a", "")], counts=(500, 1000, 2000, 4000))
+        self.assertFalse(result["ok"])
+        self.assertGreater(result["exponent"], 1.5)
+
+
+if __name__ == '__main__':
+    unittest.main()
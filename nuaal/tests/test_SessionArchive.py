@@ -0,0 +1,85 @@
+import unittest
+import pathlib
+import json
+import tempfile
+import timeit
+from nuaal.connections.cli import CliMultiRunner, Cisco_IOS_Cli, SessionArchive
+from nuaal.connections.cli.SessionArchive import ReplayConnection, INVALID_INPUT
+from nuaal.tests.simulator import DeviceSimulator
+from nuaal.tests.simulator.DeviceSimulator import asyncssh
+
+
+class TestSessionArchive(unittest.TestCase):
+
+    ACTIONS = ["get_version", "get_vlans", "get_neighbors", "get_trunks", "get_license"]
+    PROVIDER = {"username": "admin", "password": "cisco", "secret": "enable", "enable": True}
+
+    @staticmethod
+    def get_text(test_file_name):
+        test_file_path = pathlib.Path(__file__).parent.joinpath("resources/{}.txt".format(test_file_name))
+        return test_file_path.read_text()
+
+    @staticmethod
+    def get_results(results_file_name):
+        result_file_path = pathlib.Path(__file__).parent.joinpath("results/{}.json".format(results_file_name))
+        return json.loads(result_file_path.read_text())
+
+    def test_archive(self):
+        archive = SessionArchive(verbosity=0)
+        text = self.get_text("cisco_ios_show_vlan_brief_01")
+        for ip in ["192.0.2.1", "192.0.2.2"]:
+            archive.add_device(ip=ip, connect_time=0.5)
+            archive.set_prompt(ip=ip, prompt="SW#")
+            archive.add(ip=ip, command="show vlan brief", output=text, elapsed=0.1)
+            archive.add(ip=ip, command="show version", output=ip, elapsed=0.2)
+        archive.add(ip="192.0.2.1", command="show version", output="reloaded", elapsed=0.3)
+        stats = archive.stats()
+        self.assertEqual({"devices": 2, "commands": 5, "outputs": 4}, {key: stats[key] for key in ["devices", "commands", "outputs"]})
+        self.assertLess(stats["size"], stats["raw_size"] / 2)
+        # Outputs of repeated command in recorded order, the last one is repeated
+        self.assertEqual([("192.0.2.1", 0.2), ("reloaded", 0.3), ("reloaded", 0.3)], [archive.replay("192.0.2.1", "show version") for _ in range(3)])
+        self.assertEqual((None, 0.0), archive.replay("192.0.2.1", "show inventory"))
+        archive.rewind()
+        self.assertEqual(("192.0.2.1", 0.2), archive.replay("192.0.2.1", "show version"))
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = pathlib.Path(directory).joinpath("sessions.json.gz")
+            archive.save(path)
+            loaded = SessionArchive(path=path, timing=0.1, verbosity=0)
+        self.assertEqual((archive.devices, archive.outputs), (loaded.devices, loaded.outputs))
+        start_time = timeit.default_timer()
+        connection = ReplayConnection(archive=loaded, ip="192.0.2.2")
+        self.assertEqual("SW#", connection.find_prompt())
+        self.assertEqual(text, connection.send_command("show vlan brief"))
+        self.assertEqual(INVALID_INPUT, connection.send_command("show inventory"))
+        self.assertGreaterEqual(timeit.default_timer() - start_time, 0.06)
+
+    def test_record_replay(self):
+        if asyncssh is None:
+            self.skipTest("asyncssh is not installed")
+        archive = SessionArchive(verbosity=0)
+        with DeviceSimulator(devices=2, enable_secret=self.PROVIDER["secret"], unsupported=["show license"], verbosity=0) as simulator:
+            recorder = CliMultiRunner(
+                provider=dict(self.PROVIDER, record=archive), ips=simulator.ips, actions=self.ACTIONS, workers=2, verbosity=0,
+                netmiko_params={"port": simulator.port}
+            )
+            recorder.run()
+        self.assertEqual(sorted(simulator.ips), sorted(archive.ips))
+        self.assertTrue(all(archive.devices[ip]["prompt"].endswith("#") for ip in simulator.ips))
+
+        # Simulator is stopped, all outputs come from the archive
+        replayer = CliMultiRunner(provider=dict(self.PROVIDER, replay=archive), ips=simulator.ips, actions=self.ACTIONS, workers=2, verbosity=0)
+        replayer.run()
+        self.assertEqual([], replayer.error_hosts)
+        recorded = sorted(recorder.data, key=lambda x: x["ipAddress"])
+        self.assertEqual(recorded, sorted(replayer.data, key=lambda x: x["ipAddress"]))
+        self.assertEqual(self.get_results("cisco_ios_show_vlan_brief_01"), recorded[0]["vlans"])
+        self.assertEqual([], recorded[0]["license"])
+
+        with Cisco_IOS_Cli(ip="192.0.2.1", replay=archive, verbosity=0) as device:
+            self.assertIsNone(device.device)
+            self.assertIn("replay_missing", device.failures)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+import unittest
+import threading
+import time
+from nuaal.connections.cli import CliMultiRunner, Cisco_IOS_Cli, SessionPool
+from nuaal.tests.simulator import DeviceSimulator
+from nuaal.tests.simulator.DeviceSimulator import asyncssh
+
+
+class Session(object):
+    """
+    Stand-in for netmiko connection.
+    """
+    def __init__(self):
+        self.alive = True
+
+    def is_alive(self):
+        return self.alive
+
+    def disconnect(self):
+        self.alive = False
+
+
+class TestSessionPool(unittest.TestCase):
+
+    ACTIONS = ["get_version", "get_vlans", "get_neighbors"]
+    PROVIDER = {"username": "admin", "password": "cisco", "secret": "enable", "enable": True}
+
+    def test_lease(self):
+        pool = SessionPool(max_per_device=1, idle_timeout=0.2, verbosity=0)
+        self.assertIsNone(pool.lease(key="a"))
+        first = Session()
+        # Second lease waits until the session to the same device is released
+        self.assertRaises(TimeoutError, pool.lease, key="a", timeout=0.05)
+        self.assertIsNone(pool.lease(key="b", timeout=0.05))
+        threading.Timer(0.05, pool.release, kwargs={"key": "a", "session": first}).start()
+        self.assertIs(first, pool.lease(key="a", timeout=1))
+        pool.release(key="a", session=first)
+        # Session closed by the device fails the health check
+        first.alive = False
+        self.assertIsNone(pool.lease(key="a"))
+        second = Session()
+        pool.release(key="a", session=second)
+        time.sleep(0.25)
+        pool.release(key="b", session=None)
+        self.assertFalse(second.alive)
+        self.assertEqual(
+            {"created": 3, "reused": 1, "expired": 1, "failed_checks": 1, "idle": 0, "leased": 0}, pool.stats()
+        )
+        third = Session()
+        self.assertIsNone(pool.lease(key="a"))
+        pool.release(key="a", session=third)
+        pool.close()
+        self.assertFalse(third.alive)
+
+    def test_runner(self):
+        if asyncssh is None:
+            self.skipTest("asyncssh is not installed")
+        with DeviceSimulator(devices=2, enable_secret=self.PROVIDER["secret"], verbosity=0) as simulator:
+            with SessionPool(verbosity=0) as pool:
+                runs = []
+                for _ in range(3):
+                    runner = CliMultiRunner(
+                        provider=self.PROVIDER, ips=simulator.ips, actions=self.ACTIONS, workers=2, verbosity=0,
+                        netmiko_params={"port": simulator.port}, pool=pool
+                    )
+                    runner.run()
+                    runs.append(sorted(runner.data, key=lambda x: x["ipAddress"]))
+                # Session closed by the device is replaced
+                pool._idle[(simulator.ips[0], simulator.port, "admin", "cisco_ios")][0][0].disconnect()
+                with Cisco_IOS_Cli(ip=simulator.ips[0], **self.PROVIDER, netmiko_params={"port": simulator.port}, pool=pool, verbosity=0) as device:
+                    self.assertEqual("SW-00000", device.get_version()[0]["hostname"])
+                stats = pool.stats()
+            sessions = simulator.stats()["sessions"]
+        self.assertEqual(runs[0], runs[1])
+        self.assertEqual(runs[0], runs[2])
+        self.assertEqual(3, sessions)
+        self.assertEqual({"created": 3, "reused": 4, "failed_checks": 1, "idle": 2, "leased": 0}, {key: stats[key] for key in ["created", "reused", "failed_checks", "idle", "leased"]})
+
+
+if __name__ == '__main__':
+    unittest.main()
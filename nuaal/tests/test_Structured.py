@@ -0,0 +1,120 @@
+import unittest
+import pathlib
+import json
+from nuaal.Parsers import CiscoNXOSParser, JuniperJUNOSParser, StructuredMapping
+from nuaal.Parsers.Records import Record
+from nuaal.Parsers.Structured import is_structured, load_structured, port_list, split_part
+from nuaal.connections.cli import CommandCache
+from nuaal.connections.cli.CliBase import CliBaseConnection
+from nuaal.utils import Columns
+
+
+class TestStructured(unittest.TestCase):
+
+    PARSERS = {
+        "cisco_nxos": CiscoNXOSParser(verbosity=0),
+        "juniper_junos": JuniperJUNOSParser(verbosity=0)
+    }
+    # Outputs with both plaintext and structured fixture, which have to be parsed to the same entries
+    PARITY_TESTS = [
+        ("cisco_nxos", "cisco_nxos_show_lldp_neighbors_detail_01", "show lldp neighbors detail"),
+        ("juniper_junos", "juniper_junos_show_bgp_neighbors_01", "show bgp neighbors"),
+        ("juniper_junos", "juniper_junos_show_interfaces_01", "show interfaces")
+    ]
+    STRUCTURED_TESTS = [
+        ("cisco_nxos", "cisco_nxos_show_version_json_01", "show version"),
+        ("cisco_nxos", "cisco_nxos_show_vlan_brief_json_01", "show vlan brief"),
+        ("cisco_nxos", "cisco_nxos_show_interface_status_json_01", "show interface status"),
+        ("cisco_nxos", "cisco_nxos_show_mac_address-table_json_01", "show mac address-table"),
+        ("cisco_nxos", "cisco_nxos_show_ip_arp_json_01", "show ip arp"),
+        ("cisco_nxos", "cisco_nxos_show_cdp_neighbors_detail_json_01", "show cdp neighbors detail")
+    ]
+
+    @staticmethod
+    def get_text(test_file_name):
+        test_file_path = pathlib.Path(__file__).parent.joinpath("resources/{}.txt".format(test_file_name))
+        return test_file_path.read_text()
+
+    @staticmethod
+    def get_results(results_file_name):
+        result_file_path = pathlib.Path(__file__).parent.joinpath("results/{}.json".format(results_file_name))
+        return json.loads(result_file_path.read_text())
+
+    def test_structured_outputs(self):
+        for device_type, name, command in self.STRUCTURED_TESTS:
+            with self.subTest(command=command):
+                text = self.get_text(name)
+                self.assertTrue(is_structured(text))
+                self.assertEqual(self.get_results(name), self.PARSERS[device_type].autoparse(text=text, command=command))
+
+    def test_parity_with_plaintext(self):
+        for device_type, name, command in self.PARITY_TESTS:
+            with self.subTest(command=command):
+                parser = self.PARSERS[device_type]
+                want = self.get_results(name)
+                self.assertEqual(want, parser.autoparse(text=self.get_text(name), command=command))
+                self.assertEqual(want, parser.autoparse(text=self.get_text(name[:-3] + "_json_01"), command=command))
+
+    def test_structured_command(self):
+        self.assertEqual("show version | json", self.PARSERS["cisco_nxos"].structured_command("show version"))
+        self.assertEqual("show interfaces | display json", self.PARSERS["juniper_junos"].structured_command("show interfaces"))
+        self.assertIsNone(self.PARSERS["cisco_nxos"].structured_command("show running-config"))
+        self.assertTrue(self.PARSERS["cisco_nxos"].supports("show ip arp"))
+
+    def test_invalid_output(self):
+        parser = self.PARSERS["juniper_junos"]
+        self.assertEqual([], parser.autoparse(text='{"bgp-information": [', command="show bgp neighbors"))
+        self.assertEqual([], parser.autoparse(text='{"interface-information": []}', command="show interfaces"))
+        self.assertEqual([], self.PARSERS["cisco_nxos"].autoparse(text="Flags: * - Adjacencies learnt on non-active FHRP router", command="show ip arp"))
+
+    def test_fields_compact_columns(self):
+        parser = self.PARSERS["juniper_junos"]
+        name, command = "juniper_junos_show_interfaces_json_01", "show interfaces"
+        want = self.get_results("juniper_junos_show_interfaces_01")
+        text = self.get_text(name)
+        self.assertEqual([{"interface_name": x["interface_name"], "ip_address": x["ip_address"]} for x in want],
+                         parser.autoparse(text=text, command=command, fields=["interface_name", "ip_address"]))
+        compact = JuniperJUNOSParser(compact=True, verbosity=0).autoparse(text=text, command=command)
+        self.assertTrue(all(isinstance(x, Record) for x in compact))
+        self.assertEqual(want, [x.to_dict() for x in compact])
+        columns = parser.autoparse(text=text, command=command, layout="columns")
+        self.assertIsInstance(columns, Columns)
+        self.assertEqual(want, list(columns.iter_rows()))
+
+    def test_mapping(self):
+        mapping = StructuredMapping(rows=("TABLE_x", "ROW_x"), fields={
+            "id": "id",
+            "peer": ("peer", split_part("+", 0)),
+            "ports": lambda row: port_list(row.get("ports"))
+        })
+        data = load_structured('{"TABLE_x": {"ROW_x": {"id": "10", "peer": "10.0.0.1+179", "ports": "Ethernet1/1-2"}}}\n\n{master:0}\n')
+        self.assertEqual([{"id": 10, "peer": "10.0.0.1", "ports": ["Eth1/1", "Eth1/2"]}], list(mapping.iter_entries(data)))
+
+    def test_command_handler(self):
+        device = CliBaseConnection(ip="192.0.2.1", parser=self.PARSERS["cisco_nxos"], verbosity=0)
+        name = "cisco_nxos_show_lldp_neighbors_detail_01"
+        sent = []
+        for outputs in [{"show lldp neighbors detail | json": self.get_text(name[:-3] + "_json_01")},
+                        {"show lldp neighbors detail | json": "% Invalid command at '^' marker.", "show lldp neighbors detail": self.get_text(name)}]:
+            with self.subTest(outputs=list(outputs)):
+                del sent[:]
+                device._send_command = lambda command: sent.append(command) or outputs.get(command, "")
+                self.assertEqual(self.get_results(name), device._command_handler(commands=["show lldp neighbors detail"]))
+                self.assertEqual(list(outputs), sent)
+        # Structured command not supported by the device is not sent again
+        del sent[:]
+        self.assertEqual(self.get_results(name), device._command_handler(commands=["show lldp neighbors detail"]))
+        self.assertEqual(["show lldp neighbors detail"], sent)
+        # Neither by other connections to the same platform sharing command cache
+        cache = CommandCache(use_disk=False, verbosity=0)
+        for expected in [["show lldp neighbors detail | json", "show lldp neighbors detail"], ["show lldp neighbors detail"]]:
+            device = CliBaseConnection(ip="192.0.2.1", parser=self.PARSERS["cisco_nxos"], command_cache=cache, verbosity=0)
+            device._platform = cache.platform_key(device_type="cisco_nxos", platform="N9K-C93180YC-EX", version="9.3(5)")
+            del sent[:]
+            device._send_command = lambda command: sent.append(command) or outputs.get(command, "")
+            self.assertEqual(self.get_results(name), device._command_handler(commands=["show lldp neighbors detail"]))
+            self.assertEqual(expected, sent)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,116 @@
+from collections.abc import Mapping
+from array import array
+from itertools import compress
+import sys
+
+# Longer strings (such as descriptions) are rarely repeated, so interning them only costs time
+MAX_INTERNED_LENGTH = 64
+
+
+class Columns(dict):
+    """
+    Columnar (struct-of-arrays) representation of parsed entries, returned by ``autoparse(..., layout="columns")``. Keys are field names,
+    values are columns of equal length ``self.length``, where n-th item of every column belongs to n-th entry. Columns of integer fields are
+    ``array('l')``, other columns are lists with short strings interned, so repeated values such as interface names or `DYNAMIC` are stored
+    only once. Missing values are ``None``, which turns integer column to list.
+    """
+    def __init__(self, columns=None, length=0):
+        """
+
+        :param dict columns: Dictionary with field names as keys and columns as values
+        :param int length: Number of entries
+        """
+        super(Columns, self).__init__(columns or {})
+        self.length = length
+
+    def __repr__(self):
+        return "<Columns: {} entries, fields {}>".format(self.length, list(self.keys()))
+
+    @classmethod
+    def from_entries(cls, entries):
+        """
+        Builds columns from iterable of dictionaries (or other mappings), consuming it one entry at a time, so that list of all entries is
+        never held in memory when ``entries`` is a generator, such as output of ``ParserModule.iterparse()``.
+
+        :param entries: Iterable of dictionaries
+        :return: ``Columns`` object
+        """
+        columns = cls()
+        length = 0
+        intern = sys.intern
+        for entry in entries:
+            if not isinstance(entry, Mapping):
+                raise TypeError("Columnar layout requires entries with named fields, got {}.".format(type(entry).__name__))
+            for key, value in entry.items():
+                column = columns.get(key)
+                if column is None:
+                    if length == 0 and type(value) is int:
+                        column = columns[key] = array("l")
+                    else:
+                        column = columns[key] = [None] * length
+                if type(column) is array:
+                    if type(value) is int:
+                        try:
+                            column.append(value)
+                            continue
+                        except OverflowError:
+                            pass
+                    column = columns[key] = column.tolist()
+                if type(value) is str and len(value) <= MAX_INTERNED_LENGTH:
+                    value = intern(value)
+                column.append(value)
+            length += 1
+            if len(entry) != len(columns):
+                for key, column in columns.items():
+                    if len(column) < length:
+                        if type(column) is array:
+                            column = columns[key] = column.tolist()
+                        column.append(None)
+        columns.length = length
+        return columns
+
+    def iter_rows(self):
+        """
+        Generator of entries as dictionaries, in the order they were parsed.
+
+        :return: Generator of dictionaries
+        """
+        keys = list(self.keys())
+        for values in zip(*self.values()):
+            yield dict(zip(keys, values))
+
+    def iter_lists(self, headers=None):
+        """
+        Generator of entries as lists of values, in the order of ``headers``.
+
+        :param list headers: List of field names, defaults to all fields
+        :return: Generator of lists
+        """
+        columns = [self[header] for header in (headers if headers is not None else self.keys())]
+        for values in zip(*columns):
+            yield list(values)
+
+    def compress(self, selectors):
+        """
+        Returns new ``Columns`` object with entries for which the corresponding item of ``selectors`` is true.
+
+        :param selectors: Iterable of booleans, one for every entry
+        :return: ``Columns`` object
+        """
+        selectors = list(selectors)
+        columns = {}
+        for key, column in self.items():
+            if type(column) is array:
+                columns[key] = array(column.typecode, compress(column, selectors))
+            else:
+                columns[key] = list(compress(column, selectors))
+        return type(self)(columns=columns, length=sum(1 for x in selectors if x))
+
+    def select(self, fields):
+        """
+        Returns new ``Columns`` object containing only ``fields``. Columns are shared, not copied.
+
+        :param list fields: List of field names
+        :return: ``Columns`` object
+        """
+        return type(self)(columns={key: column for key, column in self.items() if key in fields}, length=self.length)
@@ -1,4 +1,6 @@
 from nuaal.utils import get_logger
+from nuaal.utils.Columns import Columns
+from collections.abc import Mapping
 import copy
 
 
@@ -119,6 +121,55 @@ class Filter:
                     continue
         return data
 
+    def _value_matches(self, value, filter_value):
+        """
+        Checks whether ``value`` of entry matches ``filter_value``, with respect to ``self.exact_match``.
+
+        :param value: Value of the entry
+        :param filter_value: String or list of strings
+        :return: ``True`` or ``False``, ``None`` if ``filter_value`` is not supported or ``value`` is ``None`` with ``exact_match=False``.
+        """
+        if isinstance(filter_value, str) and self.exact_match:
+            return value == filter_value
+        elif isinstance(filter_value, list) and self.exact_match:
+            return value in filter_value
+        elif isinstance(filter_value, (str, list)) and value is None:
+            return None
+        elif isinstance(filter_value, str):
+            return filter_value in value
+        elif isinstance(filter_value, list):
+            return any(filter_value_item in value for filter_value_item in filter_value)
+        return None
+
+    def matches(self, entry):
+        """
+        Checks whether single dictionary passes the filter.
+
+        :param dict entry: Dictionary to be checked
+        :return: ``True`` if ``entry`` contains all required and none of excluded values, ``False`` otherwise.
+        """
+        for filter_key, filter_value in self.required.items():
+            if filter_key not in entry.keys():
+                self.logger.warning(msg="Matches: Filter key: %s not present in Data: %s" % (filter_key, entry))
+                continue
+            result = self._value_matches(value=entry[filter_key], filter_value=filter_value)
+            if result is None and isinstance(filter_value, (str, list)):
+                return False
+            elif result is None:
+                self.logger.warning(msg="Matches: None of the cases matched. Data: %s Filter: %s" % (entry, filter_value))
+            elif not result:
+                return False
+        for filter_key, filter_value in self.excluded.items():
+            if filter_key not in entry.keys():
+                self.logger.warning(msg="Matches: Filter key: %s not present in Data: %s" % (filter_key, entry))
+                continue
+            result = self._value_matches(value=entry[filter_key], filter_value=filter_value)
+            if result is None and not isinstance(filter_value, (str, list)):
+                self.logger.warning(msg="Matches: None of the cases matched. Data: %s Filter: %s" % (entry, filter_value))
+            elif result:
+                return False
+        return True
+
     def list_cleanup(self, data):
         """
         Function for filtering list structures (eg. list of dictionaries).
@@ -126,79 +177,54 @@ class Filter:
         :param list data: List of dictionaries, which you want to filter.
         :return: Filtered list of dictionaries.
         """
-        for data_value in list(data):
-            # TODO: Add DEBUG logging (?)
-            for filter_key, filter_value in self.required.items():
-                if filter_key in data_value.keys():
-                    if isinstance(filter_value, str) and self.exact_match:
-                        if data_value[filter_key] != filter_value:
-                            data.remove(data_value)
-                            break
-                    elif isinstance(filter_value, str) and (not self.exact_match):
-                        if data_value[filter_key] is None:
-                            data.remove(data_value)
-                            break
-                        if filter_value not in data_value[filter_key]:
-                            data.remove(data_value)
-                            break
-                    elif isinstance(filter_value, list) and self.exact_match:
-                        if data_value[filter_key] not in filter_value:
-                            data.remove(data_value)
-                            break
-                    elif isinstance(filter_value, list) and (not self.exact_match):
-                        if data_value[filter_key] is None:
-                            data.remove(data_value)
-                            break
-                        found_match = False
-                        for filter_value_item in filter_value:
-                            if filter_value_item in data_value[filter_key]:
-                                found_match = True
-                        if not found_match:
-                            data.remove(data_value)
-                            break
-                    else:
-                        self.logger.warning(msg="List_Cleanup: None of the cases matched. Data: %s Filter: %s" % (data_value, self.filter))
-                        # TODO: Handle other possible cases
-                else:
-                    self.logger.warning(msg="List_Cleanup: Filter key: %s not present in Data: %s" % (filter_key, data_value))
-                    continue
+        data[:] = [data_value for data_value in data if self.matches(data_value)]
+        return data
 
-        for data_value in list(data):
-            # TODO: Add DEBUG logging (?)
-            for filter_key, filter_value in self.excluded.items():
-                if filter_key in data_value.keys():
-                    if isinstance(filter_value, str) and self.exact_match:
-                        if data_value[filter_key] == filter_value:
-                            data.remove(data_value)
-                            break
-                    elif isinstance(filter_value, str) and (not self.exact_match):
-                        if data_value[filter_key] is None:
-                            continue
-                        if filter_value in data_value[filter_key]:
-                            data.remove(data_value)
-                            break
-                    elif isinstance(filter_value, list) and self.exact_match:
-                        if data_value[filter_key] in filter_value:
-                            data.remove(data_value)
-                            break
-                    elif isinstance(filter_value, list) and (not self.exact_match):
-                        if data_value[filter_key] is None:
-                            continue
-                        found_match = False
-                        for filter_value_item in filter_value:
-                            if filter_value_item in data_value[filter_key]:
-                                found_match = True
-                        if found_match:
-                            data.remove(data_value)
-                            break
-                    else:
-                        self.logger.warning(msg="List_Cleanup: None of the cases matched. Data: %s Filter: %s" % (data_value, self.filter))
-                        # TODO: Handle other possible cases
-                else:
-                    self.logger.warning(msg="List_Cleanup: Filter key: %s not present in Data: %s" % (filter_key, data_value))
-                    continue
+    def iter_cleanup(self, data):
+        """
+        Generator version of ``list_cleanup()``. Consumes any iterable of dictionaries, such as output of ``ParserModule.iterparse()``,
+        and yields only those which pass the filter, without building intermediate lists. Entries are not copied.
 
-        return data
+        :param data: Iterable of dictionaries, which you want to filter.
+        :return: Generator of dictionaries.
+        """
+        matches = self.matches
+        for data_value in data:
+            if matches(data_value):
+                yield data_value
+
+    def _column_selectors(self, data, filters, required):
+        """
+        Evaluates ``filters`` against columns of ``data``, returns list of booleans telling which entries pass.
+        """
+        selectors = [True] * data.length
+        for filter_key, filter_value in filters.items():
+            if filter_key not in data:
+                self.logger.warning(msg="Columns: Filter key: %s not present in Data: %s" % (filter_key, data))
+                continue
+            if not isinstance(filter_value, (str, list)):
+                self.logger.warning(msg="Columns: None of the cases matched. Filter: %s" % filter_value)
+                continue
+            value_matches = self._value_matches
+            for index, value in enumerate(data[filter_key]):
+                if selectors[index]:
+                    result = value_matches(value=value, filter_value=filter_value)
+                    selectors[index] = bool(result) if required else not result
+        return selectors
+
+    def columns_cleanup(self, data):
+        """
+        Function for filtering ``Columns`` (output of ``autoparse(..., layout="columns")``). Filters are evaluated column by column,
+        without converting the data to rows.
+
+        :param data: ``Columns`` object, which you want to filter.
+        :return: New ``Columns`` object with entries which passed the filter.
+        """
+        selectors = self._column_selectors(data=data, filters=self.required, required=True)
+        if self.excluded:
+            excluded = self._column_selectors(data=data, filters=self.excluded, required=False)
+            selectors = [x and y for x, y in zip(selectors, excluded)]
+        return data.compress(selectors)
 
     def universal_cleanup(self, data=None):
         """
@@ -207,6 +233,8 @@ class Filter:
         :param data: Data to be filtered, either list of dictionaries or dictionary of dictionaries.
         :return: Filtered data
         """
+        if isinstance(data, Columns):
+            return self.columns_cleanup(data=data)
         data = copy.deepcopy(data)
         output = None
         if isinstance(data, list):
@@ -246,13 +274,26 @@ class OutputFilter:
             self.excluded = []
             self.logger.error(msg="Excluded is not a list!")
 
+    @property
+    def fields(self):
+        """
+        List of required keys, which can be used as ``fields`` projection when parsing, so that only these keys are parsed at all.
+        ``None`` if no required keys are specified.
+        """
+        return list(self.required) if self.required else None
+
     def get(self):
         """
         After instantiating object, call this function to retrieve filtered data.
 
         :return: Filtered data.
         """
-        if isinstance(self.data, dict):
+        if isinstance(self.data, Columns):
+            if len(self.required) > 0:
+                return self.data.select(fields=self.required)
+            return self.data.select(fields=[key for key in self.data.keys() if key not in self.excluded])
+
+        elif isinstance(self.data, dict):
             for id, data in list(self.data.items()):
                 if len(self.required) > 0:
                     # Loop over required keys
@@ -270,6 +311,9 @@ class OutputFilter:
 
         elif isinstance(self.data, list):
             for i in range(len(self.data)):
+                if isinstance(self.data[i], Mapping) and not isinstance(self.data[i], dict):
+                    # Compact records have fixed keys, filtered entries are therefore returned as dictionaries
+                    self.data[i] = dict(self.data[i])
                 if isinstance(self.data[i], dict):
                     if len(self.required) > 0:
                         for key in list(self.data[i].keys()):
@@ -1,2 +1,3 @@
 from nuaal.utils.utils import *
+from nuaal.utils.Columns import Columns
 from nuaal.utils.Filter import Filter, OutputFilter